@@ -1,6 +1,7 @@
 from gevent import monkey  # isort:skip # noqa
 monkey.patch_all()  # isort:skip # noqa
 import logging
+import multiprocessing
 import sys
 import traceback
 
@@ -16,6 +17,9 @@ log = RotkehlchenLogsAdapter(logger)
 
 
 def main() -> None:
+    # In the packaged binary the worker processes start the executable itself. This
+    # runs the worker instead of the backend in them.
+    multiprocessing.freeze_support()
     try:
         rotkehlchen_server = RotkehlchenServer()
     except SystemPermissionError as e:
@@ -1,10 +1,11 @@
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
 
 import gevent
 
 from rotkehlchen.accounting.constants import FREE_PNL_EVENTS_LIMIT
+from rotkehlchen.accounting.events_stream import AccountingEventsStream
 from rotkehlchen.accounting.export.csv import CSVExporter
 from rotkehlchen.accounting.mixins.event import AccountingEventMixin
 from rotkehlchen.accounting.pot import AccountingPot
@@ -19,6 +20,7 @@ from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import Premium
 from rotkehlchen.types import Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.metrics import METRICS
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.accounting.aggregator import EVMAccountingAggregator
@@ -51,6 +53,7 @@ class Accountant():
         ]
 
         self.currently_processing_timestamp = Timestamp(-1)
+        self.currently_processing_event: Optional[AccountingEventMixin] = None
         self.first_processed_timestamp = Timestamp(-1)
         self.premium = premium
 
@@ -71,11 +74,11 @@ class Accountant():
     def _process_skipping_exception(
             self,
             exception: Exception,
-            events: List[AccountingEventMixin],
             count: int,
             reason: str,
     ) -> int:
-        event = events[count]
+        event = self.currently_processing_event
+        assert event is not None, 'Only called for exceptions raised when processing an event'
         ts = event.get_timestamp()
         identifier = event.get_identifier()
         self.msg_aggregator.add_error(
@@ -94,18 +97,24 @@ class Accountant():
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
-            events: List[AccountingEventMixin],
+            events: Union[List[AccountingEventMixin], AccountingEventsStream],
+            retain_processed_events: bool = True,
     ) -> int:
         """Processes the entire history of cryptoworld actions in order to determine
         the price and time at which every asset was obtained and also
         the general and taxable profit/loss.
 
         The events history is already expected to be sorted when passed to this function.
+        It is either a list or a stream that is consumed as the events get processed.
 
         start_ts here is the timestamp at which to start taking trades and other
         taxable events into account. Not where processing starts from. Processing
         always starts from the very first event we find in the history.
 
+        The processed events are written to the DB report data in batches. If
+        retain_processed_events is False they are not also kept in memory, so the
+        report can't be exported afterwards and only its DB data is available.
+
         Returns the id of the generated report
         """
         active_premium = self.premium and self.premium.is_active()
@@ -116,20 +125,29 @@ class Accountant():
             active_premium=active_premium,
         )
         events_limit = -1 if active_premium else FREE_PNL_EVENTS_LIMIT
+        if isinstance(events, list):
+            events = AccountingEventsStream.from_list(events)
         # Ask the DB for the settings once at the start of processing so we got the
         # same settings through the entire task
         with self.db.conn.read_ctx() as cursor:
             db_settings = self.db.get_settings(cursor)
             # Create a new pnl report in the DB to be used to save each event generated
             dbpnl = DBAccountingReports(self.db)
-            first_ts = Timestamp(0) if len(events) == 0 else events[0].get_timestamp()
+            first_event = events.peek()
+            first_ts = Timestamp(0) if first_event is None else first_event.get_timestamp()
             report_id = dbpnl.add_report(
                 first_processed_timestamp=first_ts,
                 start_ts=start_ts,
                 end_ts=end_ts,
                 settings=db_settings,
             )
-            self.pots[0].reset(settings=db_settings, start_ts=start_ts, end_ts=end_ts, report_id=report_id)  # noqa: E501
+            self.pots[0].reset(
+                settings=db_settings,
+                start_ts=start_ts,
+                end_ts=end_ts,
+                report_id=report_id,
+                retain_processed_events=retain_processed_events,
+            )
             self.end_ts = end_ts
             self.csvexporter.reset(start_ts=start_ts, end_ts=end_ts)
 
@@ -142,63 +160,63 @@ class Accountant():
             prev_time = last_event_ts = Timestamp(0)
             ignored_ids_mapping = self.db.get_ignored_action_ids(cursor=cursor, action_type=None)
 
-        events_iter = iter(events)
-        while True:
-            try:
-                (
-                    processed_events_num,
-                    prev_time,
-                ) = self._process_event(
-                    events_iterator=events_iter,
-                    start_ts=start_ts,
-                    end_ts=end_ts,
-                    prev_time=prev_time,
-                    db_settings=db_settings,
-                    ignored_ids_mapping=ignored_ids_mapping,
-                )
-            except PriceQueryUnsupportedAsset as e:
-                count = self._process_skipping_exception(
-                    exception=e,
-                    events=events,
-                    count=count,
-                    reason='not being able to find price for an unsupported asset',
-                )
-                continue
-            except NoPriceForGivenTimestamp as e:
-                self.pots[0].cost_basis.missing_prices.add(
-                    MissingPrice(
-                        from_asset=e.from_asset,
-                        to_asset=e.to_asset,
-                        time=e.time,
-                    ),
-                )
-                continue
-            except RemoteError as e:
-                count = self._process_skipping_exception(
-                    exception=e,
-                    events=events,
-                    count=count,
-                    reason='inability to reach an external service at that point in time',
-                )
-                continue
-
-            if processed_events_num == 0:
-                break  # we reached the period end
-
-            last_event_ts = prev_time
-            if count % 500 == 0:
-                # This loop can take a very long time depending on the amount of events
-                # to process. We need to yield to other greenlets or else calls to the
-                # API may time out
-                gevent.sleep(0.5)
-            count += processed_events_num
-            if not active_premium and count >= FREE_PNL_EVENTS_LIMIT:
-                log.debug(
-                    f'PnL reports event processing has hit the event limit of {events_limit}. '
-                    f'Processing stopped and the results will not '
-                    f'take into account subsequent events. Total events were {len(events)}',
-                )
-                break
+        try:
+            while True:
+                try:
+                    (
+                        processed_events_num,
+                        prev_time,
+                    ) = self._process_event(
+                        events_iterator=events,
+                        start_ts=start_ts,
+                        end_ts=end_ts,
+                        prev_time=prev_time,
+                        db_settings=db_settings,
+                        ignored_ids_mapping=ignored_ids_mapping,
+                    )
+                except PriceQueryUnsupportedAsset as e:
+                    count = self._process_skipping_exception(
+                        exception=e,
+                        count=count,
+                        reason='not being able to find price for an unsupported asset',
+                    )
+                    continue
+                except NoPriceForGivenTimestamp as e:
+                    self.pots[0].cost_basis.missing_prices.add(
+                        MissingPrice(
+                            from_asset=e.from_asset,
+                            to_asset=e.to_asset,
+                            time=e.time,
+                        ),
+                    )
+                    continue
+                except RemoteError as e:
+                    count = self._process_skipping_exception(
+                        exception=e,
+                        count=count,
+                        reason='inability to reach an external service at that point in time',
+                    )
+                    continue
+
+                if processed_events_num == 0:
+                    break  # we reached the period end
+
+                last_event_ts = prev_time
+                if count % 500 == 0:
+                    # This loop can take a very long time depending on the amount of events
+                    # to process. We need to yield to other greenlets or else calls to the
+                    # API may time out
+                    gevent.sleep(0.5)
+                count += processed_events_num
+                if not active_premium and count >= FREE_PNL_EVENTS_LIMIT:
+                    log.debug(
+                        f'PnL reports event processing has hit the event limit of {events_limit}. '
+                        f'Processing stopped and the results will not '
+                        f'take into account subsequent events. Total events were {len(events)}',
+                    )
+                    break
+        finally:
+            self.pots[0].flush_report_data()
 
         dbpnl.add_report_overview(
             report_id=report_id,
@@ -234,6 +252,7 @@ class Accountant():
         event = next(events_iterator, None)
         if event is None:
             return 0, prev_time
+        self.currently_processing_event = event
 
         # Assert we are sorted in ascending time order.
         timestamp = event.get_timestamp()
@@ -283,7 +302,8 @@ class Accountant():
             )
             return 1, prev_time
 
-        consumed_events = event.process(self.pots[0], events_iterator)
+        with METRICS.time('accounting_event', type(event).__name__):
+            consumed_events = event.process(self.pots[0], events_iterator)
         return consumed_events, prev_time
 
     def export(self, directory_path: Optional[Path]) -> Tuple[bool, str]:
@@ -293,6 +313,8 @@ class Accountant():
         If no directory is given it returns the path to a zip to export
         """
         if len(self.pots[0].processed_events) == 0:
+            if self.pots[0].processed_events_num != 0:
+                return False, 'The processed events of the last report were not kept for export'  # noqa: E501
             return False, 'No history processed in order to perform an export'
 
         if directory_path is None:
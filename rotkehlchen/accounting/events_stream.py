@@ -0,0 +1,60 @@
+import heapq
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from rotkehlchen.accounting.mixins.event import AccountingEventMixin
+from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+
+
+def accounting_event_order_key(event: AccountingEventMixin) -> Tuple[int, int]:
+    """Order in which accounting processes events. By timestamp and for history
+    base entries of the same timestamp by sequence index"""
+    return (
+        event.get_timestamp(),
+        event.sequence_index if isinstance(event, HistoryBaseEntry) else 1,
+    )
+
+
+class AccountingEventsStream():
+    """Single pass stream of the events accounting processes in order
+
+    Each source is an iterable of events already sorted by accounting_event_order_key.
+    The sources are merged lazily so that an event is only read from its source when
+    the stream gets to it. Events with equal keys come in the order of their sources,
+    same as sorting all of them together would give.
+    """
+
+    def __init__(
+            self,
+            sources: Sequence[Iterable[AccountingEventMixin]],
+            total: int,
+    ) -> None:
+        self.total = total
+        if len(sources) == 1:  # also keeps the order of a single unsorted source
+            self._iterator: Iterator[AccountingEventMixin] = iter(sources[0])
+        else:
+            self._iterator = heapq.merge(*sources, key=accounting_event_order_key)
+        self._peeked: Optional[AccountingEventMixin] = None
+
+    @classmethod
+    def from_list(cls, events: List[AccountingEventMixin]) -> 'AccountingEventsStream':
+        """Stream of a list of events that is already sorted"""
+        return cls(sources=[events], total=len(events))
+
+    def __len__(self) -> int:
+        """Total number of events in the sources. Some may still be skipped when read"""
+        return self.total
+
+    def __iter__(self) -> 'AccountingEventsStream':
+        return self
+
+    def __next__(self) -> AccountingEventMixin:
+        if self._peeked is not None:
+            event, self._peeked = self._peeked, None
+            return event
+        return next(self._iterator)
+
+    def peek(self) -> Optional[AccountingEventMixin]:
+        """Returns the next event without consuming it or None if the stream is over"""
+        if self._peeked is None:
+            self._peeked = next(self._iterator, None)
+        return self._peeked
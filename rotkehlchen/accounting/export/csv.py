@@ -12,6 +12,7 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Timestamp
 from rotkehlchen.utils.mixins.customizable_date import CustomizableDateMixin
+from rotkehlchen.utils.process_pool import run_in_worker
 from rotkehlchen.utils.version_check import get_current_version
 
 if TYPE_CHECKING:
@@ -62,6 +63,35 @@ def _dict_to_csv_file(path: Path, dictionary_list: List) -> None:
             raise CSVWriteError(f'Failed to write {path} CSV due to {str(e)}') from e
 
 
+def _write_csv_files(directory: Path, serialized_events: List[Dict[str, Any]]) -> None:
+    """Writes the CSV files of the serialized events in the directory. Runs in a
+    worker process.
+
+    May raise:
+    - CSVWriteError if an event can't be written
+    - PermissionError if the directory or the files can't be written
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    _dict_to_csv_file(directory / FILENAME_ALL_CSV, serialized_events)
+
+
+def _zip_csv_files(directory: Path) -> str:
+    """Compresses the CSV files in the directory into a zip file in it and deletes
+    them. Returns the path of the zip file. Runs in a worker process."""
+    files: List[Tuple[Path, str]] = [
+        (directory / FILENAME_ALL_CSV, FILENAME_ALL_CSV),
+    ]
+    with ZipFile(file=directory / 'csv.zip', mode='w', compression=ZIP_DEFLATED) as csv_zip:
+        for path, filename in files:
+            if not path.exists():
+                continue
+
+            csv_zip.write(path, filename)
+            path.unlink()
+
+    return '' if csv_zip.filename is None else csv_zip.filename
+
+
 class CSVExporter(CustomizableDateMixin):
 
     def __init__(
@@ -240,24 +270,8 @@ class CSVExporter(CustomizableDateMixin):
         if not success:
             return False, msg
 
-        files: List[Tuple[Path, str]] = [
-            (dirpath / FILENAME_ALL_CSV, FILENAME_ALL_CSV),
-        ]
-        with ZipFile(file=dirpath / 'csv.zip', mode='w', compression=ZIP_DEFLATED) as csv_zip:
-            for path, filename in files:
-                if not path.exists():
-                    continue
-
-                csv_zip.write(path, filename)
-                path.unlink()
-
-        success = False
-        filename = ''
-        if csv_zip.filename is not None:
-            success = True
-            filename = csv_zip.filename
-
-        return success, filename
+        filename = run_in_worker(_zip_csv_files, directory=dirpath)
+        return filename != '', filename
 
     def to_csv_entry(self, event: 'ProcessedAccountingEvent') -> Dict[str, Any]:
         dict_event = event.to_exported_dict(
@@ -281,13 +295,16 @@ class CSVExporter(CustomizableDateMixin):
             pnls: PnlTotals,
             directory: Path,
     ) -> Tuple[bool, str]:
+        """Writes the CSV files of the events in the directory. The events are serialized
+        here, since that needs the assets and the settings, and the files are written in
+        a worker process so that the backend keeps serving requests meanwhile."""
         serialized_events = [self.to_csv_entry(x) for idx, x in enumerate(events)]
         self._maybe_add_summary(events=serialized_events, pnls=pnls)
         try:
-            directory.mkdir(parents=True, exist_ok=True)
-            _dict_to_csv_file(
-                directory / FILENAME_ALL_CSV,
-                serialized_events,
+            run_in_worker(
+                _write_csv_files,
+                directory=directory,
+                serialized_events=serialized_events,
             )
         except (CSVWriteError, PermissionError) as e:
             return False, str(e)
@@ -13,7 +13,7 @@ from rotkehlchen.accounting.transactions import TransactionsAccountant
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.assets import A_KFEE
 from rotkehlchen.constants.misc import ONE, ZERO
-from rotkehlchen.db.reports import DBAccountingReports
+from rotkehlchen.db.reports import DBReportDataWriter
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
@@ -53,19 +53,23 @@ class AccountingPot(CustomizableDateMixin):
         )
         self.pnls = PnlTotals()
         self.processed_events: List[ProcessedAccountingEvent] = []
+        self.processed_events_num = 0
+        # If False the processed events are only written to the DB report data
+        self.retain_processed_events = True
         self.transactions = TransactionsAccountant(
             evm_accounting_aggregator=evm_accounting_aggregator,
             pot=self,
         )
         self.query_start_ts = self.query_end_ts = Timestamp(0)
         self.report_id: Optional[int] = None
+        self.report_writer: Optional[DBReportDataWriter] = None
 
     def _add_processed_event(self, event: ProcessedAccountingEvent) -> None:
-        dbpnl = DBAccountingReports(self.database)
-        self.processed_events.append(event)
+        self.processed_events_num += 1
+        if self.retain_processed_events:
+            self.processed_events.append(event)
         try:
-            dbpnl.add_report_data(
-                report_id=self.report_id,  # type: ignore # report id is initialized by now
+            self.report_writer.add(  # type: ignore # report writer is initialized by now
                 time=event.timestamp,
                 ts_converter=self.timestamp_to_date,
                 event=event,
@@ -76,6 +80,16 @@ class AccountingPot(CustomizableDateMixin):
 
         log.debug(event.to_string(self.timestamp_to_date))
 
+    def flush_report_data(self) -> None:
+        """Writes the processed events still pending to the DB report data"""
+        if self.report_writer is None:
+            return
+
+        try:
+            self.report_writer.flush()
+        except InputError as e:
+            log.error(str(e))
+
     def get_rate_in_profit_currency(self, asset: Asset, timestamp: Timestamp) -> Price:
         """Get the profit_currency price of asset in the given timestamp
 
@@ -102,9 +116,11 @@ class AccountingPot(CustomizableDateMixin):
             start_ts: Timestamp,
             end_ts: Timestamp,
             report_id: int,
+            retain_processed_events: bool = True,
     ) -> None:
         self.settings = settings
         self.report_id = report_id
+        self.report_writer = DBReportDataWriter(database=self.database, report_id=report_id)
         self.profit_currency = self.settings.main_currency
         self.query_start_ts = start_ts
         self.query_end_ts = end_ts
@@ -112,6 +128,8 @@ class AccountingPot(CustomizableDateMixin):
         self.cost_basis.reset(settings)
         self.transactions.reset()
         self.processed_events = []
+        self.processed_events_num = 0
+        self.retain_processed_events = retain_processed_events
 
     def add_acquisition(
             self,  # pylint: disable=unused-argument
@@ -148,7 +166,7 @@ class AccountingPot(CustomizableDateMixin):
             asset=asset,
             amount=amount,
             price=price,
-            starting_index=len(self.processed_events),
+            starting_index=self.processed_events_num,
         )
         for prefork_event in prefork_events:
             self._add_processed_event(prefork_event)
@@ -164,7 +182,7 @@ class AccountingPot(CustomizableDateMixin):
             price=price,
             pnl=PNL(),  # filled out later
             cost_basis=None,
-            index=len(self.processed_events),
+            index=self.processed_events_num,
         )
         if extra_data:
             event.extra_data = extra_data
@@ -260,7 +278,7 @@ class AccountingPot(CustomizableDateMixin):
             price=price,
             pnl=PNL(),  # filled out later
             cost_basis=spend_cost,
-            index=len(self.processed_events),
+            index=self.processed_events_num,
         )
         if extra_data:
             spend_event.extra_data = extra_data
@@ -141,7 +141,7 @@ class BalanceSheet:
     def serialize(self) -> Dict[str, Dict]:
         return {
             'assets': {k.serialize(): v.serialize() for k, v in self.assets.items()},
-            'liabilities': {k: v.serialize() for k, v in self.liabilities.items()},
+            'liabilities': {k.serialize(): v.serialize() for k, v in self.liabilities.items()},  # noqa: E501
         }
 
     def to_dict(self) -> Dict[str, Dict]:
@@ -143,6 +143,7 @@ from rotkehlchen.inquirer import CurrentPriceOracle, Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import PremiumCredentials
 from rotkehlchen.rotkehlchen import Rotkehlchen
+from rotkehlchen.serialization.encoder import dumps_json
 from rotkehlchen.serialization.serialize import process_result, process_result_list
 from rotkehlchen.types import (
     AVAILABLE_MODULES_MAP,
@@ -170,7 +171,10 @@ from rotkehlchen.types import (
     TradeType,
     UserNote,
 )
+from rotkehlchen.utils.metrics import METRICS
 from rotkehlchen.utils.misc import combine_dicts
+from rotkehlchen.utils.mixins.cacheable import pop_served_cache_age, reset_served_cache_age
+from rotkehlchen.utils.sampling_profiler import ProfileResult, SamplingProfiler
 from rotkehlchen.utils.snapshots import parse_import_snapshot_data
 from rotkehlchen.utils.version_check import get_current_version
 
@@ -178,7 +182,7 @@ if TYPE_CHECKING:
     from rotkehlchen.chain.bitcoin.xpub import XpubData
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.constants import KrakenAccountType
 
 
 logger = logging.getLogger(__name__)
@@ -216,7 +220,7 @@ def api_response(
         assert not result, "Provided 204 response with non-zero length response"
         data = ""
     else:
-        data = json.dumps(result)
+        data = dumps_json(result)
 
     response = make_response(
         (
@@ -245,6 +249,7 @@ class RestAPI():
         self.task_results: Dict[int, Any] = {}
         self.trade_schema = TradeSchema()
         self.import_tmp_files: DefaultDict[FileStorage, Path] = defaultdict()
+        self.profiler: Optional[SamplingProfiler] = None
 
     # - Private functions not exposed to the API
     def _new_task_id(self) -> int:
@@ -289,9 +294,20 @@ class RestAPI():
 
     def _do_query_async(self, command: Callable, task_id: int, **kwargs: Any) -> None:
         log.debug(f'Async task with task id {task_id} started')
-        result = command(**kwargs)
+        result = self._query_with_cache_age(command, **kwargs)
         self._write_task_result(task_id, result)
 
+    @staticmethod
+    def _query_with_cache_age(command: Callable, **kwargs: Any) -> Any:
+        """Runs the command and if it served cached results adds the age in seconds
+        of the oldest one to the response as cache_age"""
+        reset_served_cache_age()
+        result = command(**kwargs)
+        cache_age = pop_served_cache_age()
+        if cache_age is not None and isinstance(result, dict):
+            result['cache_age'] = cache_age
+        return result
+
     def _query_async(self, command: Callable, **kwargs: Any) -> Response:
         task_id = self._new_task_id()
         greenlet = gevent.spawn(
@@ -359,9 +375,11 @@ class RestAPI():
                         message = function_response['message']
                         status_code = function_response.get('status_code')
                         ret = {'result': result, 'message': message}
+                        if 'cache_age' in function_response:
+                            ret['cache_age'] = function_response['cache_age']
                         returned_task_result = {
                             'status': 'completed',
-                            'outcome': process_result(ret),
+                            'outcome': ret,
                         }
                         if status_code:
                             returned_task_result['status_code'] = status_code
@@ -460,15 +478,16 @@ class RestAPI():
                 ignore_cache=ignore_cache,
             )
 
-        response = self._query_all_balances(
+        response = self._query_with_cache_age(
+            self._query_all_balances,
             save_data=save_data,
             ignore_errors=ignore_errors,
             ignore_cache=ignore_cache,
         )
-        return api_response(
-            _wrap_in_result(process_result(response['result']), response['message']),
-            HTTPStatus.OK,
-        )
+        result_dict = _wrap_in_result(response['result'], response['message'])
+        if 'cache_age' in response:
+            result_dict['cache_age'] = response['cache_age']
+        return api_response(result_dict, HTTPStatus.OK)
 
     def _return_external_services_response(self) -> Response:
         credentials_list = self.rotkehlchen.data.db.get_all_external_service_credentials()
@@ -642,14 +661,21 @@ class RestAPI():
                 ignore_cache=ignore_cache,
             )
 
-        response = self._query_exchange_balances(location=location, ignore_cache=ignore_cache)
+        response = self._query_with_cache_age(
+            self._query_exchange_balances,
+            location=location,
+            ignore_cache=ignore_cache,
+        )
         balances = response['result']
         msg = response['message']
         status_code = _get_status_code_from_async_response(response)
         if balances is None:
             return api_response(wrap_in_fail_result(msg), status_code=status_code)
 
-        return api_response(_wrap_in_ok_result(process_result(balances)), HTTPStatus.OK)
+        result_dict = _wrap_in_ok_result(process_result(balances))
+        if 'cache_age' in response:
+            result_dict['cache_age'] = response['cache_age']
+        return api_response(result_dict, HTTPStatus.OK)
 
     def _query_blockchain_balances(
             self,
@@ -710,13 +736,16 @@ class RestAPI():
                 ignore_cache=ignore_cache,
             )
 
-        response = self._query_blockchain_balances(
+        response = self._query_with_cache_age(
+            self._query_blockchain_balances,
             blockchain=blockchain,
             ignore_cache=ignore_cache,
         )
         status_code = _get_status_code_from_async_response(response)
         result_dict = {'result': response['result'], 'message': response['message']}
-        return api_response(process_result(result_dict), status_code=status_code)
+        if 'cache_age' in response:
+            result_dict['cache_age'] = response['cache_age']
+        return api_response(result_dict, status_code=status_code)
 
     def _get_trades(
             self,
@@ -778,7 +807,7 @@ class RestAPI():
         )
         status_code = _get_status_code_from_async_response(response)
         result_dict = {'result': response['result'], 'message': response['message']}
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def add_trade(
             self,
@@ -919,7 +948,7 @@ class RestAPI():
         )
         result_dict = {'result': response['result'], 'message': response['message']}
         status_code = _get_status_code_from_async_response(response)
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def _get_ledger_actions(
             self,
@@ -969,7 +998,7 @@ class RestAPI():
         )
         status_code = _get_status_code_from_async_response(response)
         result_dict = {'result': response['result'], 'message': response['message']}
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def add_ledger_action(self, action: LedgerAction) -> Response:
         db = DBLedgerActions(self.rotkehlchen.data.db, self.rotkehlchen.msg_aggregator)
@@ -995,7 +1024,7 @@ class RestAPI():
             only_cache=True,
         )
         result_dict = {'result': response['result'], 'message': response['message']}
-        return api_response(process_result(result_dict), status_code=HTTPStatus.OK)
+        return api_response(result_dict, status_code=HTTPStatus.OK)
 
     def delete_ledger_action(self, identifier: int) -> Response:
         db = DBLedgerActions(self.rotkehlchen.data.db, self.rotkehlchen.msg_aggregator)
@@ -1010,7 +1039,33 @@ class RestAPI():
             only_cache=True,
         )
         result_dict = {'result': response['result'], 'message': response['message']}
-        return api_response(process_result(result_dict), status_code=HTTPStatus.OK)
+        return api_response(result_dict, status_code=HTTPStatus.OK)
+
+    def get_history_events_changes(self, from_sequence: int, limit: int) -> Response:
+        db = DBHistoryEvents(self.rotkehlchen.data.db)
+        with self.rotkehlchen.data.db.conn.read_ctx() as cursor:
+            events = db.get_history_events_since(
+                cursor=cursor,
+                from_sequence=from_sequence,
+                limit=limit,
+                has_premium=self.rotkehlchen.premium is not None,
+            )
+            customized_event_ids = db.get_customized_event_identifiers(cursor)
+            last_sequence = db.get_last_change_sequence(cursor)
+
+        entries = []
+        for sequence, identifier, event in events:
+            if event is None:
+                entries.append({'identifier': identifier, 'sequence': sequence, 'deleted': True})
+            else:
+                entries.append({
+                    'entry': event.serialize(),
+                    'sequence': sequence,
+                    'customized': identifier in customized_event_ids,
+                    'deleted': False,
+                })
+        result = {'entries': entries, 'last_sequence': last_sequence}
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
 
     def add_history_event(self, event: HistoryBaseEntry) -> Response:
         db = DBHistoryEvents(self.rotkehlchen.data.db)
@@ -1830,7 +1885,7 @@ class RestAPI():
 
         # success
         result_dict = _wrap_in_result(result, msg)
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def _delete_xpub(
         self,
@@ -1873,7 +1928,7 @@ class RestAPI():
 
         # success
         result_dict = _wrap_in_result(result, msg)
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def edit_xpub(
         self,
@@ -1891,12 +1946,12 @@ class RestAPI():
         except InputError as e:
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.BAD_REQUEST)  # noqa: E501
 
-        return api_response(process_result(_wrap_in_result(data, '')), status_code=HTTPStatus.OK)
+        return api_response(_wrap_in_result(data, ''), status_code=HTTPStatus.OK)
 
     def get_blockchain_accounts(self, blockchain: SupportedBlockchain) -> Response:
         with self.rotkehlchen.data.db.conn.read_ctx() as cursor:
             data = self.rotkehlchen.get_blockchain_account_data(cursor, blockchain)
-        return api_response(process_result(_wrap_in_result(data, '')), status_code=HTTPStatus.OK)
+        return api_response(_wrap_in_result(data, ''), status_code=HTTPStatus.OK)
 
     def _add_blockchain_accounts(
             self,
@@ -1947,7 +2002,7 @@ class RestAPI():
 
         # success
         result_dict = _wrap_in_result(result, msg)
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def edit_blockchain_accounts(
             self,
@@ -1968,7 +2023,7 @@ class RestAPI():
         except InputError as e:
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.BAD_REQUEST)  # noqa: E501
 
-        return api_response(process_result(_wrap_in_result(data, '')), status_code=HTTPStatus.OK)
+        return api_response(_wrap_in_result(data, ''), status_code=HTTPStatus.OK)
 
     def _remove_blockchain_accounts(
             self,
@@ -2016,7 +2071,7 @@ class RestAPI():
 
         # success
         result_dict = _wrap_in_result(result, msg)
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def _get_manually_tracked_balances(self) -> Dict[str, Any]:
         db_entries = get_manually_tracked_balances(db=self.rotkehlchen.data.db, balance_type=None)
@@ -2231,6 +2286,88 @@ class RestAPI():
     def ping() -> Response:
         return api_response(_wrap_in_ok_result(True), status_code=HTTPStatus.OK)
 
+    @staticmethod
+    def get_metrics(output_format: Literal['json', 'prometheus']) -> Response:
+        if output_format == 'prometheus':
+            return make_response(
+                (
+                    METRICS.to_prometheus(),
+                    HTTPStatus.OK,
+                    {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'},
+                ),
+            )
+        return api_response(_wrap_in_ok_result(METRICS.serialize()), status_code=HTTPStatus.OK)  # noqa: E501
+
+    @staticmethod
+    def edit_metrics(enabled: bool) -> Response:
+        METRICS.enabled = enabled
+        return api_response(_wrap_in_ok_result(METRICS.serialize()), status_code=HTTPStatus.OK)  # noqa: E501
+
+    @staticmethod
+    def reset_metrics() -> Response:
+        METRICS.reset()
+        return api_response(OK_RESULT, status_code=HTTPStatus.OK)
+
+    def _run_profiler(self, seconds: int) -> Optional[ProfileResult]:
+        """Profiles the backend for the given seconds. Returns None if it's already
+        being profiled."""
+        if self.profiler is not None:
+            return None
+
+        self.profiler = SamplingProfiler()
+        self.profiler.start()
+        try:
+            gevent.sleep(seconds)
+        finally:
+            profile = self.profiler.stop()
+            self.profiler = None
+        return profile
+
+    def _profile_backend(self, seconds: int) -> Dict[str, Any]:
+        profile = self._run_profiler(seconds)
+        if profile is None:
+            return {
+                'result': None,
+                'message': 'The backend is already being profiled',
+                'status_code': HTTPStatus.CONFLICT,
+            }
+        return {'result': profile.serialize(), 'message': ''}
+
+    def profile_backend(
+            self,
+            async_query: bool,
+            seconds: int,
+            output_format: Literal['json', 'collapsed'],
+    ) -> Response:
+        if async_query is True:
+            return self._query_async(command=self._profile_backend, seconds=seconds)
+
+        if output_format == 'collapsed':
+            profile = self._run_profiler(seconds)
+            if profile is None:
+                return api_response(
+                    wrap_in_fail_result('The backend is already being profiled'),
+                    status_code=HTTPStatus.CONFLICT,
+                )
+            return make_response(
+                (
+                    profile.collapsed_stacks(),
+                    HTTPStatus.OK,
+                    {
+                        'Content-Type': 'text/plain; charset=utf-8',
+                        'Content-Disposition': 'attachment; filename=rotki_profile.collapsed',
+                    },
+                ),
+            )
+
+        response = self._profile_backend(seconds=seconds)
+        result = response['result']
+        msg = response['message']
+        status_code = _get_status_code_from_async_response(response)
+        if result is None:
+            return api_response(wrap_in_fail_result(msg), status_code=status_code)
+        return api_response(_wrap_in_result(result, msg), status_code=status_code)
+
     def _import_data(
             self,
             source: DataImportSource,
@@ -2657,7 +2794,7 @@ class RestAPI():
         )
         result_dict = {'result': response['result'], 'message': response['message']}
         status_code = _get_status_code_from_async_response(response)
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def get_makerdao_dsr_balance(self, async_query: bool) -> Response:
         return self._api_query_for_eth_module(
@@ -3229,7 +3366,7 @@ class RestAPI():
 
         # success
         result_dict = _wrap_in_result(result, msg)
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def _decode_ethereum_transactions(
             self,
@@ -3270,7 +3407,7 @@ class RestAPI():
 
         # success
         result_dict = _wrap_in_result(result, msg)
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def get_asset_icon(
             self,
@@ -3800,7 +3937,7 @@ class RestAPI():
 
         # success
         result_dict = _wrap_in_result(result, msg)
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def _get_avax_token_info(self, address: ChecksumEvmAddress) -> Dict[str, Any]:
         avax_manager = self.rotkehlchen.chain_manager.avalanche
@@ -3871,7 +4008,7 @@ class RestAPI():
         response = self._get_nfts_balances(ignore_cache=ignore_cache)
         status_code = _get_status_code_from_async_response(response)
         result_dict = {'result': response['result'], 'message': response['message']}
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def get_nfts_with_price(self) -> Response:
         return self._api_query_for_eth_module(
@@ -3990,7 +4127,7 @@ class RestAPI():
             'entries_found': entries_found,
             'entries_limit': entries_limit,
         })
-        return api_response(process_result(result_dict), status_code=HTTPStatus.OK)
+        return api_response(result_dict, status_code=HTTPStatus.OK)
 
     def get_report_data(self, filter_query: ReportDataFilterQuery) -> Response:
         with_limit = False
@@ -4135,7 +4272,7 @@ class RestAPI():
         )
         status_code = _get_status_code_from_async_response(response)
         result_dict = {'result': response['result'], 'message': response['message']}
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def get_user_added_assets(self, path: Optional[Path]) -> Response:
         """
@@ -4354,7 +4491,7 @@ class RestAPI():
         )
         status_code = _get_status_code_from_async_response(response)
         result_dict = {'result': response['result'], 'message': response['message']}
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def import_user_snapshot(
         self,
@@ -4523,7 +4660,7 @@ class RestAPI():
         response = self._detect_ethereum_tokens(only_cache=only_cache, addresses=addresses)
         status_code = _get_status_code_from_async_response(response)
         result_dict = {'result': response['result'], 'message': response['message']}
-        return api_response(process_result(result_dict), status_code=status_code)
+        return api_response(result_dict, status_code=status_code)
 
     def get_config_arguments(self) -> Response:
         config = {
@@ -97,6 +97,7 @@ from rotkehlchen.api.v1.resources import (
     MakerdaoVaultsResource,
     ManuallyTrackedBalancesResource,
     MessagesResource,
+    MetricsResource,
     NamedEthereumModuleDataResource,
     NamedOracleCacheResource,
     NFTSBalanceResource,
@@ -106,6 +107,7 @@ from rotkehlchen.api.v1.resources import (
     PeriodicDataResource,
     PickleDillResource,
     PingResource,
+    ProfilerResource,
     QueriedAddressesResource,
     ReverseEnsResource,
     SettingsResource,
@@ -284,6 +286,8 @@ URLS_V1: URLS = [
     ('/actions/ignored', IgnoredActionsResource),
     ('/info', InfoResource),
     ('/ping', PingResource),
+    ('/metrics', MetricsResource),
+    ('/profiler', ProfilerResource),
     ('/import', DataImportResource),
     ('/nfts', NFTSResource),
     ('/nfts/balances', NFTSBalanceResource),
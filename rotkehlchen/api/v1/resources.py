@@ -72,6 +72,7 @@ from rotkehlchen.api.v1.schemas import (
     FileListSchema,
     HistoricalAssetsPriceSchema,
     HistoryBaseEntrySchema,
+    HistoryEventsChangesSchema,
     HistoryExportingSchema,
     HistoryProcessingDebugImportSchema,
     HistoryProcessingExportSchema,
@@ -89,6 +90,8 @@ from rotkehlchen.api.v1.schemas import (
     ManualPriceDeleteSchema,
     ManualPriceRegisteredSchema,
     ManualPriceSchema,
+    MetricsEditSchema,
+    MetricsQuerySchema,
     ModifyEvmTokenSchema,
     NameDeleteSchema,
     NamedEthereumModuleDataSchema,
@@ -97,6 +100,7 @@ from rotkehlchen.api.v1.schemas import (
     NamedOracleCacheSchema,
     NewUserSchema,
     OptionalEthereumAddressSchema,
+    ProfilerSchema,
     QueriedAddressesSchema,
     RequiredEthereumAddressSchema,
     ReverseEnsSchema,
@@ -177,7 +181,7 @@ from rotkehlchen.types import (
 if TYPE_CHECKING:
     from rotkehlchen.chain.bitcoin.hdkey import HDKey
     from rotkehlchen.db.filtering import HistoryEventFilterQuery
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.constants import KrakenAccountType
 
 
 def _combine_parser_data(
@@ -1013,10 +1017,16 @@ class LedgerActionsResource(BaseMethodView):
 
 class HistoryBaseEntryResource(BaseMethodView):
 
+    get_schema = HistoryEventsChangesSchema()
     put_schema = HistoryBaseEntrySchema(identifier_required=False)
     patch_schema = HistoryBaseEntrySchema(identifier_required=True)
     delete_schema = IdentifiersListSchema()
 
+    @require_loggedin_user()
+    @use_kwargs(get_schema, location='json_and_query')
+    def get(self, from_sequence: int, limit: int) -> Response:
+        return self.rest_api.get_history_events_changes(from_sequence=from_sequence, limit=limit)  # noqa: E501
+
     @require_loggedin_user()
     @use_kwargs(put_schema, location='json')
     def put(self, event: HistoryBaseEntry) -> Response:
@@ -1532,6 +1542,41 @@ class PingResource(BaseMethodView):
         return self.rest_api.ping()
 
 
+class MetricsResource(BaseMethodView):
+
+    get_schema = MetricsQuerySchema()
+    patch_schema = MetricsEditSchema()
+
+    @use_kwargs(get_schema, location='json_and_query')
+    def get(self, output_format: Literal['json', 'prometheus']) -> Response:
+        return self.rest_api.get_metrics(output_format=output_format)
+
+    @use_kwargs(patch_schema, location='json')
+    def patch(self, enabled: bool) -> Response:
+        return self.rest_api.edit_metrics(enabled=enabled)
+
+    def delete(self) -> Response:
+        return self.rest_api.reset_metrics()
+
+
+class ProfilerResource(BaseMethodView):
+
+    put_schema = ProfilerSchema()
+
+    @use_kwargs(put_schema, location='json')
+    def put(
+            self,
+            async_query: bool,
+            seconds: int,
+            output_format: Literal['json', 'collapsed'],
+    ) -> Response:
+        return self.rest_api.profile_backend(
+            async_query=async_query,
+            seconds=seconds,
+            output_format=output_format,
+        )
+
+
 class DataImportResource(BaseMethodView):
 
     upload_schema = DataImportSchema()
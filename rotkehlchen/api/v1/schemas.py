@@ -47,6 +47,7 @@ from rotkehlchen.chain.substrate.utils import (
     is_valid_polkadot_address,
 )
 from rotkehlchen.constants.assets import A_ETH, A_ETH2
+from rotkehlchen.constants.limits import MAX_HISTORY_EVENTS_CHANGES_LIMIT, MAX_PROFILING_SECONDS
 from rotkehlchen.constants.misc import ONE, ZERO
 from rotkehlchen.constants.resolver import ChainID
 from rotkehlchen.data_import.manager import DataImportSource
@@ -64,7 +65,7 @@ from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.db.utils import DBAssetBalance, LocationData
 from rotkehlchen.errors.misc import InputError, RemoteError, XPUBError
 from rotkehlchen.errors.serialization import DeserializationError, EncodingError
-from rotkehlchen.exchanges.kraken import KrakenAccountType
+from rotkehlchen.exchanges.constants import KrakenAccountType
 from rotkehlchen.exchanges.manager import ALL_SUPPORTED_EXCHANGES, SUPPORTED_EXCHANGES
 from rotkehlchen.history.types import HistoricalPriceOracle
 from rotkehlchen.icons import ALLOWED_ICON_EXTENSIONS
@@ -887,6 +888,7 @@ class ModifiableSettingsSchema(Schema):
     # even though it gets validated since we try to connect to it
     ksm_rpc_endpoint = fields.String(load_default=None)
     dot_rpc_endpoint = fields.String(load_default=None)
+    beacon_rpc_endpoint = fields.String(load_default=None)
     main_currency = AssetField(load_default=None)
     # TODO: Add some validation to this field
     date_display_format = fields.String(load_default=None)
@@ -965,6 +967,7 @@ class ModifiableSettingsSchema(Schema):
             include_gas_costs=data['include_gas_costs'],
             ksm_rpc_endpoint=data['ksm_rpc_endpoint'],
             dot_rpc_endpoint=data['dot_rpc_endpoint'],
+            beacon_rpc_endpoint=data['beacon_rpc_endpoint'],
             main_currency=data['main_currency'],
             date_display_format=data['date_display_format'],
             submit_usage_analytics=data['submit_usage_analytics'],
@@ -2188,10 +2191,66 @@ class AppInfoSchema(Schema):
     check_for_updates = fields.Boolean(load_default=False)
 
 
+class MetricsQuerySchema(Schema):
+    output_format = fields.String(
+        load_default='json',
+        validate=webargs.validate.OneOf(choices=('json', 'prometheus')),
+    )
+
+
+class MetricsEditSchema(Schema):
+    enabled = fields.Boolean(required=True)
+
+
+class ProfilerSchema(AsyncQueryArgumentSchema):
+    seconds = fields.Integer(
+        strict=True,
+        validate=webargs.validate.Range(
+            min=1,
+            max=MAX_PROFILING_SECONDS,
+            error=f'The profiling seconds should be between 1 and {MAX_PROFILING_SECONDS}',
+        ),
+        required=True,
+    )
+    output_format = fields.String(
+        load_default='json',
+        validate=webargs.validate.OneOf(choices=('json', 'collapsed')),
+    )
+
+    @validates_schema
+    def validate_profiler_schema(  # pylint: disable=no-self-use
+            self,
+            data: Dict[str, Any],
+            **_kwargs: Any,
+    ) -> None:
+        if data['async_query'] is True and data['output_format'] == 'collapsed':
+            raise ValidationError(
+                message='The collapsed stacks file can not be returned by an async query',
+                field_name='output_format',
+            )
+
+
 class IdentifiersListSchema(Schema):
     identifiers = fields.List(fields.Integer(), required=True)
 
 
+class HistoryEventsChangesSchema(Schema):
+    from_sequence = fields.Integer(
+        strict=True,
+        validate=webargs.validate.Range(min=0, error='from_sequence should be >= 0'),
+        load_default=0,
+    )
+    limit = fields.Integer(
+        strict=True,
+        validate=webargs.validate.Range(
+            min=1,
+            max=MAX_HISTORY_EVENTS_CHANGES_LIMIT,
+            error=f'limit should be between 1 and {MAX_HISTORY_EVENTS_CHANGES_LIMIT}',
+        ),
+        load_default=MAX_HISTORY_EVENTS_CHANGES_LIMIT,
+    )
+
+
 class AssetsImportingSchema(Schema):
     file = FileField(allowed_extensions=['.zip', '.json'], load_default=None)
     destination = DirectoryField(load_default=None)
@@ -13,6 +13,9 @@ class WSMessageType(Enum):
     BALANCE_SNAPSHOT_ERROR = auto()
     ETHEREUM_TRANSACTION_STATUS = auto()
     PREMIUM_STATUS_UPDATE = auto()
+    CSV_IMPORT_PROGRESS = auto()
+    NEW_HISTORY_EVENTS = auto()
+    BALANCE_SOURCE_QUERIED = auto()
 
     def __str__(self) -> str:
         return self.name.lower()  # pylint: disable=no-member
@@ -130,6 +130,14 @@ def app_args(prog: str, description: str) -> argparse.ArgumentParser:
         default=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
         type=_positive_int_or_zero,
     )
+    p.add_argument(
+        '--metrics',
+        help=(
+            'If given then timings and counters of the hot paths such as DB queries and '
+            'remote queries are collected. They can be read from the metrics endpoint.'
+        ),
+        action='store_true',
+    )
     p.add_argument(
         'version',
         help='Shows the rotkehlchen version',
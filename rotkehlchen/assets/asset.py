@@ -13,6 +13,7 @@ from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.serialization.encoder import register_json_encoder
 from rotkehlchen.types import ChecksumEvmAddress, EvmTokenKind, Timestamp
 
 from .types import AssetType
@@ -944,6 +945,9 @@ class Asset():
         return asset
 
 
+register_json_encoder((Asset,), lambda x: x.identifier)
+
+
 EthereumTokenDBTuple = Tuple[
     str,                  # identifier
     str,                  # address
@@ -10,6 +10,11 @@ from rotkehlchen.types import BTCAddress
 from rotkehlchen.utils.misc import satoshis_to_btc
 from rotkehlchen.utils.network import request_get_dict
 
+from .hedging import BalancesCallback, query_balances_hedged
+
+# Accounts per chunk of a balances query. Chunks are spread across the balance APIs
+BALANCES_QUERY_CHUNK_SIZE = 20
+
 
 def _have_bc1_accounts(accounts: List[BTCAddress]) -> bool:
     return any(account.lower()[0:3] == 'bc1' for account in accounts)
@@ -97,9 +102,13 @@ def get_bitcoin_addresses_balances(
 ) -> Dict[BTCAddress, FVal]:
     """Queries bitcoin balance APIs for the balances of accounts
 
+    The accounts are split in chunks which are queried in parallel from all the APIs.
+    Slow or failing queries are retried on the other APIs.
+
     May raise:
     - RemoteError couldn't query any of the bitcoin balance APIs
     """
+    api_callbacks: Dict[str, BalancesCallback]
     if _have_bc1_accounts(accounts) is True:
         api_callbacks = {
             'blockstream.info': _query_blockstream_info,
@@ -111,26 +120,11 @@ def get_bitcoin_addresses_balances(
             'blockstream.info': _query_blockstream_info,
             'mempool.space': _query_mempool_space,
         }
-    errors: Dict[str, str] = {}
-    for api_name, callback in api_callbacks.items():
-        try:
-            balances = callback(accounts)
-        except (
-            requests.exceptions.RequestException,
-            UnableToDecryptRemoteData,
-            requests.exceptions.Timeout,
-            RemoteError,
-            DeserializationError,
-        ) as e:
-            errors[api_name] = str(e)
-            continue
-        except KeyError as e:
-            errors[api_name] = f'Got unexpected response from {api_name}. Couldn\'t find key {str(e)}'  # noqa: E501
-        else:
-            return balances
-
-    serialized_errors = ', '.join(f'{source} error is: "{error}"' for (source, error) in errors.items())  # noqa: E501
-    raise RemoteError(f'Bitcoin external API request for balances failed. {serialized_errors}')  # noqa: E501
+    return query_balances_hedged(
+        accounts=accounts,
+        api_callbacks=api_callbacks,
+        chunk_size=BALANCES_QUERY_CHUNK_SIZE,
+    )
 
 
 def _check_blockstream_for_transactions(
@@ -0,0 +1,205 @@
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Callable, DefaultDict, Deque, Dict, List, Optional, Sequence, Union
+
+import gevent
+import requests
+
+from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.fval import FVal
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import BTCAddress
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+BalancesCallback = Callable[[List[BTCAddress]], Dict[BTCAddress, FVal]]
+
+# Seconds per account assumed for a provider we have not measured yet
+DEFAULT_SECONDS_PER_ACCOUNT = 0.5
+# Weight of the latest measurement in the moving average of the seconds per account
+THROUGHPUT_SMOOTHING = 0.3
+# Per account latencies kept per provider to calculate the hedging delay from
+LATENCY_SAMPLES = 50
+# A backup provider is raced against a request slower than this percentile of its provider
+HEDGE_LATENCY_PERCENTILE = 0.9
+# Before that many samples exist the default hedging delay is used
+HEDGE_MIN_SAMPLES = 5
+HEDGE_MIN_DELAY_SECS = 1.0
+HEDGE_DEFAULT_DELAY_SECS = 10.0
+# After a failure a provider is not assigned chunks for that long. It can still be a backup
+PROVIDER_COOLDOWN_SECS = 60
+
+
+class ProviderStats():
+    """Measured throughput and health of a balances provider"""
+
+    def __init__(self) -> None:
+        self.seconds_per_account: Optional[float] = None
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.last_failure_ts = 0.0
+
+    def record_success(self, accounts_num: int, seconds: float) -> None:
+        per_account = seconds / max(1, accounts_num)
+        self.latencies.append(per_account)
+        if self.seconds_per_account is None:
+            self.seconds_per_account = per_account
+        else:
+            self.seconds_per_account = (
+                THROUGHPUT_SMOOTHING * per_account +
+                (1 - THROUGHPUT_SMOOTHING) * self.seconds_per_account
+            )
+
+    def record_failure(self) -> None:
+        self.last_failure_ts = time.monotonic()
+
+    def is_healthy(self) -> bool:
+        return time.monotonic() - self.last_failure_ts >= PROVIDER_COOLDOWN_SECS
+
+    def expected_seconds(self, accounts_num: int) -> float:
+        if self.seconds_per_account is None:
+            return accounts_num * DEFAULT_SECONDS_PER_ACCOUNT
+        return accounts_num * self.seconds_per_account
+
+    def hedge_delay(self, accounts_num: int) -> float:
+        """Seconds after which a request for that many accounts is considered slow"""
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY_SECS
+        latencies = sorted(self.latencies)
+        percentile = latencies[int(HEDGE_LATENCY_PERCENTILE * (len(latencies) - 1))]
+        return max(HEDGE_MIN_DELAY_SECS, percentile * accounts_num)
+
+
+# Stats of each provider by name, kept across queries so that the assignment adapts
+PROVIDER_STATS: DefaultDict[str, ProviderStats] = defaultdict(ProviderStats)
+
+
+def _query_provider(
+        api_name: str,
+        callback: BalancesCallback,
+        accounts: List[BTCAddress],
+) -> Union[Dict[BTCAddress, FVal], str]:
+    """Returns the balances queried from the provider or the error if it failed.
+    Errors are returned instead of raised since failures are expected and handled."""
+    start = time.monotonic()
+    try:
+        balances = callback(accounts)
+    except (
+            requests.exceptions.RequestException,
+            UnableToDecryptRemoteData,
+            RemoteError,
+            DeserializationError,
+    ) as e:
+        PROVIDER_STATS[api_name].record_failure()
+        return str(e)
+    except KeyError as e:
+        PROVIDER_STATS[api_name].record_failure()
+        return f'Got unexpected response from {api_name}. Couldn\'t find key {str(e)}'
+
+    PROVIDER_STATS[api_name].record_success(len(accounts), time.monotonic() - start)
+    return balances
+
+
+def _query_chunk_hedged(
+        accounts: List[BTCAddress],
+        providers_order: Sequence[str],
+        api_callbacks: Dict[str, BalancesCallback],
+        errors: Dict[str, str],
+) -> Dict[BTCAddress, FVal]:
+    """Queries the balances of the accounts from the first provider of the order.
+
+    If that provider fails the next one is tried. If it is slower than its usual latency
+    the next one is raced against it and whichever returns first is used.
+
+    May raise:
+    - RemoteError if all providers failed
+    """
+    remaining = list(providers_order)
+    running: Dict[gevent.Greenlet, str] = {}
+    try:
+        while True:
+            if len(running) == 0:
+                if len(remaining) == 0:
+                    raise RemoteError(f'All providers failed for {len(accounts)} accounts')
+                api_name = remaining.pop(0)
+                running[gevent.spawn(_query_provider, api_name, api_callbacks[api_name], accounts)] = api_name  # noqa: E501
+
+            timeout = None
+            if len(remaining) != 0:
+                timeout = min(PROVIDER_STATS[x].hedge_delay(len(accounts)) for x in running.values())  # noqa: E501
+            finished = gevent.wait(list(running), timeout=timeout, count=1)
+            if len(finished) == 0:  # slow. Race the next provider
+                api_name = remaining.pop(0)
+                log.debug(f'Hedging bitcoin balances query of {len(accounts)} accounts to {api_name}')  # noqa: E501
+                running[gevent.spawn(_query_provider, api_name, api_callbacks[api_name], accounts)] = api_name  # noqa: E501
+                continue
+
+            for greenlet in finished:
+                api_name = running.pop(greenlet)
+                if isinstance(greenlet.value, dict):
+                    return greenlet.value
+                errors[api_name] = greenlet.value
+    finally:
+        gevent.killall(list(running))
+
+
+def query_balances_hedged(
+        accounts: List[BTCAddress],
+        api_callbacks: Dict[str, BalancesCallback],
+        chunk_size: int,
+) -> Dict[BTCAddress, FVal]:
+    """Queries the balances of the accounts in chunks spread across the given providers
+
+    Each chunk is assigned to the healthy provider expected to finish it first given
+    its measured throughput and the chunks already assigned to it. Each provider
+    queries its chunks one after the other while all providers run in parallel.
+    The other providers act as fallbacks and hedges for each chunk.
+
+    May raise:
+    - RemoteError if a chunk could not be queried from any provider
+    """
+    healthy = [x for x in api_callbacks if PROVIDER_STATS[x].is_healthy()]
+    if len(healthy) == 0:
+        healthy = list(api_callbacks)
+
+    assignments: Dict[str, List[List[BTCAddress]]] = {x: [] for x in healthy}
+    loads = {x: 0.0 for x in healthy}
+    for idx in range(0, len(accounts), chunk_size):
+        chunk = accounts[idx:idx + chunk_size]
+        api_name = min(healthy, key=lambda x: loads[x] + PROVIDER_STATS[x].expected_seconds(len(chunk)))  # noqa: E501
+        loads[api_name] += PROVIDER_STATS[api_name].expected_seconds(len(chunk))
+        assignments[api_name].append(chunk)
+
+    errors: Dict[str, str] = {}
+
+    def query_assigned(api_name: str) -> Dict[BTCAddress, FVal]:
+        # fall back to the others in order of expected speed, unhealthy ones last
+        backups = sorted(
+            (x for x in api_callbacks if x != api_name),
+            key=lambda x: (not PROVIDER_STATS[x].is_healthy(), PROVIDER_STATS[x].expected_seconds(1)),  # noqa: E501
+        )
+        balances = {}
+        for chunk in assignments[api_name]:
+            balances.update(_query_chunk_hedged(
+                accounts=chunk,
+                providers_order=[api_name] + backups,
+                api_callbacks=api_callbacks,
+                errors=errors,
+            ))
+        return balances
+
+    greenlets = [gevent.spawn(query_assigned, x) for x in healthy if len(assignments[x]) != 0]
+    try:
+        gevent.joinall(greenlets, raise_error=True)
+    except RemoteError as e:
+        serialized_errors = ', '.join(f'{source} error is: "{error}"' for (source, error) in errors.items())  # noqa: E501
+        raise RemoteError(f'Bitcoin external API request for balances failed. {serialized_errors}') from e  # noqa: E501
+    finally:
+        gevent.killall(greenlets)
+
+    balances = {}
+    for greenlet in greenlets:
+        balances.update(greenlet.value)
+    return balances
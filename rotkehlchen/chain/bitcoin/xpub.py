@@ -1,6 +1,7 @@
 import logging
 from typing import TYPE_CHECKING, Any, Dict, List, Literal, NamedTuple, Optional, Tuple
 
+import gevent
 from gevent.lock import Semaphore
 
 from rotkehlchen.accounting.structures.balance import Balance
@@ -69,6 +70,17 @@ class XpubDerivedAddressData(NamedTuple):
     balance: FVal
 
 
+def _derive_addresses_batch(
+        root: HDKey,
+        start_index: int,
+        gap_limit: int,
+) -> List[Tuple[int, BTCAddress]]:
+    return [
+        (idx, root.derive_child(idx).address())
+        for idx in range(start_index, start_index + gap_limit)
+    ]
+
+
 def _derive_addresses_loop(
         account_index: int,
         start_index: int,
@@ -76,49 +88,59 @@ def _derive_addresses_loop(
         gap_limit: int,
         blockchain: Literal[SupportedBlockchain.BITCOIN, SupportedBlockchain.BITCOIN_CASH],
 ) -> List[XpubDerivedAddressData]:
-    """May raise:
+    """Derives addresses in batches of gap_limit until a batch with no transactions
+    is found. The next batch is derived while the transactions of the previous one
+    are being checked.
+
+    May raise:
     - RemoteError: if blockstream/blockchain.info can't be reached
     """
-    step_index = start_index
+    if blockchain == SupportedBlockchain.BITCOIN:
+        have_transactions_fn = have_bitcoin_transactions
+    else:
+        have_transactions_fn = have_bch_transactions
+
     addresses: List[XpubDerivedAddressData] = []
-    should_continue = True
-    while should_continue:
-        batch_addresses: List[Tuple[int, BTCAddress]] = []
-        for idx in range(step_index, step_index + gap_limit):
-            child = root.derive_child(idx)
-            batch_addresses.append((idx, child.address()))
+    unused_addresses: List[XpubDerivedAddressData] = []
+    batch_addresses = _derive_addresses_batch(root, start_index, gap_limit)
+    while True:
+        greenlet = gevent.spawn(have_transactions_fn, [x[1] for x in batch_addresses])
+        gevent.sleep(0)  # let the check send its request before deriving the next batch
+        try:
+            next_batch_addresses = _derive_addresses_batch(
+                root=root,
+                start_index=batch_addresses[-1][0] + 1,
+                gap_limit=gap_limit,
+            )
+            have_tx_mapping = greenlet.get()
+        finally:
+            greenlet.kill()
 
-        if blockchain == SupportedBlockchain.BITCOIN:
-            have_tx_mapping = have_bitcoin_transactions([x[1] for x in batch_addresses])
-        else:
-            have_tx_mapping = have_bch_transactions([x[1] for x in batch_addresses])
-        should_continue = False
+        batch_has_tx = False
         for idx, address in batch_addresses:
             have_tx, balance = have_tx_mapping[address]
+            entry = XpubDerivedAddressData(
+                account_index=account_index,
+                derived_index=idx,
+                address=address,
+                balance=balance,
+            )
             if have_tx:
-                addresses.append(XpubDerivedAddressData(
-                    account_index=account_index,
-                    derived_index=idx,
-                    address=address,
-                    balance=balance,
-                ))
-                should_continue = True
-
-        # do one more pass and add any addresses with no transactions before the max index
-        # this is so we can start new address generation from the max index later
-        if len(addresses) != 0:
-            max_index = max(x[0] for x in addresses)
-            for idx, address in batch_addresses[:max_index]:
-                have_tx, balance = have_tx_mapping[address]
-                if not have_tx:
-                    addresses.append(XpubDerivedAddressData(
-                        account_index=account_index,
-                        derived_index=idx,
-                        address=address,
-                        balance=balance,
-                    ))
-
-        step_index += gap_limit
+                addresses.append(entry)
+                batch_has_tx = True
+            else:
+                unused_addresses.append(entry)
+
+        if batch_has_tx is False:
+            break
+
+        batch_addresses = next_batch_addresses
+
+    # also add any addresses with no transactions before the max index
+    # this is so we can start new address generation from the max index later
+    if len(addresses) != 0:
+        max_index = max(x.derived_index for x in addresses)
+        addresses.extend(x for x in unused_addresses if x.derived_index < max_index)
 
     return addresses
 
@@ -134,6 +156,8 @@ def _derive_addresses_from_xpub_data(
     any addresses until the biggest index derived addresses that have had no transactions.
     This is to make it easier to later derive and check more addresses
 
+    The receiving and change addresses are derived and checked concurrently.
+
     May raise:
     - RemoteError: if blockstream/blockchain.info/haskoin and others can't be reached
     """
@@ -142,27 +166,24 @@ def _derive_addresses_from_xpub_data(
     else:
         account_xpub = xpub_data.xpub
 
-    addresses = []
-    receiving_xpub = account_xpub.derive_child(0)
-    addresses.extend(
-        _derive_addresses_loop(
-            account_index=0,
-            start_index=start_receiving_index,
-            root=receiving_xpub,
-            gap_limit=gap_limit,
-            blockchain=blockchain,
-        ),
-    )
-    change_xpub = account_xpub.derive_child(1)
-    addresses.extend(
-        _derive_addresses_loop(
-            account_index=1,
-            start_index=start_change_index,
-            root=change_xpub,
+    greenlets = [
+        gevent.spawn(
+            _derive_addresses_loop,
+            account_index=account_index,
+            start_index=start_index,
+            root=account_xpub.derive_child(account_index),
             gap_limit=gap_limit,
             blockchain=blockchain,
-        ),
-    )
+        ) for account_index, start_index in ((0, start_receiving_index), (1, start_change_index))  # noqa: E501
+    ]
+    try:
+        gevent.joinall(greenlets, raise_error=True)
+    finally:
+        gevent.killall(greenlets)
+
+    addresses = []
+    for greenlet in greenlets:
+        addresses.extend(greenlet.get())
     return addresses
 
 
@@ -188,11 +209,15 @@ class XpubManager():
         - RemoteError: if blockstream/blockchain.info/haskoin and others can't be reached
         """
         with self.db.conn.read_ctx() as cursor:
-            last_receiving_idx, last_change_idx = self.db.get_last_consecutive_xpub_derived_indices(cursor, xpub_data)  # noqa: E501
+            start_receiving_idx, start_change_idx = self.db.get_xpub_derivation_start_indices(  # noqa: E501
+                cursor=cursor,
+                xpub_data=xpub_data,
+                blockchain=blockchain,
+            )
             derived_addresses_data = _derive_addresses_from_xpub_data(
                 xpub_data=xpub_data,
-                start_receiving_index=last_receiving_idx,
-                start_change_index=last_change_idx,
+                start_receiving_index=start_receiving_idx,
+                start_change_index=start_change_idx,
                 gap_limit=self.chain_manager.btc_derivation_gap_limit,
                 blockchain=blockchain,
             )
@@ -245,6 +270,20 @@ class XpubManager():
                 derived_addresses_data=derived_addresses_data,
                 blockchain=blockchain,
             )
+            # remember where to continue from so that next time we don't rescan
+            next_indices = [start_receiving_idx, start_change_idx]
+            for entry in derived_addresses_data:
+                next_indices[entry.account_index] = max(
+                    next_indices[entry.account_index],
+                    entry.derived_index + 1,
+                )
+            self.db.set_xpub_derivation_start_indices(
+                write_cursor=cursor,
+                xpub_data=xpub_data,
+                blockchain=blockchain,
+                receiving_index=next_indices[0],
+                change_index=next_indices[1],
+            )
 
         # also add queried balances
         if blockchain == SupportedBlockchain.BITCOIN:
@@ -0,0 +1,237 @@
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, NamedTuple, Optional, Sequence
+
+import requests
+from web3 import HTTPProvider, Web3
+from web3.types import BlockIdentifier
+
+from rotkehlchen.chain.ethereum.constants import (
+    ETHERSCAN_MAX_ARGUMENTS_TO_CONTRACT,
+    ETHERSCAN_NODE,
+    OTHER_MAX_TOKEN_CHUNK_LENGTH,
+)
+from rotkehlchen.chain.ethereum.types import ETHERSCAN_NODE_NAME
+from rotkehlchen.chain.ethereum.utils import multicall_2
+from rotkehlchen.constants.ethereum import ETH_SCAN
+from rotkehlchen.constants.resolver import ChainID
+from rotkehlchen.constants.timing import DEFAULT_TIMEOUT_TUPLE
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import ChecksumEvmAddress
+from rotkehlchen.utils.misc import get_chunks, hex_or_bytes_to_str
+
+if TYPE_CHECKING:
+    from rotkehlchen.chain.ethereum.manager import EthereumManager
+    from rotkehlchen.chain.ethereum.types import WeightedNode
+
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+BatchedMethod = Literal['eth_getBalance', 'eth_getCode', 'eth_call']
+# 32-bytes words a single call occupies in a tryAggregate argument besides its calldata.
+# Offset of the tuple, target address, offset of the calldata and its length.
+MULTICALL_WORDS_PER_CALL = 4
+# Maximum requests in a single json-rpc batch sent to an own node
+JSONRPC_BATCH_SIZE = 100
+
+
+class BatchedRequest(NamedTuple):
+    method: BatchedMethod
+    address: ChecksumEvmAddress
+    data: Optional[str] = None  # calldata for eth_call
+
+
+def _multicall_words(request: BatchedRequest) -> int:
+    calldata_bytes = (len(request.data) - 2) // 2 if request.data else 0
+    return MULTICALL_WORDS_PER_CALL + (calldata_bytes + 31) // 32
+
+
+def _chunk_by_words(
+        indices: List[int],
+        requests_list: List[BatchedRequest],
+        max_words: int,
+) -> List[List[int]]:
+    """Splits the given request indices in chunks whose multicall argument size does
+    not exceed max_words 32-bytes words. A chunk always contains at least one request."""
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    current_words = 0
+    for idx in indices:
+        words = _multicall_words(requests_list[idx])
+        if len(current) != 0 and current_words + words > max_words:
+            chunks.append(current)
+            current, current_words = [], 0
+        current.append(idx)
+        current_words += words
+
+    if len(current) != 0:
+        chunks.append(current)
+    return chunks
+
+
+class EthereumBatchQuery():
+    """Collects eth_getBalance, eth_getCode and eth_call requests and executes them
+    with as few remote calls as possible.
+
+    - eth_getBalance requests are packed into calls to the ETH_SCAN balance scanner.
+    - eth_call requests are packed into MULTICALL_2 tryAggregate calls so that a
+    single failing call does not fail the rest.
+    - eth_getCode can't be done by a contract, so it is sent as a json-rpc batch to an
+    own node if one is connected and otherwise queried one by one.
+
+    When only etherscan is available all calls are chunked so that they fit in
+    ETHERSCAN_MAX_ARGUMENTS_TO_CONTRACT arguments. Other nodes get larger chunks.
+
+    Usage is to enqueue all requests, keeping the returned indices, and then call
+    execute() which returns all results in the order they were enqueued.
+    """
+
+    def __init__(
+            self,
+            ethereum: 'EthereumManager',
+            call_order: Optional[Sequence['WeightedNode']] = None,
+    ) -> None:
+        self.ethereum = ethereum
+        self.call_order = call_order
+        self.queued: List[BatchedRequest] = []
+
+    def __len__(self) -> int:
+        return len(self.queued)
+
+    def _enqueue(self, request: BatchedRequest) -> int:
+        self.queued.append(request)
+        return len(self.queued) - 1
+
+    def enqueue_balance(self, address: ChecksumEvmAddress) -> int:
+        """Result is the balance of the address in wei"""
+        return self._enqueue(BatchedRequest(method='eth_getBalance', address=address))
+
+    def enqueue_code(self, address: ChecksumEvmAddress) -> int:
+        """Result is the deployed code at the address as a hex string"""
+        return self._enqueue(BatchedRequest(method='eth_getCode', address=address))
+
+    def enqueue_call(self, address: ChecksumEvmAddress, data: str) -> int:
+        """Result is the returned bytes of the call or None if the call failed"""
+        return self._enqueue(BatchedRequest(method='eth_call', address=address, data=data))
+
+    def _limits(self) -> Dict[str, Any]:
+        """Returns the call order and maximum chunk sizes to use"""
+        if self.call_order is not None:
+            call_order = self.call_order
+            uses_etherscan = any(
+                node.node_info.name == ETHERSCAN_NODE_NAME for node in call_order
+            )
+        elif self.ethereum.connected_to_any_web3():
+            # skipping etherscan because chunk size is too big for etherscan
+            call_order = self.ethereum.default_call_order(skip_etherscan=True)
+            uses_etherscan = False
+        else:
+            call_order = [ETHERSCAN_NODE]
+            uses_etherscan = True
+
+        if uses_etherscan:
+            return {
+                'call_order': call_order,
+                'max_words': ETHERSCAN_MAX_ARGUMENTS_TO_CONTRACT,
+                'max_addresses': ETHERSCAN_MAX_ARGUMENTS_TO_CONTRACT,
+            }
+
+        return {
+            'call_order': call_order,
+            'max_words': OTHER_MAX_TOKEN_CHUNK_LENGTH * MULTICALL_WORDS_PER_CALL,
+            'max_addresses': OTHER_MAX_TOKEN_CHUNK_LENGTH,
+        }
+
+    def execute(self, block_identifier: BlockIdentifier = 'latest') -> List[Any]:
+        """Executes all enqueued requests and empties the queue
+
+        May raise:
+        - RemoteError if an external service such as Etherscan is queried and
+        there is a problem with its query.
+        """
+        requests_list, self.queued = self.queued, []
+        results: List[Any] = [None] * len(requests_list)
+        if len(requests_list) == 0:
+            return results
+
+        limits = self._limits()
+        balance_indices, call_indices, code_indices = [], [], []
+        for idx, request in enumerate(requests_list):
+            if request.method == 'eth_getBalance':
+                balance_indices.append(idx)
+            elif request.method == 'eth_call':
+                call_indices.append(idx)
+            else:
+                code_indices.append(idx)
+
+        for chunk in get_chunks(balance_indices, n=limits['max_addresses']):
+            balances = ETH_SCAN[ChainID.ETHEREUM].call(
+                ethereum=self.ethereum,
+                method_name='etherBalances',
+                arguments=[[requests_list[idx].address for idx in chunk]],
+                call_order=limits['call_order'],
+                block_identifier=block_identifier,
+            )
+            for idx, balance in zip(chunk, balances):
+                results[idx] = balance
+
+        for chunk in _chunk_by_words(call_indices, requests_list, limits['max_words']):
+            outputs = multicall_2(
+                ethereum=self.ethereum,
+                calls=[(requests_list[idx].address, requests_list[idx].data) for idx in chunk],  # type: ignore  # data is always given for eth_call  # noqa: E501
+                require_success=False,
+                call_order=limits['call_order'],
+                block_identifier=block_identifier,
+            )
+            for idx, (success, output) in zip(chunk, outputs):
+                results[idx] = output if success else None
+
+        if len(code_indices) != 0:
+            codes = self._query_codes([requests_list[idx].address for idx in code_indices])
+            for idx, code in zip(code_indices, codes):
+                results[idx] = code
+
+        return results
+
+    def _query_codes(self, addresses: List[ChecksumEvmAddress]) -> List[str]:
+        web3 = self.ethereum.get_own_node_web3()
+        if web3 is not None and isinstance(web3.provider, HTTPProvider):
+            try:
+                return _jsonrpc_batch_get_code(web3, addresses)
+            except (requests.exceptions.RequestException, RemoteError) as e:
+                log.warning(f'Json-rpc batch eth_getCode failed due to {str(e)}. Falling back')
+
+        return [
+            self.ethereum.get_code(account=address, call_order=self.call_order)
+            for address in addresses
+        ]
+
+
+def _jsonrpc_batch_get_code(web3: Web3, addresses: List[ChecksumEvmAddress]) -> List[str]:
+    """Queries eth_getCode for all addresses using json-rpc batch requests
+
+    May raise:
+    - RemoteError if the node returns an unexpected response
+    - requests.exceptions.RequestException if there is a connection problem
+    """
+    endpoint = web3.provider.endpoint_uri  # type: ignore  # checked it's an HTTPProvider
+    result: List[str] = []
+    for chunk in get_chunks(addresses, n=JSONRPC_BATCH_SIZE):
+        payload = [
+            {'jsonrpc': '2.0', 'id': idx, 'method': 'eth_getCode', 'params': [address, 'latest']}  # noqa: E501
+            for idx, address in enumerate(chunk)
+        ]
+        response = requests.post(endpoint, json=payload, timeout=DEFAULT_TIMEOUT_TUPLE)
+        try:
+            entries = sorted(response.json(), key=lambda x: x['id'])
+            result.extend(hex_or_bytes_to_str(entry['result']) for entry in entries)
+        except (ValueError, KeyError, TypeError) as e:
+            raise RemoteError(
+                f'Unexpected json-rpc batch response {response.text} from {endpoint}',
+            ) from e
+
+        if len(entries) != len(chunk):
+            raise RemoteError(f'Json-rpc batch response from {endpoint} misses entries')
+
+    return result
@@ -9,6 +9,7 @@ from gevent.lock import Semaphore
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.assets.asset import EvmToken
 from rotkehlchen.assets.utils import get_or_create_evm_token
 from rotkehlchen.chain.ethereum.abi import decode_event_data_abi_str
@@ -246,10 +247,24 @@ class EVMTransactionDecoder():
     def get_and_decode_undecoded_transactions(self, limit: Optional[int] = None) -> None:
         """Checks the DB for up to `limit` undecoded transactions and decodes them.
 
-        This is protected by concurrent access from a lock"""
+        This is protected by concurrent access from a lock
+
+        If new events got decoded, the range of their change sequences is sent to the
+        clients so that they only fetch the new events.
+        """
         with self.undecoded_tx_query_lock:
             hashes = self.dbethtx.get_transaction_hashes_not_decoded(limit=limit)
+            with self.database.conn.read_ctx() as cursor:
+                from_sequence = self.dbevents.get_last_change_sequence(cursor)
             self.decode_transaction_hashes(ignore_cache=False, tx_hashes=hashes)
+            with self.database.conn.read_ctx() as cursor:
+                to_sequence = self.dbevents.get_last_change_sequence(cursor)
+
+        if to_sequence > from_sequence:
+            self.msg_aggregator.add_message(
+                message_type=WSMessageType.NEW_HISTORY_EVENTS,
+                data={'from_sequence': from_sequence + 1, 'to_sequence': to_sequence},
+            )
 
     def decode_transaction_hashes(self, ignore_cache: bool, tx_hashes: Optional[List[EVMTxHash]]) -> List[HistoryBaseEntry]:  # noqa: E501
         """Make sure that receipts are pulled + events decoded for the given transaction hashes.
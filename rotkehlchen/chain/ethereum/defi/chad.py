@@ -1,15 +1,23 @@
 from collections import defaultdict
-from typing import TYPE_CHECKING, Dict, List
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import gevent
+from gevent.pool import Pool
 
 from rotkehlchen.chain.ethereum.defi.structures import DefiProtocolBalances
 from rotkehlchen.chain.ethereum.defi.zerionsdk import ZerionSDK
-from rotkehlchen.types import ChecksumEvmAddress
+from rotkehlchen.types import ChecksumEvmAddress, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.misc import ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
     from rotkehlchen.db.dbhandler import DBHandler
 
+DEFI_BALANCES_REQUERY_SECONDS = 600
+# Maximum number of accounts whose DeFi balances are queried at the same time
+DEFI_BALANCES_QUERY_CONCURRENCY = 8
+
 
 class DefiChad():
     """An aggregator for many things ethereum DeFi"""
@@ -26,14 +34,43 @@ class DefiChad():
             msg_aggregator=msg_aggregator,
             database=database,
         )
+        # account -> (last query ts, defi balances)
+        self.balances_cache: Dict[ChecksumEvmAddress, Tuple[Timestamp, List[DefiProtocolBalances]]] = {}  # noqa: E501
 
     def query_defi_balances(
             self,
             addresses: List[ChecksumEvmAddress],
     ) -> Dict[ChecksumEvmAddress, List[DefiProtocolBalances]]:
+        """Queries the DeFi balances of the given addresses concurrently
+
+        Balances of an account are remembered for DEFI_BALANCES_REQUERY_SECONDS so
+        only accounts not queried recently hit the network.
+
+        May raise:
+        - RemoteError if an external service such as Etherscan or cryptocompare
+        is queried and there is a problem with its query.
+        """
+        now = ts_now()
+        stale_addresses = [
+            x for x in addresses
+            if x not in self.balances_cache or now - self.balances_cache[x][0] >= DEFI_BALANCES_REQUERY_SECONDS  # noqa: E501
+        ]
+        pool = Pool(DEFI_BALANCES_QUERY_CONCURRENCY)
+        greenlets = [
+            pool.spawn(self.zerion_sdk.all_balances_for_account, account)
+            for account in stale_addresses
+        ]
+        try:
+            gevent.joinall(greenlets, raise_error=True)
+        finally:  # if one failed the rest are not needed
+            gevent.killall(greenlets)
+
+        for account, greenlet in zip(stale_addresses, greenlets):
+            self.balances_cache[account] = (now, greenlet.value)
+
         defi_balances = defaultdict(list)
         for account in addresses:
-            balances = self.zerion_sdk.all_balances_for_account(account)
+            balances = self.balances_cache[account][1]
             if len(balances) != 0:
                 defi_balances[account] = balances
         return defi_balances
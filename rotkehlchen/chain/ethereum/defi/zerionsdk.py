@@ -1,6 +1,9 @@
 import logging
 from typing import TYPE_CHECKING, List, Optional, Tuple
 
+import gevent
+from gevent.pool import Pool
+
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.assets.asset import EvmToken
 from rotkehlchen.assets.utils import get_asset_by_symbol
@@ -37,6 +40,8 @@ log = RotkehlchenLogsAdapter(logger)
 
 
 PROTOCOLS_QUERY_NUM = 40  # number of protocols to query in a single call
+# Maximum protocol chunk queries in flight, shared by all accounts queried at the same time
+PROTOCOLS_QUERY_CONCURRENCY = 8
 KNOWN_ZERION_PROTOCOL_NAMES = (
     'Curve • Vesting',
     'Curve • Liquidity Gauges',
@@ -223,6 +228,7 @@ class ZerionSDK():
         )
         self.database = database
         self.protocol_names: Optional[List[str]] = None
+        self.protocol_chunks_pool = Pool(PROTOCOLS_QUERY_CONCURRENCY)
 
     def _get_protocol_names(self) -> List[str]:
         if self.protocol_names is not None:
@@ -270,21 +276,26 @@ class ZerionSDK():
         # https://github.com/rotki/rotki/issues/1969
         # So now we get all supported protocols and query in batches
         protocol_names = self._get_protocol_names()
-        result = []
         protocol_chunks: List[List[str]] = list(get_chunks(
             list(protocol_names),
             n=PROTOCOLS_QUERY_NUM,
         ))
-        for protocol_names in protocol_chunks:
-            contract_result = self.contract.call(
+        greenlets = [
+            self.protocol_chunks_pool.spawn(
+                self.contract.call,
                 ethereum=self.ethereum,
                 method_name='getProtocolBalances',
-                arguments=[account, protocol_names],
-            )
-            if len(contract_result) == 0:
-                continue
-            result.extend(contract_result)
+                arguments=[account, chunk],
+            ) for chunk in protocol_chunks
+        ]
+        try:
+            gevent.joinall(greenlets, raise_error=True)
+        finally:  # if one failed the rest are not needed
+            gevent.killall(greenlets)
 
+        result = []
+        for greenlet in greenlets:  # keep the protocol order of the serial query
+            result.extend(greenlet.value)
         return result
 
     def all_balances_for_account(self, account: ChecksumEvmAddress) -> List[DefiProtocolBalances]:
@@ -1,7 +1,8 @@
 import json
 import logging
 import re
-from typing import Any, Dict, Literal, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
 
 import gevent
 import requests
@@ -12,6 +13,7 @@ from rotkehlchen.constants.timing import QUERY_RETRY_TIMES
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChecksumEvmAddress, Timestamp
+from rotkehlchen.utils.misc import get_chunks
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -19,6 +21,10 @@ log = RotkehlchenLogsAdapter(logger)
 
 GRAPH_QUERY_LIMIT = 1000
 GRAPH_QUERY_SKIP_LIMIT = 5000
+# Maximum aliased copies of a per address query sent in a single request
+GRAPH_QUERY_BATCH_SIZE = 50
+# Number of parsed query documents to keep. Parsing is a big part of preparing a query
+GRAPH_PARSED_QUERIES_CACHE_SIZE = 256
 RE_MULTIPLE_WHITESPACE = re.compile(r'\s+')
 RETRY_BACKOFF_FACTOR = 0.2
 SUBGRAPH_REMOTE_ERROR_MSG = (
@@ -37,6 +43,12 @@ def format_query_indentation(querystr: str) -> str:
     return RE_MULTIPLE_WHITESPACE.sub(' ', querystr).strip()
 
 
+@lru_cache(maxsize=GRAPH_PARSED_QUERIES_CACHE_SIZE)
+def _parse_query(querystr: str) -> Any:
+    """Parses the query string to a GraphQL document, remembering the most recent ones"""
+    return gql(querystr)
+
+
 def get_common_params(
         from_ts: Timestamp,
         to_ts: Timestamp,
@@ -91,7 +103,7 @@ class Graph():
         retries_left = QUERY_RETRY_TIMES
         while retries_left > 0:
             try:
-                result = self.client.execute(gql(querystr), variable_values=param_values)
+                result = self.client.execute(_parse_query(querystr), variable_values=param_values)  # noqa: E501
             # need to catch Exception here due to stupidity of gql library
             except (requests.exceptions.RequestException, Exception) as e:  # pylint: disable=broad-except  # noqa: E501
                 # NB: the lack of a good API error handling by The Graph combined
@@ -117,3 +129,45 @@ class Graph():
 
         log.debug('Got result from The Graph query')
         return result
+
+    def query_by_address(
+            self,
+            selection: str,
+            addresses: Sequence[ChecksumEvmAddress],
+            address_type: Literal['Bytes!', 'String!', 'ID!'] = 'String!',
+    ) -> Dict[ChecksumEvmAddress, Any]:
+        """Queries the same selection for many addresses in as few requests as possible
+
+        The selection is a single top level field with its subfields that contains an
+        `{address}` format placeholder, in place of which the address variable is put.
+        Up to GRAPH_QUERY_BATCH_SIZE aliased copies of it are sent in each request.
+        The addresses are passed as variables so that the query text, and its parsed
+        document, are the same for all the full chunks.
+
+        The results of each copy are limited by the subgraph like those of any field,
+        so this is meant for selections that don't need pagination.
+
+        Returns a mapping of each address to the result of its selection.
+
+        May raise:
+        - RemoteError: If there is a problem querying the subgraph and there
+        are no retries left.
+        """
+        result: Dict[ChecksumEvmAddress, Any] = {}
+        chunk: List[ChecksumEvmAddress]
+        for chunk in get_chunks(list(addresses), n=GRAPH_QUERY_BATCH_SIZE):
+            param_types = {f'$address{idx}': address_type for idx in range(len(chunk))}
+            param_values = {f'address{idx}': address.lower() for idx, address in enumerate(chunk)}  # noqa: E501
+            querystr = ' '.join(
+                f'a{idx}: {selection.format(address=f"$address{idx}")}'
+                for idx in range(len(chunk))
+            )
+            chunk_result = self.query(
+                querystr=format_query_indentation(querystr) + '}',
+                param_types=param_types,
+                param_values=param_values,
+            )
+            for idx, address in enumerate(chunk):
+                result[address] = chunk_result[f'a{idx}']
+
+        return result
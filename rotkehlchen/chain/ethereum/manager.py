@@ -24,6 +24,7 @@ from ens.main import ENS_MAINNET_ADDR
 from ens.utils import is_none_or_zero_address, normal_name_to_hash, normalize_name
 from eth_abi.exceptions import InsufficientDataBytes
 from eth_typing import BlockNumber, HexStr
+from gevent.lock import BoundedSemaphore
 from web3 import HTTPProvider, Web3
 from web3._utils.abi import get_abi_output_types
 from web3._utils.contracts import find_matching_event_abi
@@ -38,19 +39,15 @@ from web3.exceptions import (
 from web3.types import BlockIdentifier, FilterParams
 
 from rotkehlchen.chain.constants import DEFAULT_EVM_RPC_TIMEOUT
+from rotkehlchen.chain.ethereum.batching import EthereumBatchQuery
 from rotkehlchen.chain.ethereum.contracts import EthereumContract
 from rotkehlchen.chain.ethereum.graph import Graph
 from rotkehlchen.chain.ethereum.modules.eth2.constants import ETH2_DEPOSIT
 from rotkehlchen.chain.ethereum.types import string_to_evm_address
 from rotkehlchen.chain.ethereum.utils import multicall_2
 from rotkehlchen.constants import ONE
-from rotkehlchen.constants.ethereum import (
-    ENS_REVERSE_RECORDS,
-    ERC20TOKEN_ABI,
-    ETH_SCAN,
-    UNIV1_LP_ABI,
-)
-from rotkehlchen.constants.resolver import ChainID
+from rotkehlchen.constants.ethereum import ENS_REVERSE_RECORDS, ERC20TOKEN_ABI, UNIV1_LP_ABI
+from rotkehlchen.db.ethtx import DBEthTx
 from rotkehlchen.errors.misc import (
     BlockchainQueryError,
     InputError,
@@ -76,6 +73,7 @@ from rotkehlchen.types import (
     Timestamp,
 )
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.metrics import METRICS
 from rotkehlchen.utils.misc import from_wei, get_chunks, hex_or_bytes_to_str
 from rotkehlchen.utils.network import request_get_dict
 
@@ -111,6 +109,12 @@ def _is_synchronized(current_block: int, latest_block: int) -> Tuple[bool, str]:
 
 
 WEB3_LOGQUERY_BLOCK_RANGE = 250000
+# Maximum queries in flight at the same time per node. Open nodes are shared with
+# everyone else so we stay gentle with them.
+OWN_NODE_MAX_CONCURRENT_QUERIES = 16
+OPEN_NODE_MAX_CONCURRENT_QUERIES = 4
+# Maximum blocks to query from an own node when searching for the block of a timestamp
+BLOCK_BY_TIME_MAX_PROBES = 40
 
 MAX_ADDRESSES_IN_REVERSE_ENS_QUERY = 80
 
@@ -206,6 +210,7 @@ class EthereumManager():
         log.debug(f'Initializing Ethereum Manager. Nodes to connect {connect_at_start}')
         self.greenlet_manager = greenlet_manager
         self.web3_mapping: Dict[NodeName, Web3] = {}
+        self.node_semaphores: Dict[NodeName, BoundedSemaphore] = {}
         self.etherscan = etherscan
         self.msg_aggregator = msg_aggregator
         self.eth_rpc_timeout = eth_rpc_timeout
@@ -387,11 +392,23 @@ class EthereumManager():
                 mainnet_check=True,
             )
 
+    def _get_node_semaphore(self, node: NodeName) -> BoundedSemaphore:
+        semaphore = self.node_semaphores.get(node)
+        if semaphore is None:
+            semaphore = BoundedSemaphore(
+                OWN_NODE_MAX_CONCURRENT_QUERIES if node.owned else OPEN_NODE_MAX_CONCURRENT_QUERIES,  # noqa: E501
+            )
+            self.node_semaphores[node] = semaphore
+        return semaphore
+
     def query(self, method: Callable, call_order: Sequence[WeightedNode], **kwargs: Any) -> Any:
         """Queries ethereum related data by performing the provided method to all given nodes
 
         The first node in the call order that gets a succcesful response returns.
         If none get a result then a remote error is raised
+
+        Concurrent queries to the same node are capped so that greenlets fanning out
+        many queries don't overwhelm it.
         """
         for weighted_node in call_order:
             node = weighted_node.node_info
@@ -400,7 +417,8 @@ class EthereumManager():
                 continue
 
             try:
-                result = method(web3, **kwargs)
+                with self._get_node_semaphore(node), METRICS.time('ethereum_query', node.name):  # noqa: E501
+                    result = method(web3, **kwargs)
             except (
                     RemoteError,
                     requests.exceptions.RequestException,
@@ -411,6 +429,7 @@ class EthereumManager():
                     ValueError,  # Yabir saw this happen with mew node for unavailable method at node. Since it's generic we should replace if web3 implements https://github.com/ethereum/web3.py/issues/2448  # noqa: E501
             ) as e:
                 log.warning(f'Failed to query {node} for {str(method)} due to {str(e)}')
+                METRICS.increment('ethereum_query_failures', node.name)
                 # Catch all possible errors here and just try next node call
                 continue
 
@@ -526,21 +545,15 @@ class EthereumManager():
         - RemoteError if an external service such as Etherscan is queried and
           there is a problem with its query.
         """
-        balances: Dict[ChecksumEvmAddress, FVal] = {}
         log.debug(
             'Querying ethereum chain for ETH balance',
             eth_addresses=accounts,
         )
-        result = ETH_SCAN[ChainID.ETHEREUM].call(
-            ethereum=self,
-            method_name='etherBalances',
-            arguments=[accounts],
-            call_order=call_order if call_order is not None else self.default_call_order(),
-        )
-        balances = {}
-        for idx, account in enumerate(accounts):
-            balances[account] = from_wei(result[idx])
-        return balances
+        batch = EthereumBatchQuery(ethereum=self, call_order=call_order)
+        for account in accounts:
+            batch.enqueue_balance(account)
+        result = batch.execute()
+        return {account: from_wei(balance) for account, balance in zip(accounts, result)}
 
     def get_block_by_number(
             self,
@@ -1125,12 +1138,78 @@ class EthereumManager():
         else:
             return result
 
+    def _get_blocknumber_by_time_from_own_node(
+            self,
+            ts: Timestamp,
+            before: Optional[Tuple[int, Timestamp]],
+            after: Optional[Tuple[int, Timestamp]],
+    ) -> Optional[int]:
+        """Narrows down the given bracketing known blocks by querying the own node for
+        blocks guessed by interpolating the timestamps. Every other guess bisects the
+        range, so the search also converges when block times are very irregular.
+
+        All queried blocks are remembered. Returns None if there is no own node or if
+        the search did not converge.
+        """
+        web3 = self.get_own_node_web3()
+        if web3 is None:
+            return None
+
+        seen_blocks: List[Tuple[int, Timestamp]] = []
+        result = None
+        try:
+            if after is None:
+                latest = web3.eth.get_block('latest')
+                after = (latest['number'], Timestamp(latest['timestamp']))
+                seen_blocks.append(after)
+                if after[1] <= ts:
+                    return after[0]
+
+            low_block, low_ts = before if before is not None else (0, Timestamp(0))
+            high_block, high_ts = after
+            for probe in range(BLOCK_BY_TIME_MAX_PROBES):
+                if high_block - low_block <= 1:
+                    result = low_block
+                    break
+
+                if probe % 2 == 0:
+                    guess = low_block + (ts - low_ts) * (high_block - low_block) // (high_ts - low_ts)  # noqa: E501
+                else:
+                    guess = (low_block + high_block) // 2
+                guess = min(max(guess, low_block + 1), high_block - 1)
+                block_ts = Timestamp(web3.eth.get_block(guess)['timestamp'])
+                seen_blocks.append((guess, block_ts))
+                if block_ts <= ts:
+                    low_block, low_ts = guess, block_ts
+                else:
+                    high_block, high_ts = guess, block_ts
+        except (requests.exceptions.RequestException, BlockNotFound, KeyError) as e:
+            log.warning(f'Failed to search the own node for the block of {ts} due to {str(e)}')
+        finally:
+            if len(seen_blocks) != 0:
+                with self.database.user_write() as write_cursor:
+                    DBEthTx(self.database).add_block_timestamps(write_cursor, seen_blocks)
+
+        return result
+
     def get_blocknumber_by_time(self, ts: Timestamp, etherscan: bool = True) -> int:
         """Searches for the blocknumber of a specific timestamp
-        - Performs the etherscan api call by default first
+        - First checks the locally known block timestamps. If the closest known blocks
+        around the timestamp are consecutive the block is known without any query.
+        - If an own node is connected, narrows down the closest known blocks by querying it
+        - Else performs the etherscan api call by default first
         - If RemoteError raised or etherscan flag set to false
             -> queries blocks subgraph
         """
+        with self.database.conn.read_ctx() as cursor:
+            before, after = DBEthTx(self.database).get_blocks_around_timestamp(cursor, ts)
+        if before is not None and (before[1] == ts or (after is not None and after[0] - before[0] == 1)):  # noqa: E501
+            return before[0]
+
+        number = self._get_blocknumber_by_time_from_own_node(ts=ts, before=before, after=after)
+        if number is not None:
+            return number
+
         if etherscan:
             try:
                 return self.etherscan.get_blocknumber_by_time(ts)
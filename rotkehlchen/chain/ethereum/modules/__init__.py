@@ -1,3 +1,6 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 __all__ = [
     'Aave',
     'Adex',
@@ -16,18 +19,51 @@ __all__ = [
     'Nfts',
 ]
 
-from .aave.aave import Aave
-from .adex.adex import Adex
-from .balancer.balancer import Balancer
-from .compound import Compound
-from .eth2.eth2 import Eth2
-from .l2.loopring import Loopring
-from .liquity.trove import Liquity
-from .makerdao.dsr import MakerdaoDsr
-from .makerdao.vaults import MakerdaoVaults
-from .nfts import Nfts
-from .pickle_finance import PickleFinance
-from .sushiswap.sushiswap import Sushiswap
-from .uniswap.uniswap import Uniswap
-from .yearn.vaults import YearnVaults
-from .yearn.vaultsv2 import YearnVaultsV2
+# The module classes are imported lazily, only when first accessed. Each of them pulls
+# in a big amount of protocol specific code and constants and importing this package
+# is also required for loading any of the submodules (e.g. the decoders).
+_MODULE_CLASS_LOCATIONS = {
+    'Aave': '.aave.aave',
+    'Adex': '.adex.adex',
+    'Balancer': '.balancer.balancer',
+    'Compound': '.compound',
+    'Eth2': '.eth2.eth2',
+    'Loopring': '.l2.loopring',
+    'Liquity': '.liquity.trove',
+    'MakerdaoDsr': '.makerdao.dsr',
+    'MakerdaoVaults': '.makerdao.vaults',
+    'Nfts': '.nfts',
+    'PickleFinance': '.pickle_finance',
+    'Sushiswap': '.sushiswap.sushiswap',
+    'Uniswap': '.uniswap.uniswap',
+    'YearnVaults': '.yearn.vaults',
+    'YearnVaultsV2': '.yearn.vaultsv2',
+}
+
+
+def __getattr__(name: str) -> Any:
+    location = _MODULE_CLASS_LOCATIONS.get(name)
+    if location is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    klass = getattr(import_module(location, __name__), name)
+    globals()[name] = klass  # cache it so that __getattr__ is not hit again
+    return klass
+
+
+if TYPE_CHECKING:
+    from .aave.aave import Aave
+    from .adex.adex import Adex
+    from .balancer.balancer import Balancer
+    from .compound import Compound
+    from .eth2.eth2 import Eth2
+    from .l2.loopring import Loopring
+    from .liquity.trove import Liquity
+    from .makerdao.dsr import MakerdaoDsr
+    from .makerdao.vaults import MakerdaoVaults
+    from .nfts import Nfts
+    from .pickle_finance import PickleFinance
+    from .sushiswap.sushiswap import Sushiswap
+    from .uniswap.uniswap import Uniswap
+    from .yearn.vaults import YearnVaults
+    from .yearn.vaultsv2 import YearnVaultsV2
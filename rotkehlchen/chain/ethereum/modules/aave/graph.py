@@ -1,6 +1,6 @@
 import logging
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, NamedTuple, Optional, Set, Tuple
 
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.assets.asset import Asset
@@ -46,17 +46,16 @@ log = RotkehlchenLogsAdapter(logger)
 
 AAVE_GRAPH_RECENT_SECS = 600  # 10 mins
 
-USER_RESERVES_QUERY = """
-{{
-  userReserves(where: {{ user: "{address}"}}) {{
+# Queried for many users at once via Graph.query_by_address
+USER_RESERVES_SELECTION = """
+userReserves(where: {{ user: {address}}}) {{
+  id
+  reserve{{
+    id
+    symbol
+  }}
+  user {{
     id
-    reserve{{
-      id
-      symbol
-    }}
-    user {{
-      id
-    }}
   }}
 }}"""
 
@@ -421,41 +420,43 @@ class AaveGraphInquirer(AaveInquirer):
         semaphore
         """
         result = {}
+        users_reserves = self._get_users_reserves(addresses)
         for address in addresses:
-            history_results = self.get_history_for_address(
-                user_address=address,
-                from_timestamp=from_timestamp,
-                to_timestamp=to_timestamp,
+            if len(users_reserves[address]) == 0:
+                continue
+
+            result[address] = self._get_user_data(
+                from_ts=from_timestamp,
+                to_ts=to_timestamp,
+                address=address,
                 balances=aave_balances.get(address, AaveBalances({}, {})),
             )
-            if history_results is None:
-                continue
-            result[address] = history_results
 
         return result
 
-    def _get_user_reserves(self, address: ChecksumEvmAddress) -> List[AaveUserReserve]:
-        query = self.graph.query(
-            querystr=USER_RESERVES_QUERY.format(address=address.lower()),
-        )
-        query_v2 = self.graph_v2.query(
-            querystr=USER_RESERVES_QUERY.format(address=address.lower()),
-        )
-        result = []
-        for entry in query['userReserves'] + query_v2['userReserves']:
-            reserve = entry['reserve']
-            try:
-                result.append(AaveUserReserve(
-                    # The ID of reserve is the address of the asset and the address of the market's LendingPoolAddressProvider, in lower case  # noqa: E501
-                    address=deserialize_ethereum_address(reserve['id'][:42]),
-                    symbol=reserve['symbol'],
-                ))
-            except DeserializationError:
-                log.error(
-                    f'Failed to deserialize reserve address {reserve["id"]} '
-                    f'Skipping reserve address {reserve["id"]} for user address {address}',
-                )
-                continue
+    def _get_users_reserves(
+            self,
+            addresses: List[ChecksumEvmAddress],
+    ) -> DefaultDict[ChecksumEvmAddress, List[AaveUserReserve]]:
+        """Queries the reserves of all given users in both aave subgraphs in batches"""
+        result: DefaultDict[ChecksumEvmAddress, List[AaveUserReserve]] = defaultdict(list)
+        for graph in (self.graph, self.graph_v2):
+            query = graph.query_by_address(selection=USER_RESERVES_SELECTION, addresses=addresses)  # noqa: E501
+            for address, entries in query.items():
+                for entry in entries:
+                    reserve = entry['reserve']
+                    try:
+                        result[address].append(AaveUserReserve(
+                            # The ID of reserve is the address of the asset and the address of the market's LendingPoolAddressProvider, in lower case  # noqa: E501
+                            address=deserialize_ethereum_address(reserve['id'][:42]),
+                            symbol=reserve['symbol'],
+                        ))
+                    except DeserializationError:
+                        log.error(
+                            f'Failed to deserialize reserve address {reserve["id"]} '
+                            f'Skipping reserve address {reserve["id"]} for user address {address}',  # noqa: E501
+                        )
+                        continue
 
         return result
 
@@ -1067,30 +1068,6 @@ class AaveGraphInquirer(AaveInquirer):
 
         return events
 
-    def get_history_for_address(
-            self,
-            user_address: ChecksumEvmAddress,
-            from_timestamp: Timestamp,
-            to_timestamp: Timestamp,
-            balances: AaveBalances,
-    ) -> Optional[AaveHistory]:
-        """
-        Queries aave history for a single address.
-
-        This function should be entered while holding the history_lock
-        semaphore
-        """
-        reserves = self._get_user_reserves(address=user_address)
-        if len(reserves) != 0:
-            return self._get_user_data(
-                from_ts=from_timestamp,
-                to_ts=to_timestamp,
-                address=user_address,
-                balances=balances,
-            )
-
-        return None
-
     def _get_asset_and_balance(
             self,
             entry: Dict[str, Any],
@@ -0,0 +1,129 @@
+import logging
+from json.decoder import JSONDecodeError
+from typing import Any, Dict, List, Optional, Union
+
+import requests
+
+from rotkehlchen.constants.timing import DEFAULT_CONNECT_TIMEOUT
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Timestamp
+from rotkehlchen.utils.misc import get_chunks
+from rotkehlchen.utils.serialization import jsonloads_dict
+
+from .constants import (
+    BEACON_NODE_VALIDATORS_PER_QUERY,
+    ETH2_GENESIS_TIMESTAMP,
+    ETH2_SECONDS_PER_SLOT,
+    ETH2_SLOTS_PER_EPOCH,
+)
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Historical states may need to be regenerated by the node which can take a while
+BEACON_NODE_READ_TIMEOUT = 120
+BEACON_NODE_TIMEOUT_TUPLE = (DEFAULT_CONNECT_TIMEOUT, BEACON_NODE_READ_TIMEOUT)
+# Value of the epoch fields of validators for which the event has not happened yet
+FAR_FUTURE_EPOCH = 2**64 - 1
+
+
+def slot_at_timestamp(timestamp: Timestamp) -> int:
+    """Returns the slot during which the given timestamp falls"""
+    return max(0, timestamp - ETH2_GENESIS_TIMESTAMP) // ETH2_SECONDS_PER_SLOT
+
+
+def epoch_to_timestamp(epoch: int) -> Timestamp:
+    return Timestamp(ETH2_GENESIS_TIMESTAMP + epoch * ETH2_SLOTS_PER_EPOCH * ETH2_SECONDS_PER_SLOT)  # noqa: E501
+
+
+class BeaconNode():
+    """Client for the standard beacon node REST API of a user's own consensus client
+
+    https://ethereum.github.io/beacon-APIs/
+
+    Unlike beaconcha.in it returns data for many validators at once, so this is used
+    to derive validator stats in bulk.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url.rstrip('/')
+        self.session = requests.session()
+
+    def _query(self, path: str, params: Optional[Dict[str, str]] = None) -> Any:
+        """Queries the given path of the beacon node API and returns the data key
+
+        May raise:
+        - RemoteError if there is a problem querying the node or the response is invalid
+        """
+        url = f'{self.url}{path}'
+        log.debug(f'Querying beacon node {url} with {params}')
+        try:
+            response = self.session.get(url, params=params, timeout=BEACON_NODE_TIMEOUT_TUPLE)
+        except requests.exceptions.RequestException as e:
+            raise RemoteError(f'Querying beacon node {url} failed due to {str(e)}') from e
+
+        if response.status_code != 200:
+            raise RemoteError(
+                f'Beacon node request {url} failed with HTTP status code '
+                f'{response.status_code} and text {response.text}',
+            )
+
+        try:
+            json_ret = jsonloads_dict(response.text)
+        except JSONDecodeError as e:
+            raise RemoteError(f'Beacon node returned invalid JSON response: {response.text}') from e  # noqa: E501
+
+        if 'data' not in json_ret:
+            raise RemoteError(f'Beacon node response did not contain a data key: {json_ret}')
+
+        return json_ret['data']
+
+    def get_activation_eligibility_epochs(self, indices: List[int]) -> Dict[int, int]:
+        """Returns the epoch at which each validator's deposit got processed by the
+        beacon chain, which is when it starts having a balance. Validators whose deposit
+        is not processed yet are omitted.
+
+        May raise:
+        - RemoteError if there is a problem querying the node or the response is invalid
+        """
+        result = {}
+        for chunk in get_chunks(indices, n=BEACON_NODE_VALIDATORS_PER_QUERY):
+            data = self._query(
+                path='/eth/v1/beacon/states/head/validators',
+                params={'id': ','.join(str(x) for x in chunk)},
+            )
+            try:
+                for entry in data:
+                    epoch = int(entry['validator']['activation_eligibility_epoch'])
+                    if epoch != FAR_FUTURE_EPOCH:
+                        result[int(entry['index'])] = epoch
+            except (KeyError, TypeError, ValueError) as e:
+                raise RemoteError(f'Unexpected beacon node validators response entry {str(e)}') from e  # noqa: E501
+
+        return result
+
+    def get_balances(
+            self,
+            state_id: Union[int, str],
+            indices: List[int],
+    ) -> Dict[int, int]:
+        """Returns the balances in gwei of the given validators at the given state.
+        The state can be a slot number. Validators not existing at that state are omitted.
+
+        May raise:
+        - RemoteError if there is a problem querying the node or the response is invalid
+        """
+        result = {}
+        for chunk in get_chunks(indices, n=BEACON_NODE_VALIDATORS_PER_QUERY):
+            data = self._query(
+                path=f'/eth/v1/beacon/states/{state_id}/validator_balances',
+                params={'id': ','.join(str(x) for x in chunk)},
+            )
+            try:
+                for entry in data:
+                    result[int(entry['index'])] = int(entry['balance'])
+            except (KeyError, TypeError, ValueError) as e:
+                raise RemoteError(f'Unexpected beacon node balances response entry {str(e)}') from e  # noqa: E501
+
+        return result
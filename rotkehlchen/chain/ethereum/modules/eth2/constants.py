@@ -9,3 +9,14 @@ VALIDATOR_STATS_QUERY_BACKOFF_TIME_RANGE = 20
 VALIDATOR_STATS_QUERY_BACKOFF_TIME = 8
 
 FREE_VALIDATORS_LIMIT = 4
+
+ETH2_GENESIS_TIMESTAMP = 1606824023
+ETH2_SECONDS_PER_SLOT = 12
+ETH2_SLOTS_PER_EPOCH = 32
+# The beacon chain credits a deposit once its eth1 block is 2048 blocks (~14 secs each)
+# deep and an eth1 data voting period of 64 epochs has passed. These bound the seconds
+# between the deposit transaction and its credit, with a voting period of slack.
+ETH2_DEPOSIT_MIN_CREDIT_DELAY = 2048 * 14
+ETH2_DEPOSIT_MAX_CREDIT_DELAY = ETH2_DEPOSIT_MIN_CREDIT_DELAY + 2 * 64 * ETH2_SLOTS_PER_EPOCH * ETH2_SECONDS_PER_SLOT  # noqa: E501
+# Validator indices per beacon node API query. Bound by the URL length
+BEACON_NODE_VALIDATORS_PER_QUERY = 300
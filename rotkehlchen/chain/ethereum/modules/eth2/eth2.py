@@ -1,6 +1,6 @@
 import logging
 from collections import defaultdict
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, DefaultDict, Dict, List, Optional, Tuple, Union
 
 import gevent
 
@@ -20,6 +20,7 @@ from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.interfaces import EthereumModule
 from rotkehlchen.utils.misc import from_gwei, ts_now
 
+from .beacon_node import BeaconNode
 from .constants import (
     FREE_VALIDATORS_LIMIT,
     REQUEST_DELTA_TS,
@@ -35,7 +36,7 @@ from .structures import (
     ValidatorDetails,
     ValidatorID,
 )
-from .utils import scrape_validator_daily_stats
+from .utils import derive_validators_daily_stats, scrape_validator_daily_stats
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
@@ -335,10 +336,35 @@ class Eth2(EthereumModule):
             to_ts: Timestamp,
             msg_aggregator: MessagesAggregator,
     ) -> None:
-        """Goes through all saved validators and sees which need to have their stats requeried"""
+        """Goes through all saved validators and sees which need to have their stats requeried
+
+        If the user has a beacon node the stats of all validators are derived in bulk
+        from it. Otherwise, or if that fails, they are scraped from beaconcha.in one
+        validator at a time.
+        """
         now = ts_now()
         dbeth2 = DBEth2(self.database)
         result = dbeth2.get_validators_to_query_for_stats(up_to_ts=to_ts)
+        if len(result) == 0:
+            return
+
+        with self.database.conn.read_ctx() as cursor:
+            beacon_rpc_endpoint = self.database.get_settings(cursor).beacon_rpc_endpoint
+        if beacon_rpc_endpoint != '':
+            try:
+                self._derive_validator_daily_stats_from_beacon_node(
+                    beacon_node=BeaconNode(beacon_rpc_endpoint),
+                    validators=result,
+                    to_ts=to_ts,
+                    msg_aggregator=msg_aggregator,
+                )
+            except RemoteError as e:
+                log.warning(
+                    f'Failed to derive eth2 validator daily stats from the beacon node at '
+                    f'{beacon_rpc_endpoint} due to {str(e)}. Falling back to beaconcha.in',
+                )
+            else:
+                return
 
         for validator_index, last_ts in result:
             should_backoff = (
@@ -365,6 +391,35 @@ class Eth2(EthereumModule):
             if len(new_stats) != 0:
                 dbeth2.add_validator_daily_stats(stats=new_stats)
 
+    def _derive_validator_daily_stats_from_beacon_node(
+            self,
+            beacon_node: BeaconNode,
+            validators: List[Tuple[int, Timestamp]],
+            to_ts: Timestamp,
+            msg_aggregator: MessagesAggregator,
+    ) -> None:
+        """May raise:
+        - RemoteError if there is a problem querying the beacon node
+        """
+        dbeth2 = DBEth2(self.database)
+        with self.database.conn.read_ctx() as cursor:
+            pubkey_to_index = {x.public_key: x.index for x in dbeth2.get_validators(cursor)}
+            deposits: DefaultDict[int, List[Eth2Deposit]] = defaultdict(list)
+            for deposit in dbeth2.get_eth2_deposits(cursor):
+                index = pubkey_to_index.get(Eth2PubKey(deposit.pubkey))
+                if index is not None:
+                    deposits[index].append(deposit)
+
+        new_stats = derive_validators_daily_stats(
+            beacon_node=beacon_node,
+            validators=validators,
+            deposits=deposits,
+            to_ts=to_ts,
+            msg_aggregator=msg_aggregator,
+        )
+        if len(new_stats) != 0:
+            dbeth2.add_validator_daily_stats(stats=new_stats)
+
     def get_validator_daily_stats(
             self,
             cursor: 'DBCursor',
@@ -1,6 +1,7 @@
 import logging
+from collections import defaultdict
 from http import HTTPStatus
-from typing import List, NamedTuple
+from typing import TYPE_CHECKING, DefaultDict, Dict, List, NamedTuple, Optional, Tuple
 
 import gevent
 import requests
@@ -15,10 +16,16 @@ from rotkehlchen.history.price import query_usd_price_zero_if_error
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import create_timestamp
+from rotkehlchen.utils.misc import create_timestamp, from_gwei, ts_now
 
+from .beacon_node import epoch_to_timestamp, slot_at_timestamp
+from .constants import ETH2_DEPOSIT_MAX_CREDIT_DELAY, ETH2_DEPOSIT_MIN_CREDIT_DELAY
 from .structures import ValidatorDailyStats
 
+if TYPE_CHECKING:
+    from .beacon_node import BeaconNode
+    from .structures import Eth2Deposit
+
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
@@ -204,3 +211,145 @@ def scrape_validator_daily_stats(
 
     log.debug('Processed beaconcha.in stats results. Returning it.')
     return stats
+
+
+def _day_start(timestamp: Timestamp) -> Timestamp:
+    return Timestamp(timestamp - timestamp % DAY_IN_SECONDS)
+
+
+def _deposits_per_credit_day(
+        deposits: List['Eth2Deposit'],
+        balance_increases: Dict[Timestamp, FVal],
+) -> DefaultDict[Timestamp, List['Eth2Deposit']]:
+    """Finds the day each deposit was credited to the validator by the beacon chain.
+
+    The beacon chain credits a deposit hours after its transaction, which may be on
+    the next day. So each deposit is given to the first day, within the possible
+    credit delay, whose balance increase not explained by earlier deposits covers
+    most of its amount. If no day does, as when the balances of the days are not
+    known, it is given to the day of the earliest possible credit.
+
+    `balance_increases` are the balance increases of the validator per day start.
+    """
+    increases = dict(balance_increases)
+    credit_days: DefaultDict[Timestamp, List['Eth2Deposit']] = defaultdict(list)
+    for deposit in sorted(deposits, key=lambda x: x.timestamp):
+        amount = deposit.value.amount
+        candidate_days = range(
+            _day_start(deposit.timestamp),
+            _day_start(Timestamp(deposit.timestamp + ETH2_DEPOSIT_MAX_CREDIT_DELAY)) + 1,
+            DAY_IN_SECONDS,
+        )
+        credit_day = next(
+            (Timestamp(x) for x in candidate_days if increases.get(Timestamp(x), ZERO) >= amount / 2),  # noqa: E501
+            _day_start(Timestamp(deposit.timestamp + ETH2_DEPOSIT_MIN_CREDIT_DELAY)),
+        )
+        if credit_day in increases:
+            increases[credit_day] -= amount
+        credit_days[credit_day].append(deposit)
+
+    return credit_days
+
+
+def derive_validators_daily_stats(
+        beacon_node: 'BeaconNode',
+        validators: List[Tuple[int, Timestamp]],
+        deposits: Dict[int, List['Eth2Deposit']],
+        to_ts: Timestamp,
+        msg_aggregator: MessagesAggregator,
+) -> List[ValidatorDailyStats]:
+    """Derives the daily stats of many validators from their balances at the start
+    of each day, which are queried in bulk from a beacon node.
+
+    `validators` are tuples of validator index and the timestamp of its last known
+    daily stats, or 0 if it has none. `deposits` are the known deposits per validator.
+    Only complete days are derived.
+
+    Balances don't give us the attestation, block and slashing counts so those are
+    left to zero. A validator that had no balance at the start of a day is considered
+    to have been deposited its end balance during it. Deposits count on the day the
+    beacon chain credited them and not on the day of their transaction.
+
+    May raise:
+    - RemoteError if there is a problem querying the beacon node
+    """
+    new_indices = [index for index, last_ts in validators if last_ts == 0]
+    eligibility_epochs = {}
+    if len(new_indices) != 0:
+        eligibility_epochs = beacon_node.get_activation_eligibility_epochs(new_indices)
+
+    first_days: Dict[int, Timestamp] = {}
+    for index, last_ts in validators:
+        if last_ts != 0:
+            first_days[index] = Timestamp(last_ts + DAY_IN_SECONDS)
+        elif (epoch := eligibility_epochs.get(index)) is not None:
+            first_days[index] = _day_start(epoch_to_timestamp(epoch))
+        # else the beacon chain has not processed the validator's deposit yet
+
+    # Find the validators that need a balance at each start of day. The start of a day
+    # is also the end of the previous one, so the balances at it are queried only once.
+    last_day_end = _day_start(Timestamp(min(to_ts, ts_now())))
+    day_starts: DefaultDict[Timestamp, List[int]] = defaultdict(list)
+    for index, first_day in first_days.items():
+        for day_start in range(first_day, last_day_end + 1, DAY_IN_SECONDS):
+            day_starts[Timestamp(day_start)].append(index)
+
+    balances: Dict[Timestamp, Dict[int, int]] = {}
+    prices = {}
+    for day_start, indices in sorted(day_starts.items()):
+        balances[day_start] = beacon_node.get_balances(
+            state_id=slot_at_timestamp(day_start),
+            indices=indices,
+        )
+        prices[day_start] = query_usd_price_zero_if_error(
+            A_ETH,
+            time=day_start,
+            location='eth2 staking daily stats',
+            msg_aggregator=msg_aggregator,
+        )
+
+    stats = []
+    for index, first_day in first_days.items():
+        amounts: Dict[Timestamp, Tuple[Optional[FVal], FVal]] = {}
+        balance_increases: Dict[Timestamp, FVal] = {}
+        for timestamp in range(first_day, last_day_end, DAY_IN_SECONDS):
+            day_start, day_end = Timestamp(timestamp), Timestamp(timestamp + DAY_IN_SECONDS)
+            start_balance: Optional[int] = balances[day_start].get(index)
+            end_balance: Optional[int] = balances[day_end].get(index)
+            if end_balance is None:
+                continue  # the validator did not exist yet
+
+            amounts[day_start] = (
+                None if start_balance is None else from_gwei(start_balance),
+                from_gwei(end_balance),
+            )
+            balance_increases[day_start] = from_gwei(end_balance - (start_balance or 0))
+
+        credit_days = _deposits_per_credit_day(
+            deposits=deposits.get(index, []),
+            balance_increases=balance_increases,
+        )
+        for day_start, (maybe_start_amount, end_amount) in amounts.items():
+            day_end = Timestamp(day_start + DAY_IN_SECONDS)
+            day_deposits = credit_days.get(day_start, [])
+            start_amount = ZERO if maybe_start_amount is None else maybe_start_amount
+            if maybe_start_amount is None:
+                amount_deposited = end_amount
+                deposits_number = max(1, len(day_deposits))
+            else:
+                amount_deposited = sum((x.value.amount for x in day_deposits), ZERO)
+                deposits_number = len(day_deposits)
+
+            stats.append(ValidatorDailyStats(
+                validator_index=index,
+                timestamp=day_start,
+                start_usd_price=prices[day_start],
+                end_usd_price=prices[day_end],
+                pnl=end_amount - start_amount - amount_deposited,
+                start_amount=start_amount,
+                end_amount=end_amount,
+                deposits_number=deposits_number,
+                amount_deposited=amount_deposited,
+            ))
+
+    return stats
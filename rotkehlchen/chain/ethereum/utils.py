@@ -59,7 +59,7 @@ def token_normalized_value_decimals(token_amount: int, token_decimals: Optional[
     if token_decimals is None:  # if somehow no info on decimals ends up here assume 18
         token_decimals = 18
 
-    return token_amount / (FVal(10) ** FVal(token_decimals))
+    return FVal.from_fixed_point(token_amount, token_decimals)
 
 
 def token_raw_value_decimals(token_amount: FVal, token_decimals: Optional[int]) -> int:
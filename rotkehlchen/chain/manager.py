@@ -29,22 +29,6 @@ from rotkehlchen.chain.bitcoin.bch.utils import force_address_to_legacy_address
 from rotkehlchen.chain.bitcoin.xpub import XpubData, XpubManager
 from rotkehlchen.chain.ethereum.defi.chad import DefiChad
 from rotkehlchen.chain.ethereum.defi.structures import DefiProtocolBalances
-from rotkehlchen.chain.ethereum.modules import (
-    Aave,
-    Adex,
-    Balancer,
-    Compound,
-    Eth2,
-    Liquity,
-    Loopring,
-    MakerdaoDsr,
-    MakerdaoVaults,
-    PickleFinance,
-    Sushiswap,
-    Uniswap,
-    YearnVaults,
-    YearnVaultsV2,
-)
 from rotkehlchen.chain.ethereum.modules.balancer.types import BalancerPoolBalance
 from rotkehlchen.chain.ethereum.modules.eth2.structures import Eth2Validator
 from rotkehlchen.chain.ethereum.tokens import EthTokens
@@ -95,7 +79,6 @@ from rotkehlchen.types import (
 )
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.interfaces import EthereumModule
-from rotkehlchen.utils.misc import ts_now
 from rotkehlchen.utils.mixins.cacheable import CacheableMixIn, cache_response_timewise
 from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
 
@@ -103,6 +86,22 @@ if TYPE_CHECKING:
     from rotkehlchen.chain.avalanche.manager import AvalancheManager
     from rotkehlchen.chain.ethereum.interfaces.ammswap.types import AddressToLPBalances
     from rotkehlchen.chain.ethereum.manager import EthereumManager
+    from rotkehlchen.chain.ethereum.modules import (
+        Aave,
+        Adex,
+        Balancer,
+        Compound,
+        Eth2,
+        Liquity,
+        Loopring,
+        MakerdaoDsr,
+        MakerdaoVaults,
+        PickleFinance,
+        Sushiswap,
+        Uniswap,
+        YearnVaults,
+        YearnVaultsV2,
+    )
     from rotkehlchen.chain.ethereum.modules.balancer.types import AddressToPoolBalances
     from rotkehlchen.chain.ethereum.modules.eth2.structures import (
         Eth2Deposit,
@@ -132,8 +131,6 @@ def _module_name_to_class(module_name: ModuleName) -> EthereumModule:
     return module
 
 
-DEFI_BALANCES_REQUERY_SECONDS = 600
-
 # Mapping to token symbols to ignore. True means all
 DEFI_PROTOCOLS_TO_SKIP_ASSETS = {
     # aTokens are already detected at token balance queries
@@ -344,7 +341,6 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
         self.data_directory = data_directory
         self.beaconchain = beaconchain
         self.btc_derivation_gap_limit = btc_derivation_gap_limit
-        self.defi_balances_last_query_ts = Timestamp(0)
         self.defi_balances: Dict[ChecksumEvmAddress, List[DefiProtocolBalances]] = {}
 
         self.defi_lock = Semaphore()
@@ -464,59 +460,59 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
         return
 
     @overload
-    def get_module(self, module_name: Literal['aave']) -> Optional[Aave]:
+    def get_module(self, module_name: Literal['aave']) -> Optional['Aave']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['adex']) -> Optional[Adex]:
+    def get_module(self, module_name: Literal['adex']) -> Optional['Adex']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['balancer']) -> Optional[Balancer]:
+    def get_module(self, module_name: Literal['balancer']) -> Optional['Balancer']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['compound']) -> Optional[Compound]:
+    def get_module(self, module_name: Literal['compound']) -> Optional['Compound']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['eth2']) -> Optional[Eth2]:
+    def get_module(self, module_name: Literal['eth2']) -> Optional['Eth2']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['loopring']) -> Optional[Loopring]:
+    def get_module(self, module_name: Literal['loopring']) -> Optional['Loopring']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['makerdao_dsr']) -> Optional[MakerdaoDsr]:
+    def get_module(self, module_name: Literal['makerdao_dsr']) -> Optional['MakerdaoDsr']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['makerdao_vaults']) -> Optional[MakerdaoVaults]:
+    def get_module(self, module_name: Literal['makerdao_vaults']) -> Optional['MakerdaoVaults']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['uniswap']) -> Optional[Uniswap]:
+    def get_module(self, module_name: Literal['uniswap']) -> Optional['Uniswap']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['sushiswap']) -> Optional[Sushiswap]:
+    def get_module(self, module_name: Literal['sushiswap']) -> Optional['Sushiswap']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['yearn_vaults']) -> Optional[YearnVaults]:
+    def get_module(self, module_name: Literal['yearn_vaults']) -> Optional['YearnVaults']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['yearn_vaults_v2']) -> Optional[YearnVaultsV2]:
+    def get_module(self, module_name: Literal['yearn_vaults_v2']) -> Optional['YearnVaultsV2']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['liquity']) -> Optional[Liquity]:
+    def get_module(self, module_name: Literal['liquity']) -> Optional['Liquity']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['pickle_finance']) -> Optional[PickleFinance]:
+    def get_module(self, module_name: Literal['pickle_finance']) -> Optional['PickleFinance']:
         ...
 
     @overload
@@ -1096,12 +1092,9 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
         client and the chain is not synced
         """
         with self.defi_lock:
-            if ts_now() - self.defi_balances_last_query_ts < DEFI_BALANCES_REQUERY_SECONDS:
-                return self.defi_balances
-
-            # query zerion adapter contract for defi balances
+            # query zerion adapter contract for defi balances. Only accounts
+            # not queried in the last DEFI_BALANCES_REQUERY_SECONDS are requeried
             self.defi_balances = self.defichad.query_defi_balances(self.accounts.eth)
-            self.defi_balances_last_query_ts = ts_now()
             return self.defi_balances
 
     @protect_with_lock()
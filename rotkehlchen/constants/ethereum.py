@@ -2,6 +2,7 @@
 
 import json
 import os
+import re
 from typing import Any, Dict, List, Optional
 
 from rotkehlchen.chain.ethereum.contracts import EthereumContract
@@ -11,48 +12,109 @@ from rotkehlchen.constants.resolver import ChainID
 MAX_BLOCKTIME_CACHE = 250  # 55 mins with 13 secs avg block time
 ETH_SPECIAL_ADDRESS = string_to_evm_address('0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE')
 
+TOP_LEVEL_KEY_RE = re.compile(r'"([A-Z0-9_]+)"\s*:\s*')
+JSON_DECODER = json.JSONDecoder()
+
+
+class _LazyJSONRegistry():
+    """A read-only view over a bundled json file mapping names to json values
+
+    Instead of parsing the whole file at once, an index of the text offsets of each
+    top-level entry is built with a single regex pass over the raw text and each entry
+    is only decoded (and then memoized) the first time it is requested.
+
+    All top-level keys of the bundled files are uppercase constant names while keys of
+    nested objects (abi entries) are lowercase, which is what the index relies on.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self._text: Optional[str] = None
+        self._index: Dict[str, int] = {}
+        self._entries: Dict[str, Any] = {}
+
+    def _ensure_index(self) -> str:
+        if self._text is None:
+            dir_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+            with open(os.path.join(dir_path, 'data', self.filename), 'r') as f:
+                self._text = f.read()
+            self._index = {
+                match.group(1): match.end()
+                for match in TOP_LEVEL_KEY_RE.finditer(self._text)
+            }
+        return self._text
+
+    def get(self, name: str) -> Optional[Any]:
+        entry = self._entries.get(name)
+        if entry is not None:
+            return entry
+
+        text = self._ensure_index()
+        offset = self._index.get(name)
+        if offset is None:
+            return None
+
+        entry, _ = JSON_DECODER.raw_decode(text, offset)
+        self._entries[name] = entry
+        return entry
+
+    def names(self) -> List[str]:
+        self._ensure_index()
+        return list(self._index)
+
+    def all(self) -> Dict[str, Any]:
+        return {name: self.get(name) for name in self.names()}
+
 
 class EthereumConstants():
     __instance = None
-    contracts: Dict[str, Dict[str, Any]] = {}
-    abi_entries: Dict[str, List[Dict[str, Any]]] = {}
+    _contracts: _LazyJSONRegistry
+    _abi_entries: _LazyJSONRegistry
+    _contract_instances: Dict[str, EthereumContract]
 
     def __new__(cls) -> 'EthereumConstants':
         if EthereumConstants.__instance is not None:
             return EthereumConstants.__instance  # type: ignore
 
         EthereumConstants.__instance = object.__new__(cls)
-
-        dir_path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
-        with open(os.path.join(dir_path, 'data', 'eth_contracts.json'), 'r') as f:
-            contracts = json.loads(f.read())
-
-        with open(os.path.join(dir_path, 'data', 'eth_abi.json'), 'r') as f:
-            abi_entries = json.loads(f.read())
-
-        EthereumConstants.__instance.contracts = contracts
-        EthereumConstants.__instance.abi_entries = abi_entries
+        EthereumConstants.__instance._contracts = _LazyJSONRegistry('eth_contracts.json')
+        EthereumConstants.__instance._abi_entries = _LazyJSONRegistry('eth_abi.json')
+        EthereumConstants.__instance._contract_instances = {}
         return EthereumConstants.__instance
 
     @staticmethod
     def get() -> Dict[str, Dict[str, Any]]:
-        return EthereumConstants().contracts
+        """Returns all contract entries. This decodes the entire contracts file"""
+        return EthereumConstants()._contracts.all()
+
+    @staticmethod
+    def get_abis() -> Dict[str, List[Dict[str, Any]]]:
+        """Returns all abi entries. This decodes the entire abi file"""
+        return EthereumConstants()._abi_entries.all()
 
     @staticmethod
     def contract_or_none(name: str) -> Optional[EthereumContract]:
         """Gets details of an ethereum contract from the contracts json file
 
+        The created contract is memoized so subsequent calls return the same object.
         Returns None if missing
         """
-        contract = EthereumConstants().contracts.get(name, None)
-        if contract is None:
+        instance = EthereumConstants()
+        contract = instance._contract_instances.get(name)
+        if contract is not None:
+            return contract
+
+        entry = instance._contracts.get(name)
+        if entry is None:
             return None
 
-        return EthereumContract(
-            address=contract['address'],
-            abi=contract['abi'],
-            deployed_block=contract['deployed_block'],
+        contract = EthereumContract(
+            address=entry['address'],
+            abi=entry['abi'],
+            deployed_block=entry['deployed_block'],
         )
+        instance._contract_instances[name] = contract
+        return contract
 
     @staticmethod
     def contract(name: str) -> EthereumContract:
@@ -70,7 +132,7 @@ class EthereumConstants():
 
         Returns None if missing
         """
-        return EthereumConstants().abi_entries.get(name, None)
+        return EthereumConstants()._abi_entries.get(name)
 
     @staticmethod
     def abi(name: str) -> List[Dict[str, Any]]:
@@ -4,3 +4,7 @@ FREE_LEDGER_ACTIONS_LIMIT = 50
 FREE_HISTORY_EVENTS_LIMIT = 100
 FREE_ETH_TX_LIMIT = 100
 FREE_USER_NOTES_LIMIT = 10
+# Max history events returned by one request to the history events change feed
+MAX_HISTORY_EVENTS_CHANGES_LIMIT = 1000
+# Max seconds the backend can be profiled for by one request to the profiler
+MAX_PROFILING_SECONDS = 600
@@ -13,10 +13,8 @@ from rotkehlchen.constants.assets import A_USD
 from rotkehlchen.data_import.utils import BaseExchangeImporter
 from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
-from rotkehlchen.errors.price import NoPriceForGivenTimestamp
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.exchanges.data_structures import AssetMovement, Trade
-from rotkehlchen.history.price import PriceHistorian
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import (
     deserialize_asset_amount,
@@ -123,6 +121,24 @@ class BinanceTradeEntry(BinanceMultipleEntry):
             (keys == {'ETH 2.0 Staking'} and counted['ETH 2.0 Staking'] % 2 == 0)
         )
 
+    @staticmethod
+    def have_same_assets(data: List[BinanceCsvRow]) -> bool:
+        """Checks if all Buys / Sells / Fees of the rows use the same asset respectively.
+        If not the rows need their usd value to be grouped into trades."""
+        assets: Dict[str, Optional[Asset]] = defaultdict(lambda: None)
+        for row in data:
+            if row['Operation'] == 'Fee':
+                cur_operation = 'Fee'
+            elif row['Change'] < 0:
+                cur_operation = 'Sold'
+            else:
+                cur_operation = 'Bought'
+            assets[cur_operation] = assets[cur_operation] or row['Coin']
+            if assets[cur_operation] != row['Coin']:
+                return False
+
+        return True
+
     @staticmethod
     def process_trades(
             importer: BaseExchangeImporter,
@@ -143,31 +159,12 @@ class BinanceTradeEntry(BinanceMultipleEntry):
         # and therefore we check if all Buys / Sells use the same asset.
         # If so, we can group by original amount.
 
-        # Checking assets
-        same_assets = True
-        assets: Dict[str, Optional[Asset]] = defaultdict(lambda: None)
-        for row in data:
-            if row['Operation'] == 'Fee':
-                cur_operation = 'Fee'
-            elif row['Change'] < 0:
-                cur_operation = 'Sold'
-            else:
-                cur_operation = 'Bought'
-            assets[cur_operation] = assets[cur_operation] or row['Coin']
-            if assets[cur_operation] != row['Coin']:
-                same_assets = False
-                break
-
-        # Querying usd value if needed
+        # Querying usd value if needed. The importer has prefetched them
+        same_assets = BinanceTradeEntry.have_same_assets(data)
         if same_assets is False:
             for row in data:
-                try:
-                    price = PriceHistorian.query_historical_price(
-                        from_asset=row['Coin'],
-                        to_asset=A_USD,
-                        timestamp=timestamp,
-                    )
-                except NoPriceForGivenTimestamp:
+                price = importer.get_usd_price(row['Coin'], timestamp)
+                if price is None:
                     # If we can't find price we can't group, so we quit the method
                     log.warning(f'Couldn\'t find price of {row["Coin"]} on {timestamp}')
                     return []
@@ -463,6 +460,22 @@ class BinanceImporter(BaseExchangeImporter):
                 return multiple_entry_class, processed_count
         return None, 0
 
+    def _prefetch_trade_prices(self, multi: Dict[Timestamp, List[BinanceCsvRow]]) -> None:
+        """Prefetches the USD prices needed to group trade rows that mix assets"""
+        queries = []
+        for timestamp, rows in multi.items():
+            trade_rows = [
+                row for row in rows
+                if not any(x.is_entry(row['Operation']) for x in SINGLE_BINANCE_ENTRIES)
+            ]
+            if (
+                BinanceTradeEntry().are_entries([row['Operation'] for row in trade_rows]) and
+                BinanceTradeEntry.have_same_assets(trade_rows) is False
+            ):
+                queries.extend((row['Coin'], timestamp) for row in trade_rows)
+
+        self.prefetch_usd_prices(queries)
+
     def _process_binance_rows(
             self,
             cursor: DBCursor,
@@ -470,7 +483,9 @@ class BinanceImporter(BaseExchangeImporter):
     ) -> None:
         stats: Dict[BinanceEntry, int] = defaultdict(int)
         skipped_rows: List[Any] = []
-        for timestamp, rows in multi.items():
+        self._prefetch_trade_prices(multi)
+        # rows are grouped by timestamp so each group is checkpointed as one csv row
+        for timestamp, rows in self.csv_rows(cursor, multi.items()):
             single_processed, rows_without_single = self._process_single_binance_entries(
                 cursor=cursor,
                 timestamp=timestamp,
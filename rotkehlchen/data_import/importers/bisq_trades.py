@@ -100,7 +100,7 @@ class BisqTradesImporter(BaseExchangeImporter):
         """
         with open(filepath, 'r', encoding='utf-8-sig') as csvfile:
             data = csv.DictReader(csvfile)
-            for row in data:
+            for row in self.csv_rows(cursor, data):
                 try:
                     self._consume_bisq_trade(cursor, row, **kwargs)
                 except UnknownAsset as e:
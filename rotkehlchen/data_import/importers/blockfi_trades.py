@@ -74,7 +74,7 @@ class BlockfiTradesImporter(BaseExchangeImporter):
         """
         with open(filepath, 'r', encoding='utf-8-sig') as csvfile:
             data = csv.DictReader(csvfile)
-            for row in data:
+            for row in self.csv_rows(cursor, data):
                 try:
                     self._consume_blockfi_trade(cursor, row, **kwargs)
                 except UnknownAsset as e:
@@ -177,7 +177,7 @@ class CointrackingImporter(BaseExchangeImporter):
         with open(filepath, 'r', encoding='utf-8-sig') as csvfile:
             data = csv.reader(csvfile, delimiter=',', quotechar='"')
             header = remap_header(next(data))
-            for row in data:
+            for row in self.csv_rows(cursor, data):
                 try:
                     self._consume_cointracking_entry(cursor, dict(zip(header, row)), **kwargs)
                 except UnknownAsset as e:
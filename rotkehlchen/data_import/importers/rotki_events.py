@@ -91,7 +91,7 @@ class RotkiGenericEventsImporter(BaseExchangeImporter):
         """
         with open(filepath, 'r', encoding='utf-8-sig') as csvfile:
             data = csv.DictReader(csvfile)
-            for idx, row in enumerate(data):
+            for idx, row in self.csv_rows(cursor, enumerate(data)):
                 try:
                     kwargs['sequence_index'] = idx
                     self._consume_rotki_event(cursor, row, **kwargs)
@@ -68,7 +68,7 @@ class RotkiGenericTradesImporter(BaseExchangeImporter):
         """
         with open(filepath, 'r', encoding='utf-8-sig') as csvfile:
             data = csv.DictReader(csvfile)
-            for row in data:
+            for row in self.csv_rows(cursor, data):
                 try:
                     self._consume_rotki_trades(cursor, row, **kwargs)
                 except UnknownAsset as e:
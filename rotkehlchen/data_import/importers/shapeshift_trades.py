@@ -103,7 +103,7 @@ Trade from ShapeShift with ShapeShift Deposit Address:
         """
         with open(filepath, 'r', encoding='utf-8-sig') as csvfile:
             data = csv.DictReader(csvfile)
-            for row in data:
+            for row in self.csv_rows(cursor, data):
                 try:
                     self._consume_shapeshift_trade(cursor, row, **kwargs)
                 except UnknownAsset as e:
@@ -181,7 +181,7 @@ Activity from uphold with uphold transaction id:
         """
         with open(filepath, 'r', encoding='utf-8-sig') as csvfile:
             data = csv.DictReader(csvfile)
-            for row in data:
+            for row in self.csv_rows(cursor, data):
                 try:
                     self._consume_uphold_transaction(cursor, row, **kwargs)
                 except UnknownAsset as e:
@@ -1,18 +1,46 @@
+import hashlib
+import logging
 from abc import ABCMeta, abstractmethod
 from pathlib import Path
-from typing import Any, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import gevent
+from gevent.pool import Pool
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+from rotkehlchen.api.websockets.typedefs import WSMessageType
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants.assets import A_USD
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.db.ledger_actions import DBLedgerActions
 from rotkehlchen.errors.misc import InputError
+from rotkehlchen.errors.price import NoPriceForGivenTimestamp
 from rotkehlchen.exchanges.data_structures import AssetMovement, Trade
+from rotkehlchen.history.price import PriceHistorian
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Price, Timestamp
 
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
 
 ITEMS_PER_DB_WRITE = 400
+# Concurrent historical price queries when prefetching the prices an import needs
+PRICES_PREFETCH_CONCURRENCY = 4
+HASH_READ_CHUNK_SIZE = 1024 * 1024
+
+T = TypeVar('T')
+
+
+def hash_csv_file(filepath: Path) -> str:
+    """Hashes the file in chunks so that big files don't need to be read in memory"""
+    file_hash = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        while chunk := f.read(HASH_READ_CHUNK_SIZE):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
 
 
 class BaseExchangeImporter(metaclass=ABCMeta):
@@ -24,16 +52,118 @@ class BaseExchangeImporter(metaclass=ABCMeta):
         self._asset_movements: List[AssetMovement] = []
         self._ledger_actions: List[LedgerAction] = []
         self._history_events: List[HistoryBaseEntry] = []
+        self._usd_prices: Dict[Tuple[Asset, Timestamp], Optional[Price]] = {}
+        # Set while importing a file whose rows are iterated with csv_rows()
+        self._file_hash: Optional[str] = None
+        self._checkpointing = False
+        self._imported_rows = 0
 
     def import_csv(self, filepath: Path, **kwargs: Any) -> Tuple[bool, str]:
+        """Imports the csv file.
+
+        Importers that iterate the file with csv_rows() commit their entries every
+        ITEMS_PER_DB_WRITE entries along with the number of rows imported so far.
+        If such an import fails, importing the same file again resumes after the last
+        committed row. All other importers import the whole file in one transaction.
+        """
+        self._file_hash = hash_csv_file(filepath)
+        self._checkpointing = False
+        self._imported_rows = 0
         try:
             with self.db.user_write() as cursor:
                 self._import_csv(cursor, filepath=filepath, **kwargs)
                 self._flush_all(cursor)
+                cursor.execute(
+                    'DELETE FROM csv_import_checkpoints WHERE file_hash=? AND importer=?',
+                    (self._file_hash, self._importer_name()),
+                )
+            if self._checkpointing is True:
+                self._send_progress(finished=True)
             return True, ''
         except InputError as e:
             return False, str(e)
 
+    def _importer_name(self) -> str:
+        return type(self).__name__
+
+    def _send_progress(self, finished: bool) -> None:
+        self.db.msg_aggregator.add_message(
+            message_type=WSMessageType.CSV_IMPORT_PROGRESS,
+            data={
+                'importer': self._importer_name(),
+                'imported_rows': self._imported_rows,
+                'finished': finished,
+            },
+        )
+
+    def csv_rows(self, cursor: DBCursor, rows: Iterable[T]) -> Iterator[T]:
+        """Iterates the rows of the file being imported, committing the entries added
+        so far along with a checkpoint every time ITEMS_PER_DB_WRITE are pending.
+
+        Rows already imported by an earlier interrupted import of the same file are
+        skipped. Importers should only use this if each row is processed independently
+        of the others and in the same order for the same file.
+        """
+        self._checkpointing = True
+        cursor.execute(
+            'SELECT imported_rows FROM csv_import_checkpoints WHERE file_hash=? AND importer=?',  # noqa: E501
+            (self._file_hash, self._importer_name()),
+        )
+        result = cursor.fetchone()
+        resume_from = 0 if result is None else result[0]
+        if resume_from != 0:
+            log.info(f'Resuming {self._importer_name()} csv import after row {resume_from}')
+
+        for idx, row in enumerate(rows):
+            if idx < resume_from:
+                continue
+
+            if self._pending_entries() >= ITEMS_PER_DB_WRITE:
+                self._commit_checkpoint(cursor)
+            yield row
+            self._imported_rows = idx + 1
+
+    def _commit_checkpoint(self, cursor: DBCursor) -> None:
+        """Writes the pending entries and the number of rows they came from and commits
+        so that they are kept if the import fails later and other writers can proceed"""
+        self._flush_all(cursor)
+        cursor.execute(
+            'INSERT OR REPLACE INTO csv_import_checkpoints(file_hash, importer, imported_rows) '
+            'VALUES(?, ?, ?)',
+            (self._file_hash, self._importer_name(), self._imported_rows),
+        )
+        self.db.conn.commit()
+        self._send_progress(finished=False)
+        gevent.sleep(0)
+
+    def prefetch_usd_prices(self, queries: Iterable[Tuple[Asset, Timestamp]]) -> None:
+        """Queries the USD prices of the given assets at the given timestamps
+        concurrently so that get_usd_price() finds them without waiting"""
+        pending = {x for x in queries if x not in self._usd_prices}
+        if len(pending) == 0:
+            return
+
+        log.debug(f'Prefetching {len(pending)} USD prices for {self._importer_name()} csv import')  # noqa: E501
+        pool = Pool(PRICES_PREFETCH_CONCURRENCY)
+        for asset, timestamp in pending:
+            pool.spawn(self.get_usd_price, asset, timestamp)
+        pool.join(raise_error=True)
+
+    def get_usd_price(self, asset: Asset, timestamp: Timestamp) -> Optional[Price]:
+        """Returns the USD price of the asset at the timestamp or None if not found"""
+        key = (asset, timestamp)
+        if key not in self._usd_prices:
+            try:
+                self._usd_prices[key] = PriceHistorian.query_historical_price(
+                    from_asset=asset,
+                    to_asset=A_USD,
+                    timestamp=timestamp,
+                )
+            except NoPriceForGivenTimestamp:
+                self._usd_prices[key] = None
+
+        return self._usd_prices[key]
+
     @abstractmethod
     def _import_csv(self, cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
         """The method that processes csv. Should be implemented by subclasses.
@@ -58,8 +188,12 @@ class BaseExchangeImporter(metaclass=ABCMeta):
         self._history_events.extend(history_events)
         self.maybe_flush_all(cursor)
 
+    def _pending_entries(self) -> int:
+        return len(self._trades) + len(self._asset_movements) + len(self._ledger_actions) + len(self._history_events)  # noqa: E501
+
     def maybe_flush_all(self, cursor: DBCursor) -> None:
-        if len(self._trades) + len(self._asset_movements) + len(self._ledger_actions) + len(self._history_events) >= ITEMS_PER_DB_WRITE:  # noqa: E501
+        # When iterating with csv_rows() the entries are written between rows instead
+        if self._checkpointing is False and self._pending_entries() >= ITEMS_PER_DB_WRITE:
             self._flush_all(cursor)
 
     def _flush_all(self, cursor: DBCursor) -> None:
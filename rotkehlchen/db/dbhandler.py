@@ -81,6 +81,7 @@ from rotkehlchen.db.filtering import (
     TradesFilterQuery,
     UserNotesFilterQuery,
 )
+from rotkehlchen.db.history_events import CHANGES_DELETE
 from rotkehlchen.db.loopring import DBLoopring
 from rotkehlchen.db.misc import detect_sqlcipher_version
 from rotkehlchen.db.schema import DB_SCRIPT_CREATE_TABLES
@@ -102,6 +103,7 @@ from rotkehlchen.db.utils import (
     Tag,
     combine_asset_balances,
     deserialize_tags_from_db,
+    fetchone_cached,
     form_query_to_filter_timestamps,
     insert_tag_mappings,
     is_valid_db_blockchain_account,
@@ -113,9 +115,8 @@ from rotkehlchen.errors.api import AuthenticationError, IncorrectApiKeyFormat
 from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset
 from rotkehlchen.errors.misc import InputError, SystemPermissionError, TagConstraintError
 from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.exchanges.constants import FTX_SUBACCOUNT_DB_SETTING, KrakenAccountType
 from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
-from rotkehlchen.exchanges.ftx import FTX_SUBACCOUNT_DB_SETTING
-from rotkehlchen.exchanges.kraken import KrakenAccountType
 from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
@@ -1194,6 +1195,10 @@ class DBHandler:
             'DELETE FROM asset_movements WHERE location = ?;',
             (location.serialize_for_db(),),
         )
+        write_cursor.execute(
+            CHANGES_DELETE + 'location = ?;',
+            (location.serialize_for_db(),),
+        )
         write_cursor.execute(
             'DELETE FROM history_events WHERE location = ?;',
             (location.serialize_for_db(),),
@@ -1220,20 +1225,23 @@ class DBHandler:
 
     def add_multiple_location_data(self, write_cursor: 'DBCursor', location_data: List[LocationData]) -> None:  # noqa: E501
         """Execute addition of multiple location data in the DB"""
-        for entry in location_data:
-            try:
-                write_cursor.execute(
-                    'INSERT INTO timed_location_data('
-                    '    timestamp, location, usd_value) '
-                    ' VALUES(?, ?, ?)',
-                    (entry.time, entry.location, entry.usd_value),
-                )
-            except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
-                raise InputError(
-                    f'Tried to add a timed_location_data for '
-                    f'{str(Location.deserialize_from_db(entry.location))} at'
-                    f' already existing timestamp {entry.time}.',
-                ) from e
+        changes_before = write_cursor.execute('SELECT total_changes()').fetchone()[0]
+        try:
+            write_cursor.executemany(
+                'INSERT INTO timed_location_data('
+                '    timestamp, location, usd_value) '
+                ' VALUES(?, ?, ?)',
+                [(entry.time, entry.location, entry.usd_value) for entry in location_data],
+            )
+        except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
+            # executemany stops at the first conflicting entry after inserting the ones before it
+            inserted = write_cursor.execute('SELECT total_changes()').fetchone()[0] - changes_before  # noqa: E501
+            entry = location_data[min(inserted, len(location_data) - 1)]
+            raise InputError(
+                f'Tried to add a timed_location_data for '
+                f'{str(Location.deserialize_from_db(entry.location))} at'
+                f' already existing timestamp {entry.time}.',
+            ) from e
 
     # pylint: disable=no-self-use
     def add_blockchain_accounts(
@@ -1641,12 +1649,19 @@ class DBHandler:
                 f'manually tracked balance ids that do not exist',
             )
 
-    def save_balances_data(self, write_cursor: 'DBCursor', data: Dict[str, Any], timestamp: Timestamp) -> None:  # noqa: E501
+    def save_balances_data(
+            self,
+            write_cursor: 'DBCursor',
+            data: Dict[str, Any],
+            timestamp: Timestamp,
+            source_timings: Optional[Dict[str, float]] = None,
+    ) -> None:
         """The keys of the data dictionary can be any kind of asset plus 'location'
         and 'net_usd'. This gives us the balance data per assets, the balance data
         per location and finally the total balance
 
-        The balances are saved in the DB at the given timestamp
+        The balances are saved in the DB at the given timestamp. If given, the seconds
+        it took to query each source of the balances are saved along with them.
         """
         balances = []
         locations = []
@@ -1690,6 +1705,14 @@ class DBHandler:
             self.add_multiple_location_data(write_cursor, locations)
         except InputError as err:
             self.msg_aggregator.add_warning(str(err))
+            return
+
+        if source_timings is not None:
+            write_cursor.executemany(
+                'INSERT OR REPLACE INTO timed_balances_sources(timestamp, source, seconds) '
+                'VALUES(?, ?, ?)',
+                [(timestamp, source, seconds) for source, seconds in source_timings.items()],
+            )
 
     def add_exchange(
             self,
@@ -2145,8 +2168,7 @@ class DBHandler:
             movements = self.get_asset_movements(cursor, filter_query=filter_query, has_premium=has_premium)  # noqa: E501
             query, bindings = filter_query.prepare(with_pagination=False)
             query = 'SELECT COUNT(*) from asset_movements ' + query
-            total_found_result = cursor.execute(query, bindings)
-            return movements, total_found_result.fetchone()[0]
+            return movements, fetchone_cached(cursor, query, bindings)[0]
 
     def get_asset_movements(
             self,
@@ -2210,8 +2232,7 @@ class DBHandler:
             cursorstr += ' WHERE'
         op.join([f' {arg} = "{val}" ' for arg, val in kwargs.items()])
         cursorstr += ';'
-        cursor.execute(cursorstr)
-        return cursor.fetchone()[0]
+        return fetchone_cached(cursor, cursorstr)[0]
 
     def delete_data_for_ethereum_address(self, write_cursor: 'DBCursor', address: ChecksumEvmAddress) -> None:  # noqa: E501
         """Deletes all ethereum related data from the DB for a single ethereum address"""
@@ -2353,8 +2374,7 @@ class DBHandler:
         table_name = 'combined_trades_view' if has_premium else 'trades'
         query, bindings = filter_query.prepare(with_pagination=False)
         query = f'SELECT COUNT(*) from {table_name} ' + query
-        total_found_result = cursor.execute(query, bindings)
-        return trades, total_found_result.fetchone()[0]
+        return trades, fetchone_cached(cursor, query, bindings)[0]
 
     def get_trades(self, cursor: 'DBCursor', filter_query: TradesFilterQuery, has_premium: bool) -> List[Trade]:  # noqa: E501
         """Returns a list of trades optionally filtered by various filters.
@@ -3124,7 +3144,7 @@ class DBHandler:
         for acc_idx in (0, 1):
             query = cursor.execute(
                 'SELECT derived_index from xpub_mappings WHERE xpub=? AND '
-                'derivation_path IS ? AND account_index=?;',
+                'derivation_path IS ? AND account_index=? ORDER BY derived_index ASC;',
                 (xpub_data.xpub.xpub, xpub_data.serialize_derivation_path_for_db(), acc_idx),
             )
             prev_index = -1
@@ -3139,6 +3159,53 @@ class DBHandler:
 
         return tuple(returned_indices)  # type: ignore
 
+    def get_xpub_derivation_start_indices(
+            self,
+            cursor: 'DBCursor',
+            xpub_data: XpubData,
+            blockchain: Literal[SupportedBlockchain.BITCOIN, SupportedBlockchain.BITCOIN_CASH],
+    ) -> Tuple[int, int]:
+        """Get the receiving and change indices from which to continue deriving addresses
+        of the given xpub. If the xpub has not been derived with saved progress yet then
+        start from its last consecutive derived indices.
+        """
+        cursor.execute(
+            'SELECT receiving_index, change_index FROM xpub_derivation_progress WHERE '
+            'xpub=? AND derivation_path=? AND blockchain=?;',
+            (xpub_data.xpub.xpub, xpub_data.serialize_derivation_path_for_db(), blockchain.value),  # noqa: E501
+        )
+        result = cursor.fetchone()
+        if result is None:
+            return self.get_last_consecutive_xpub_derived_indices(cursor, xpub_data)
+
+        return result[0], result[1]
+
+    def set_xpub_derivation_start_indices(
+            self,
+            write_cursor: 'DBCursor',
+            xpub_data: XpubData,
+            blockchain: Literal[SupportedBlockchain.BITCOIN, SupportedBlockchain.BITCOIN_CASH],
+            receiving_index: int,
+            change_index: int,
+    ) -> None:
+        """Save the receiving and change indices from which to continue deriving addresses
+        of the given xpub. All addresses below them must have been checked.
+
+        Nothing is saved if the xpub is not tracked for the given blockchain.
+        """
+        write_cursor.execute(
+            'INSERT OR REPLACE INTO xpub_derivation_progress(xpub, derivation_path, '
+            'blockchain, receiving_index, change_index) SELECT xpub, derivation_path, '
+            'blockchain, ?, ? FROM xpubs WHERE xpub=? AND derivation_path=? AND blockchain=?',
+            (
+                receiving_index,
+                change_index,
+                xpub_data.xpub.xpub,
+                xpub_data.serialize_derivation_path_for_db(),
+                blockchain.value,
+            ),
+        )
+
     def get_addresses_to_xpub_mapping(
             self,
             cursor: 'DBCursor',
@@ -3461,8 +3528,7 @@ class DBHandler:
         user_notes = self.get_user_notes(filter_query=filter_query, cursor=cursor, has_premium=has_premium)  # noqa: E501
         query, bindings = filter_query.prepare(with_pagination=False)
         query = 'SELECT COUNT(*) from user_notes ' + query
-        total_found_result = cursor.execute(query, bindings)
-        return user_notes, total_found_result.fetchone()[0]
+        return user_notes, fetchone_cached(cursor, query, bindings)[0]
 
     def add_user_note(
             self,
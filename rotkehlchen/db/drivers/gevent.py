@@ -3,16 +3,35 @@
 but heavily modified"""
 
 import random
+import re
 import sqlite3
+from collections import OrderedDict, defaultdict
 from contextlib import contextmanager
 from enum import Enum, auto
 from pathlib import Path
 from types import TracebackType
-from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Sequence, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    DefaultDict,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import gevent
 from pysqlcipher3 import dbapi2 as sqlcipher
 
+from rotkehlchen.db.schema import DB_SCRIPT_CREATE_TABLES
+from rotkehlchen.utils.metrics import METRICS
+
 if TYPE_CHECKING:
     from rotkehlchen.logging import RotkehlchenLogger
 
@@ -24,6 +43,51 @@ import logging
 
 logger: 'RotkehlchenLogger' = logging.getLogger(__name__)  # type: ignore
 
+# Captures the table written to by an INSERT, REPLACE, UPDATE or DELETE statement
+WRITE_STATEMENT_RE = re.compile(
+    r'^\s*(?:INSERT|REPLACE|UPDATE|DELETE)(?:\s+OR\s+\w+)?\s+(?:INTO\s+|FROM\s+)?["`\[]?(\w+)',
+    re.IGNORECASE,
+)
+# Captures each table of a create script and the parents of its foreign keys that
+# cascade updates or deletes to it
+CREATE_TABLE_RE = re.compile(r'CREATE TABLE IF NOT EXISTS (\w+)', re.IGNORECASE)
+CASCADING_REFERENCE_RE = re.compile(
+    r'REFERENCES\s+(\w+)\s*\([^)]*\)((?:\s*ON\s+(?:UPDATE|DELETE)\s+(?:SET\s+\w+|NO\s+ACTION|\w+))*)',  # noqa: E501
+    re.IGNORECASE,
+)
+# How many cached aggregate query results are kept per connection
+AGGREGATES_CACHE_SIZE = 256
+
+
+def cascade_tables(create_script: str) -> Dict[str, Tuple[str, ...]]:
+    """Maps each table of the create script to all tables that writes to it can
+    modify through foreign key actions, including the ones of the modified tables."""
+    children: DefaultDict[str, Set[str]] = defaultdict(set)
+    for table_definition in create_script.split('CREATE TABLE')[1:]:
+        table_match = CREATE_TABLE_RE.match('CREATE TABLE' + table_definition)
+        if table_match is None:
+            continue
+        for parent, actions in CASCADING_REFERENCE_RE.findall(table_definition):
+            actions = actions.upper()
+            if 'CASCADE' in actions or 'SET' in actions:
+                children[parent.lower()].add(table_match.group(1).lower())
+
+    result = {}
+    for parent in children:
+        descendants: Set[str] = set()
+        pending = [parent]
+        while len(pending) != 0:
+            for child in children.get(pending.pop(), ()):
+                if child not in descendants:
+                    descendants.add(child)
+                    pending.append(child)
+        result[parent] = tuple(sorted(descendants))
+    return result
+
+
+# Tables of the user DB written to by foreign key actions of writes to each parent table
+CASCADE_TABLES = cascade_tables(DB_SCRIPT_CREATE_TABLES)
+
 
 class DBCursor:
 
@@ -69,7 +133,9 @@ class DBCursor:
     def execute(self, statement: str, *bindings: Sequence) -> 'DBCursor':
         if __debug__:
             logger.trace(f'EXECUTE {statement}')
-        self._cursor.execute(statement, *bindings)
+        self.connection.record_write(statement)
+        with METRICS.time('db_execute', self.connection.metrics_label):
+            self._cursor.execute(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH EXECUTE {statement}')
         return self
@@ -77,7 +143,9 @@ class DBCursor:
     def executemany(self, statement: str, *bindings: Sequence[Sequence]) -> 'DBCursor':
         if __debug__:
             logger.trace(f'EXECUTEMANY {statement}')
-        self._cursor.executemany(statement, *bindings)
+        self.connection.record_write(statement)
+        with METRICS.time('db_executemany', self.connection.metrics_label):
+            self._cursor.executemany(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH EXECUTEMANY {statement}')
         return self
@@ -88,6 +156,7 @@ class DBCursor:
         """
         if __debug__:
             logger.trace(f'EXECUTESCRIPT {script}')  # lgtm [py/clear-text-logging-sensitive-data]
+        self.connection.record_write(None)
         self._cursor.executescript(script)
         if __debug__:
             logger.trace(f'FINISH EXECUTESCRIPT {script}')  # noqa: E501 lgtm [py/clear-text-logging-sensitive-data]
@@ -213,17 +282,54 @@ class DBConnection:
         self._conn: UnderlyingConnection
         self.in_callback = gevent.lock.Semaphore()
         self.connection_type = connection_type
+        self.metrics_label = connection_type.name.lower()
         self.sql_vm_instructions_cb = sql_vm_instructions_cb
         if connection_type == DBConnectionType.GLOBAL:
             self._conn = sqlite3.connect(path, check_same_thread=False)
         else:
             self._conn = sqlcipher.connect(path, check_same_thread=False)  # pylint: disable=no-member  # noqa: E501
         self._set_progress_handler()
+        # Counters of the writes to each table and to the whole DB. Results cached
+        # with the counters of the tables they read are valid while the counters match.
+        self.table_write_generations: DefaultDict[str, int] = defaultdict(int)
+        self.cascade_tables: Dict[str, Tuple[str, ...]] = {}
+        if connection_type != DBConnectionType.GLOBAL:
+            self.cascade_tables = CASCADE_TABLES
+        self.write_generation = 0
+        self.aggregates_cache: OrderedDict[Tuple[str, Tuple[Any, ...]], Tuple[Tuple[int, ...], Any]] = OrderedDict()  # noqa: E501
+
+    def record_write(self, statement: Optional[str]) -> None:
+        """Bumps the write generation of the table the statement writes to and of
+        the tables that foreign key actions of the table may write to.
+
+        A statement of None, like a script, a rollback or a statement that can't be
+        parsed, may have changed anything so the generation of the whole DB is bumped.
+        """
+        if statement is None:
+            self.write_generation += 1
+            return
+
+        match = WRITE_STATEMENT_RE.match(statement)
+        if match is not None:
+            table = match.group(1).lower()
+            self.table_write_generations[table] += 1
+            for child_table in self.cascade_tables.get(table, ()):
+                self.table_write_generations[child_table] += 1
+        elif statement.lstrip()[:6].upper() not in ('SELECT', 'PRAGMA'):
+            self.write_generation += 1
+
+    def write_generations(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        return (
+            self.write_generation,
+            *(self.table_write_generations[table] for table in tables),
+        )
 
     def execute(self, statement: str, *bindings: Sequence) -> DBCursor:
         if __debug__:
             logger.trace(f'DB CONNECTION EXECUTE {statement}')
-        underlying_cursor = self._conn.execute(statement, *bindings)
+        self.record_write(statement)
+        with METRICS.time('db_execute', self.metrics_label):
+            underlying_cursor = self._conn.execute(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH DB CONNECTION EXECUTEMANY {statement}')
         return DBCursor(connection=self, cursor=underlying_cursor)
@@ -231,7 +337,9 @@ class DBConnection:
     def executemany(self, statement: str, *bindings: Sequence[Sequence]) -> DBCursor:
         if __debug__:
             logger.trace(f'DB CONNECTION EXECUTEMANY {statement}')
-        underlying_cursor = self._conn.executemany(statement, *bindings)
+        self.record_write(statement)
+        with METRICS.time('db_executemany', self.metrics_label):
+            underlying_cursor = self._conn.executemany(statement, *bindings)
         if __debug__:
             logger.trace(f'FINISH DB CONNECTION EXECUTEMANY {statement}')
         return DBCursor(connection=self, cursor=underlying_cursor)
@@ -242,6 +350,7 @@ class DBConnection:
         """
         if __debug__:
             logger.trace(f'DB CONNECTION EXECUTESCRIPT {script}')
+        self.record_write(None)
         underlying_cursor = self._conn.executescript(script)
         if __debug__:
             logger.trace(f'DB CONNECTION EXECUTESCRIPT {script}')
@@ -252,7 +361,8 @@ class DBConnection:
             if __debug__:
                 logger.trace('START DB CONNECTION COMMIT')
             try:
-                self._conn.commit()
+                with METRICS.time('db_commit', self.metrics_label):
+                    self._conn.commit()
             finally:
                 if __debug__:
                     logger.trace('FINISH DB CONNECTION COMMIT')
@@ -262,6 +372,7 @@ class DBConnection:
             if __debug__:
                 logger.trace('START DB CONNECTION ROLLBACK')
             try:
+                self.record_write(None)  # cached results may have seen the rolled back writes
                 self._conn.rollback()
             finally:
                 if __debug__:
@@ -288,6 +399,7 @@ class DBConnection:
         try:
             yield cursor
         except Exception:
+            self.record_write(None)
             self._conn.rollback()
             raise
         else:
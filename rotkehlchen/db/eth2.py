@@ -12,7 +12,7 @@ from rotkehlchen.chain.ethereum.modules.eth2.structures import (
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.timing import DAY_IN_SECONDS
 from rotkehlchen.db.filtering import Eth2DailyStatsFilterQuery
-from rotkehlchen.db.utils import form_query_to_filter_timestamps
+from rotkehlchen.db.utils import fetchone_cached, form_query_to_filter_timestamps
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -167,7 +167,7 @@ class DBEth2():
             '((CAST(start_usd_price AS REAL) + CAST(end_usd_price AS REAL)) / 2)) '
             'from eth2_daily_staking_details ' + query
         )
-        result = cursor.execute(query, bindings).fetchone()
+        result = fetchone_cached(cursor, query, bindings)
 
         try:
             pnl = FVal(result[1])
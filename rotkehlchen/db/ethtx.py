@@ -1,5 +1,5 @@
 import logging
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
 
 from rotkehlchen.chain.ethereum.constants import (
     ETHEREUM_BEGIN,
@@ -13,6 +13,7 @@ from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt, EthereumTxR
 from rotkehlchen.db.constants import HISTORY_MAPPING_DECODED
 from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
 from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.db.utils import fetchone_cached
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import (
@@ -91,6 +92,10 @@ class DBEthTx():
             tuples=tx_tuples,
             relevant_address=relevant_address,
         )
+        self.add_block_timestamps(
+            write_cursor=write_cursor,
+            blocks=[(tx.block_number, tx.timestamp) for tx in ethereum_transactions],
+        )
 
     def add_ethereum_internal_transactions(
             self,
@@ -129,6 +134,49 @@ class DBEthTx():
             tuples=tx_tuples,
             relevant_address=relevant_address,
         )
+        self.add_block_timestamps(
+            write_cursor=write_cursor,
+            blocks=[(tx.block_number, tx.timestamp) for tx in transactions],
+        )
+
+    def add_block_timestamps(  # pylint: disable=no-self-use
+            self,
+            write_cursor: 'DBCursor',
+            blocks: Sequence[Tuple[int, Timestamp]],
+    ) -> None:
+        """Remembers the timestamps of the given block numbers"""
+        write_cursor.executemany(
+            'INSERT OR IGNORE INTO ethereum_block_timestamps(block_number, timestamp) '
+            'VALUES(?, ?)',
+            blocks,
+        )
+
+    def get_blocks_around_timestamp(  # pylint: disable=no-self-use
+            self,
+            cursor: 'DBCursor',
+            timestamp: Timestamp,
+    ) -> Tuple[Optional[Tuple[int, Timestamp]], Optional[Tuple[int, Timestamp]]]:
+        """Returns the closest known (block_number, timestamp) at or before the given
+        timestamp and the closest known after it. Either of them can be None.
+
+        Block timestamps strictly increase with the block number so the closest
+        timestamps are the closest blocks. Both are found with the timestamp index."""
+        cursor.execute(
+            'SELECT block_number, timestamp FROM ethereum_block_timestamps '
+            'WHERE timestamp <= ? ORDER BY timestamp DESC LIMIT 1',
+            (timestamp,),
+        )
+        before = cursor.fetchone()
+        cursor.execute(
+            'SELECT block_number, timestamp FROM ethereum_block_timestamps '
+            'WHERE timestamp > ? ORDER BY timestamp ASC LIMIT 1',
+            (timestamp,),
+        )
+        after = cursor.fetchone()
+        return (
+            (before[0], Timestamp(before[1])) if before is not None else None,
+            (after[0], Timestamp(after[1])) if after is not None else None,
+        )
 
     def get_ethereum_internal_transactions(
             self,
@@ -216,8 +264,7 @@ class DBEthTx():
         txs = self.get_ethereum_transactions(cursor, filter_=filter_, has_premium=has_premium)
         query, bindings = filter_.prepare(with_pagination=False)
         query = 'SELECT COUNT(DISTINCT ethereum_transactions.tx_hash) FROM ethereum_transactions ' + query  # noqa: E501
-        total_found_result = cursor.execute(query, bindings)
-        return txs, total_found_result.fetchone()[0]  # always returns result
+        return txs, fetchone_cached(cursor, query, bindings)[0]  # always returns result
 
     def purge_ethereum_transaction_data(self) -> None:
         """Deletes all ethereum transaction related data from the DB"""
@@ -1,5 +1,5 @@
 import logging
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
 
 from pysqlcipher3 import dbapi2 as sqlcipher
 
@@ -9,13 +9,14 @@ from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.limits import FREE_HISTORY_EVENTS_LIMIT
 from rotkehlchen.db.constants import HISTORY_MAPPING_CUSTOMIZED
 from rotkehlchen.db.filtering import HistoryEventFilterQuery
+from rotkehlchen.db.utils import fetchone_cached
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import deserialize_fval
 from rotkehlchen.types import EVMTxHash, Timestamp, TimestampMS, Tuple
-from rotkehlchen.utils.misc import ts_ms_to_sec
+from rotkehlchen.utils.misc import ts_ms_to_sec, ts_sec_to_ms
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -24,9 +25,22 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# History events read from the DB at a time when streaming them for accounting
+ACCOUNTING_EVENTS_PAGE_SIZE = 5000
+
 HISTORY_INSERT = """INSERT INTO history_events(event_identifier, sequence_index,
 timestamp, location, location_label, asset, amount, usd_value, notes,
 type, subtype, counterparty, extra_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"""
+# Gives added events the next sequence in the change feed. Events already in the feed, as
+# happens for duplicate additions, keep their sequence. A deleted event whose identifier
+# got reused is replaced.
+CHANGES_INSERT = """INSERT OR REPLACE INTO history_events_changes(identifier)
+SELECT identifier FROM history_events WHERE event_identifier=? AND sequence_index=? AND
+identifier NOT IN (SELECT identifier FROM history_events_changes WHERE deleted=0);"""
+# Gives the events matching the condition that follows, which are about to be deleted,
+# the next sequence in the change feed and marks them as deleted
+CHANGES_DELETE = """INSERT OR REPLACE INTO history_events_changes(identifier, deleted)
+SELECT identifier, 1 FROM history_events WHERE """
 
 
 class DBHistoryEvents():
@@ -51,6 +65,10 @@ class DBHistoryEvents():
         """
         write_cursor.execute(HISTORY_INSERT, event.serialize_for_db())
         identifier = write_cursor.lastrowid
+        write_cursor.execute(
+            'INSERT OR REPLACE INTO history_events_changes(identifier) VALUES(?)',
+            (identifier,),
+        )
 
         if mapping_value is not None:
             write_cursor.execute(
@@ -80,6 +98,7 @@ class DBHistoryEvents():
             query=HISTORY_INSERT,
             tuples=events,
         )
+        write_cursor.executemany(CHANGES_INSERT, [x[:2] for x in events])
 
     def edit_history_event(self, event: HistoryBaseEntry) -> Tuple[bool, str]:
         """Edit a history entry to the DB. Returns the edited entry"""
@@ -106,6 +125,11 @@ class DBHistoryEvents():
                 'VALUES(?, ?)',
                 (event.identifier, HISTORY_MAPPING_CUSTOMIZED),
             )
+            # replacing gives the edited event the next sequence
+            cursor.execute(
+                'INSERT OR REPLACE INTO history_events_changes(identifier) VALUES(?)',
+                (event.identifier,),
+            )
 
         return True, ''
 
@@ -130,6 +154,7 @@ class DBHistoryEvents():
                         f'which was the last event of a transaction'
                     )
 
+                cursor.execute(CHANGES_DELETE + 'identifier=?', (identifier,))
                 cursor.execute(
                     'DELETE FROM history_events WHERE identifier=?', (identifier,),
                 )
@@ -146,13 +171,14 @@ class DBHistoryEvents():
         are customized"""
         customized_event_ids = self.get_customized_event_identifiers(write_cursor)
         length = len(customized_event_ids)
-        querystr = 'DELETE FROM history_events WHERE event_identifier=?'
+        condition = 'event_identifier=?'
         if length != 0:
-            querystr += f' AND identifier NOT IN ({", ".join(["?"] * length)})'
+            condition += f' AND identifier NOT IN ({", ".join(["?"] * length)})'
             bindings = [(x, *customized_event_ids) for x in tx_hashes]
         else:
             bindings = [(x,) for x in tx_hashes]
-        write_cursor.executemany(querystr, bindings)
+        write_cursor.executemany(CHANGES_DELETE + condition, bindings)
+        write_cursor.executemany('DELETE FROM history_events WHERE ' + condition, bindings)
 
     def get_customized_event_identifiers(self, cursor: 'DBCursor') -> List[int]:      # pylint: disable=no-self-use  # noqa: E501
         """Returns the identifiers of all the events in the database that have been customized"""
@@ -189,6 +215,96 @@ class DBHistoryEvents():
 
         return output
 
+    def _query_accounting_events_page(      # pylint: disable=no-self-use
+            self,
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+            limit: Optional[int],
+    ) -> List[Tuple]:
+        """Returns the raw DB rows of the history events in the range that accounting
+        processes, ordered by timestamp. Up to limit if given."""
+        filter_query = HistoryEventFilterQuery.make(
+            from_ts=from_ts,
+            to_ts=to_ts,
+            limit=limit,
+            offset=None if limit is None else 0,
+        )
+        query, bindings = filter_query.prepare()
+        with self.db.conn.read_ctx() as cursor:
+            return cursor.execute('SELECT * from history_events ' + query, bindings).fetchall()
+
+    def iterate_accounting_events(
+            self,
+            to_ts: Timestamp,
+            page_size: int = ACCOUNTING_EVENTS_PAGE_SIZE,
+    ) -> Iterator[HistoryBaseEntry]:
+        """Yields all history events up to to_ts in the order accounting processes them.
+        That is by timestamp in seconds and then by sequence index.
+
+        The events are read from the DB one page at a time, each with its own read
+        cursor so that none is kept open while the consumer processes events. Each
+        page is cut at a whole second so that sorting the page sorts the events of
+        each second across the millisecond timestamps. The rows are only deserialized
+        when the consumer gets to them.
+        """
+        from_ts = Timestamp(0)
+        while True:
+            rows = self._query_accounting_events_page(from_ts=from_ts, to_ts=to_ts, limit=page_size)  # noqa: E501
+            if len(rows) < page_size:  # last page
+                next_from_ts = None
+            else:
+                last_second = rows[-1][3] // 1000
+                rows = [x for x in rows if x[3] // 1000 < last_second]
+                if len(rows) == 0:  # all of the page is in a single second. Read all of it
+                    rows = [
+                        x for x in self._query_accounting_events_page(
+                            from_ts=Timestamp(last_second),
+                            to_ts=Timestamp(min(to_ts, last_second + 1)),
+                            limit=None,
+                        ) if x[3] // 1000 == last_second
+                    ]
+                    next_from_ts = Timestamp(last_second + 1)
+                else:
+                    next_from_ts = Timestamp(last_second)
+
+            rows.sort(key=lambda x: (x[3] // 1000, x[2]))
+            for entry in rows:
+                try:
+                    yield HistoryBaseEntry.deserialize_from_db(entry)
+                except (DeserializationError, UnknownAsset) as e:
+                    log.debug(f'Failed to deserialize history event {entry} due to {str(e)}')
+
+            if next_from_ts is None or next_from_ts > to_ts:
+                return
+            from_ts = next_from_ts
+
+    def get_asset_hours(     # pylint: disable=no-self-use
+            self,
+            cursor: 'DBCursor',
+            to_ts: Timestamp,
+    ) -> List[Tuple[Asset, Timestamp]]:
+        """Returns each asset of the history events up to to_ts along with the start
+        of every hour in which it appears. Much fewer than the events themselves."""
+        cursor.execute(
+            'SELECT DISTINCT asset, timestamp / 3600000 FROM history_events WHERE timestamp <= ?',
+            (ts_sec_to_ms(to_ts),),
+        )
+        assets: Dict[str, Optional[Asset]] = {}
+        result = []
+        for asset_identifier, hour in cursor:
+            if asset_identifier not in assets:
+                try:
+                    assets[asset_identifier] = Asset(asset_identifier)
+                except UnknownAsset:
+                    log.debug(f'Skipping history events of unknown asset {asset_identifier}')
+                    assets[asset_identifier] = None
+
+            asset = assets[asset_identifier]
+            if asset is not None:
+                result.append((asset, Timestamp(hour * 3600)))
+
+        return result
+
     def get_history_events_and_limit_info(
             self,
             cursor: 'DBCursor',
@@ -206,8 +322,7 @@ class DBHistoryEvents():
         )
         query, bindings = filter_query.prepare(with_pagination=False)
         query = 'SELECT COUNT(*) from history_events ' + query
-        cursor.execute(query, bindings)
-        return events, cursor.fetchone()[0]  # count always has value
+        return events, fetchone_cached(cursor, query, bindings)[0]  # count always has value
 
     def rows_missing_prices_in_base_entries(
         self,
@@ -272,8 +387,56 @@ class DBHistoryEvents():
         """Returns how many of certain base entry events are in the database"""
         query, bindings = query_filter.prepare(with_pagination=False)
         query = 'SELECT COUNT(*) from history_events ' + query
-        cursor.execute(query, bindings)
-        return cursor.fetchone()[0]  # count(*) always returns
+        return fetchone_cached(cursor, query, bindings)[0]  # count(*) always returns
+
+    def get_last_change_sequence(self, cursor: 'DBCursor') -> int:  # pylint: disable=no-self-use  # noqa: E501
+        """Returns the last sequence given to an added, edited or deleted history event,
+        or 0 if none.
+
+        This includes sequences of events deleted since then, so it never decreases."""
+        cursor.execute(
+            'SELECT seq FROM sqlite_sequence WHERE name=?', ('history_events_changes',),
+        )
+        result = cursor.fetchone()
+        return 0 if result is None else result[0]
+
+    def get_history_events_since(      # pylint: disable=no-self-use
+            self,
+            cursor: 'DBCursor',
+            from_sequence: int,
+            limit: int,
+            has_premium: bool,
+    ) -> List[Tuple[int, int, Optional[HistoryBaseEntry]]]:
+        """Returns up to limit history events added, edited or deleted after the given
+        sequence, in the order of the sequence. Each is a tuple of the sequence, the event
+        identifier and the event, which is None if the event was deleted.
+
+        Without premium only changes of the events that get_history_events returns, plus
+        the deletions, are returned.
+        """
+        if has_premium:
+            events_query = 'history_events'
+            bindings: Tuple[int, ...] = (from_sequence, limit)
+        else:
+            events_query = '(SELECT * from history_events ORDER BY timestamp DESC, sequence_index ASC LIMIT ?)'  # noqa: E501
+            bindings = (FREE_HISTORY_EVENTS_LIMIT, from_sequence, limit)
+        cursor.execute(
+            f'SELECT C.sequence, C.identifier, C.deleted, H.* FROM history_events_changes AS C '
+            f'LEFT JOIN {events_query} AS H ON C.identifier=H.identifier WHERE C.sequence > ? '
+            f'AND (C.deleted=1 OR H.identifier IS NOT NULL) ORDER BY C.sequence ASC LIMIT ?',
+            bindings,
+        )
+        output: List[Tuple[int, int, Optional[HistoryBaseEntry]]] = []
+        for entry in cursor:
+            if entry[2] == 1:
+                output.append((entry[0], entry[1], None))
+                continue
+            try:
+                output.append((entry[0], entry[1], HistoryBaseEntry.deserialize_from_db(entry[3:])))  # noqa: E501
+            except (DeserializationError, UnknownAsset) as e:
+                log.debug(f'Failed to deserialize history event {entry} due to {str(e)}')
+
+        return output
 
     def get_value_stats(      # pylint: disable=no-self-use
             self,
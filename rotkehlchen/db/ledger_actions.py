@@ -6,6 +6,7 @@ from pysqlcipher3 import dbapi2 as sqlcipher
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.constants.limits import FREE_LEDGER_ACTIONS_LIMIT
 from rotkehlchen.db.filtering import LedgerActionsFilterQuery
+from rotkehlchen.db.utils import fetchone_cached
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -38,8 +39,7 @@ class DBLedgerActions():
             actions = self.get_ledger_actions(cursor, filter_query=filter_query, has_premium=has_premium)  # noqa: E501
             query, bindings = filter_query.prepare(with_pagination=False)
             query = 'SELECT COUNT(*) from ledger_actions ' + query
-            total_found_result = cursor.execute(query, bindings)
-            return actions, total_found_result.fetchone()[0]
+            return actions, fetchone_cached(cursor, query, bindings)[0]
 
     def get_ledger_actions(
             self,
@@ -33,6 +33,9 @@ if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
 
+# How many processed events of a report are buffered before being written to the DB
+REPORT_DATA_BATCH_SIZE = 1000
+
 
 @overload
 def _get_reports_or_events_maybe_limit(
@@ -246,33 +249,6 @@ class DBAccountingReports():
                     f'Could not delete PnL report {report_id} from the DB. Report was not found',
                 )
 
-    def add_report_data(
-            self,
-            report_id: int,
-            time: Timestamp,
-            ts_converter: Callable[[Timestamp], str],
-            event: ProcessedAccountingEvent,
-    ) -> None:
-        """Adds a new entry to a transient report for the PnL history in a given time range
-        May raise:
-        - DeserializationError if there is a conflict at serialization of the event
-        - InputError if the event can not be written to the DB. Probably report id does not exist.
-        """
-        data = event.serialize_for_db(ts_converter)
-        query = """
-        INSERT INTO pnl_events(
-            report_id, timestamp, data
-        )
-        VALUES(?, ?, ?);"""
-        with self.db.transient_write() as cursor:
-            try:
-                cursor.execute(query, (report_id, time, data))
-            except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
-                raise InputError(
-                    f'Could not write {event} data to the DB due to {str(e)}. '
-                    f'Probably report {report_id} does not exist?',
-                ) from e
-
     def get_report_data(
             self,
             filter_: ReportDataFilterQuery,
@@ -327,3 +303,59 @@ class DBAccountingReports():
             entries=records,
             with_limit=with_limit,
         )
+
+
+class DBReportDataWriter():
+    """Buffers the processed events of a PnL report and writes them to the DB in
+    batches, each in a single transaction, instead of committing every event."""
+
+    def __init__(
+            self,
+            database: 'DBHandler',
+            report_id: int,
+            batch_size: int = REPORT_DATA_BATCH_SIZE,
+    ) -> None:
+        self.db = database
+        self.report_id = report_id
+        self.batch_size = batch_size
+        self.pending: List[Tuple[int, Timestamp, str]] = []
+
+    def add(
+            self,
+            time: Timestamp,
+            ts_converter: Callable[[Timestamp], str],
+            event: ProcessedAccountingEvent,
+    ) -> None:
+        """Adds a new entry to the report. Writes the pending entries if they reach
+        the batch size.
+
+        May raise:
+        - DeserializationError if there is a conflict at serialization of the event
+        - InputError if the pending entries can not be written to the DB
+        """
+        self.pending.append((self.report_id, time, event.serialize_for_db(ts_converter)))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the pending entries to the DB
+
+        May raise:
+        - InputError if the entries can not be written to the DB. Probably the report
+        id does not exist.
+        """
+        if len(self.pending) == 0:
+            return
+
+        entries, self.pending = self.pending, []
+        with self.db.transient_write() as cursor:
+            try:
+                cursor.executemany(
+                    'INSERT INTO pnl_events(report_id, timestamp, data) VALUES(?, ?, ?)',
+                    entries,
+                )
+            except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
+                raise InputError(
+                    f'Could not write {len(entries)} events to the DB due to {str(e)}. '
+                    f'Probably report {self.report_id} does not exist?',
+                ) from e
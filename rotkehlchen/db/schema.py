@@ -193,6 +193,15 @@ CREATE TABLE IF NOT EXISTS timed_location_data (
 );
 """
 
+DB_CREATE_TIMED_BALANCES_SOURCES = """
+CREATE TABLE IF NOT EXISTS timed_balances_sources (
+    timestamp INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    seconds FLOAT NOT NULL,
+    PRIMARY KEY (timestamp, source)
+);
+"""
+
 DB_CREATE_USER_CREDENTIALS = """
 CREATE TABLE IF NOT EXISTS user_credentials (
     name TEXT NOT NULL,
@@ -313,6 +322,24 @@ CREATE TABLE IF NOT EXISTS xpub_mappings (
 );
 """  # noqa: E501
 
+# Indices from which derivation of new receiving and change addresses of an xpub continues.
+# All addresses below them have been checked and those up to the last used one are tracked.
+DB_CREATE_XPUB_DERIVATION_PROGRESS = """
+CREATE TABLE IF NOT EXISTS xpub_derivation_progress (
+    xpub TEXT NOT NULL,
+    derivation_path TEXT NOT NULL,
+    blockchain TEXT NOT NULL,
+    receiving_index INTEGER NOT NULL,
+    change_index INTEGER NOT NULL,
+    FOREIGN KEY(xpub, derivation_path, blockchain) REFERENCES xpubs(
+        xpub,
+        derivation_path,
+        blockchain
+    ) ON DELETE CASCADE
+    PRIMARY KEY (xpub, derivation_path, blockchain)
+);
+"""
+
 DB_CREATE_ETHEREUM_ACCOUNTS_DETAILS = """
 CREATE TABLE IF NOT EXISTS ethereum_accounts_details (
     account VARCHAR[42] NOT NULL PRIMARY KEY,
@@ -630,6 +657,11 @@ CREATE TABLE IF NOT EXISTS history_events (
 );
 """
 
+# Accounting reads the history events ordered by timestamp one page at a time
+DB_CREATE_HISTORY_EVENTS_TIMESTAMP_INDEX = """
+CREATE INDEX IF NOT EXISTS history_events_timestamp ON history_events(timestamp, sequence_index);
+"""
+
 DB_CREATE_HISTORY_EVENTS_MAPPINGS = """
 CREATE TABLE IF NOT EXISTS history_events_mappings (
     parent_identifier INTEGER NOT NULL,
@@ -639,6 +671,18 @@ CREATE TABLE IF NOT EXISTS history_events_mappings (
 );
 """  # noqa: E501
 
+# Change feed of history_events. Each added, edited or deleted event gets the next sequence
+# number so that clients can fetch only the events changed after the last sequence they saw.
+# Deleted events stay in the feed marked as deleted, so there is no foreign key to the events.
+# AUTOINCREMENT makes sure that sequences of replaced rows are never reused.
+DB_CREATE_HISTORY_EVENTS_CHANGES = """
+CREATE TABLE IF NOT EXISTS history_events_changes (
+    sequence INTEGER PRIMARY KEY AUTOINCREMENT,
+    identifier INTEGER NOT NULL UNIQUE,
+    deleted INTEGER NOT NULL DEFAULT 0 CHECK (deleted IN (0, 1))
+);
+"""
+
 DB_CREATE_ADEX_EVENTS = """
 CREATE TABLE IF NOT EXISTS adex_events (
     tx_hash BLOB NOT NULL,
@@ -838,6 +882,32 @@ CREATE TABLE IF NOT EXISTS user_notes(
 );
 """
 
+# Known block number to timestamp pairs. Populated from all transactions and blocks we see
+# and used to find the block of a timestamp without querying the network.
+DB_CREATE_ETHEREUM_BLOCK_TIMESTAMPS = """
+CREATE TABLE IF NOT EXISTS ethereum_block_timestamps (
+    block_number INTEGER NOT NULL PRIMARY KEY,
+    timestamp INTEGER NOT NULL
+);
+"""
+
+# Finding the blocks around a timestamp searches by timestamp
+DB_CREATE_ETHEREUM_BLOCK_TIMESTAMPS_INDEX = """
+CREATE INDEX IF NOT EXISTS ethereum_block_timestamps_timestamp
+ON ethereum_block_timestamps(timestamp);
+"""
+
+# Rows of a csv file committed by an import that did not finish. Keyed by the sha256 of
+# the file so that importing the same file again continues after them.
+DB_CREATE_CSV_IMPORT_CHECKPOINTS = """
+CREATE TABLE IF NOT EXISTS csv_import_checkpoints (
+    file_hash TEXT NOT NULL,
+    importer TEXT NOT NULL,
+    imported_rows INTEGER NOT NULL,
+    PRIMARY KEY (file_hash, importer)
+);
+"""
+
 DB_SCRIPT_CREATE_TABLES = f"""
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
@@ -848,6 +918,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_ASSETS}
 {DB_CREATE_TIMED_BALANCES}
 {DB_CREATE_TIMED_LOCATION_DATA}
+{DB_CREATE_TIMED_BALANCES_SOURCES}
 {DB_CREATE_USER_CREDENTIALS}
 {DB_CREATE_USER_CREDENTIALS_MAPPINGS}
 {DB_CREATE_EXTERNAL_SERVICE_CREDENTIALS}
@@ -873,13 +944,16 @@ BEGIN TRANSACTION;
 {DB_CREATE_YEARN_VAULT_EVENTS}
 {DB_CREATE_XPUBS}
 {DB_CREATE_XPUB_MAPPINGS}
+{DB_CREATE_XPUB_DERIVATION_PROGRESS}
 {DB_CREATE_AMM_SWAPS}
 {DB_CREATE_AMM_EVENTS}
 {DB_CREATE_ETH2_VALIDATORS}
 {DB_CREATE_ETH2_DEPOSITS}
 {DB_CREATE_ETH2_DAILY_STAKING_DETAILS}
 {DB_CREATE_HISTORY_EVENTS}
+{DB_CREATE_HISTORY_EVENTS_TIMESTAMP_INDEX}
 {DB_CREATE_HISTORY_EVENTS_MAPPINGS}
+{DB_CREATE_HISTORY_EVENTS_CHANGES}
 {DB_CREATE_ADEX_EVENTS}
 {DB_CREATE_LEDGER_ACTION_TYPE}
 {DB_CREATE_LEDGER_ACTIONS}
@@ -892,6 +966,9 @@ BEGIN TRANSACTION;
 {DB_CREATE_ADDRESS_BOOK}
 {DB_CREATE_WEB3_NODES}
 {DB_CREATE_USER_NOTES}
+{DB_CREATE_ETHEREUM_BLOCK_TIMESTAMPS}
+{DB_CREATE_ETHEREUM_BLOCK_TIMESTAMPS_INDEX}
+{DB_CREATE_CSV_IMPORT_CHECKPOINTS}
 COMMIT;
 PRAGMA foreign_keys=on;
 """
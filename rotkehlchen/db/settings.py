@@ -85,6 +85,7 @@ INTEGER_KEYS = (
 STRING_KEYS = (
     'ksm_rpc_endpoint',
     'dot_rpc_endpoint',
+    'beacon_rpc_endpoint',
     'date_display_format',
     'frontend_settings',
 )
@@ -104,6 +105,7 @@ class DBSettings(NamedTuple):
     include_gas_costs: bool = DEFAULT_INCLUDE_GAS_COSTS
     ksm_rpc_endpoint: str = 'http://localhost:9933'
     dot_rpc_endpoint: str = ''  # same as kusama -- must be set by user
+    beacon_rpc_endpoint: str = ''  # REST API of an own beacon node. Optional
     main_currency: Asset = DEFAULT_MAIN_CURRENCY
     date_display_format: str = DEFAULT_DATE_DISPLAY_FORMAT
     last_balance_save: Timestamp = Timestamp(0)
@@ -149,6 +151,7 @@ class ModifiableDBSettings(NamedTuple):
     include_gas_costs: Optional[bool] = None
     ksm_rpc_endpoint: Optional[str] = None
     dot_rpc_endpoint: Optional[str] = None
+    beacon_rpc_endpoint: Optional[str] = None
     main_currency: Optional[Asset] = None
     date_display_format: Optional[str] = None
     submit_usage_analytics: Optional[bool] = None
@@ -257,6 +257,7 @@ class DBSnapshot:
         write_cursor.execute('DELETE FROM timed_location_data WHERE timestamp=?', (timestamp,))
         if write_cursor.rowcount == 0:
             raise InputError('No snapshot found for the specified timestamp')
+        write_cursor.execute('DELETE FROM timed_balances_sources WHERE timestamp=?', (timestamp,))
 
     def add_nft_asset_ids(self, write_cursor: 'DBCursor', entries: List[str]) -> None:
         """Add NFT identifiers to the DB to prevent unknown asset error."""
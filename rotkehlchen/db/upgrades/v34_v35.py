@@ -35,6 +35,70 @@ def _create_new_tables(cursor: 'DBCursor') -> None:
         is_pinned INTEGER NOT NULL CHECK (is_pinned IN (0, 1))
     );
     """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS ethereum_block_timestamps (
+        block_number INTEGER NOT NULL PRIMARY KEY,
+        timestamp INTEGER NOT NULL
+    );
+    """)
+    # seed it with what we already know from the saved transactions
+    cursor.execute(
+        'INSERT OR IGNORE INTO ethereum_block_timestamps(block_number, timestamp) '
+        'SELECT DISTINCT block_number, timestamp FROM ethereum_transactions UNION '
+        'SELECT DISTINCT block_number, timestamp FROM ethereum_internal_transactions',
+    )
+    # not seeded. The first derivation of each xpub rechecks from its last consecutive index
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS xpub_derivation_progress (
+        xpub TEXT NOT NULL,
+        derivation_path TEXT NOT NULL,
+        blockchain TEXT NOT NULL,
+        receiving_index INTEGER NOT NULL,
+        change_index INTEGER NOT NULL,
+        FOREIGN KEY(xpub, derivation_path, blockchain) REFERENCES xpubs(
+            xpub,
+            derivation_path,
+            blockchain
+        ) ON DELETE CASCADE
+        PRIMARY KEY (xpub, derivation_path, blockchain)
+    );
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS csv_import_checkpoints (
+        file_hash TEXT NOT NULL,
+        importer TEXT NOT NULL,
+        imported_rows INTEGER NOT NULL,
+        PRIMARY KEY (file_hash, importer)
+    );
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS history_events_changes (
+        sequence INTEGER PRIMARY KEY AUTOINCREMENT,
+        identifier INTEGER NOT NULL UNIQUE,
+        deleted INTEGER NOT NULL DEFAULT 0 CHECK (deleted IN (0, 1))
+    );
+    """)
+    # existing events get sequences in the order they were added
+    cursor.execute(
+        'INSERT INTO history_events_changes(identifier) '
+        'SELECT identifier FROM history_events ORDER BY identifier',
+    )
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS timed_balances_sources (
+        timestamp INTEGER NOT NULL,
+        source TEXT NOT NULL,
+        seconds FLOAT NOT NULL,
+        PRIMARY KEY (timestamp, source)
+    );
+    """)
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS history_events_timestamp '
+        'ON history_events(timestamp, sequence_index);',
+    )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS ethereum_block_timestamps_timestamp '
+        'ON ethereum_block_timestamps(timestamp);',
+    )
 
 
 def _rename_assets_identifiers(cursor: 'DBCursor') -> None:
@@ -54,6 +118,13 @@ def upgrade_v34_to_v35(db: 'DBHandler') -> None:
     """Upgrades the DB from v34 to v35
     - Change tables where time is used as column name to timestamp
     - Add user_notes table
+    - Add ethereum_block_timestamps table
+    - Add xpub_derivation_progress table
+    - Add csv_import_checkpoints table
+    - Add history_events_changes table
+    - Add timed_balances_sources table
+    - Add an index on the timestamp of history events
+    - Add an index on the timestamp of ethereum block timestamps
     - Renames the asset identifiers to use CAIPS
     """
     with db.user_write() as cursor:
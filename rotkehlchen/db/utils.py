@@ -1,5 +1,6 @@
+import re
 from dataclasses import dataclass
-from functools import wraps
+from functools import lru_cache, wraps
 from operator import attrgetter
 from typing import (
     TYPE_CHECKING,
@@ -11,6 +12,7 @@ from typing import (
     NamedTuple,
     Optional,
     Protocol,
+    Sequence,
     Tuple,
     TypeVar,
     Union,
@@ -24,7 +26,7 @@ from rotkehlchen.accounting.structures.balance import BalanceType
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.chain.substrate.types import KusamaAddress, PolkadotAddress
 from rotkehlchen.chain.substrate.utils import is_valid_kusama_address, is_valid_polkadot_address
-from rotkehlchen.db.drivers.gevent import DBCursor
+from rotkehlchen.db.drivers.gevent import AGGREGATES_CACHE_SIZE, DBCursor
 from rotkehlchen.fval import FVal
 from rotkehlchen.types import (
     BlockchainAccountData,
@@ -47,6 +49,11 @@ if TYPE_CHECKING:
 P = ParamSpec('P')
 T = TypeVar('T', covariant=True)
 
+# Captures the tables and views a query reads from
+QUERY_TABLES_RE = re.compile(r'\b(?:FROM|JOIN)\s+["`\[]?(\w+)', re.IGNORECASE)
+# The tables each view reads from, since writes are tracked per table
+VIEW_TABLES = {'combined_trades_view': ('trades', 'amm_swaps')}
+
 
 class MaybeInjectWriteCursor(Protocol[P, T]):
     @overload
@@ -247,6 +254,38 @@ class Tag(NamedTuple):
         return self._asdict()  # pylint: disable=no-member
 
 
+@lru_cache(maxsize=AGGREGATES_CACHE_SIZE)
+def _query_tables(query: str) -> Tuple[str, ...]:
+    tables = set()
+    for table in QUERY_TABLES_RE.findall(query):
+        table = table.lower()
+        tables.update(VIEW_TABLES.get(table, (table,)))
+    return tuple(sorted(tables))
+
+
+def fetchone_cached(cursor: DBCursor, query: str, bindings: Sequence[Any] = ()) -> Any:
+    """Executes an aggregate query, like a COUNT(*), and returns its result row.
+
+    The row is cached per connection until any of the tables the query reads from is
+    written, so repeating the query with the same filter, like when paging, does not
+    scan the tables again.
+    """
+    connection = cursor.connection
+    key = (query, tuple(bindings))
+    generations = connection.write_generations(_query_tables(query))
+    cached = connection.aggregates_cache.get(key)
+    if cached is not None and cached[0] == generations:
+        connection.aggregates_cache.move_to_end(key)
+        return cached[1]
+
+    result = cursor.execute(query, bindings).fetchone()
+    connection.aggregates_cache[key] = (generations, result)
+    connection.aggregates_cache.move_to_end(key)
+    if len(connection.aggregates_cache) > AGGREGATES_CACHE_SIZE:
+        connection.aggregates_cache.popitem(last=False)
+    return result
+
+
 def str_to_bool(s: str) -> bool:
     return s == 'True'
 
@@ -51,3 +51,7 @@ class BlockchainQueryError(Exception):
 
     For example a VM Execution error in ethereum contract calls
     """
+
+
+class WorkerProcessError(Exception):
+    """Raised when a job can't be run in a worker process or the worker dies while running it"""
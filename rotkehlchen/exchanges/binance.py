@@ -31,6 +31,7 @@ from rotkehlchen.db.constants import BINANCE_MARKETS_KEY
 from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset
 from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.exchanges.constants import BINANCE_BASE_URL, BINANCEUS_BASE_URL
 from rotkehlchen.exchanges.data_structures import (
     AssetMovement,
     BinancePair,
@@ -91,9 +92,6 @@ REJECTED_MBX_KEY = -2015
 
 BINANCE_API_TYPE = Literal['api', 'sapi', 'dapi', 'fapi']
 
-BINANCE_BASE_URL = 'binance.com/'
-BINANCEUS_BASE_URL = 'binance.us/'
-
 
 class BinancePermissionError(RemoteError):
     """Exception raised when a binance permission problem is detected
@@ -808,8 +806,8 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
 
         return balances
 
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         try:
             self.first_connection()
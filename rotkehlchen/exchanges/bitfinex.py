@@ -859,8 +859,8 @@ class Bitfinex(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         self.pair_bfx_symbols_map = pair_bfx_symbols_map
         self.first_connection_made = True
 
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         """Return the account exchange balances on Bitfinex
 
@@ -234,8 +234,8 @@ class Bitmex(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         assert isinstance(result, List)  # pylint: disable=isinstance-second-argument-not-valid-type  # noqa: E501
         return result
 
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         returned_balances: Dict[Asset, Balance] = {}
         try:
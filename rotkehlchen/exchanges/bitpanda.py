@@ -470,8 +470,8 @@ class Bitpanda(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         return result  # type: ignore
 
     # ---- General exchanges interface ----
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         try:
             wallets, _, _ = self._api_query('wallets')
@@ -152,8 +152,8 @@ class Bitstamp(ExchangeInterface):  # lgtm[py/missing-call-to-init]
             self.session.headers.update({'X-Auth': f'BITSTAMP {api_key}'})
         return changed
 
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         """Return the account balances on Bistamp
 
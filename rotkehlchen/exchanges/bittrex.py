@@ -296,8 +296,8 @@ class Bittrex(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         result = self.api_query('currencies')
         return result
 
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         try:
             resp = self.api_query('balances')
@@ -416,8 +416,8 @@ class Coinbase(ExchangeInterface):  # lgtm[py/missing-call-to-init]
 
         return all_items
 
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         try:
             resp = self._api_query('accounts')
@@ -0,0 +1,24 @@
+"""Lightweight exchange constants and types
+
+These live outside of the exchange modules themselves so that the rest of the
+backend can use them without importing every exchange implementation (and its
+dependencies) at startup. Exchange modules are imported on demand by the
+ExchangeManager when an exchange is set up.
+"""
+from rotkehlchen.utils.mixins.serializableenum import SerializableEnumMixin
+
+BINANCE_BASE_URL = 'binance.com/'
+BINANCEUS_BASE_URL = 'binance.us/'
+
+FTX_SUBACCOUNT_DB_SETTING = 'ftx_subaccount'
+FTX_BASE_URL = 'https://ftx.com'
+FTXUS_BASE_URL = 'https://ftx.us'
+
+
+class KrakenAccountType(SerializableEnumMixin):
+    STARTER = 0
+    INTERMEDIATE = 1
+    PRO = 2
+
+
+DEFAULT_KRAKEN_ACCOUNT_TYPE = KrakenAccountType.STARTER
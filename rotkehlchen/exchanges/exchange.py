@@ -25,6 +25,7 @@ from rotkehlchen.types import (
     T_ApiSecret,
     Timestamp,
 )
+from rotkehlchen.utils.metrics import instrument_session
 from rotkehlchen.utils.mixins.cacheable import CacheableMixIn
 from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
 
@@ -68,6 +69,7 @@ class ExchangeInterface(CacheableMixIn, LockableQueryMixIn):
         self.secret = secret
         self.first_connection_made = False
         self.session = requests.session()
+        instrument_session(self.session, 'exchange_request', str(location))
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         log.info(f'Initialized {str(location)} exchange {name}')
 
@@ -30,6 +30,7 @@ from rotkehlchen.constants.timing import DEFAULT_TIMEOUT_TUPLE
 from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.exchanges.constants import FTX_BASE_URL, FTXUS_BASE_URL
 from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
 from rotkehlchen.exchanges.exchange import ExchangeInterface, ExchangeQueryBalances
 from rotkehlchen.history.deserialization import deserialize_price
@@ -64,10 +65,6 @@ INITIAL_BACKOFF_TIME = 2
 BACKOFF_LIMIT = 60
 PAGINATION_LIMIT = 100
 
-FTX_SUBACCOUNT_DB_SETTING = 'ftx_subaccount'
-FTX_BASE_URL = 'https://ftx.com'
-FTXUS_BASE_URL = 'https://ftx.us'
-
 
 def trade_from_ftx(raw_trade: Dict[str, Any]) -> Optional[Trade]:
     """Turns an FTX transaction into a rotki Trade.
@@ -377,8 +374,8 @@ class Ftx(ExchangeInterface):  # lgtm[py/missing-call-to-init]
 
         return final_data
 
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         resp_dict, resp_lst = None, None
         try:
@@ -311,8 +311,8 @@ class Gemini(ExchangeInterface):  # lgtm[py/missing-call-to-init]
 
         return json_ret
 
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         try:
             balances = self._private_api_query('balances')
@@ -9,7 +9,7 @@ import logging
 import operator
 import time
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Callable, DefaultDict, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlencode
 
 import gevent
@@ -36,8 +36,10 @@ from rotkehlchen.db.ranges import DBQueryRanges
 from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair
 from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.exchanges.constants import DEFAULT_KRAKEN_ACCOUNT_TYPE, KrakenAccountType
 from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
 from rotkehlchen.exchanges.exchange import ExchangeInterface, ExchangeQueryBalances
+from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import (
@@ -57,10 +59,9 @@ from rotkehlchen.types import (
     TradeType,
 )
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import pairwise, ts_ms_to_sec, ts_now
+from rotkehlchen.utils.misc import pairwise, ts_ms_to_sec
 from rotkehlchen.utils.mixins.cacheable import cache_response_timewise
 from rotkehlchen.utils.mixins.lockable import protect_with_lock
-from rotkehlchen.utils.mixins.serializableenum import SerializableEnumMixin
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 if TYPE_CHECKING:
@@ -75,7 +76,13 @@ KRAKEN_DELISTED = ('XDAO', 'XXVN', 'ZKRW', 'XNMC', 'BSV', 'XICN')
 KRAKEN_PUBLIC_METHODS = ('AssetPairs', 'Assets')
 KRAKEN_QUERY_TRIES = 8
 KRAKEN_BACKOFF_DIVIDEND = 15
-MAX_CALL_COUNTER_INCREASE = 2  # Trades and Ledger produce the max increase
+# How much each call increases the call counter. Trades and Ledger produce the max increase
+# https://docs.kraken.com/rest/#section/Rate-Limits/REST-API-Rate-Limits
+KRAKEN_EXPENSIVE_METHODS = ('Ledgers', 'TradesHistory')
+MAX_CALL_COUNTER_INCREASE = 2
+# The entries of a ledger refid group are milliseconds apart. A group with entries within
+# this many seconds of the oldest entry of a page may continue in the next page.
+KRAKEN_LEDGER_GROUP_SPREAD_SECS = 1
 
 
 def kraken_ledger_entry_type_to_ours(value: str) -> HistoryEventType:
@@ -303,15 +310,6 @@ def _check_and_get_response(response: Response, method: str) -> Union[str, Dict]
     return result
 
 
-class KrakenAccountType(SerializableEnumMixin):
-    STARTER = 0
-    INTERMEDIATE = 1
-    PRO = 2
-
-
-DEFAULT_KRAKEN_ACCOUNT_TYPE = KrakenAccountType.STARTER
-
-
 class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
     def __init__(
             self,
@@ -332,8 +330,8 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         self.msg_aggregator = msg_aggregator
         self.session.headers.update({'API-Key': self.api_key})
         self.set_account_type(kraken_account_type)
-        self.call_counter = 0
-        self.last_query_ts = 0
+        self.call_counter = 0.0
+        self.last_counter_update = time.monotonic()
         self.history_events_db = DBHistoryEvents(self.db)
 
     def set_account_type(self, account_type: Optional[KrakenAccountType]) -> None:
@@ -445,10 +443,20 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
     def first_connection(self) -> None:
         self.first_connection_made = True
 
+    def _decay_call_counter(self) -> None:
+        """Reduces the call counter by how much kraken has reduced it since the last update.
+        Kraken reduces it by one every reduction_every_secs continuously."""
+        now = time.monotonic()
+        self.call_counter = max(
+            0.0,
+            self.call_counter - (now - self.last_counter_update) / self.reduction_every_secs,
+        )
+        self.last_counter_update = now
+
     def _manage_call_counter(self, method: str) -> None:
-        self.last_query_ts = ts_now()
-        if method in ('Ledgers', 'TradesHistory'):
-            self.call_counter += 2
+        self._decay_call_counter()
+        if method in KRAKEN_EXPENSIVE_METHODS:
+            self.call_counter += MAX_CALL_COUNTER_INCREASE
         else:
             self.call_counter += 1
 
@@ -475,26 +483,20 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         query_method = (
             self._query_public if method in KRAKEN_PUBLIC_METHODS else self._query_private
         )
+        call_increase = MAX_CALL_COUNTER_INCREASE if method in KRAKEN_EXPENSIVE_METHODS else 1
         while tries > 0:
-            if self.call_counter + MAX_CALL_COUNTER_INCREASE > self.call_limit:
-                # If we are close to the limit, check how much our call counter reduced
-                # https://www.kraken.com/features/api#api-call-rate-limit
-                secs_since_last_call = ts_now() - self.last_query_ts
-                self.call_counter = max(
-                    0,
-                    self.call_counter - int(secs_since_last_call / self.reduction_every_secs),
+            self._decay_call_counter()
+            excess = self.call_counter + call_increase - self.call_limit
+            if excess > 0:
+                # Wait exactly until kraken has reduced the counter enough for this call
+                backoff_in_seconds = excess * self.reduction_every_secs
+                log.debug(
+                    f'Doing a Kraken API call would now exceed our call counter limit. '
+                    f'Backing off for {backoff_in_seconds:.2f} seconds',
+                    call_counter=self.call_counter,
                 )
-                # If still at limit, sleep for an amount big enough for smallest tier reduction
-                if self.call_counter + MAX_CALL_COUNTER_INCREASE > self.call_limit:
-                    backoff_in_seconds = self.reduction_every_secs * 2
-                    log.debug(
-                        f'Doing a Kraken API call would now exceed our call counter limit. '
-                        f'Backing off for {backoff_in_seconds} seconds',
-                        call_counter=self.call_counter,
-                    )
-                    tries -= 1
-                    gevent.sleep(backoff_in_seconds)
-                    continue
+                gevent.sleep(backoff_in_seconds)
+                self._decay_call_counter()
 
             log.debug(
                 'Kraken API query',
@@ -559,8 +561,8 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         return _check_and_get_response(response, method)
 
     # ---- General exchanges interface ----
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         try:
             kraken_balances = self.api_query('Balance', req={})
@@ -635,12 +637,18 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
             start_ts: Timestamp,
             end_ts: Timestamp,
             extra_dict: Optional[dict] = None,
+            page_callback: Optional[Callable[[List], None]] = None,
     ) -> Tuple[List, bool]:
         """ Abstracting away the functionality of querying a kraken endpoint where
         you need to check the 'count' of the returned results and provide sufficient
         calls with enough offset to gather all the data of your query.
+
+        If a page_callback is given each page of results is given to it as soon as it is
+        received instead of being gathered in the returned list.
         """
         result: List = []
+        if page_callback is None:
+            page_callback = result.extend
 
         with_errors = False
         log.debug(
@@ -655,7 +663,7 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         )
         count = response['count']
         offset = len(response[keyname])
-        result.extend(response[keyname].values())
+        page_callback(list(response[keyname].values()))
 
         log.debug(f'Kraken {endpoint} Query Response with count:{count}')
 
@@ -705,7 +713,7 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
                 with_errors = True
                 break
 
-            result.extend(response[keyname].values())
+            page_callback(list(response[keyname].values()))
 
         return result, with_errors
 
@@ -1098,6 +1106,107 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
 
         return trades, Timestamp(max_ts)
 
+    def _history_events_from_ledger_groups(
+            self,
+            groups: List[List[Dict[str, Any]]],
+    ) -> List[HistoryBaseEntry]:
+        """Turns groups of raw ledger entries with the same refid to history events"""
+        new_events = []
+        for events in groups:
+            try:
+                events = sorted(
+                    events,
+                    key=lambda x: deserialize_fval(x['time'], 'time', 'kraken ledgers') * 1000,
+                )
+            except DeserializationError as e:
+                self.msg_aggregator.add_error(
+                    f'Failed to read timestamp in kraken event group '
+                    f'due to {str(e)}. For more information read the logs. Skipping event',
+                )
+                log.error(f'Failed to read timestamp for {events}')
+                continue
+            group_events, found_unknown_event = history_event_from_kraken(
+                events=events,
+                name=self.name,
+                msg_aggregator=self.msg_aggregator,
+            )
+            if found_unknown_event:
+                for event in group_events:
+                    event.event_type = HistoryEventType.INFORMATIONAL
+            new_events.extend(group_events)
+
+        return new_events
+
+    def _save_ledger_events(
+            self,
+            new_events: List[HistoryBaseEntry],
+            ledger_cursor: Optional[Tuple[Timestamp, Timestamp]],
+    ) -> None:
+        """Saves the history events of the ledger and the given cursor in the DB"""
+        with self.db.user_write() as write_cursor:
+            if len(new_events) != 0:
+                try:
+                    self.history_events_db.add_history_events(write_cursor=write_cursor, history=new_events)  # noqa: E501
+                except InputError as e:
+                    self.msg_aggregator.add_error(
+                        f'Failed to save kraken events in database. {str(e)}',
+                    )
+            if ledger_cursor is not None:
+                self.db.update_used_query_range(
+                    write_cursor=write_cursor,
+                    name=f'{self.location}_ledger_cursor_{self.name}',
+                    start_ts=ledger_cursor[0],
+                    end_ts=ledger_cursor[1],
+                )
+
+    def _process_ledger_page(
+            self,
+            entries: List[Dict[str, Any]],
+            pending_groups: DefaultDict[str, List[Dict[str, Any]]],
+            ledger_cursor_end: Optional[Timestamp],
+    ) -> None:
+        """Processes a page of ledger entries and saves the events of the refid groups that
+        are complete. Groups with entries close to the oldest time of the page may continue
+        in the next page so they are kept pending.
+
+        If a ledger_cursor_end is given, the cursor is saved from the timestamp after which
+        all entries are saved up to that end.
+        """
+        def entry_time(entry: Dict[str, Any]) -> Optional[FVal]:
+            try:
+                return deserialize_fval(entry['time'], 'time', 'kraken ledgers')
+            except DeserializationError:
+                return None  # reported when the group is processed
+
+        oldest_time = None
+        for raw_event in entries:
+            pending_groups[raw_event['refid']].append(raw_event)
+            event_time = entry_time(raw_event)
+            if event_time is not None and (oldest_time is None or event_time < oldest_time):
+                oldest_time = event_time
+
+        if oldest_time is None:
+            return
+
+        complete_refids = []
+        latest_pending_time = oldest_time
+        complete_after = oldest_time + KRAKEN_LEDGER_GROUP_SPREAD_SECS
+        for refid, group in pending_groups.items():
+            times = [entry_time(x) for x in group]
+            if all(x is None or x > complete_after for x in times):
+                complete_refids.append(refid)
+            else:
+                latest_pending_time = max(latest_pending_time, *(x for x in times if x is not None))  # noqa: E501
+
+        new_events = self._history_events_from_ledger_groups(
+            [pending_groups.pop(x) for x in complete_refids],
+        )
+        ledger_cursor = None
+        if ledger_cursor_end is not None:
+            # all entries after the latest pending one have been saved
+            ledger_cursor = (Timestamp(latest_pending_time.to_int(exact=False) + 1), ledger_cursor_end)  # noqa: E501
+        self._save_ledger_events(new_events=new_events, ledger_cursor=ledger_cursor)
+
     @protect_with_lock()
     def query_kraken_ledgers(
             self,
@@ -1111,80 +1220,92 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         range (start_ts, end_ts) to avoid double quering the kraken API when this method is called
         for deposits/withdrawals and trades. The events queried are then stored in the database.
 
+        Kraken returns the ledger newest first. Each page is processed and saved as soon as
+        it is received, except for the refid groups with entries close to the oldest entry
+        of the page, which may continue in the next page. The part of a range saved so far is kept
+        in a ledger cursor, so that if the query of the range is interrupted the next call
+        only queries what is missing.
+
         Returns true if any query to the kraken API was not successful
         """
         ranges = DBQueryRanges(self.db)
         range_query_name = f'{self.location}_history_events_{self.name}'
+        cursor_name = f'{self.location}_ledger_cursor_{self.name}'
         ranges_to_query = ranges.get_location_query_ranges(
             cursor=cursor,
             location_string=range_query_name,
             start_ts=start_ts,
             end_ts=end_ts,
         )
-        with_errors = False
+        saved_cursor = self.db.get_used_query_range(cursor, cursor_name)
         for query_start_ts, query_end_ts in ranges_to_query:
-            log.debug(f'Querying kraken ledger entries from {query_start_ts} to {query_end_ts}')
-            try:
-                response, with_errors = self.query_until_finished(
-                    endpoint='Ledgers',
-                    keyname='ledger',
-                    start_ts=query_start_ts,
-                    end_ts=query_end_ts,
-                    extra_dict={},
-                )
-            except RemoteError as e:
-                self.msg_aggregator.add_error(
-                    f'Failed to query kraken ledger between {query_start_ts} and '
-                    f'{query_end_ts}. {str(e)}',
+            # Start of the saved part of the range that reaches up to its end
+            covered_from: Optional[Timestamp] = None
+            parts = [(query_start_ts, query_end_ts)]
+            resumed_cursor: Optional[Tuple[Timestamp, Timestamp]] = None
+            if saved_cursor is not None and query_start_ts < saved_cursor[0] <= saved_cursor[1] <= query_end_ts:  # noqa: E501
+                # An earlier query of this range was interrupted. Skip what it saved
+                resumed_cursor = saved_cursor
+                parts = [(query_start_ts, Timestamp(saved_cursor[0] - 1))]
+                if saved_cursor[1] == query_end_ts:
+                    covered_from = saved_cursor[0]
+                else:
+                    parts.insert(0, (Timestamp(saved_cursor[1] + 1), query_end_ts))
+
+            for part_start_ts, part_end_ts in parts:
+                # The saved part of the range grows down from the end of the part as pages
+                # come. It can be kept in the cursor only if it is connected to the range end
+                # and would not overwrite the cursor being resumed.
+                track_cursor = (
+                    covered_from == part_end_ts + 1 or
+                    (covered_from is None and resumed_cursor is None)
                 )
-                return True
-
-            # Group related events
-            raw_events_groupped = defaultdict(list)
-            for raw_event in response:
-                raw_events_groupped[raw_event['refid']].append(raw_event)
+                pending_groups: DefaultDict[str, List[Dict[str, Any]]] = defaultdict(list)
 
-            new_events = []
-            for events in raw_events_groupped.values():
+                log.debug(f'Querying kraken ledger entries from {part_start_ts} to {part_end_ts}')  # noqa: E501
                 try:
-                    events = sorted(
-                        events,
-                        key=lambda x: deserialize_fval(x['time'], 'time', 'kraken ledgers') * 1000,
+                    _, with_errors = self.query_until_finished(
+                        endpoint='Ledgers',
+                        keyname='ledger',
+                        start_ts=part_start_ts,
+                        end_ts=part_end_ts,
+                        extra_dict={},
+                        page_callback=lambda entries: self._process_ledger_page(  # pylint: disable=cell-var-from-loop  # noqa: E501
+                            entries=entries,
+                            pending_groups=pending_groups,
+                            ledger_cursor_end=query_end_ts if track_cursor else None,
+                        ),
                     )
-                except DeserializationError as e:
+                except RemoteError as e:
                     self.msg_aggregator.add_error(
-                        f'Failed to read timestamp in kraken event group '
-                        f'due to {str(e)}. For more information read the logs. Skipping event',
+                        f'Failed to query kraken ledger between {part_start_ts} and '
+                        f'{part_end_ts}. {str(e)}',
                     )
-                    log.error(f'Failed to read timestamp for {events}')
-                    continue
-                group_events, found_unknown_event = history_event_from_kraken(
-                    events=events,
-                    name=self.name,
-                    msg_aggregator=self.msg_aggregator,
+                    return True
+
+                if with_errors is True:
+                    # we had errors so stop any further queries and quit. What was saved
+                    # so far is in the DB and the cursor and the rest is queried next time
+                    return True
+
+                # the part is complete so the entries of its oldest timestamp are too
+                new_events = self._history_events_from_ledger_groups(list(pending_groups.values()))  # noqa: E501
+                if covered_from is None or covered_from == part_end_ts + 1:
+                    covered_from = part_start_ts
+                if resumed_cursor is not None and covered_from == resumed_cursor[1] + 1:
+                    covered_from = resumed_cursor[0]
+                self._save_ledger_events(
+                    new_events=new_events,
+                    ledger_cursor=(covered_from, query_end_ts),
                 )
-                if found_unknown_event:
-                    for event in group_events:
-                        event.event_type = HistoryEventType.INFORMATIONAL
-                new_events.extend(group_events)
-
-            if len(new_events) != 0:
-                with self.db.user_write() as write_cursor:
-                    try:
-                        self.history_events_db.add_history_events(write_cursor=write_cursor, history=new_events)  # noqa: E501
-                    except InputError as e:
-                        self.msg_aggregator.add_error(
-                            f'Failed to save kraken events from {query_start_ts} '
-                            f'to {query_end_ts} in database. {str(e)}',
-                        )
-
-                    ranges.update_used_query_range(
-                        write_cursor=write_cursor,
-                        location_string=range_query_name,
-                        queried_ranges=[(start_ts, end_ts)] + ranges_to_query,
-                    )
 
-            if with_errors is True:
-                return True  # we had errors so stop any further queries and quit
+            with self.db.user_write() as write_cursor:
+                ranges.update_used_query_range(
+                    write_cursor=write_cursor,
+                    location_string=range_query_name,
+                    queried_ranges=[(query_start_ts, query_end_ts)],
+                )
+                write_cursor.execute('DELETE FROM used_query_ranges WHERE name=?', (cursor_name,))  # noqa: E501
+            saved_cursor = None
 
         return False  # no errors
@@ -730,8 +730,8 @@ class Kucoin(ExchangeInterface):  # lgtm[py/missing-call-to-init]
     def first_connection(self) -> None:
         self.first_connection_made = True
 
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         """Return the account balances
 
@@ -6,9 +6,13 @@ from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
 from rotkehlchen.db.constants import KRAKEN_ACCOUNT_TYPE_KEY
 from rotkehlchen.errors.misc import InputError
-from rotkehlchen.exchanges.binance import BINANCE_BASE_URL, BINANCEUS_BASE_URL
+from rotkehlchen.exchanges.constants import (
+    BINANCE_BASE_URL,
+    BINANCEUS_BASE_URL,
+    FTX_BASE_URL,
+    FTXUS_BASE_URL,
+)
 from rotkehlchen.exchanges.exchange import ExchangeInterface
-from rotkehlchen.exchanges.ftx import FTX_BASE_URL, FTXUS_BASE_URL
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import (
     EXTERNAL_EXCHANGES,
@@ -21,7 +25,8 @@ from rotkehlchen.user_messages import MessagesAggregator
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.constants import KrakenAccountType
+    from rotkehlchen.greenlets import GreenletManager
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -55,9 +60,14 @@ ALL_SUPPORTED_EXCHANGES = SUPPORTED_EXCHANGES + EXTERNAL_EXCHANGES
 
 class ExchangeManager():
 
-    def __init__(self, msg_aggregator: MessagesAggregator) -> None:
+    def __init__(
+            self,
+            msg_aggregator: MessagesAggregator,
+            greenlet_manager: 'GreenletManager',
+    ) -> None:
         self.connected_exchanges: Dict[Location, List[ExchangeInterface]] = defaultdict(list)
         self.msg_aggregator = msg_aggregator
+        self.greenlet_manager = greenlet_manager
 
     @staticmethod
     def _get_exchange_module_name(location: Location) -> str:
@@ -272,6 +282,7 @@ class ExchangeManager():
             # remove all empty kwargs
             **{k: v for k, v in kwargs.items() if v is not None},
         )
+        exchange_obj.greenlet_manager = self.greenlet_manager
         return exchange_obj
 
     def initialize_exchanges(
@@ -358,8 +358,8 @@ class Poloniex(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         return data
 
     # ---- General exchanges interface ----
+    @cache_response_timewise(stale_while_revalidate=True)
     @protect_with_lock()
-    @cache_response_timewise()
     def query_balances(self) -> ExchangeQueryBalances:
         try:
             resp = self.api_query_list('/accounts/balances')
@@ -29,6 +29,7 @@ from rotkehlchen.types import (
     deserialize_evm_tx_hash,
 )
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.metrics import instrument_session
 from rotkehlchen.utils.misc import from_gwei, get_chunks
 from rotkehlchen.utils.serialization import jsonloads_dict
 
@@ -73,6 +74,7 @@ class BeaconChain(ExternalServiceWithApiKey):
         super().__init__(database=database, service_name=ExternalService.BEACONCHAIN)
         self.msg_aggregator = msg_aggregator
         self.session = requests.session()
+        instrument_session(self.session, 'external_api_request', 'beaconchain')
         self.warning_given = False
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.url = 'https://beaconcha.in/api/v1/'
@@ -19,6 +19,7 @@ from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.interfaces import HistoricalPriceOracleInterface
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Price, Timestamp
+from rotkehlchen.utils.metrics import instrument_session
 from rotkehlchen.utils.misc import create_timestamp, timestamp_to_date
 
 logger = logging.getLogger(__name__)
@@ -335,6 +336,7 @@ class Coingecko(HistoricalPriceOracleInterface):
     def __init__(self) -> None:
         super().__init__(oracle_name='coingecko')
         self.session = requests.session()
+        instrument_session(self.session, 'external_api_request', 'coingecko')
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.all_coins_cache: Optional[Dict[str, Dict[str, Any]]] = None
 
@@ -19,6 +19,7 @@ from rotkehlchen.types import (
     Timestamp,
 )
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.metrics import instrument_session
 from rotkehlchen.utils.misc import create_timestamp, ts_now
 
 COVALENT_QUERY_LIMIT = 1000
@@ -84,6 +85,7 @@ class Covalent(ExternalServiceWithApiKey):
     ) -> None:
         super().__init__(database=database, service_name=ExternalService.COVALENT)
         self.session = requests.session()
+        instrument_session(self.session, 'external_api_request', 'covalent')
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.msg_aggregator = msg_aggregator
         self.chain_id = chain_id
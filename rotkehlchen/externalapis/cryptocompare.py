@@ -1,12 +1,27 @@
 import logging
 import os
-from collections import deque
+from bisect import bisect_left
+from collections import defaultdict, deque
 from json.decoder import JSONDecodeError
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Deque, Dict, List, Literal, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    DefaultDict,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 
 import gevent
 import requests
+from gevent.pool import Pool
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants import ZERO
@@ -51,6 +66,7 @@ from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.interfaces import HistoricalPriceOracleInterface
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ExternalService, Price, Timestamp
+from rotkehlchen.utils.metrics import instrument_session
 from rotkehlchen.utils.misc import pairwise, ts_now
 from rotkehlchen.utils.serialization import jsonloads_dict, rlk_jsondumps
 
@@ -158,6 +174,23 @@ CRYPTOCOMPARE_SPECIAL_CASES_MAPPING = {
 }
 CRYPTOCOMPARE_SPECIAL_CASES = CRYPTOCOMPARE_SPECIAL_CASES_MAPPING.keys()
 CRYPTOCOMPARE_HOURQUERYLIMIT = 2000
+# Concurrent histohour queries when fetching the price ranges of many pairs
+CRYPTOCOMPARE_HISTOHOUR_CONCURRENCY = 3
+# Historical prices written to the global DB at a time when fetching price ranges
+HISTORICAL_PRICES_WRITE_BATCH = 10000
+
+
+class HistohourWindow(NamedTuple):
+    """Hourly prices of a pair to get with a single histohour query. From start_ts
+    to end_ts, both hour aligned and included"""
+    from_asset: Asset
+    to_asset: Asset
+    start_ts: Timestamp
+    end_ts: Timestamp
+
+    @property
+    def hours(self) -> int:
+        return (self.end_ts - self.start_ts) // 3600
 
 
 def _multiply_str_nums(a: str, b: str) -> str:
@@ -188,6 +221,64 @@ def _check_hourly_data_sanity(
         index += 2
 
 
+def coalesce_histohour_windows(
+        timestamps: List[Timestamp],
+        cached_timestamps: List[Timestamp],
+) -> List[Tuple[Timestamp, Timestamp]]:
+    """Returns the fewest (start_ts, end_ts) hour aligned windows of at most
+    CRYPTOCOMPARE_HOURQUERYLIMIT hours that cover all timestamps which have no cached
+    price within an hour. Same distance at which query_historical_price uses the cache.
+
+    Both lists should be sorted in ascending order.
+    """
+    windows: List[Tuple[Timestamp, Timestamp]] = []
+    for timestamp in timestamps:
+        idx = bisect_left(cached_timestamps, timestamp - 3600)
+        if idx < len(cached_timestamps) and cached_timestamps[idx] <= timestamp + 3600:
+            continue  # got a cached price
+
+        # the hours before and after the timestamp
+        hour_end = Timestamp(timestamp - timestamp % 3600 + 3600)
+        if len(windows) != 0 and hour_end - windows[-1][0] <= CRYPTOCOMPARE_HOURQUERYLIMIT * 3600:  # noqa: E501
+            windows[-1] = (windows[-1][0], hour_end)
+        else:
+            windows.append((Timestamp(hour_end - 3600), hour_end))
+
+    return windows
+
+
+def _histohour_entries_to_prices(
+        entries: List[Dict[str, Any]],
+        from_asset: Asset,
+        to_asset: Asset,
+) -> List[HistoricalPrice]:
+    """Turns histohour entries into the historical prices to write in the global DB"""
+    prices = []
+    for entry in entries:
+        try:
+            price = Price((deserialize_price(entry['high']) + deserialize_price(entry['low'])) / 2)  # noqa: E501
+            if price == Price(ZERO):
+                continue  # don't write zero prices
+            prices.append(HistoricalPrice(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                source=HistoricalPriceOracle.CRYPTOCOMPARE,
+                timestamp=Timestamp(entry['time']),
+                price=price,
+            ))
+        except (DeserializationError, KeyError) as e:
+            msg = str(e)
+            if isinstance(e, KeyError):
+                msg = f'Missing key entry for {msg}.'
+            log.error(
+                f'{msg}. Error getting price entry from cryptocompare histohour '
+                f'price results. Skipping entry.',
+            )
+            continue
+
+    return prices
+
+
 class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface):
     def __init__(self, data_directory: Path, database: Optional['DBHandler']) -> None:
         HistoricalPriceOracleInterface.__init__(self, oracle_name='cryptocompare')
@@ -198,6 +289,7 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface):
         )
         self.data_directory = data_directory
         self.session = requests.session()
+        instrument_session(self.session, 'external_api_request', 'cryptocompare')
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.last_histohour_query_ts = 0
         self.last_rate_limit = 0
@@ -705,33 +797,105 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface):
 
         # Let's always check for data sanity for the hourly prices.
         _check_hourly_data_sanity(calculated_history, from_asset, to_asset)
-        # Turn them into the format we will enter in the DB
-        prices = []
-        for entry in calculated_history:
-            try:
-                price = Price((deserialize_price(entry['high']) + deserialize_price(entry['low'])) / 2)  # noqa: E501
-                if price == Price(ZERO):
-                    continue  # don't write zero prices
-                prices.append(HistoricalPrice(
-                    from_asset=from_asset,
-                    to_asset=to_asset,
-                    source=HistoricalPriceOracle.CRYPTOCOMPARE,
-                    timestamp=Timestamp(entry['time']),
-                    price=price,
-                ))
-            except (DeserializationError, KeyError) as e:
-                msg = str(e)
-                if isinstance(e, KeyError):
-                    msg = f'Missing key entry for {msg}.'
-                log.error(
-                    f'{msg}. Error getting price entry from cryptocompare histohour '
-                    f'price results. Skipping entry.',
-                )
-                continue
-
+        prices = _histohour_entries_to_prices(calculated_history, from_asset, to_asset)
         GlobalDBHandler().add_historical_prices(prices)
         self.last_histohour_query_ts = ts_now()  # also save when last query finished
 
+    @staticmethod
+    def plan_histohour_windows(
+            needs: Iterable[Tuple[Asset, Asset, Timestamp]],
+    ) -> List[HistohourWindow]:
+        """Returns the fewest histohour queries that get a price around each of the
+        given (from_asset, to_asset, timestamp) needs not already in the global DB
+
+        Pairs that cryptocompare can't query or that are fiat to fiat are skipped.
+        """
+        pair_timestamps: DefaultDict[Tuple[Asset, Asset], Set[Timestamp]] = defaultdict(set)
+        for from_asset, to_asset, timestamp in needs:
+            pair_timestamps[(from_asset, to_asset)].add(timestamp)
+
+        windows: List[HistohourWindow] = []
+        for (from_asset, to_asset), timestamps_set in pair_timestamps.items():
+            if from_asset == to_asset or (from_asset.is_fiat() and to_asset.is_fiat()):
+                continue
+            if from_asset.cryptocompare == '' or to_asset.cryptocompare == '':
+                continue  # not supported in cryptocompare
+
+            timestamps = sorted(timestamps_set)
+            cached_timestamps = GlobalDBHandler().get_historical_price_timestamps(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                source=HistoricalPriceOracle.CRYPTOCOMPARE,
+                from_timestamp=Timestamp(timestamps[0] - 3600),
+                to_timestamp=Timestamp(timestamps[-1] + 3600),
+            )
+            windows.extend(
+                HistohourWindow(from_asset, to_asset, start_ts, end_ts)
+                for start_ts, end_ts in coalesce_histohour_windows(timestamps, cached_timestamps)
+            )
+
+        return windows
+
+    def _query_histohour_window(self, window: HistohourWindow) -> List[HistoricalPrice]:
+        """Returns the non zero hourly prices of the window
+
+        May raise:
+        - RemoteError if there is a problem reaching the cryptocompare server
+        or with reading the response returned by the server
+        - PriceQueryUnsupportedAsset if from/to assets are not known to cryptocompare
+        """
+        resp = self.query_endpoint_histohour(
+            from_asset=window.from_asset,
+            to_asset=window.to_asset,
+            limit=window.hours,
+            to_timestamp=window.end_ts,
+        )
+        entries = [x for x in resp['Data'] if window.start_ts <= x['time'] <= window.end_ts]
+        _check_hourly_data_sanity(entries, window.from_asset, window.to_asset)
+        return _histohour_entries_to_prices(entries, window.from_asset, window.to_asset)
+
+    def query_and_store_historical_ranges(
+            self,
+            needs: Iterable[Tuple[Asset, Asset, Timestamp]],
+    ) -> None:
+        """Gets hourly prices around all of the given (from_asset, to_asset, timestamp)
+        needs and populates the global DB, so that query_historical_price finds them cached.
+
+        Unlike query_and_store_historical_data only the hours around the needed timestamps
+        are queried. The planned windows are queried concurrently and the prices are
+        written in big batches. Windows that fail are logged and skipped since the
+        prices can still be queried one by one later.
+        """
+        windows = self.plan_histohour_windows(needs)
+        if len(windows) == 0:
+            return
+
+        log.debug(f'Querying {len(windows)} histohour windows from cryptocompare')
+        self.last_histohour_query_ts = ts_now()
+
+        def query_window(window: HistohourWindow) -> List[HistoricalPrice]:
+            try:
+                return self._query_histohour_window(window)
+            except (RemoteError, PriceQueryUnsupportedAsset) as e:
+                log.warning(
+                    f'Could not query cryptocompare histohour data for {window.from_asset} '
+                    f'/ {window.to_asset} from {window.start_ts} to {window.end_ts} '
+                    f'due to {str(e)}',
+                )
+                return []
+
+        prices: List[HistoricalPrice] = []
+        pool = Pool(CRYPTOCOMPARE_HISTOHOUR_CONCURRENCY)
+        for window_prices in pool.imap_unordered(query_window, windows):
+            prices.extend(window_prices)
+            if len(prices) >= HISTORICAL_PRICES_WRITE_BATCH:
+                GlobalDBHandler().add_historical_prices(prices)
+                prices = []
+
+        if len(prices) != 0:
+            GlobalDBHandler().add_historical_prices(prices)
+        self.last_histohour_query_ts = ts_now()
+
     def query_historical_price(
             self,
             from_asset: Asset,
@@ -43,11 +43,19 @@ from rotkehlchen.types import (
     Timestamp,
 )
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.metrics import instrument_session
 from rotkehlchen.utils.misc import hex_or_bytes_to_int
+from rotkehlchen.utils.ratelimit import TokenBucket
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 ETHERSCAN_TX_QUERY_LIMIT = 10000
 TRANSACTIONS_BATCH_NUM = 10
+# Etherscan allows 5 calls per second with a free api key and advertises 1 call per
+# 5 seconds without one, though in practice it lets more through. The rate limiter
+# adapts down to the minimum rate when etherscan starts rejecting queries.
+ETHERSCAN_RATE_WITH_KEY = 5
+ETHERSCAN_RATE_WITHOUT_KEY = 1
+ETHERSCAN_MIN_RATE = 0.2
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -66,8 +74,25 @@ class Etherscan(ExternalServiceWithApiKey):
         super().__init__(database=database, service_name=ExternalService.ETHERSCAN)
         self.msg_aggregator = msg_aggregator
         self.session = requests.session()
+        instrument_session(self.session, 'external_api_request', 'etherscan')
         self.warning_given = False
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
+        # Shared by all greenlets querying etherscan so that concurrent transaction,
+        # receipt and balance queries do not all hit the rate limit and stall together
+        self.rate_limiter = TokenBucket(
+            max_rate=ETHERSCAN_RATE_WITHOUT_KEY,
+            capacity=1,
+            min_rate=ETHERSCAN_MIN_RATE,
+        )
+
+    def _configure_rate_limiter(self, has_api_key: bool) -> None:
+        if has_api_key:
+            self.rate_limiter.reconfigure(
+                max_rate=ETHERSCAN_RATE_WITH_KEY,
+                capacity=ETHERSCAN_RATE_WITH_KEY,
+            )
+        else:
+            self.rate_limiter.reconfigure(max_rate=ETHERSCAN_RATE_WITHOUT_KEY, capacity=1)
 
     @overload
     def _query(  # pylint: disable=no-self-use
@@ -147,10 +172,14 @@ class Etherscan(ExternalServiceWithApiKey):
                 self.warning_given = True
         else:
             query_str += f'&apikey={api_key}'
+        self._configure_rate_limiter(has_api_key=api_key is not None)
 
         backoff = 1
         backoff_limit = 33
         while backoff < backoff_limit:
+            waited = self.rate_limiter.acquire()
+            if waited > 1:
+                log.debug(f'Waited {waited} seconds for the etherscan rate limit')
             log.debug(f'Querying etherscan: {query_str}')
             try:
                 response = self.session.get(query_str, timeout=timeout if timeout else DEFAULT_TIMEOUT_TUPLE)  # noqa: E501
@@ -201,14 +230,11 @@ class Etherscan(ExternalServiceWithApiKey):
                     if status == 0 and 'rate limit reached' in result:
                         log.debug(
                             f'Got response: {response.text} from etherscan. Will '
-                            f'backoff for {backoff} seconds.',
+                            f'slow down the shared rate limiter and retry.',
                         )
-                        gevent.sleep(backoff)
-                        # Continue increasing backoff until limit is reached.
-                        # If limit is reached then keep sleeping with the limit.
-                        # Etherscan will let the query go through eventually
-                        if backoff * 2 < backoff_limit:
-                            backoff = backoff * 2
+                        # The rate limiter keeps slowing down until etherscan
+                        # lets the query go through, which it eventually will
+                        self.rate_limiter.register_rate_limited()
                         continue
 
                     transaction_endpoint_and_none_found = (
@@ -234,6 +260,7 @@ class Etherscan(ExternalServiceWithApiKey):
                 ) from e
 
             # success, break out of the loop and return result
+            self.rate_limiter.register_success()
             return result
 
         return result
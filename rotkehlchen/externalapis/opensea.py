@@ -34,6 +34,7 @@ from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import deserialize_optional_to_optional_fval
 from rotkehlchen.types import ChecksumEvmAddress, ExternalService
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.metrics import instrument_session
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -94,6 +95,7 @@ class Opensea(ExternalServiceWithApiKey):
         super().__init__(database=database, service_name=ExternalService.OPENSEA)
         self.msg_aggregator = msg_aggregator
         self.session = requests.session()
+        instrument_session(self.session, 'external_api_request', 'opensea')
         # Their API seems to get limited by cloudflare after 1-2 requests ... unless
         # the user agent is a browser. We lose nothing by doing this and may revert if they fix
         # https://twitter.com/LefterisJP/status/1483017589869711364
@@ -1,12 +1,17 @@
 from decimal import Decimal, InvalidOperation
-from typing import Any, Union
+from typing import Any, Dict, Union
 
 from rotkehlchen.errors.serialization import ConversionError
+from rotkehlchen.serialization.encoder import register_json_encoder
 
 # Here even though we got __future__ annotations using FVal does not seem to work
 AcceptableFValInitInput = Union[float, bytes, Decimal, int, str, 'FVal']
 AcceptableFValOtherInput = Union[int, 'FVal']
 
+# Powers of ten by exponent for the amounts given in fixed point. Computed the same way
+# as FVal(10) ** FVal(decimals) so that dividing by them gives the same results
+_POWERS_OF_TEN: Dict[int, Decimal] = {}
+
 
 class FVal():
     """A value to represent numbers for financial applications. At the moment
@@ -16,14 +21,20 @@ class FVal():
     At the moment we do not allow any operations against floating points. Even though
     floating points could be converted to Decimals before each operation we will
     use this restriction to make sure floating point numbers are rooted from the codebase first.
+
+    The operations check for an FVal operand by exact type before anything else since
+    that is by far the most common case and they are in the hot path of most of the code.
     """
+    # pylint: disable=unidiomatic-typecheck
 
     __slots__ = ('num',)
 
     def __init__(self, data: AcceptableFValInitInput = 0):
 
         try:
-            if isinstance(data, float):
+            if type(data) is str or type(data) is Decimal or type(data) is int:  # not bool
+                self.num = Decimal(data)
+            elif isinstance(data, float):
                 self.num = Decimal(str(data))
             elif isinstance(data, bytes):
                 # assume it's an ascii string and try to decode the bytes to one
@@ -52,76 +63,74 @@ class FVal():
         return 'FVal({})'.format(str(self.num))
 
     def __gt__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('1')
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return self.num > other_num
 
     def __lt__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('-1')
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return self.num < other_num
 
     def __le__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('-1'), Decimal('0'))
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return self.num <= other_num
 
     def __ge__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('1'), Decimal('0'))
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return self.num >= other_num
 
     def __eq__(self, other: object) -> bool:
-        evaluated_other = evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('0')
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return self.num == other_num
+
+    def __ne__(self, other: object) -> bool:
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return self.num != other_num
 
     def __add__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__add__(evaluated_other))
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return _fval_from_decimal(self.num + other_num)
 
     def __sub__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__sub__(evaluated_other))
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return _fval_from_decimal(self.num - other_num)
 
     def __mul__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__mul__(evaluated_other))
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return _fval_from_decimal(self.num * other_num)
 
     def __truediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__truediv__(evaluated_other))
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return _fval_from_decimal(self.num / other_num)
 
     def __floordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__floordiv__(evaluated_other))
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return _fval_from_decimal(self.num // other_num)
 
     def __pow__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__pow__(evaluated_other))
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return _fval_from_decimal(self.num ** other_num)
 
     def __radd__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__radd__(evaluated_other))
+        return _fval_from_decimal(evaluate_input(other) + self.num)
 
     def __rsub__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rsub__(evaluated_other))
+        return _fval_from_decimal(evaluate_input(other) - self.num)
 
     def __rmul__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rmul__(evaluated_other))
+        return _fval_from_decimal(evaluate_input(other) * self.num)
 
     def __rtruediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rtruediv__(evaluated_other))
+        return _fval_from_decimal(evaluate_input(other) / self.num)
 
     def __rfloordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rfloordiv__(evaluated_other))
+        return _fval_from_decimal(evaluate_input(other) // self.num)
 
     def __mod__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__mod__(evaluated_other))
+        other_num = other.num if type(other) is FVal else evaluate_input(other)
+        return _fval_from_decimal(self.num % other_num)
 
     def __rmod__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = evaluate_input(other)
-        return FVal(self.num.__rmod__(evaluated_other))
+        return _fval_from_decimal(evaluate_input(other) % self.num)
 
     def __float__(self) -> float:
         return float(self.num)
@@ -129,10 +138,10 @@ class FVal():
     # --- Unary operands
 
     def __neg__(self) -> 'FVal':
-        return FVal(self.num.__neg__())
+        return _fval_from_decimal(-self.num)
 
     def __abs__(self) -> 'FVal':
-        return FVal(self.num.copy_abs())
+        return _fval_from_decimal(self.num.copy_abs())
 
     # --- Other operations
 
@@ -143,7 +152,7 @@ class FVal():
         """
         evaluated_other = evaluate_input(other)
         evaluated_third = evaluate_input(third)
-        return FVal(self.num.fma(evaluated_other, evaluated_third))
+        return _fval_from_decimal(self.num.fma(evaluated_other, evaluated_third))
 
     def to_percentage(self, precision: int = 4, with_perc_sign: bool = True) -> str:
         return f'{self.num*100:.{precision}f}{"%" if with_perc_sign else ""}'
@@ -161,13 +170,30 @@ class FVal():
         return int(self.num)
 
     def is_close(self, other: AcceptableFValInitInput, max_diff: str = "1e-6") -> bool:
-        evaluated_max_diff = FVal(max_diff)
-
         if not isinstance(other, FVal):
             other = FVal(other)
 
         diff_num = abs(self.num - other.num)
-        return diff_num <= evaluated_max_diff.num
+        return diff_num <= Decimal(max_diff)
+
+    @staticmethod
+    def from_fixed_point(amount: int, decimals: int) -> 'FVal':
+        """Returns the value of an integer amount given in fixed point with the given
+        decimals, such as a token amount in its smallest unit. Same result as
+        amount / FVal(10) ** FVal(decimals) but without creating the divisor each time.
+        """
+        try:
+            divisor = _POWERS_OF_TEN[decimals]
+        except KeyError:
+            divisor = _POWERS_OF_TEN[decimals] = Decimal(10) ** Decimal(decimals)
+        return _fval_from_decimal(Decimal(amount) / divisor)
+
+
+def _fval_from_decimal(num: Decimal) -> FVal:
+    """Creates an FVal from a Decimal result skipping the input checks of the constructor"""
+    result = object.__new__(FVal)
+    result.num = num
+    return result
 
 
 def evaluate_input(other: Any) -> Union[Decimal, int]:
@@ -178,3 +204,7 @@ def evaluate_input(other: Any) -> Union[Decimal, int]:
         raise NotImplementedError("Expected either FVal or int.")
     # else
     return other
+
+
+# Serialized as strings so that clients handle the big numbers and we lose no precision
+register_json_encoder((FVal,), str)
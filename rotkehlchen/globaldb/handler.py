@@ -1222,6 +1222,29 @@ class GlobalDBHandler():
                 return None
             return result[0], result[1]
 
+    @staticmethod
+    def get_historical_price_timestamps(
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: HistoricalPriceOracle,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> List[Timestamp]:
+        """Returns the timestamps of the prices of the pair in the range in ascending order"""
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT timestamp FROM price_history WHERE from_asset=? AND to_asset=? AND '
+                'source_type=? AND timestamp >= ? AND timestamp <= ? ORDER BY timestamp ASC',
+                (
+                    from_asset.identifier,
+                    to_asset.identifier,
+                    source.serialize_for_db(),
+                    from_timestamp,
+                    to_timestamp,
+                ),
+            )
+            return [Timestamp(x[0]) for x in cursor]
+
     @staticmethod
     def get_historical_price_data(source: HistoricalPriceOracle) -> List[Dict[str, Any]]:
         """Return a list of assets and first/last ts
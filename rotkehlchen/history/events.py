@@ -2,6 +2,7 @@ import logging
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, List, Tuple
 
+from rotkehlchen.accounting.events_stream import AccountingEventsStream, accounting_event_order_key
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.db.filtering import (
@@ -13,10 +14,12 @@ from rotkehlchen.db.filtering import (
 )
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.db.ledger_actions import DBLedgerActions
+from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair, UnsupportedAsset
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
 from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES, ExchangeManager
 from rotkehlchen.fval import FVal
+from rotkehlchen.history.price import PriceHistorian
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import EXTERNAL_LOCATION, Location, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
@@ -42,8 +45,9 @@ log = RotkehlchenLogsAdapter(logger)
 # external location trades -> len(EXTERNAL_LOCATION)
 # eth2
 # base history entries
+# historical prices
 # Please, update this number each time a history query step is either added or removed
-NUM_HISTORY_QUERY_STEPS_EXCL_EXCHANGES = 6 + len(EXTERNAL_LOCATION)
+NUM_HISTORY_QUERY_STEPS_EXCL_EXCHANGES = 7 + len(EXTERNAL_LOCATION)
 
 
 class EventsHistorian:
@@ -89,6 +93,31 @@ class EventsHistorian:
         self.progress = FVal(step / total_steps) * 100
         return step
 
+    def _prefetch_historical_prices(
+            self,
+            history: List['AccountingEventMixin'],
+            end_ts: Timestamp,
+    ) -> None:
+        """Gets in bulk the historical prices in the main currency that processing the
+        events will need, so that accounting does not query them one event at a time"""
+        with self.db.conn.read_ctx() as cursor:
+            main_currency = self.db.get_setting(cursor=cursor, name='main_currency')
+            ignored_assets = set(self.db.get_ignored_assets(cursor))
+            asset_hours = DBHistoryEvents(self.db).get_asset_hours(cursor=cursor, to_ts=end_ts)
+
+        needs = [(asset, main_currency, timestamp) for asset, timestamp in asset_hours]
+        for event in history:
+            try:
+                event_assets = event.get_assets()
+            except (UnknownAsset, UnsupportedAsset, UnprocessableTradePair):
+                continue  # accounting skips them too
+            timestamp = event.get_timestamp()
+            needs.extend((asset, main_currency, timestamp) for asset in event_assets)
+
+        PriceHistorian().prefetch_historical_prices(
+            x for x in needs if x[0] not in ignored_assets
+        )
+
     def query_ledger_actions(
             self,
             filter_query: LedgerActionsFilterQuery,
@@ -286,10 +315,13 @@ class EventsHistorian:
             start_ts: Timestamp,
             end_ts: Timestamp,
             has_premium: bool,
-    ) -> Tuple[str, List['AccountingEventMixin']]:
+    ) -> Tuple[str, AccountingEventsStream]:
         """
-        Creates all events history from start_ts to end_ts. Returns it
+        Creates all events history from start_ts to end_ts. Returns it as a stream
         sorted by ascending timestamp.
+
+        The events queried from remote sources are kept in memory and sorted. The
+        history events are streamed from the DB as the stream is consumed.
         """
         self._reset_variables()
         step = 0
@@ -406,25 +438,26 @@ class EventsHistorian:
 
         step = self._increase_progress(step, total_steps)
 
-        # Include base history entries
+        # Include base history entries. Limits are ignored here. Applied at processing
         history_events_db = DBHistoryEvents(self.db)
         with self.db.conn.read_ctx() as cursor:
-            base_entries, _ = history_events_db.get_history_events_and_limit_info(
+            base_entries_num = history_events_db.get_history_events_count(
                 cursor=cursor,
-                filter_query=HistoryEventFilterQuery.make(
+                query_filter=HistoryEventFilterQuery.make(
                     # We need to have history since before the range
                     from_ts=Timestamp(0),
                     to_ts=end_ts,
                 ),
-                has_premium=True,  # ignore limits here. Limit applied at processing
             )
-        history.extend(base_entries)
+        base_entries = history_events_db.iterate_accounting_events(to_ts=end_ts)
+        step = self._increase_progress(step, total_steps)
+
+        self.processing_state_name = 'Querying historical prices'
+        self._prefetch_historical_prices(history=history, end_ts=end_ts)
         self._increase_progress(step, total_steps)
 
-        history.sort(  # sort events first by timestamp and if history base by sequence index
-            key=lambda x: (
-                x.get_timestamp(),
-                x.sequence_index if isinstance(x, HistoryBaseEntry) else 1,
-            ),
+        history.sort(key=accounting_event_order_key)
+        return empty_or_error, AccountingEventsStream(
+            sources=[history, base_entries],
+            total=len(history) + base_entries_num,
         )
-        return empty_or_error, history
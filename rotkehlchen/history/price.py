@@ -1,6 +1,6 @@
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.assets import A_KFEE, A_USD
@@ -13,6 +13,7 @@ from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.metrics import METRICS
 
 from .types import HistoricalPriceOracle, HistoricalPriceOracleInstance
 
@@ -105,6 +106,21 @@ class PriceHistorian():
         instance._oracles = oracles
         instance._oracle_instances = [getattr(instance, f'_{str(oracle)}') for oracle in oracles]
 
+    @staticmethod
+    def prefetch_historical_prices(needs: Iterable[Tuple[Asset, Asset, Timestamp]]) -> None:
+        """Gets in bulk the prices of the given (from_asset, to_asset, timestamp) needs
+        so that querying them one by one later finds them cached.
+
+        Only done if cryptocompare is the first oracle to query after the manual prices,
+        since it's the only one that can query ranges of historical prices.
+        """
+        instance = PriceHistorian()
+        oracles = [x for x in instance._oracles or [] if x != HistoricalPriceOracle.MANUAL]
+        if len(oracles) == 0 or oracles[0] != HistoricalPriceOracle.CRYPTOCOMPARE:
+            return
+
+        instance._cryptocompare.query_and_store_historical_ranges(needs)
+
     @staticmethod
     def get_price_for_special_asset(
         from_asset: Asset,
@@ -208,12 +224,14 @@ class PriceHistorian():
                 continue
 
             try:
-                price = oracle_instance.query_historical_price(
-                    from_asset=from_asset,
-                    to_asset=to_asset,
-                    timestamp=timestamp,
-                )
+                with METRICS.time('historical_price_query', str(oracle)):
+                    price = oracle_instance.query_historical_price(
+                        from_asset=from_asset,
+                        to_asset=to_asset,
+                        timestamp=timestamp,
+                    )
             except (PriceQueryUnsupportedAsset, NoPriceForGivenTimestamp, RemoteError):
+                METRICS.increment('historical_price_query_failures', str(oracle))
                 continue
 
             log.debug(
@@ -82,6 +82,7 @@ from rotkehlchen.types import (
     Price,
     Timestamp,
 )
+from rotkehlchen.utils.metrics import METRICS
 from rotkehlchen.utils.misc import timestamp_to_daystart_timestamp, ts_now
 from rotkehlchen.utils.mixins.serializableenum import SerializableEnumMixin
 from rotkehlchen.utils.network import request_get_dict
@@ -378,11 +379,13 @@ class Inquirer():
                 continue
 
             try:
-                price = oracle_instance.query_current_price(
-                    from_asset=from_asset,
-                    to_asset=to_asset,
-                )
+                with METRICS.time('current_price_query', str(oracle)):
+                    price = oracle_instance.query_current_price(
+                        from_asset=from_asset,
+                        to_asset=to_asset,
+                    )
             except (DefiPoolError, PriceQueryUnsupportedAsset, RemoteError) as e:
+                METRICS.increment('current_price_query_failures', str(oracle))
                 log.warning(
                     f'Current price oracle {oracle} failed to request {to_asset.identifier} '
                     f'price for {from_asset.identifier} due to: {str(e)}.',
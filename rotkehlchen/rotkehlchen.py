@@ -6,10 +6,12 @@ import logging.config
 import os
 import time
 from collections import defaultdict
+from functools import partial
 from pathlib import Path
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     DefaultDict,
     Dict,
     List,
@@ -23,7 +25,7 @@ from typing import (
 import gevent
 
 from rotkehlchen.accounting.accountant import Accountant
-from rotkehlchen.accounting.structures.balance import Balance, BalanceType
+from rotkehlchen.accounting.structures.balance import Balance, BalanceSheet, BalanceType
 from rotkehlchen.api.websockets.notifier import RotkiNotifier
 from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.assets.asset import Asset
@@ -84,17 +86,23 @@ from rotkehlchen.types import (
 )
 from rotkehlchen.usage_analytics import maybe_submit_usage_analytics
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import combine_dicts
+from rotkehlchen.utils.metrics import METRICS
+from rotkehlchen.utils.misc import combine_dicts, timed_section
+from rotkehlchen.utils.mixins.cacheable import pop_served_cache_age, record_served_cache_age
+from rotkehlchen.utils.process_pool import stop_worker_pool
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.bitcoin.xpub import XpubData
     from rotkehlchen.db.drivers.gevent import DBCursor
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.constants import KrakenAccountType
+    from rotkehlchen.exchanges.exchange import ExchangeInterface
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 MAIN_LOOP_SECS_DELAY = 10
+# Seconds after which the query of a source of the balances snapshot is given up
+BALANCE_SOURCE_TIMEOUT = 600
 
 
 ICONS_BATCH_SIZE = 3
@@ -127,13 +135,17 @@ class Rotkehlchen():
             raise SystemPermissionError(
                 f'The given data directory {self.data_dir} is not readable or writable',
             )
+        METRICS.enabled = self.args.metrics
         self.main_loop_spawned = False
         self.api_task_greenlets: List[gevent.Greenlet] = []
         self.msg_aggregator = MessagesAggregator()
         self.greenlet_manager = GreenletManager(msg_aggregator=self.msg_aggregator)
         self.rotki_notifier = RotkiNotifier(greenlet_manager=self.greenlet_manager)
         self.msg_aggregator.rotki_notifier = self.rotki_notifier
-        self.exchange_manager = ExchangeManager(msg_aggregator=self.msg_aggregator)
+        self.exchange_manager = ExchangeManager(
+            msg_aggregator=self.msg_aggregator,
+            greenlet_manager=self.greenlet_manager,
+        )
         # Initialize the GlobalDBHandler singleton. Has to be initialized BEFORE asset resolver
         GlobalDBHandler(
             data_dir=self.data_dir,
@@ -649,12 +661,137 @@ class Rotkehlchen():
         )
         return report_id, error_or_empty
 
+    def _query_balances_source(
+            self,
+            source: str,
+            query: Callable[[], Dict[str, BalanceSheet]],
+            timings: Dict[str, float],
+            cache_ages: Dict[str, int],
+    ) -> Union[Dict[str, BalanceSheet], str]:
+        """Runs the query of a source of the balances snapshot with a timeout and pushes
+        the balances it found to the websocket as soon as it finishes. If the query
+        served cached results the age of the oldest one is saved in cache_ages.
+
+        Returns the balances per location or the error message if the query failed.
+        """
+        timeout = gevent.Timeout(BALANCE_SOURCE_TIMEOUT)
+        try:
+            with timed_section(timings, source), timeout:
+                result = query()
+        except gevent.Timeout as e:
+            if e is not timeout:
+                raise
+            return f'Query did not finish within {BALANCE_SOURCE_TIMEOUT} seconds'
+        except (RemoteError, EthSyncError) as e:
+            return str(e)
+
+        cache_age = pop_served_cache_age()
+        if cache_age is not None:
+            cache_ages[source] = cache_age
+        self.msg_aggregator.add_message(
+            message_type=WSMessageType.BALANCE_SOURCE_QUERIED,
+            data={
+                'source': source,
+                'seconds': round(timings[source], 2),
+                'balances': {location: sheet.serialize() for location, sheet in result.items()},  # noqa: E501
+            },
+        )
+        return result
+
+    def _query_exchange_balances(
+            self,
+            exchange: 'ExchangeInterface',
+            ignore_cache: bool,
+            allow_stale: bool,
+    ) -> Dict[str, BalanceSheet]:
+        """May raise:
+        - RemoteError if the exchange balances could not be queried
+        """
+        exchange_balances, error_msg = exchange.query_balances(
+            ignore_cache=ignore_cache,
+            allow_stale=allow_stale,
+        )
+        if exchange_balances is None:
+            raise RemoteError(error_msg)
+        return {str(exchange.location): BalanceSheet(assets=defaultdict(Balance, exchange_balances))}  # noqa: E501
+
+    def _query_blockchain_balances(
+            self,
+            ignore_cache: bool,
+            beaconchain_fetch_eth1: bool,
+    ) -> Dict[str, BalanceSheet]:
+        """May raise:
+        - RemoteError if an external service is queried and there is a problem with it
+        - EthSyncError if querying the token balances through a provided ethereum
+        client and the chain is not synced
+        """
+        blockchain_result = self.chain_manager.query_balances(
+            blockchain=None,
+            beaconchain_fetch_eth1=beaconchain_fetch_eth1,
+            ignore_cache=ignore_cache,
+        )
+        return {str(Location.BLOCKCHAIN): blockchain_result.totals}
+
+    def _query_loopring_balances(self) -> Dict[str, BalanceSheet]:
+        """May raise:
+        - RemoteError if there is a problem querying the loopring api
+        """
+        loopring_balances = self.chain_manager.get_loopring_balances()
+        if len(loopring_balances) == 0:
+            return {}
+        return {str(Location.LOOPRING): BalanceSheet(assets=defaultdict(Balance, loopring_balances))}  # noqa: E501
+
+    def _query_lp_and_nft_balances(self) -> Dict[str, BalanceSheet]:
+        """Queries the liquidity pool and the NFT balances. They are queried together
+        since the uniswap v3 LP balances are needed for the NFT balances. Errors of
+        either query are logged and the other query still goes on.
+        """
+        blockchain_balances: Dict[str, Dict[Asset, Balance]] = {}
+        uniswap_v3_balances = None
+        try:
+            uniswap_v3_balances = self.chain_manager.query_ethereum_lp_balances(balances=blockchain_balances)  # noqa: E501
+        except RemoteError as e:
+            log.error(
+                f'At balance snapshot LP balances query failed due to {str(e)}. Error '
+                f'is ignored and balance snapshot will still be saved.',
+            )
+
+        # retrieve nft balances if module is activated
+        nfts = self.chain_manager.get_module('nfts')
+        if nfts is not None:
+            try:
+                nft_mapping = nfts.get_balances(
+                    addresses=self.chain_manager.queried_addresses_for_module('nfts'),
+                    uniswap_nfts=uniswap_v3_balances,
+                    return_zero_values=False,
+                    ignore_cache=False,
+                )
+            except RemoteError as e:
+                log.error(
+                    f'At balance snapshot NFT balances query failed due to {str(e)}. Error '
+                    f'is ignored and balance snapshot will still be saved.',
+                )
+            else:
+                nft_assets = blockchain_balances.setdefault(str(Location.BLOCKCHAIN), {})
+                for nft_balances in nft_mapping.values():
+                    for balance_entry in nft_balances:
+                        nft_assets[Asset(balance_entry['id'])] = Balance(
+                            amount=ONE,
+                            usd_value=balance_entry['usd_price'],
+                        )
+
+        return {
+            location: BalanceSheet(assets=defaultdict(Balance, location_balances))
+            for location, location_balances in blockchain_balances.items()
+        }
+
     def query_balances(
             self,
             requested_save_data: bool = False,
             save_despite_errors: bool = False,
             timestamp: Timestamp = None,
             ignore_cache: bool = False,
+            beaconchain_fetch_eth1: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """Query all balances rotkehlchen can see.
 
@@ -666,7 +803,18 @@ class Rotkehlchen():
         If timestamp is None then the current timestamp is used.
         If a timestamp is given then that is the time that the balances are going
         to be saved in the DB
-        If ignore_cache is True then all underlying calls that have a cache ignore it
+        If ignore_cache is True then all underlying calls that have a cache ignore it.
+        If it is False only the sources whose cached results are older than their
+        cache TTL are queried again. Expired exchange balances are normally returned
+        while they are refreshed in the background, but if the balances are going to be
+        saved the query waits for the refreshed ones so that no stale balances are saved.
+        If beaconchain_fetch_eth1 is True then the eth1 accounts are checked for the eth2
+        validators they deposited to. If it is None it follows ignore_cache.
+
+        The exchanges, blockchain, loopring and LP/NFT balances are queried concurrently,
+        each with a timeout. The balances of each source are pushed to the websocket as
+        soon as it finishes. The time spent on each source is logged and saved along
+        with the snapshot so that slow snapshots can be attributed.
 
         Returns a dictionary with the queried balances.
         """
@@ -674,109 +822,98 @@ class Rotkehlchen():
             'query_balances called',
             requested_save_data=requested_save_data,
             save_despite_errors=save_despite_errors,
+            ignore_cache=ignore_cache,
+            beaconchain_fetch_eth1=beaconchain_fetch_eth1,
         )
-
+        if beaconchain_fetch_eth1 is None:
+            beaconchain_fetch_eth1 = ignore_cache
+        with self.data.db.conn.read_ctx() as cursor:
+            allow_stale = not (requested_save_data or self.data.db.should_save_balances(cursor))  # noqa: E501
+
+        timings: Dict[str, float] = {}
+        cache_ages: Dict[str, int] = {}
+        queries: List[Tuple[str, Optional[str], Callable[[], Dict[str, BalanceSheet]]]] = [
+            (
+                f'exchange {exchange.name}',
+                exchange.name,
+                partial(
+                    self._query_exchange_balances,
+                    exchange=exchange,
+                    ignore_cache=ignore_cache,
+                    allow_stale=allow_stale,
+                ),
+            ) for exchange in self.exchange_manager.iterate_exchanges()
+        ]
+        queries.append((
+            'blockchain',
+            'blockchain balances query',
+            partial(
+                self._query_blockchain_balances,
+                ignore_cache=ignore_cache,
+                beaconchain_fetch_eth1=beaconchain_fetch_eth1,
+            ),
+        ))
+        if self.chain_manager.get_module('loopring'):
+            queries.append(('loopring', 'loopring', self._query_loopring_balances))
+        queries.append(('LP and nfts', None, self._query_lp_and_nft_balances))
+        # (source, location to report errors for or None if errors are ignored, greenlet)
+        sources = [
+            (source, error_location, gevent.spawn(self._query_balances_source, source, query, timings, cache_ages))  # noqa: E501
+            for source, error_location, query in queries
+        ]
+        gevent.joinall([x[2] for x in sources])
+        # the cached results were served to the greenlets of the sources
+        for cache_age in cache_ages.values():
+            record_served_cache_age(cache_age)
+
+        # Compose the balances in the order of the sources. The LP and NFT balances
+        # replace the balances of the same assets found as tokens on the blockchain.
         balances: Dict[str, Dict[Asset, Balance]] = {}
+        liabilities: Dict[Asset, Balance] = {}
         problem_free = True
-        for exchange in self.exchange_manager.iterate_exchanges():
-            exchange_balances, error_msg = exchange.query_balances(ignore_cache=ignore_cache)
-            # If we got an error, disregard that exchange but make sure we don't save data
-            if not isinstance(exchange_balances, dict):
-                problem_free = False
-                self.msg_aggregator.add_message(
-                    message_type=WSMessageType.BALANCE_SNAPSHOT_ERROR,
-                    data={'location': exchange.name, 'error': error_msg},
+        for source, error_location, greenlet in sources:
+            result = greenlet.get()  # re-raises any unexpected error of the query
+            if not isinstance(result, str):
+                for location_str, sheet in result.items():
+                    liabilities = combine_dicts(liabilities, sheet.liabilities)
+                    if len(sheet.assets) == 0:
+                        continue
+                    if error_location is None:  # LP and NFT balances
+                        balances.setdefault(location_str, {}).update(sheet.assets)
+                    elif location_str in balances:  # multiple exchanges of same type
+                        balances[location_str] = combine_dicts(balances[location_str], sheet.assets)  # noqa: E501
+                    else:
+                        balances[location_str] = dict(sheet.assets)
+                continue
+
+            error = result
+            if error_location is None:
+                log.error(
+                    f'At balance snapshot {source} balances query failed due to {error}. '
+                    f'Error is ignored and balance snapshot will still be saved.',
                 )
-            else:
-                location_str = str(exchange.location)
-                if location_str not in balances:
-                    balances[location_str] = exchange_balances
-                else:  # multiple exchange of same type. Combine balances
-                    balances[location_str] = combine_dicts(
-                        balances[location_str],
-                        exchange_balances,
-                    )
-
-        liabilities: Dict[Asset, Balance]
-        try:
-            blockchain_result = self.chain_manager.query_balances(
-                blockchain=None,
-                beaconchain_fetch_eth1=ignore_cache,
-                ignore_cache=ignore_cache,
-            )
-            if len(blockchain_result.totals.assets) != 0:
-                balances[str(Location.BLOCKCHAIN)] = blockchain_result.totals.assets
-            liabilities = blockchain_result.totals.liabilities
-        except (RemoteError, EthSyncError) as e:
+                continue
+
             problem_free = False
-            liabilities = {}
-            log.error(f'Querying blockchain balances failed due to: {str(e)}')
+            log.error(f'Querying {source} balances failed due to: {error}')
             self.msg_aggregator.add_message(
                 message_type=WSMessageType.BALANCE_SNAPSHOT_ERROR,
-                data={'location': 'blockchain balances query', 'error': str(e)},
+                data={'location': error_location, 'error': error},
             )
 
-        manually_tracked_liabilities = get_manually_tracked_balances(
-            db=self.data.db,
-            balance_type=BalanceType.LIABILITY,
-        )
+        with timed_section(timings, 'manual liabilities'):
+            manually_tracked_liabilities = get_manually_tracked_balances(
+                db=self.data.db,
+                balance_type=BalanceType.LIABILITY,
+            )
         manual_liabilities_as_dict: DefaultDict[Asset, Balance] = defaultdict(Balance)
         for manual_liability in manually_tracked_liabilities:
             manual_liabilities_as_dict[manual_liability.asset] += manual_liability.value
 
         liabilities = combine_dicts(liabilities, manual_liabilities_as_dict)
-        # retrieve loopring balances if module is activated
-        if self.chain_manager.get_module('loopring'):
-            try:
-                loopring_balances = self.chain_manager.get_loopring_balances()
-            except RemoteError as e:
-                problem_free = False
-                self.msg_aggregator.add_message(
-                    message_type=WSMessageType.BALANCE_SNAPSHOT_ERROR,
-                    data={'location': 'loopring', 'error': str(e)},
-                )
-            else:
-                if len(loopring_balances) != 0:
-                    balances[str(Location.LOOPRING)] = loopring_balances
-
-        uniswap_v3_balances = None
-        try:
-            uniswap_v3_balances = self.chain_manager.query_ethereum_lp_balances(balances=balances)
-        except RemoteError as e:
-            log.error(
-                f'At balance snapshot LP balances query failed due to {str(e)}. Error '
-                f'is ignored and balance snapshot will still be saved.',
-            )
-
-        # retrieve nft balances if module is activated
-        nfts = self.chain_manager.get_module('nfts')
-        if nfts is not None:
-            try:
-                nft_mapping = nfts.get_balances(
-                    addresses=self.chain_manager.queried_addresses_for_module('nfts'),
-                    uniswap_nfts=uniswap_v3_balances,
-                    return_zero_values=False,
-                    ignore_cache=False,
-                )
-            except RemoteError as e:
-                log.error(
-                    f'At balance snapshot NFT balances query failed due to {str(e)}. Error '
-                    f'is ignored and balance snapshot will still be saved.',
-                )
-            else:
-                if len(nft_mapping) != 0:
-                    if str(Location.BLOCKCHAIN) not in balances:
-                        balances[str(Location.BLOCKCHAIN)] = {}
-
-                    for nft_balances in nft_mapping.values():
-                        for balance_entry in nft_balances:
-                            balances[str(Location.BLOCKCHAIN)][Asset(
-                                balance_entry['id'])] = Balance(
-                                amount=ONE,
-                                usd_value=balance_entry['usd_price'],
-                            )
 
-        balances = account_for_manually_tracked_asset_balances(db=self.data.db, balances=balances)
+        with timed_section(timings, 'manual balances'):
+            balances = account_for_manually_tracked_asset_balances(db=self.data.db, balances=balances)  # noqa: E501
 
         # Calculate usd totals
         assets_total_balance: DefaultDict[Asset, Balance] = defaultdict(Balance)
@@ -825,12 +962,17 @@ class Rotkehlchen():
             'location': location_stats,
             'net_usd': net_usd,
         }
-        with self.data.db.user_write() as cursor:
+        with timed_section(timings, 'saving'), self.data.db.user_write() as cursor:
             allowed_to_save = requested_save_data or self.data.db.should_save_balances(cursor)
             if (problem_free or save_despite_errors) and allowed_to_save:
                 if not timestamp:
                     timestamp = Timestamp(int(time.time()))
-                self.data.db.save_balances_data(cursor, data=result_dict, timestamp=timestamp)
+                self.data.db.save_balances_data(
+                    write_cursor=cursor,
+                    data=result_dict,
+                    timestamp=timestamp,
+                    source_timings=timings,
+                )
                 log.debug('query_balances data saved')
             else:
                 log.debug(
@@ -840,6 +982,10 @@ class Rotkehlchen():
                     save_despite_errors=save_despite_errors,
                 )
 
+        log.info(
+            'query_balances finished. Seconds per source: ' +
+            ', '.join(f'{name}: {secs:.2f}' for name, secs in sorted(timings.items(), key=lambda x: x[1], reverse=True)),  # noqa: E501
+        )
         return result_dict
 
     def set_settings(self, settings: ModifiableDBSettings) -> Tuple[bool, str]:
@@ -939,6 +1085,7 @@ class Rotkehlchen():
 
     def shutdown(self) -> None:
         self.logout()
+        stop_worker_pool()
         self.shutdown_event.set()
 
     def create_oracle_cache(
@@ -0,0 +1,184 @@
+"""Type dispatched serialization of results to JSON
+
+Data structures register an encoder for their type with register_json_encoder.
+The encoder turns an instance into something serializable such as a string, a
+dict or a list and whatever it returns is serialized in turn. The encoder of an
+instance is looked up by its type, walking the MRO for subclasses, and cached.
+
+dumps_json writes the JSON of a result in a single pass while serializable_copy
+returns a copy of the result with all registered types encoded.
+"""
+from json.encoder import INFINITY, encode_basestring_ascii
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+JSONEncoderFunc = Callable[[Any], Any]
+
+_ENCODERS: Dict[type, JSONEncoderFunc] = {}
+# Encoder of each type met so far, resolved through its MRO. None if it has none
+_RESOLVED_ENCODERS: Dict[type, Optional[JSONEncoderFunc]] = {}
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def register_json_encoder(types: Tuple[Type, ...], encoder: JSONEncoderFunc) -> None:
+    """Registers the encoder for the given types. Replaces any existing encoder of
+    the same types."""
+    for entry_type in types:
+        _ENCODERS[entry_type] = encoder
+    _RESOLVED_ENCODERS.clear()
+
+
+def _get_encoder(entry_type: type) -> Optional[JSONEncoderFunc]:
+    try:
+        return _RESOLVED_ENCODERS[entry_type]
+    except KeyError:
+        pass
+
+    encoder = None
+    for base in entry_type.__mro__:
+        if base in _ENCODERS:
+            encoder = _ENCODERS[base]
+            break
+    _RESOLVED_ENCODERS[entry_type] = encoder
+    return encoder
+
+
+def _encode_key(key: Any) -> Any:
+    if type(key) is str:  # pylint: disable=unidiomatic-typecheck
+        return key
+    encoder = _get_encoder(type(key))
+    return key if encoder is None else encoder(key)
+
+
+def serializable_copy(entry: Any) -> Any:
+    """Returns a copy of the entry where all the registered types are encoded.
+    Entries of unknown types are returned as they are.
+
+    May raise:
+    - ValueError if the entry contains a tuple with no registered encoder
+    """
+    entry_type = type(entry)
+    if entry_type in _PLAIN_TYPES:
+        return entry
+    if entry_type is dict:
+        return {_encode_key(k): serializable_copy(v) for k, v in entry.items()}
+    if entry_type is list:
+        return [serializable_copy(x) for x in entry]
+
+    encoder = _get_encoder(entry_type)
+    if encoder is not None:
+        return serializable_copy(encoder(entry))
+    if isinstance(entry, dict):
+        return {_encode_key(k): serializable_copy(v) for k, v in entry.items()}
+    if isinstance(entry, list):
+        return [serializable_copy(x) for x in entry]
+    if isinstance(entry, tuple):
+        raise ValueError('Query results should not contain plain tuples')
+    return entry
+
+
+def _float_to_json(value: float) -> str:
+    """Same representation as the json module uses"""
+    if value != value:  # pylint: disable=comparison-with-itself
+        return 'NaN'
+    if value == INFINITY:
+        return 'Infinity'
+    if value == -INFINITY:
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+def _key_to_json(key: Any) -> str:
+    key = _encode_key(key)
+    if isinstance(key, str):
+        return encode_basestring_ascii(key)
+    if key is True:
+        return '"true"'
+    if key is False:
+        return '"false"'
+    if key is None:
+        return '"null"'
+    if isinstance(key, int):
+        return f'"{int.__repr__(key)}"'
+    if isinstance(key, float):
+        return f'"{_float_to_json(key)}"'
+    raise TypeError(f'keys must be str, int, float, bool or None, not {type(key).__name__}')
+
+
+def _write_dict(entry: Dict, parts: List[str]) -> None:
+    if len(entry) == 0:
+        parts.append('{}')
+        return
+
+    # pylint: disable=unidiomatic-typecheck
+    separator = '{'
+    for key, value in entry.items():
+        parts.append(separator)
+        parts.append(encode_basestring_ascii(key) if type(key) is str else _key_to_json(key))
+        parts.append(': ')
+        if type(value) is str:  # most values are. Saves a call
+            parts.append(encode_basestring_ascii(value))
+        else:
+            _write(value, parts)
+        separator = ', '
+    parts.append('}')
+
+
+def _write_list(entry: Union[List, Tuple], parts: List[str]) -> None:
+    if len(entry) == 0:
+        parts.append('[]')
+        return
+
+    separator = '['
+    for value in entry:
+        parts.append(separator)
+        _write(value, parts)
+        separator = ', '
+    parts.append(']')
+
+
+def _write(entry: Any, parts: List[str]) -> None:
+    entry_type = type(entry)
+    if entry_type is str:
+        parts.append(encode_basestring_ascii(entry))
+    elif entry_type is dict:
+        _write_dict(entry, parts)
+    elif entry_type is list:
+        _write_list(entry, parts)
+    elif entry is None:
+        parts.append('null')
+    elif entry is True:
+        parts.append('true')
+    elif entry is False:
+        parts.append('false')
+    elif entry_type is int:
+        parts.append(int.__repr__(entry))
+    elif entry_type is float:
+        parts.append(_float_to_json(entry))
+    elif (encoder := _get_encoder(entry_type)) is not None:
+        _write(encoder(entry), parts)
+    elif isinstance(entry, str):
+        parts.append(encode_basestring_ascii(entry))
+    elif isinstance(entry, dict):
+        _write_dict(entry, parts)
+    elif isinstance(entry, (list, tuple)):
+        _write_list(entry, parts)
+    elif isinstance(entry, int):
+        parts.append(int.__repr__(entry))
+    elif isinstance(entry, float):
+        parts.append(_float_to_json(entry))
+    else:
+        raise TypeError(f'Object of type {entry_type.__name__} is not JSON serializable')
+
+
+def dumps_json(entry: Any) -> str:
+    """Serializes the entry to JSON in a single pass, encoding the registered types
+    on the way. The output is the same as json.dumps of serializable_copy(entry),
+    except that like json.dumps plain tuples are serialized as lists.
+
+    May raise:
+    - TypeError if the entry contains something that can not be serialized
+    - ValueError if an encoder rejects an entry
+    """
+    parts: List[str] = []
+    _write(entry, parts)
+    return ''.join(parts)
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List
 
 from hexbytes import HexBytes
 from web3.datastructures import AttributeDict
@@ -6,7 +6,6 @@ from web3.datastructures import AttributeDict
 from rotkehlchen.accounting.ledger_actions import LedgerActionType
 from rotkehlchen.accounting.structures.balance import Balance, BalanceType
 from rotkehlchen.accounting.structures.base import StakingEvent
-from rotkehlchen.assets.asset import Asset
 from rotkehlchen.balances.manual import ManuallyTrackedBalanceWithValue
 from rotkehlchen.chain.bitcoin.xpub import XpubData
 from rotkehlchen.chain.ethereum.defi.structures import (
@@ -63,11 +62,11 @@ from rotkehlchen.chain.ethereum.types import NodeName, WeightedNode
 from rotkehlchen.constants.resolver import ChainID
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.db.utils import DBAssetBalance, LocationData, SingleDBAssetBalance
+from rotkehlchen.exchanges.constants import KrakenAccountType
 from rotkehlchen.exchanges.data_structures import Trade
-from rotkehlchen.exchanges.kraken import KrakenAccountType
-from rotkehlchen.fval import FVal
 from rotkehlchen.history.types import HistoricalPriceOracle
 from rotkehlchen.inquirer import CurrentPriceOracle
+from rotkehlchen.serialization.encoder import register_json_encoder, serializable_copy
 from rotkehlchen.types import (
     AssetMovementCategory,
     BlockchainAccountData,
@@ -81,130 +80,114 @@ from rotkehlchen.types import (
 from rotkehlchen.utils.version_check import VersionCheckResult
 
 
-def _process_entry(entry: Any) -> Union[str, List[Any], Dict[str, Any], Any]:
-    if isinstance(entry, FVal):
-        return str(entry)
-    if isinstance(entry, list):
-        new_list = []
-        for new_entry in entry:
-            new_list.append(_process_entry(new_entry))
-        return new_list
-    if isinstance(entry, (dict, AttributeDict)):
-        new_dict = {}
-        for k, v in entry.items():
-            if isinstance(k, Asset):
-                k = k.identifier
-            new_dict[k] = _process_entry(v)
-        return new_dict
-    if isinstance(entry, HexBytes):
-        return entry.hex()
-    if isinstance(entry, LocationData):
-        return {
-            'time': entry.time,
-            'location': str(Location.deserialize_from_db(entry.location)),
-            'usd_value': entry.usd_value,
-        }
-    if isinstance(entry, SingleDBAssetBalance):
-        return {
-            'time': entry.time,
-            'category': str(entry.category),
-            'amount': str(entry.amount),
-            'usd_value': str(entry.usd_value),
-        }
-    if isinstance(entry, DBAssetBalance):
-        return {
-            'time': entry.time,
-            'category': str(entry.category),
-            'asset': entry.asset.identifier,
-            'amount': str(entry.amount),
-            'usd_value': str(entry.usd_value),
-        }
-    if isinstance(entry, (
-            DefiProtocol,
-            MakerdaoVault,
-            XpubData,
-            Eth2Deposit,
-            StakingEvent,
-            NodeName,
-            NodeName,
-            ChainID,
-    )):
-        return entry.serialize()
-    if isinstance(entry, (
-            Trade,
-            EthereumTransaction,
-            MakerdaoVault,
-            DSRAccountReport,
-            Balance,
-            AaveLendingBalance,
-            AaveBorrowingBalance,
-            CompoundBalance,
-            YearnVaultEvent,
-            YearnVaultBalance,
-            AaveEvent,
-            UniswapPool,
-            UniswapPoolAsset,
-            AMMTrade,
-            UniswapPoolEventsBalance,
-            ADXStakingHistory,
-            BalancerBPTEventPoolToken,
-            BalancerEvent,
-            BalancerPoolEventsBalance,
-            BalancerPoolBalance,
-            BalancerPoolTokenBalance,
-            LiquityTroveEvent,
-            LiquityStakeEvent,
-            ManuallyTrackedBalanceWithValue,
-            Trove,
-            StakePosition,
-            DillBalance,
-            NFTResult,
-            ExchangeLocationID,
-            WeightedNode,
-    )):
-        return process_result(entry.serialize())
-    if isinstance(entry, (
-            DBSettings,
-            CompoundEvent,
-            VersionCheckResult,
-            DBSettings,
-            DSRCurrentBalances,
-            VaultEvent,
-            MakerdaoVaultDetails,
-            AaveBalances,
-            AaveHistory,
-            DefiBalance,
-            DefiProtocolBalances,
-            YearnVaultHistory,
-            BlockchainAccountData,
-    )):
-        return process_result(entry._asdict())
-    if isinstance(entry, tuple):
-        raise ValueError('Query results should not contain plain tuples')
-    if isinstance(entry, Asset):
-        return entry.identifier
-    if isinstance(entry, (
-            TradeType,
-            Location,
-            KrakenAccountType,
-            Location,
-            VaultEventType,
-            AssetMovementCategory,
-            CurrentPriceOracle,
-            HistoricalPriceOracle,
-            LedgerActionType,
-            TroveOperation,
-            LiquityStakeEvent,
-            TroveOperation,
-            LiquityStakeEventType,
-            BalanceType,
-            CostBasisMethod,
-            EvmTokenKind,
-    )):
-        return str(entry)
-
-    # else
-    return entry
+def _serialize_location_data(entry: LocationData) -> Dict[str, Any]:
+    return {
+        'time': entry.time,
+        'location': str(Location.deserialize_from_db(entry.location)),
+        'usd_value': entry.usd_value,
+    }
+
+
+def _serialize_single_db_asset_balance(entry: SingleDBAssetBalance) -> Dict[str, Any]:
+    return {
+        'time': entry.time,
+        'category': str(entry.category),
+        'amount': str(entry.amount),
+        'usd_value': str(entry.usd_value),
+    }
+
+
+def _serialize_db_asset_balance(entry: DBAssetBalance) -> Dict[str, Any]:
+    return {
+        'time': entry.time,
+        'category': str(entry.category),
+        'asset': entry.asset.identifier,
+        'amount': str(entry.amount),
+        'usd_value': str(entry.usd_value),
+    }
+
+
+register_json_encoder((AttributeDict,), dict)
+register_json_encoder((HexBytes,), lambda x: x.hex())
+register_json_encoder((LocationData,), _serialize_location_data)
+register_json_encoder((SingleDBAssetBalance,), _serialize_single_db_asset_balance)
+register_json_encoder((DBAssetBalance,), _serialize_db_asset_balance)
+register_json_encoder(
+    (
+        DefiProtocol,
+        MakerdaoVault,
+        XpubData,
+        Eth2Deposit,
+        StakingEvent,
+        NodeName,
+        ChainID,
+        Trade,
+        EthereumTransaction,
+        DSRAccountReport,
+        Balance,
+        AaveLendingBalance,
+        AaveBorrowingBalance,
+        CompoundBalance,
+        YearnVaultEvent,
+        YearnVaultBalance,
+        AaveEvent,
+        UniswapPool,
+        UniswapPoolAsset,
+        AMMTrade,
+        UniswapPoolEventsBalance,
+        ADXStakingHistory,
+        BalancerBPTEventPoolToken,
+        BalancerEvent,
+        BalancerPoolEventsBalance,
+        BalancerPoolBalance,
+        BalancerPoolTokenBalance,
+        LiquityTroveEvent,
+        LiquityStakeEvent,
+        ManuallyTrackedBalanceWithValue,
+        Trove,
+        StakePosition,
+        DillBalance,
+        NFTResult,
+        ExchangeLocationID,
+        WeightedNode,
+    ),
+    lambda x: x.serialize(),
+)
+register_json_encoder(
+    (
+        DBSettings,
+        CompoundEvent,
+        VersionCheckResult,
+        DSRCurrentBalances,
+        VaultEvent,
+        MakerdaoVaultDetails,
+        AaveBalances,
+        AaveHistory,
+        DefiBalance,
+        DefiProtocolBalances,
+        YearnVaultHistory,
+        BlockchainAccountData,
+    ),
+    lambda x: x._asdict(),
+)
+register_json_encoder(
+    (
+        TradeType,
+        Location,
+        KrakenAccountType,
+        VaultEventType,
+        AssetMovementCategory,
+        CurrentPriceOracle,
+        HistoricalPriceOracle,
+        LedgerActionType,
+        TroveOperation,
+        LiquityStakeEventType,
+        BalanceType,
+        CostBasisMethod,
+        EvmTokenKind,
+    ),
+    str,
+)
 
 
 def process_result(result: Any) -> Dict[Any, Any]:
@@ -218,13 +201,13 @@ def process_result(result: Any) -> Dict[Any, Any]:
         - all NamedTuples and Dataclasses must be serialized into dicts
         - all enums and more
     """
-    processed_result = _process_entry(result)
+    processed_result = serializable_copy(result)
     assert isinstance(processed_result, (Dict, AttributeDict))  # pylint: disable=isinstance-second-argument-not-valid-type  # noqa: E501
     return processed_result  # type: ignore
 
 
 def process_result_list(result: List[Any]) -> List[Any]:
     """Just like process_result but for lists"""
-    processed_result = _process_entry(result)
+    processed_result = serializable_copy(result)
     assert isinstance(processed_result, List)  # pylint: disable=isinstance-second-argument-not-valid-type  # noqa: E501
     return processed_result
@@ -470,6 +470,11 @@ class TaskManager():
         """
         Update the balances of a user if the difference between last time they were updated
         and the current time exceeds the `balance_save_frequency`.
+
+        The snapshot is incremental. Cached results of sources that are still fresh are
+        reused and only the sources whose cache expired are queried again. That way the
+        snapshot does not requery everything and make API requests for balances wait on it.
+        The eth1 accounts are still always checked for the eth2 validators they deposited to.
         """
         with self.database.conn.read_ctx() as cursor:
             if self.database.should_save_balances(cursor):
@@ -483,7 +488,8 @@ class TaskManager():
                     requested_save_data=True,
                     save_despite_errors=False,
                     timestamp=None,
-                    ignore_cache=True,
+                    ignore_cache=False,
+                    beaconchain_fetch_eth1=True,
                 )
 
     def _schedule(self) -> None:
@@ -367,6 +367,48 @@ def test_query_all_balances_ignore_cache(
         assert etherscan_mock.call_count == expected_count, msg
 
 
+@pytest.mark.parametrize('number_of_eth_accounts', [2])
+@pytest.mark.parametrize('btc_accounts', [[UNIT_BTC_ADDRESS1, UNIT_BTC_ADDRESS2]])
+@pytest.mark.parametrize('added_exchanges', [(Location.BINANCE, Location.POLONIEX)])
+def test_query_all_balances_cache_age(
+        rotkehlchen_api_server_with_exchanges,
+        ethereum_accounts,
+        btc_accounts,
+):
+    """Test that the query all balances endpoint returns the age of the oldest cached
+    result used, even though each balance source is queried in its own greenlet"""
+    rotki = rotkehlchen_api_server_with_exchanges.rest_api.rotkehlchen
+    setup = setup_balances(rotki, ethereum_accounts, btc_accounts)
+    now = ts_now()
+    with ExitStack() as stack:
+        setup.enter_all_patches(stack)
+        with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=now):
+            response = requests.get(
+                api_url_for(
+                    rotkehlchen_api_server_with_exchanges,
+                    'allbalancesresource',
+                ),
+            )
+            assert_proper_response(response)
+
+        with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=now + 10):
+            response = requests.get(
+                api_url_for(
+                    rotkehlchen_api_server_with_exchanges,
+                    'allbalancesresource',
+                ),
+            )
+            result = assert_proper_response_with_result(response)
+
+    assert_all_balances(
+        result=result,
+        db=rotki.data.db,
+        expected_data_in_db=True,
+        setup=setup,
+    )
+    assert response.json()['cache_age'] == 10
+
+
 @pytest.mark.parametrize('tags', [[{
     'name': 'private',
     'description': 'My private accounts',
@@ -507,28 +549,62 @@ def test_balance_snapshot_error_message(
 
     result = assert_proper_response_with_result(response)
     assert result == {'assets': {}, 'liabilities': {}, 'location': {}, 'net_usd': '0'}
-    websocket_connection.wait_until_messages_num(num=2, timeout=10)
-    assert websocket_connection.messages_num() == 2
-    msg = websocket_connection.pop_message()
-    assert msg == {
+    # the sources that succeeded also send their balances as they finish
+    websocket_connection.wait_until_messages_num(num=4, timeout=10)
+    messages = [websocket_connection.pop_message() for _ in range(4)]
+    queried_sources = {
+        msg['data']['source'] for msg in messages if msg['type'] == 'balance_source_queried'
+    }
+    assert queried_sources == {'blockchain', 'LP and nfts'}
+    messages = [msg for msg in messages if msg['type'] != 'balance_source_queried']
+    assert messages == [{
         'type': 'legacy',
         'data': {
             'value': 'binance account API request failed. Could not reach binance due to Made a booboo',  # noqa: E501
             'verbosity': 'error',
         },
-    }
-    assert websocket_connection.messages_num() == 1
-    msg = websocket_connection.pop_message()
-    assert msg == {
+    }, {
         'type': 'balance_snapshot_error',
         'data': {
             'location': 'binance',
             'error': 'binance account API request failed. Could not reach binance due to Made a booboo',  # noqa: E501
         },
-    }
+    }]
     assert websocket_connection.messages_num() == 0
 
 
+@pytest.mark.parametrize('number_of_eth_accounts', [0])
+@pytest.mark.parametrize('added_exchanges', [(Location.BINANCE,)])
+def test_balance_snapshot_source_timeout(rotkehlchen_api_server_with_exchanges):
+    """Test that a balance source that takes too long does not hold the snapshot back
+    and that the seconds spent on each source are saved along with the snapshot"""
+    rotki = rotkehlchen_api_server_with_exchanges.rest_api.rotkehlchen
+    binance = try_get_first_exchange(rotki.exchange_manager, Location.BINANCE)
+
+    def mock_binance_query_balances(**kwargs):  # pylint: disable=unused-argument
+        gevent.sleep(10)
+        return {}, ''
+
+    binance_patch = patch.object(binance, 'query_balances', side_effect=mock_binance_query_balances)  # noqa: E501
+    timeout_patch = patch('rotkehlchen.rotkehlchen.BALANCE_SOURCE_TIMEOUT', new=1)
+    with binance_patch, timeout_patch:
+        response = requests.get(
+            api_url_for(
+                rotkehlchen_api_server_with_exchanges,
+                'allbalancesresource',
+            ), json={'save_data': True, 'ignore_errors': True},
+        )
+
+    result = assert_proper_response_with_result(response)
+    assert result == {'assets': {}, 'liabilities': {}, 'location': {}, 'net_usd': '0'}
+    errors = rotki.msg_aggregator.consume_errors()
+    assert any('Query did not finish within 1 seconds' in x for x in errors)
+    with rotki.data.db.conn.read_ctx() as cursor:
+        timings = dict(cursor.execute('SELECT source, seconds FROM timed_balances_sources'))
+    assert {'exchange binance', 'blockchain', 'LP and nfts'} <= set(timings)
+    assert 1 <= timings['exchange binance'] < 10
+
+
 @pytest.mark.parametrize('number_of_eth_accounts', [2])
 @pytest.mark.parametrize('btc_accounts', [[UNIT_BTC_ADDRESS1, UNIT_BTC_ADDRESS2]])
 @pytest.mark.parametrize('separate_blockchain_calls', [True, False])
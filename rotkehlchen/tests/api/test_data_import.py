@@ -3,16 +3,19 @@ import shutil
 from http import HTTPStatus
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 import pytest
 import requests
 
+from rotkehlchen.data_import.importers.rotki_trades import RotkiGenericTradesImporter
 from rotkehlchen.db.filtering import (
     AssetMovementsFilterQuery,
     LedgerActionsFilterQuery,
     TradesFilterQuery,
 )
 from rotkehlchen.db.ledger_actions import DBLedgerActions
+from rotkehlchen.errors.misc import InputError
 from rotkehlchen.tests.utils.api import (
     api_url_for,
     assert_error_response,
@@ -489,6 +492,46 @@ def test_data_import_rotki_generic_events(rotkehlchen_api_server):
     assert_rotki_generic_events_import_results(rotki)
 
 
+def test_data_import_resumes_after_failure(rotkehlchen_api_server):
+    """Test that the rows committed by a failed import are kept and that importing the
+    same file again continues after them"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    dir_path = Path(__file__).resolve().parent.parent
+    filepath = dir_path / 'data' / 'rotki_generic_trades.csv'
+    json_data = {'source': 'rotki_trades', 'file': str(filepath)}
+    original_consume = RotkiGenericTradesImporter._consume_rotki_trades
+
+    def failing_consume(self, cursor, csv_row, **kwargs):
+        if csv_row['Location'] == 'kucoin':
+            raise InputError('Simulated failure')
+        return original_consume(self, cursor, csv_row, **kwargs)
+
+    consume_patch = patch.object(RotkiGenericTradesImporter, '_consume_rotki_trades', failing_consume)  # noqa: E501
+    with patch('rotkehlchen.data_import.utils.ITEMS_PER_DB_WRITE', 1), consume_patch:
+        response = requests.put(
+            api_url_for(rotkehlchen_api_server, 'dataimportresource'),
+            json=json_data,
+        )
+    assert_error_response(
+        response=response,
+        contained_in_msg='Simulated failure',
+        status_code=HTTPStatus.BAD_REQUEST,
+    )
+    with rotki.data.db.conn.read_ctx() as cursor:
+        _, trades_count = rotki.data.db.get_trades_and_limit_info(cursor, filter_query=TradesFilterQuery.make(), has_premium=True)  # noqa: E501
+        assert trades_count == 2  # the rows before the failing one were committed
+        assert cursor.execute('SELECT imported_rows FROM csv_import_checkpoints').fetchall() == [(2,)]  # noqa: E501
+
+    response = requests.put(
+        api_url_for(rotkehlchen_api_server, 'dataimportresource'),
+        json=json_data,
+    )
+    assert assert_proper_response_with_result(response) is True
+    assert_rotki_generic_trades_import_results(rotki)
+    with rotki.data.db.conn.read_ctx() as cursor:
+        assert cursor.execute('SELECT COUNT(*) FROM csv_import_checkpoints').fetchone()[0] == 0
+
+
 def test_docker_async_import(rotkehlchen_api_server):
     """Test that docker async csv import using POST on /import is initialized properly
         The test doesn't wait for import completion, it only tests successful import initialization
@@ -1,5 +1,6 @@
 from http import HTTPStatus
 from typing import Any, Dict, List
+from unittest.mock import patch
 
 import pytest
 import requests
@@ -219,3 +220,94 @@ def test_add_edit_delete_entries(rotkehlchen_api_server):
         )
         saved_events = db.get_history_events(cursor, HistoryEventFilterQuery.make(), True)
         assert saved_events == [entries[0], entries[3], entry]
+
+
+def _query_changes(server, **kwargs) -> Dict[str, Any]:
+    response = requests.get(
+        api_url_for(server, 'historybaseentryresource'),
+        json=kwargs,
+    )
+    return assert_proper_response_with_result(response)
+
+
+@pytest.mark.parametrize('number_of_eth_accounts', [0])
+def test_history_events_changes(rotkehlchen_api_server):
+    """Test that clients can get only the events added or edited after a sequence"""
+    entries = _add_entries(rotkehlchen_api_server)
+    result = _query_changes(rotkehlchen_api_server)
+    assert result['last_sequence'] == 5
+    assert [x['sequence'] for x in result['entries']] == [1, 2, 3, 4, 5]
+    assert [x['entry'] for x in result['entries']] == [x.serialize() for x in entries]
+    assert all(x['customized'] is True for x in result['entries'])
+    assert _query_changes(rotkehlchen_api_server, from_sequence=5) == {
+        'entries': [],
+        'last_sequence': 5,
+    }
+
+    # an edited event is returned again with the next sequence
+    entry = entries[2]
+    entry.notes = 'Edited notes'
+    response = requests.patch(
+        api_url_for(rotkehlchen_api_server, 'historybaseentryresource'),
+        json=entry_to_input_dict(entry, include_identifier=True),
+    )
+    assert_simple_ok_response(response)
+    result = _query_changes(rotkehlchen_api_server, from_sequence=5)
+    assert result['last_sequence'] == 6
+    assert [(x['sequence'], x['entry']) for x in result['entries']] == [(6, entry.serialize())]
+
+    # a deleted event is returned with the next sequence and sequences are not reused
+    deleted_identifier = entries[1].identifier
+    response = requests.delete(
+        api_url_for(rotkehlchen_api_server, 'historybaseentryresource'),
+        json={'identifiers': [deleted_identifier]},
+    )
+    assert_simple_ok_response(response)
+    new_entry = entries[1]
+    new_entry.sequence_index = 164
+    response = requests.put(
+        api_url_for(rotkehlchen_api_server, 'historybaseentryresource'),
+        json=entry_to_input_dict(new_entry, include_identifier=False),
+    )
+    new_entry.identifier = assert_proper_response_with_result(response)['identifier']
+    result = _query_changes(rotkehlchen_api_server, from_sequence=6)
+    assert result['last_sequence'] == 8
+    assert result['entries'] == [
+        {'identifier': deleted_identifier, 'sequence': 7, 'deleted': True},
+        {'entry': new_entry.serialize(), 'sequence': 8, 'customized': True, 'deleted': False},
+    ]
+
+    result = _query_changes(rotkehlchen_api_server, from_sequence=0, limit=2)
+    assert [x['sequence'] for x in result['entries']] == [1, 4]
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server, 'historybaseentryresource'),
+        json={'from_sequence': -1},
+    )
+    assert_error_response(
+        response=response,
+        contained_in_msg='from_sequence should be >= 0',
+        status_code=HTTPStatus.BAD_REQUEST,
+    )
+
+
+@pytest.mark.parametrize('number_of_eth_accounts', [0])
+@pytest.mark.parametrize('start_with_valid_premium', [False])
+def test_history_events_changes_free_limit(rotkehlchen_api_server):
+    """Test that without premium the change feed is limited to the events that the
+    history events query returns, while deletions of any event are returned"""
+    entries = _add_entries(rotkehlchen_api_server)
+    with patch('rotkehlchen.db.history_events.FREE_HISTORY_EVENTS_LIMIT', new=2):
+        result = _query_changes(rotkehlchen_api_server)
+        # the two latest events
+        assert [x['entry'] for x in result['entries']] == [entries[2].serialize(), entries[4].serialize()]  # noqa: E501
+        assert result['last_sequence'] == 5
+
+        response = requests.delete(
+            api_url_for(rotkehlchen_api_server, 'historybaseentryresource'),
+            json={'identifiers': [entries[0].identifier]},
+        )
+        assert_simple_ok_response(response)
+        result = _query_changes(rotkehlchen_api_server, from_sequence=5)
+        assert result['entries'] == [
+            {'identifier': entries[0].identifier, 'sequence': 6, 'deleted': True},
+        ]
@@ -11,10 +11,13 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.api import (
     api_url_for,
     assert_error_response,
+    assert_ok_async_response,
     assert_proper_response,
     assert_proper_response_with_result,
+    wait_for_async_task_with_result,
 )
 from rotkehlchen.utils.misc import get_system_spec
+from rotkehlchen.utils.sampling_profiler import HUB_TASK_NAME
 
 
 def test_query_info_version_when_up_to_date(rotkehlchen_api_server):
@@ -275,3 +278,67 @@ def test_configuration(rotkehlchen_api_server):
     assert result['max_logfiles_num']['value'] == DEFAULT_MAX_LOG_BACKUP_FILES
     assert result['sqlite_instructions']['is_default'] is True
     assert result['sqlite_instructions']['value'] == DEFAULT_SQL_VM_INSTRUCTIONS_CB
+
+
+def test_metrics(rotkehlchen_api_server):
+    """Test that metrics are collected only while enabled and can be read and reset"""
+    url = api_url_for(rotkehlchen_api_server, 'metricsresource')
+    try:
+        result = assert_proper_response_with_result(requests.patch(url, json={'enabled': True}))
+        assert result['enabled'] is True
+        # query something that hits the user DB
+        assert_proper_response(requests.get(api_url_for(rotkehlchen_api_server, 'settingsresource')))  # noqa: E501
+
+        result = assert_proper_response_with_result(requests.get(url))
+        user_db_timer = result['timers']['db_execute']['user']
+        assert user_db_timer['count'] > 0
+        assert user_db_timer['buckets']['+Inf'] == user_db_timer['count']
+
+        response = requests.get(url, json={'output_format': 'prometheus'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['Content-Type'].startswith('text/plain')
+        assert '# TYPE rotki_db_execute_seconds histogram' in response.text
+        assert 'rotki_db_execute_seconds_count{label="user"} ' in response.text
+
+        assert_proper_response(requests.delete(url))
+        result = assert_proper_response_with_result(requests.patch(url, json={'enabled': False}))  # noqa: E501
+        assert result == {'enabled': False, 'timers': {}, 'counters': {}}
+        assert_proper_response(requests.get(api_url_for(rotkehlchen_api_server, 'settingsresource')))  # noqa: E501
+        result = assert_proper_response_with_result(requests.get(url))
+        assert result['timers'] == {}, 'nothing should be collected while disabled'
+
+        response = requests.get(url, json={'output_format': 'xml'})
+        assert_error_response(response, contained_in_msg='Must be one of', status_code=HTTPStatus.BAD_REQUEST)  # noqa: E501
+    finally:
+        requests.patch(url, json={'enabled': False})
+        requests.delete(url)
+
+
+def test_profiler(rotkehlchen_api_server):
+    """Test that the backend can be profiled and the profile returned in both formats"""
+    url = api_url_for(rotkehlchen_api_server, 'profilerresource')
+    response = requests.put(url, json={'seconds': 1, 'async_query': True})
+    task_id = assert_ok_async_response(response)
+    # only one profile can run at a time
+    response = requests.put(url, json={'seconds': 1})
+    assert_error_response(response, contained_in_msg='already being profiled', status_code=HTTPStatus.CONFLICT)  # noqa: E501
+    result = wait_for_async_task_with_result(rotkehlchen_api_server, task_id)
+    assert result['duration'] >= 1
+    assert result['samples'] > 0
+    task_names = {x['task_name'] for x in result['greenlets']}
+    assert HUB_TASK_NAME in task_names
+    assert sum(x['percentage'] for x in result['greenlets']) == pytest.approx(100, abs=1)
+    for line in result['collapsed_stacks'].splitlines():
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) >= 0
+        assert stack.split(';')[0] in task_names
+
+    response = requests.put(url, json={'seconds': 1, 'output_format': 'collapsed'})
+    assert response.status_code == HTTPStatus.OK
+    assert 'attachment' in response.headers['Content-Disposition']
+    assert len(response.text.splitlines()) != 0
+
+    response = requests.put(url, json={'seconds': 1, 'async_query': True, 'output_format': 'collapsed'})  # noqa: E501
+    assert_error_response(response, contained_in_msg='can not be returned by an async query')
+    response = requests.put(url, json={'seconds': 0})
+    assert_error_response(response, contained_in_msg='profiling seconds should be between 1')
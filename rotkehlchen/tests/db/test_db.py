@@ -11,11 +11,14 @@ from rotkehlchen.accounting.structures.balance import BalanceType
 from rotkehlchen.accounting.structures.types import ActionType
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.balances.manual import ManuallyTrackedBalance
+from rotkehlchen.chain.ethereum.modules.eth2.structures import Eth2Validator, ValidatorDailyStats
 from rotkehlchen.constants import ONE, YEAR_IN_SECONDS
 from rotkehlchen.constants.assets import A_1INCH, A_BTC, A_DAI, A_ETH, A_ETH2, A_USD
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.drivers.gevent import DBCursor
+from rotkehlchen.db.eth2 import DBEth2
 from rotkehlchen.db.filtering import AssetMovementsFilterQuery, TradesFilterQuery
 from rotkehlchen.db.misc import detect_sqlcipher_version
 from rotkehlchen.db.queried_addresses import QueriedAddresses
@@ -49,6 +52,7 @@ from rotkehlchen.db.utils import (
     DBAssetBalance,
     LocationData,
     SingleDBAssetBalance,
+    fetchone_cached,
 )
 from rotkehlchen.errors.api import AuthenticationError
 from rotkehlchen.errors.misc import InputError
@@ -138,6 +142,12 @@ TABLES_AT_INIT = [
     'address_book',
     'web3_nodes',
     'user_notes',
+    'ethereum_block_timestamps',
+    'xpub_derivation_progress',
+    'csv_import_checkpoints',
+    'history_events_changes',
+    'sqlite_sequence',
+    'timed_balances_sources',
 ]
 
 
@@ -354,6 +364,7 @@ def test_writing_fetching_data(data_dir, username, sql_vm_instructions_cb):
         'have_premium': False,
         'ksm_rpc_endpoint': 'http://localhost:9933',
         'dot_rpc_endpoint': '',
+        'beacon_rpc_endpoint': '',
         'ui_floating_precision': DEFAULT_UI_FLOATING_PRECISION,
         'version': ROTKEHLCHEN_DB_VERSION,
         'include_crypto2crypto': DEFAULT_INCLUDE_CRYPTO2CRYPTO,
@@ -1268,6 +1279,10 @@ def test_multiple_location_data_and_balances_same_timestamp(user_data_dir, sql_v
 
     locations = [
         LocationData(
+            time=1590676728,
+            location='B',
+            usd_value='10',
+        ), LocationData(
             time=1590676728,
             location='H',
             usd_value='55',
@@ -1280,7 +1295,9 @@ def test_multiple_location_data_and_balances_same_timestamp(user_data_dir, sql_v
     with pytest.raises(InputError) as exc_info:
         with db.user_write() as cursor:
             db.add_multiple_location_data(cursor, locations)
-    assert 'Tried to add a timed_location_data for' in str(exc_info.value)
+    assert str(exc_info.value) == (
+        'Tried to add a timed_location_data for total at already existing timestamp 1590676728.'
+    )
     assert exc_info.errisinstance(InputError)
 
     locations = db.get_latest_location_value_distribution()
@@ -1519,3 +1536,98 @@ def test_fresh_db_adds_version(user_data_dir, sql_vm_instructions_cb):
     query = query.fetchall()
     assert len(query) != 0
     assert int(query[0][0]) == ROTKEHLCHEN_DB_VERSION
+
+
+def test_fetchone_cached(database):
+    """Test that aggregate query results are cached until a table they read is written"""
+    trade1, trade2 = [Trade(
+        timestamp=Timestamp(timestamp),
+        location=Location.EXTERNAL,
+        base_asset=A_ETH,
+        quote_asset=A_BTC,
+        trade_type=TradeType.BUY,
+        amount=AssetAmount(ONE),
+        rate=Price(ONE),
+        fee=Fee(FVal('0.1')),
+        fee_currency=A_BTC,
+        link='',
+        notes='',
+    ) for timestamp in (1, 2)]
+    query = 'SELECT COUNT(*) FROM combined_trades_view WHERE location=?'
+    bindings = (Location.EXTERNAL.serialize_for_db(),)
+    no_queries = patch.object(DBCursor, 'execute', side_effect=AssertionError('Should be cached'))  # noqa: E501
+    with database.conn.read_ctx() as cursor:
+        assert fetchone_cached(cursor, query, bindings) == (0,)
+        with no_queries:
+            assert fetchone_cached(cursor, query, bindings) == (0,)
+
+    # writing to a table the query does not read keeps the result cached
+    with database.user_write() as write_cursor:
+        write_cursor.execute('INSERT INTO user_notes(title, content, location, last_update_timestamp, is_pinned) VALUES(?, ?, ?, ?, ?)', ('a', 'b', 'c', 1, 0))  # noqa: E501
+    with database.conn.read_ctx() as cursor, no_queries:
+        assert fetchone_cached(cursor, query, bindings) == (0,)
+
+    with database.user_write() as write_cursor:
+        database.add_trades(write_cursor, [trade1])
+    with database.conn.read_ctx() as cursor:
+        assert fetchone_cached(cursor, query, bindings) == (1,)
+
+    # a rolled back write invalidates the results read during the transaction
+    with pytest.raises(ValueError), database.user_write() as write_cursor:
+        database.add_trades(write_cursor, [trade2])
+        assert fetchone_cached(write_cursor, query, bindings) == (2,)
+        raise ValueError('roll back')
+    with database.conn.read_ctx() as cursor:
+        assert fetchone_cached(cursor, query, bindings) == (1,)
+
+
+def test_fetchone_cached_foreign_key_actions(database):
+    """Test that cached aggregate query results are invalidated by writes that the
+    foreign keys of the tables they read cascade to them"""
+    dbeth2 = DBEth2(database)
+    with database.user_write() as write_cursor:
+        dbeth2.add_validators(write_cursor, [Eth2Validator(index=1, public_key='0xfoo1', ownership_proportion=ONE)])  # noqa: E501
+    dbeth2.add_validator_daily_stats([ValidatorDailyStats(
+        validator_index=1,
+        timestamp=1607126400,
+        start_usd_price=ONE,
+        end_usd_price=ONE,
+        pnl=ZERO,
+        start_amount=ZERO,
+        end_amount=FVal(32),
+    )])
+    stats_query = 'SELECT COUNT(*) FROM eth2_daily_staking_details WHERE validator_index=?'
+    with database.conn.read_ctx() as cursor:
+        assert fetchone_cached(cursor, stats_query, (1,)) == (1,)
+
+    # deleting the validator deletes its daily stats
+    dbeth2.delete_validator(validator_index=1, public_key=None)
+    with database.conn.read_ctx() as cursor:
+        assert fetchone_cached(cursor, stats_query, (1,)) == (0,)
+
+    with database.user_write() as write_cursor:
+        database.add_trades(write_cursor, [Trade(
+            timestamp=Timestamp(1),
+            location=Location.EXTERNAL,
+            base_asset=A_DAI,
+            quote_asset=A_BTC,
+            trade_type=TradeType.BUY,
+            amount=AssetAmount(ONE),
+            rate=Price(ONE),
+            fee=Fee(FVal('0.1')),
+            fee_currency=A_BTC,
+            link='',
+            notes='',
+        )])
+    trades_query = 'SELECT COUNT(*) FROM trades WHERE base_asset=?'
+    with database.conn.read_ctx() as cursor:
+        assert fetchone_cached(cursor, trades_query, ('new-dai',)) == (0,)
+
+    # merging an asset into another updates the identifier of the asset in the trades
+    with database.user_write() as write_cursor:
+        write_cursor.execute(
+            'UPDATE assets SET identifier=? WHERE identifier=?;',
+            ('new-dai', A_DAI.identifier),
+        )
+    with database.conn.read_ctx() as cursor:
+        assert fetchone_cached(cursor, trades_query, ('new-dai',)) == (1,)
@@ -820,6 +820,9 @@ def test_latest_upgrade_adds_remove_tables(user_data_dir):
     cursor = db.conn.cursor()
     result = cursor.execute('SELECT name FROM sqlite_master WHERE type="table"')
     tables_after_upgrade = {x[0] for x in result}
+    result = cursor.execute('SELECT name FROM sqlite_master WHERE type="index"')
+    indices_after_upgrade = {x[0] for x in result}
+    assert {'history_events_timestamp', 'ethereum_block_timestamps_timestamp'} <= indices_after_upgrade  # noqa: E501
     # also add latest tables (this will indicate if DB upgrade missed something
     db.conn.executescript(DB_SCRIPT_CREATE_TABLES)
     result = cursor.execute('SELECT name FROM sqlite_master WHERE type="table"')
@@ -830,7 +833,15 @@ def test_latest_upgrade_adds_remove_tables(user_data_dir):
     assert missing_tables == removed_tables
     assert tables_after_creation - tables_after_upgrade == set()
     new_tables = tables_after_upgrade - tables_before
-    assert new_tables == {'user_notes'}
+    assert new_tables == {
+        'user_notes',
+        'ethereum_block_timestamps',
+        'xpub_derivation_progress',
+        'csv_import_checkpoints',
+        'history_events_changes',
+        'sqlite_sequence',
+        'timed_balances_sources',
+    }
 
 
 def test_db_newer_than_software_raises_error(data_dir, username, sql_vm_instructions_cb):
@@ -284,3 +284,20 @@ def test_query_also_internal_ethereum_transactions(data_dir, username, sql_vm_in
             has_premium=True,
         )
         assert result == [tx1, tx3, tx4]
+
+
+def test_get_blocks_around_timestamp(database):
+    dbethtx = DBEthTx(database)
+    with database.user_write() as write_cursor:
+        dbethtx.add_block_timestamps(
+            write_cursor=write_cursor,
+            blocks=[(100, Timestamp(1000)), (110, Timestamp(1130)), (111, Timestamp(1145))],
+        )
+        # adding known blocks again is ignored
+        dbethtx.add_block_timestamps(write_cursor=write_cursor, blocks=[(100, Timestamp(1000))])
+
+    with database.conn.read_ctx() as cursor:
+        assert dbethtx.get_blocks_around_timestamp(cursor, Timestamp(999)) == (None, (100, 1000))
+        assert dbethtx.get_blocks_around_timestamp(cursor, Timestamp(1000)) == ((100, 1000), (110, 1130))  # noqa: E501
+        assert dbethtx.get_blocks_around_timestamp(cursor, Timestamp(1140)) == ((110, 1130), (111, 1145))  # noqa: E501
+        assert dbethtx.get_blocks_around_timestamp(cursor, Timestamp(1200)) == ((111, 1145), None)
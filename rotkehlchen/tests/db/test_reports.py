@@ -1,7 +1,13 @@
-from rotkehlchen.accounting.pnl import PnlTotals
-from rotkehlchen.db.reports import DBAccountingReports
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.constants.misc import ONE, ZERO
+from rotkehlchen.db.filtering import ReportDataFilterQuery
+from rotkehlchen.db.reports import DBAccountingReports, DBReportDataWriter
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.tests.utils.constants import A_GBP
+from rotkehlchen.types import Location, Price, Timestamp
 
 
 def test_report_settings(database):
@@ -55,3 +61,46 @@ def test_report_settings(database):
         else:
             value = getattr(settings, setting_name)
         assert returned_settings[x] == value
+
+
+def test_report_data_writer_batches(database):
+    dbreport = DBAccountingReports(database)
+    report_id = dbreport.add_report(
+        first_processed_timestamp=1,
+        start_ts=0,
+        end_ts=10,
+        settings=DBSettings(),
+    )
+    writer = DBReportDataWriter(database=database, report_id=report_id, batch_size=2)
+
+    def written_events_num():
+        _, entries_found = dbreport.get_report_data(
+            filter_=ReportDataFilterQuery.make(report_id=report_id),
+            with_limit=False,
+        )
+        return entries_found
+
+    for idx in range(3):
+        writer.add(
+            time=Timestamp(idx + 1),
+            ts_converter=str,
+            event=ProcessedAccountingEvent(
+                type=AccountingEventType.TRADE,
+                notes=f'event {idx}',
+                location=Location.KRAKEN,
+                timestamp=Timestamp(idx + 1),
+                asset=A_ETH,
+                free_amount=ZERO,
+                taxable_amount=ONE,
+                price=Price(ONE),
+                pnl=PNL(),
+                cost_basis=None,
+                index=idx,
+            ),
+        )
+        # only full batches are written
+        assert written_events_num() == 2 * ((idx + 1) // 2)
+
+    writer.flush()
+    assert written_events_num() == 3
+    assert writer.pending == []
@@ -123,6 +123,35 @@ def test_get_last_consecutive_xpub_derived_indices(setup_db_for_xpub_tests):
         assert change_idx == 0
 
 
+def test_xpub_derivation_start_indices(setup_db_for_xpub_tests):
+    """Test that saved derivation progress is used instead of the derived indices"""
+    db, xpub1, xpub2, _, _ = setup_db_for_xpub_tests
+    with db.user_write() as cursor:
+        assert db.get_xpub_derivation_start_indices(cursor, xpub1, SupportedBlockchain.BITCOIN_CASH) == (1, 0)  # noqa: E501
+        db.set_xpub_derivation_start_indices(
+            write_cursor=cursor,
+            xpub_data=xpub1,
+            blockchain=SupportedBlockchain.BITCOIN_CASH,
+            receiving_index=6,
+            change_index=2,
+        )
+        # xpub1 is not tracked for bitcoin so nothing is saved for it
+        db.set_xpub_derivation_start_indices(
+            write_cursor=cursor,
+            xpub_data=xpub1,
+            blockchain=SupportedBlockchain.BITCOIN,
+            receiving_index=10,
+            change_index=10,
+        )
+        assert db.get_xpub_derivation_start_indices(cursor, xpub1, SupportedBlockchain.BITCOIN_CASH) == (6, 2)  # noqa: E501
+        assert db.get_xpub_derivation_start_indices(cursor, xpub1, SupportedBlockchain.BITCOIN) == (1, 0)  # noqa: E501
+        assert db.get_xpub_derivation_start_indices(cursor, xpub2, SupportedBlockchain.BITCOIN) == (0, 3)  # noqa: E501
+
+        db.delete_bitcoin_xpub(cursor, xpub1, SupportedBlockchain.BITCOIN_CASH)
+        cursor.execute('SELECT COUNT(*) FROM xpub_derivation_progress')
+        assert cursor.fetchone()[0] == 0
+
+
 def test_get_addresses_to_xpub_mapping(setup_db_for_xpub_tests):
     db, xpub1, xpub2, _, all_addresses = setup_db_for_xpub_tests
     # Also add a non-existing address in there for fun
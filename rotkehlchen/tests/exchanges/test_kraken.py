@@ -3,6 +3,7 @@ from contextlib import ExitStack
 from http import HTTPStatus
 from pathlib import Path
 from unittest.mock import patch
+from urllib.parse import parse_qs
 
 import gevent
 import pytest
@@ -26,6 +27,8 @@ from rotkehlchen.constants.assets import (
     A_XRP,
 )
 from rotkehlchen.constants.limits import FREE_HISTORY_EVENTS_LIMIT
+from rotkehlchen.db.filtering import HistoryEventFilterQuery
+from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair
 from rotkehlchen.errors.serialization import DeserializationError
@@ -191,6 +194,151 @@ def test_querying_rate_limit_exhaustion(function_scope_kraken, database):
     assert to_ts == 1638529919, 'should have saved only until the last trades timestamp'
 
 
+def test_kraken_ledger_query_resumes_from_cursor(function_scope_kraken, database):
+    """Test that the ledger entries are saved as the pages come and that after an
+    interrupted query the next one only queries the ledger before the saved cursor"""
+    kraken = function_scope_kraken
+    kraken.use_original_kraken = True
+    kraken.reduction_every_secs = 0.05
+    end_ts = Timestamp(1638529919)
+    first_page = '{"result":{"ledger":{"L1":{"refid":"R1","time":1000.5,"type":"deposit","subtype":"","aclass":"currency","asset":"XETH","amount":"1","fee":"0","balance":"1"},"L2":{"refid":"R2","time":900.2,"type":"trade","subtype":"","aclass":"currency","asset":"ZEUR","amount":"50","fee":"0","balance":"50"}},"count":4}}'  # noqa: E501
+    older_ledger = '{"result":{"ledger":{"L2":{"refid":"R2","time":900.2,"type":"trade","subtype":"","aclass":"currency","asset":"ZEUR","amount":"50","fee":"0","balance":"50"},"L3":{"refid":"R2","time":900.2,"type":"trade","subtype":"","aclass":"currency","asset":"XETH","amount":"-0.1","fee":"0","balance":"0.9"},"L4":{"refid":"R3","time":800,"type":"withdrawal","subtype":"","aclass":"currency","asset":"XETH","amount":"-0.5","fee":"0.001","balance":"0.4"}},"count":3}}'  # noqa: E501
+    ledger_requests = []
+
+    def mock_response(url, **kwargs):
+        if 'Ledgers' in url:
+            request = parse_qs(kwargs['data'].decode())
+            ledger_requests.append(request)
+            if request['end'] == ['900']:
+                return MockResponse(200, older_ledger)
+            if 'ofs' not in request:
+                return MockResponse(200, first_page)
+            return MockResponse(200, '{"result": "", "error": "EAPI Rate limit exceeded"}')
+        raise AssertionError(f'Unexpected url in kraken query: {url}')
+
+    def get_events():
+        with database.conn.read_ctx() as cursor:
+            return DBHistoryEvents(database).get_history_events(
+                cursor=cursor,
+                filter_query=HistoryEventFilterQuery.make(location=Location.KRAKEN),
+                has_premium=True,
+            )
+
+    with ExitStack() as stack:
+        stack.enter_context(gevent.Timeout(8))
+        stack.enter_context(patch('rotkehlchen.exchanges.kraken.KRAKEN_QUERY_TRIES', new=1))
+        stack.enter_context(patch('rotkehlchen.exchanges.kraken.KRAKEN_BACKOFF_DIVIDEND', new=0))  # noqa: E501
+        stack.enter_context(patch.object(kraken.session, 'post', side_effect=mock_response))
+        with database.conn.read_ctx() as cursor:
+            assert kraken.query_kraken_ledgers(cursor, start_ts=Timestamp(0), end_ts=end_ts) is True  # noqa: E501
+        # the deposit got saved while the trade that may continue in the next page did not
+        assert [x.event_identifier for x in get_events()] == [b'R1']
+        with database.conn.read_ctx() as cursor:
+            assert database.get_used_query_range(cursor, 'kraken_ledger_cursor_mockkraken') == (901, end_ts)  # noqa: E501
+            assert database.get_used_query_range(cursor, 'kraken_history_events_mockkraken') is None  # noqa: E501
+
+        ledger_requests.clear()
+        with database.conn.read_ctx() as cursor:
+            assert kraken.query_kraken_ledgers(cursor, start_ts=Timestamp(0), end_ts=end_ts) is False  # noqa: E501
+
+    assert len(ledger_requests) == 1
+    assert ledger_requests[0]['start'] == ['0']
+    assert ledger_requests[0]['end'] == ['900']
+    events = get_events()
+    assert len(events) == 5  # deposit, trade spend and receive, withdrawal and its fee
+    assert {x.event_identifier for x in events} == {b'R1', b'R2', b'R3'}
+    with database.conn.read_ctx() as cursor:
+        assert database.get_used_query_range(cursor, 'kraken_ledger_cursor_mockkraken') is None
+        assert database.get_used_query_range(cursor, 'kraken_history_events_mockkraken') == (0, end_ts)  # noqa: E501
+
+
+def test_kraken_ledger_group_split_across_pages(function_scope_kraken, database):
+    """Test that a refid group whose entries are split across two pages is not saved
+    in part, even if it has no entry at the oldest time of the first page"""
+    kraken = function_scope_kraken
+    kraken.use_original_kraken = True
+    kraken.reduction_every_secs = 0.05
+    end_ts = Timestamp(1638529919)
+    receive = '"L1":{"refid":"R1","time":1000.4497,"type":"trade","subtype":"","aclass":"currency","asset":"ZEUR","amount":"50","fee":"0","balance":"50"}'  # noqa: E501
+    deposit = '"L2":{"refid":"R2","time":1000.4490,"type":"deposit","subtype":"","aclass":"currency","asset":"XETH","amount":"1","fee":"0","balance":"1.1"}'  # noqa: E501
+    spend = '"L3":{"refid":"R1","time":1000.4486,"type":"trade","subtype":"","aclass":"currency","asset":"XETH","amount":"-0.1","fee":"0","balance":"0.1"}'  # noqa: E501
+    first_page = f'{{"result":{{"ledger":{{{receive},{deposit}}},"count":3}}}}'
+    full_ledger = f'{{"result":{{"ledger":{{{receive},{deposit},{spend}}},"count":3}}}}'
+    ledger_requests = []
+
+    def mock_response(url, **kwargs):
+        if 'Ledgers' in url:
+            request = parse_qs(kwargs['data'].decode())
+            ledger_requests.append(request)
+            if len(ledger_requests) > 2:
+                return MockResponse(200, full_ledger)
+            if 'ofs' not in request:
+                return MockResponse(200, first_page)
+            return MockResponse(200, '{"result": "", "error": "EAPI Rate limit exceeded"}')
+        raise AssertionError(f'Unexpected url in kraken query: {url}')
+
+    def get_events():
+        with database.conn.read_ctx() as cursor:
+            return DBHistoryEvents(database).get_history_events(
+                cursor=cursor,
+                filter_query=HistoryEventFilterQuery.make(location=Location.KRAKEN),
+                has_premium=True,
+            )
+
+    with ExitStack() as stack:
+        stack.enter_context(gevent.Timeout(8))
+        stack.enter_context(patch('rotkehlchen.exchanges.kraken.KRAKEN_QUERY_TRIES', new=1))
+        stack.enter_context(patch('rotkehlchen.exchanges.kraken.KRAKEN_BACKOFF_DIVIDEND', new=0))  # noqa: E501
+        stack.enter_context(patch.object(kraken.session, 'post', side_effect=mock_response))
+        with database.conn.read_ctx() as cursor:
+            assert kraken.query_kraken_ledgers(cursor, start_ts=Timestamp(0), end_ts=end_ts) is True  # noqa: E501
+        # the trade may continue in the next page so nothing of it got saved
+        assert get_events() == []
+        with database.conn.read_ctx() as cursor:
+            assert kraken.query_kraken_ledgers(cursor, start_ts=Timestamp(0), end_ts=end_ts) is False  # noqa: E501
+
+    trade_events = [x for x in get_events() if x.event_identifier == b'R1']
+    assert sorted((x.sequence_index, x.asset) for x in trade_events) == [(0, A_EUR), (1, A_ETH)]
+
+
+def test_kraken_concurrent_ledger_queries(function_scope_kraken, database):
+    """Test that concurrent ledger queries, as done for trades and for deposits and
+    withdrawals, don't query the same range twice"""
+    kraken = function_scope_kraken
+    kraken.use_original_kraken = True
+    end_ts = Timestamp(1638529919)
+    ledger = '{"result":{"ledger":{"L1":{"refid":"R1","time":1000.5,"type":"deposit","subtype":"","aclass":"currency","asset":"XETH","amount":"1","fee":"0","balance":"1"},"L4":{"refid":"R3","time":800,"type":"withdrawal","subtype":"","aclass":"currency","asset":"XETH","amount":"-0.5","fee":"0.001","balance":"0.4"}},"count":2}}'  # noqa: E501
+    ledger_requests = []
+
+    def mock_response(url, **kwargs):
+        if 'Ledgers' in url:
+            ledger_requests.append(parse_qs(kwargs['data'].decode()))
+            gevent.sleep(0.1)  # let the other query run meanwhile
+            return MockResponse(200, ledger)
+        raise AssertionError(f'Unexpected url in kraken query: {url}')
+
+    def query_ledgers():
+        with database.conn.read_ctx() as cursor:
+            return kraken.query_kraken_ledgers(cursor, start_ts=Timestamp(0), end_ts=end_ts)
+
+    with ExitStack() as stack:
+        stack.enter_context(gevent.Timeout(8))
+        stack.enter_context(patch.object(kraken.session, 'post', side_effect=mock_response))
+        greenlets = [gevent.spawn(query_ledgers) for _ in range(2)]
+        gevent.joinall(greenlets, raise_error=True)
+
+    assert [x.value for x in greenlets] == [False, False]
+    assert len(ledger_requests) == 1
+    with database.conn.read_ctx() as cursor:
+        events = DBHistoryEvents(database).get_history_events(
+            cursor=cursor,
+            filter_query=HistoryEventFilterQuery.make(location=Location.KRAKEN),
+            has_premium=True,
+        )
+        assert database.get_used_query_range(cursor, 'kraken_history_events_mockkraken') == (0, end_ts)  # noqa: E501
+    assert len(events) == 3  # deposit, withdrawal and its fee
+
+
 def test_querying_deposits_withdrawals(function_scope_kraken):
     kraken = function_scope_kraken
     kraken.random_ledgers_data = False
@@ -19,7 +19,11 @@ from rotkehlchen.constants.assets import (
     A_EUR,
     A_USD,
 )
-from rotkehlchen.externalapis.cryptocompare import CRYPTOCOMPARE_HOURQUERYLIMIT, Cryptocompare
+from rotkehlchen.externalapis.cryptocompare import (
+    CRYPTOCOMPARE_HOURQUERYLIMIT,
+    Cryptocompare,
+    coalesce_histohour_windows,
+)
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
@@ -71,6 +75,66 @@ def test_cryptocompare_historical_data_use_cached_price(data_dir, database, hist
     assert result == FVal(396.56)
 
 
+def test_coalesce_histohour_windows():
+    """Test that the needed timestamps are covered by the fewest histohour windows"""
+    assert coalesce_histohour_windows(timestamps=[], cached_timestamps=[]) == []
+    # timestamps up to the query limit apart are fetched by a single window
+    last_ts = 3600 * (CRYPTOCOMPARE_HOURQUERYLIMIT + 1) - 5
+    assert coalesce_histohour_windows(
+        timestamps=[3700, 7300, last_ts, last_ts + 10],
+        cached_timestamps=[],
+    ) == [(3600, 3600 * (CRYPTOCOMPARE_HOURQUERYLIMIT + 1))]
+    # one more hour needs another window
+    assert coalesce_histohour_windows(
+        timestamps=[3700, last_ts + 10],
+        cached_timestamps=[],
+    ) == [(3600, 7200), (last_ts - 3595, last_ts + 5)]
+    # timestamps with a cached price up to an hour away are skipped
+    assert coalesce_histohour_windows(
+        timestamps=[3700, 36000, 90000, 200000],
+        cached_timestamps=[7300, 36000, 86399, 200000 + 3601],
+    ) == [(86400, 90000), (198000, 201600)]
+
+
+def test_cryptocompare_query_and_store_historical_ranges(data_dir, database):
+    """Test that the histohour windows of all the needs are queried and stored"""
+    cc = Cryptocompare(data_directory=data_dir, database=database)
+    cc_eth_start_ts = 1500000000 - 1500000000 % 3600
+
+    def mock_histohour(from_asset, to_asset, limit, to_timestamp):
+        data = [{'time': to_timestamp - idx * 3600, 'high': '3', 'low': '1'} for idx in range(limit + 1)]  # noqa: E501
+        for entry in data:
+            if entry['time'] < cc_eth_start_ts:  # no prices before that
+                entry['high'] = entry['low'] = '0'
+        return {'TimeFrom': data[-1]['time'], 'TimeTo': to_timestamp, 'Data': data[::-1]}
+
+    needs = [
+        (A_ETH, A_USD, Timestamp(cc_eth_start_ts - 7200)),
+        (A_ETH, A_USD, Timestamp(cc_eth_start_ts + 100)),
+        (A_ETH, A_USD, Timestamp(cc_eth_start_ts + 3600 * 5000)),
+        (A_BTC, A_USD, Timestamp(cc_eth_start_ts)),
+        (A_USD, A_EUR, Timestamp(cc_eth_start_ts)),  # fiat to fiat is skipped
+        (A_USD, A_USD, Timestamp(cc_eth_start_ts)),
+    ]
+    with patch.object(cc, 'query_endpoint_histohour', side_effect=mock_histohour) as histohour_mock:  # noqa: E501
+        cc.query_and_store_historical_ranges(needs)
+        assert histohour_mock.call_count == 3
+
+        result = get_globaldb_cache_entries(from_asset=A_ETH, to_asset=A_USD)
+        assert [x.timestamp for x in result] == [
+            cc_eth_start_ts,
+            cc_eth_start_ts + 3600,
+            cc_eth_start_ts + 3600 * 5000,
+            cc_eth_start_ts + 3600 * 5001,
+        ]
+        assert all(x.price == Price(FVal(2)) for x in result)
+        assert len(get_globaldb_cache_entries(from_asset=A_BTC, to_asset=A_USD)) == 2
+
+        # all needs but the one without prices are now cached
+        cc.query_and_store_historical_ranges(needs[1:])
+        assert histohour_mock.call_count == 3
+
+
 def check_cc_result(result: List, forward: bool):
     for idx, entry in enumerate(result):
         if idx != 0:
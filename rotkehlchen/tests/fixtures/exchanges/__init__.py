@@ -21,7 +21,14 @@ from .poloniex import *  # noqa: F401, F403
 
 
 @pytest.fixture(name='exchange_manager')
-def fixture_exchange_manager(function_scope_messages_aggregator, database) -> ExchangeManager:
-    exchange_manager = ExchangeManager(msg_aggregator=function_scope_messages_aggregator)
+def fixture_exchange_manager(
+        function_scope_messages_aggregator,
+        database,
+        function_greenlet_manager,
+) -> ExchangeManager:
+    exchange_manager = ExchangeManager(
+        msg_aggregator=function_scope_messages_aggregator,
+        greenlet_manager=function_greenlet_manager,
+    )
     exchange_manager.initialize_exchanges(exchange_credentials={}, database=database)
     return exchange_manager
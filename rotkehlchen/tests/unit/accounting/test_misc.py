@@ -1,16 +1,21 @@
 import pytest
 
+from rotkehlchen.accounting.events_stream import AccountingEventsStream, accounting_event_order_key
 from rotkehlchen.accounting.ledger_actions import LedgerAction, LedgerActionType
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import A_ETH, A_EUR, A_KFEE, A_USDT
+from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.accounting import accounting_history_process, check_pnls_and_csv
 from rotkehlchen.tests.utils.history import prices
 from rotkehlchen.tests.utils.messages import no_message_errors
-from rotkehlchen.types import Location, Timestamp, TradeType
+from rotkehlchen.types import Location, Timestamp, TimestampMS, TradeType
 
 
 @pytest.mark.parametrize('mocked_price_queries', [prices])
@@ -180,3 +185,54 @@ def test_fees_in_received_asset(accountant, google_service):
         AccountingEventType.LEDGER_ACTION: PNL(taxable=FVal('178.615'), free=ZERO),
     })
     check_pnls_and_csv(accountant, expected_pnls, google_service)
+
+
+def test_accounting_events_stream_order(database):
+    """Test that the history events streamed from the DB page by page and merged with
+    other events come in the same order as sorting all of them together"""
+    history_events = [HistoryBaseEntry(
+        event_identifier=idx.to_bytes(32, byteorder='big'),
+        sequence_index=sequence_index,
+        timestamp=TimestampMS(timestamp),
+        location=Location.KRAKEN,
+        event_type=HistoryEventType.RECEIVE,
+        asset=A_ETH,
+        balance=Balance(amount=ONE, usd_value=ONE),
+        event_subtype=HistoryEventSubType.NONE,
+        identifier=idx + 1,  # as given by the DB
+    ) for idx, (timestamp, sequence_index) in enumerate((
+        (1000999, 0),  # same second as the next but later in it and with a lower index
+        (1000000, 1),
+        (1000500, 1),
+        (1000000, 2),
+        (1001001, 0),
+        (1002000, 5),
+        (1002999, 4),
+        (1003000, 0),
+        (1005000, 0),  # after the end
+    ))]
+    dbevents = DBHistoryEvents(database)
+    with database.user_write() as write_cursor:
+        dbevents.add_history_events(write_cursor, history=history_events)
+    ledger_actions = [LedgerAction(
+        identifier=idx,
+        timestamp=Timestamp(timestamp),
+        action_type=LedgerActionType.INCOME,
+        location=Location.EXTERNAL,
+        amount=ONE,
+        asset=A_ETH,
+        rate=None,
+        rate_asset=None,
+        link=None,
+        notes='',
+    ) for idx, timestamp in enumerate((999, 1000, 1002, 1004))]
+
+    expected = sorted(ledger_actions + history_events[:-1], key=accounting_event_order_key)
+    for page_size in (1, 2, 3, 100):
+        stream = AccountingEventsStream(
+            sources=[ledger_actions, dbevents.iterate_accounting_events(to_ts=Timestamp(1004), page_size=page_size)],  # noqa: E501
+            total=len(expected),
+        )
+        assert stream.peek() == expected[0]
+        assert list(stream) == expected
+        assert stream.peek() is None
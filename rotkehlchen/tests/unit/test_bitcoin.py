@@ -3,8 +3,9 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from rotkehlchen.chain.bitcoin import get_bitcoin_addresses_balances
+from rotkehlchen.chain.bitcoin import BALANCES_QUERY_CHUNK_SIZE, get_bitcoin_addresses_balances
 from rotkehlchen.chain.bitcoin.hdkey import HDKey, XpubType
+from rotkehlchen.chain.bitcoin.hedging import PROVIDER_STATS
 from rotkehlchen.chain.bitcoin.utils import (
     is_valid_btc_address,
     is_valid_derivation_path,
@@ -14,10 +15,11 @@ from rotkehlchen.chain.bitcoin.utils import (
     scriptpubkey_to_p2pkh_address,
     scriptpubkey_to_p2sh_address,
 )
-from rotkehlchen.chain.bitcoin.xpub import XpubData
+from rotkehlchen.chain.bitcoin.xpub import XpubData, _derive_addresses_loop
 from rotkehlchen.chain.constants import NON_BITCOIN_CHAINS, SupportedBlockchain
 from rotkehlchen.errors.misc import RemoteError, XPUBError
 from rotkehlchen.fval import FVal
+from rotkehlchen.tests.utils.blockchain import LocalBitcoinApis
 from rotkehlchen.tests.utils.ens import ENS_BRUNO_BTC_ADDR, ENS_BRUNO_BTC_BYTES
 from rotkehlchen.tests.utils.factories import (
     UNIT_BTC_ADDRESS1,
@@ -181,6 +183,33 @@ def test_xpub_to_addresses():
         assert child.address() == expected_addresses[i]
 
 
+def test_derive_addresses_loop():
+    """Test that addresses are derived in gap limit batches until a batch without
+    transactions and that unused addresses before the last used one are included"""
+    xpub = 'xpub68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk'  # noqa: E501
+    root = HDKey.from_xpub(xpub=xpub, path='m').derive_child(0)
+    used_addresses = {root.derive_child(idx).address() for idx in (0, 3, 7)}
+    queried_batches = []
+
+    def mock_have_transactions(accounts):
+        queried_batches.append(accounts)
+        return {x: (x in used_addresses, FVal(1) if x in used_addresses else FVal(0)) for x in accounts}  # noqa: E501
+
+    with patch('rotkehlchen.chain.bitcoin.xpub.have_bitcoin_transactions', side_effect=mock_have_transactions):  # noqa: E501
+        result = _derive_addresses_loop(
+            account_index=0,
+            start_index=0,
+            root=root,
+            gap_limit=5,
+            blockchain=SupportedBlockchain.BITCOIN,
+        )
+
+    assert len(queried_batches) == 3
+    assert queried_batches[2][0] == root.derive_child(10).address()
+    assert sorted(x.derived_index for x in result) == list(range(8))
+    assert {x.address for x in result if x.balance == FVal(1)} == used_addresses
+
+
 def test_ypub_to_addresses():
     """Test vectors from here: https://iancoleman.io/bip39/"""
     xpub = 'ypub6WkRUvNhspMCJLiLgeP7oL1pzrJ6wA2tpwsKtXnbmpdAGmHHcC6FeZeF4VurGU14dSjGpF2xLavPhgvCQeXd6JxYgSfbaD1wSUi2XmEsx33'  # noqa: E501
@@ -390,3 +419,45 @@ def test_bitcoin_balance_api_resolver():
             with patch('rotkehlchen.chain.bitcoin._query_mempool_space', MagicMock(side_effect=RemoteError('Fatality'))):  # noqa: E501
                 with pytest.raises(RemoteError):
                     get_bitcoin_addresses_balances(addresses)
+
+
+def _make_legacy_addresses(number: int) -> Dict[BTCAddress, str]:
+    """Returns that many legacy addresses mapped to a distinct balance in satoshis"""
+    xpub = 'xpub68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk'  # noqa: E501
+    root = HDKey.from_xpub(xpub=xpub, path='m').derive_child(0)
+    return {root.derive_child(idx).address(): str(idx * 1000) for idx in range(number)}
+
+
+def test_bitcoin_balances_spread_across_apis():
+    """Test that chunks of accounts are queried from all the APIs in parallel"""
+    btc_map = _make_legacy_addresses(3 * BALANCES_QUERY_CHUNK_SIZE)
+    with LocalBitcoinApis(btc_map, latencies={'blockstream.info': 0.01, 'mempool.space': 0.01}).patch() as apis:  # noqa: E501
+        balances = get_bitcoin_addresses_balances(list(btc_map))
+
+    assert balances == {address: FVal(balance) / FVal(10**8) for address, balance in btc_map.items()}  # noqa: E501
+    assert set(apis.accounts) == {'blockchain.info', 'blockstream.info', 'mempool.space'}
+    assert sum(apis.accounts.values()) == len(btc_map)
+
+
+def test_bitcoin_balances_hedged_and_adapting():
+    """Test that a slow API gets raced by another one and that a failing API is not
+    assigned chunks until it has cooled down"""
+    btc_map = _make_legacy_addresses(2 * BALANCES_QUERY_CHUNK_SIZE)
+    with LocalBitcoinApis(btc_map, latencies={'blockchain.info': 30}).patch() as apis:
+        for api_name in ('blockchain.info', 'blockstream.info', 'mempool.space'):
+            for _ in range(5):  # enough samples for the hedging delay to be measured
+                PROVIDER_STATS[api_name].record_success(accounts_num=10, seconds=0.01)
+        balances = get_bitcoin_addresses_balances(list(btc_map))
+
+    assert len(balances) == len(btc_map)
+    assert apis.requests['blockchain.info'] == 1  # the slow one got hedged
+    assert apis.accounts['blockchain.info'] == 0
+
+    with LocalBitcoinApis(btc_map, failing=['blockchain.info']).patch() as apis:
+        balances = get_bitcoin_addresses_balances(list(btc_map))
+        assert len(balances) == len(btc_map)
+        assert PROVIDER_STATS['blockchain.info'].is_healthy() is False
+        requests_before = apis.requests['blockchain.info']
+        balances = get_bitcoin_addresses_balances(list(btc_map))
+        assert len(balances) == len(btc_map)
+        assert apis.requests['blockchain.info'] == requests_before
@@ -1,20 +1,26 @@
 from contextlib import ExitStack
 from datetime import datetime
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
 
 from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.chain.ethereum.modules.eth2.beacon_node import slot_at_timestamp
+from rotkehlchen.chain.ethereum.modules.eth2.constants import ETH2_GENESIS_TIMESTAMP
 from rotkehlchen.chain.ethereum.modules.eth2.eth2 import REQUEST_DELTA_TS
 from rotkehlchen.chain.ethereum.modules.eth2.structures import (
     Eth2Deposit,
     Eth2Validator,
     ValidatorDailyStats,
 )
-from rotkehlchen.chain.ethereum.modules.eth2.utils import scrape_validator_daily_stats
+from rotkehlchen.chain.ethereum.modules.eth2.utils import (
+    derive_validators_daily_stats,
+    scrape_validator_daily_stats,
+)
 from rotkehlchen.chain.ethereum.types import string_to_evm_address
 from rotkehlchen.constants.misc import ONE, ZERO
+from rotkehlchen.constants.timing import DAY_IN_SECONDS
 from rotkehlchen.db.eth2 import DBEth2
 from rotkehlchen.db.filtering import Eth2DailyStatsFilterQuery
 from rotkehlchen.fval import FVal
@@ -787,3 +793,100 @@ def test_validator_daily_stats_with_db_interaction(  # pylint: disable=unused-ar
             )
             last_stat = stats[:len(expected_stats)][-1]
             assert last_stat.pnl_balance.amount == expected_stats[-1].pnl_balance.amount * FVal(0.45)  # noqa: E501
+
+
+def test_derive_validators_daily_stats(function_scope_messages_aggregator):
+    """Test that daily stats are derived from balances queried once per day boundary"""
+    day = Timestamp(1613952000)  # 2021/02/22
+    balances = {
+        slot_at_timestamp(day): {1: 32000000000},
+        slot_at_timestamp(day + DAY_IN_SECONDS): {1: 32010000000},
+        slot_at_timestamp(day + 2 * DAY_IN_SECONDS): {1: 32020000000, 2: 32000000000},
+    }
+    beacon_node = MagicMock()
+    # validator 2 got processed by the beacon chain on the second day
+    beacon_node.get_activation_eligibility_epochs.return_value = {
+        2: (day + DAY_IN_SECONDS + 1000 - ETH2_GENESIS_TIMESTAMP) // 384,
+    }
+    beacon_node.get_balances.side_effect = lambda state_id, indices: {
+        index: balance for index, balance in balances[state_id].items() if index in indices
+    }
+    price_patch = patch(
+        'rotkehlchen.chain.ethereum.modules.eth2.utils.query_usd_price_zero_if_error',
+        return_value=FVal('1.55'),
+    )
+    with price_patch:
+        stats = derive_validators_daily_stats(
+            beacon_node=beacon_node,
+            validators=[(1, Timestamp(day - DAY_IN_SECONDS)), (2, Timestamp(0))],
+            deposits={},
+            to_ts=Timestamp(day + 2 * DAY_IN_SECONDS + 5),
+            msg_aggregator=function_scope_messages_aggregator,
+        )
+
+    beacon_node.get_activation_eligibility_epochs.assert_called_once_with([2])
+    assert beacon_node.get_balances.call_count == 3
+    assert stats == [ValidatorDailyStats(
+        validator_index=1,
+        timestamp=day,
+        start_usd_price=FVal('1.55'),
+        end_usd_price=FVal('1.55'),
+        pnl=FVal('0.01'),
+        start_amount=FVal(32),
+        end_amount=FVal('32.01'),
+    ), ValidatorDailyStats(
+        validator_index=1,
+        timestamp=Timestamp(day + DAY_IN_SECONDS),
+        start_usd_price=FVal('1.55'),
+        end_usd_price=FVal('1.55'),
+        pnl=FVal('0.01'),
+        start_amount=FVal('32.01'),
+        end_amount=FVal('32.02'),
+    ), ValidatorDailyStats(
+        validator_index=2,
+        timestamp=Timestamp(day + DAY_IN_SECONDS),
+        start_usd_price=FVal('1.55'),
+        end_usd_price=FVal('1.55'),
+        pnl=ZERO,
+        start_amount=ZERO,
+        end_amount=FVal(32),
+        deposits_number=1,
+        amount_deposited=FVal(32),
+    )]
+
+
+def test_derive_validators_daily_stats_deposit_credited_next_day(function_scope_messages_aggregator):  # noqa: E501
+    """Test that a top up deposit made near the end of a day counts on the next day,
+    when the beacon chain credited it, and not as a loss on the day of its transaction"""
+    day = Timestamp(1613952000)  # 2021/02/22
+    balances = {
+        slot_at_timestamp(day): {1: 32000000000},
+        slot_at_timestamp(day + DAY_IN_SECONDS): {1: 32010000000},
+        slot_at_timestamp(day + 2 * DAY_IN_SECONDS): {1: 33020000000},
+        slot_at_timestamp(day + 3 * DAY_IN_SECONDS): {1: 33030000000},
+    }
+    beacon_node = MagicMock()
+    beacon_node.get_balances.side_effect = lambda state_id, indices: {
+        index: balance for index, balance in balances[state_id].items() if index in indices
+    }
+    deposit = EXPECTED_DEPOSITS[0]._replace(
+        value=Balance(ONE, FVal('1.55')),
+        timestamp=Timestamp(day + DAY_IN_SECONDS - 600),
+    )
+    with patch(
+        'rotkehlchen.chain.ethereum.modules.eth2.utils.query_usd_price_zero_if_error',
+        return_value=FVal('1.55'),
+    ):
+        stats = derive_validators_daily_stats(
+            beacon_node=beacon_node,
+            validators=[(1, Timestamp(day - DAY_IN_SECONDS))],
+            deposits={1: [deposit]},
+            to_ts=Timestamp(day + 3 * DAY_IN_SECONDS + 5),
+            msg_aggregator=function_scope_messages_aggregator,
+        )
+
+    assert [(x.timestamp, x.pnl, x.deposits_number, x.amount_deposited) for x in stats] == [
+        (day, FVal('0.01'), 0, ZERO),
+        (day + DAY_IN_SECONDS, FVal('0.01'), 1, ONE),
+        (day + 2 * DAY_IN_SECONDS, FVal('0.01'), 0, ZERO),
+    ]
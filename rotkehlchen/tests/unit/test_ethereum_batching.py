@@ -0,0 +1,50 @@
+from unittest.mock import MagicMock, patch
+
+from rotkehlchen.chain.ethereum.batching import BatchedRequest, EthereumBatchQuery, _chunk_by_words
+from rotkehlchen.chain.ethereum.constants import ETHERSCAN_MAX_ARGUMENTS_TO_CONTRACT
+from rotkehlchen.chain.ethereum.types import string_to_evm_address
+from rotkehlchen.constants.resolver import ChainID
+
+ADDRESS_1 = string_to_evm_address('0x9531C059098e3d194fF87FebB587aB07B30B1306')
+ADDRESS_2 = string_to_evm_address('0x2B888954421b424C5D3D9Ce9bB67c9bD47537d12')
+
+
+def test_chunk_by_words():
+    requests = [
+        BatchedRequest(method='eth_call', address=ADDRESS_1, data='0x' + '00' * 36),
+    ] * 30
+    chunks = _chunk_by_words(list(range(30)), requests, ETHERSCAN_MAX_ARGUMENTS_TO_CONTRACT)
+    # each call with 36 bytes of calldata takes 4 + 2 words
+    assert [len(x) for x in chunks] == [20, 10]
+    assert sum(chunks, []) == list(range(30))
+
+
+def test_batch_query_keeps_enqueue_order():
+    ethereum = MagicMock()
+    ethereum.connected_to_any_web3.return_value = False
+    eth_scan = MagicMock()
+    eth_scan.call.side_effect = lambda arguments, **kwargs: [10 + idx for idx, _ in enumerate(arguments[0])]  # noqa: E501
+    multicall_mock = MagicMock(return_value=[(True, b'\x01'), (False, b'')])
+    ethereum.get_code.side_effect = lambda account, call_order: f'code_{account}'
+
+    batch = EthereumBatchQuery(ethereum=ethereum)
+    indices = [
+        batch.enqueue_call(ADDRESS_1, '0x12345678'),
+        batch.enqueue_balance(ADDRESS_1),
+        batch.enqueue_code(ADDRESS_2),
+        batch.enqueue_call(ADDRESS_2, '0x12345678'),
+        batch.enqueue_balance(ADDRESS_2),
+    ]
+    assert indices == [0, 1, 2, 3, 4]
+    eth_scan_patch = patch(
+        'rotkehlchen.chain.ethereum.batching.ETH_SCAN',
+        {ChainID.ETHEREUM: eth_scan},
+    )
+    multicall_patch = patch('rotkehlchen.chain.ethereum.batching.multicall_2', multicall_mock)
+    with eth_scan_patch, multicall_patch:
+        result = batch.execute()
+
+    assert result == [b'\x01', 10, f'code_{ADDRESS_2}', None, 11]
+    assert eth_scan.call.call_count == 1
+    assert multicall_mock.call_count == 1
+    assert len(batch) == 0
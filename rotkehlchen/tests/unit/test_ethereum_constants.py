@@ -1,3 +1,6 @@
+import json
+import os
+
 from eth_utils import is_checksum_address
 
 from rotkehlchen.constants.ethereum import EthereumConstants
@@ -5,7 +8,7 @@ from rotkehlchen.constants.ethereum import EthereumConstants
 
 def test_ethereum_contracts():
     """Test that all ethereum contract entries have legal data"""
-    for _, entry in EthereumConstants().contracts.items():
+    for _, entry in EthereumConstants.get().items():
         assert len(entry) == 3
         assert is_checksum_address(entry['address'])
         assert entry['deployed_block'] > 0
@@ -14,5 +17,23 @@ def test_ethereum_contracts():
 
 def test_ethereum_abi():
     """Test that the ethereum abi entries have legal data"""
-    for _, entry in EthereumConstants().abi_entries.items():
+    for _, entry in EthereumConstants.get_abis().items():
         assert isinstance(entry, list)
+
+
+def test_lazy_index_matches_full_parse():
+    """Test that the lazily indexed registries see exactly what a full json parse sees"""
+    dir_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    with open(os.path.join(dir_path, 'data', 'eth_contracts.json'), 'r') as f:
+        contracts = json.loads(f.read())
+    with open(os.path.join(dir_path, 'data', 'eth_abi.json'), 'r') as f:
+        abi_entries = json.loads(f.read())
+
+    assert EthereumConstants.get() == contracts
+    assert EthereumConstants.get_abis() == abi_entries
+
+
+def test_contracts_are_memoized():
+    contract = EthereumConstants.contract('ETH_MULTICALL')
+    assert EthereumConstants.contract('ETH_MULTICALL') is contract
+    assert EthereumConstants.contract_or_none('NOT_EXISTING_CONTRACT') is None
@@ -157,3 +157,16 @@ def test_initialize_with_bool_fails():
     with pytest.raises(ValueError):
         FVal(True)
         FVal(False)
+
+
+def test_from_fixed_point():
+    """Test that amounts in fixed point give the same values as dividing them"""
+    for amount in (0, 1, 15, 10 ** 18, 1234567890123456789012, 10 ** 40 + 7):
+        for decimals in (0, 6, 18, 30):
+            expected = amount / (FVal(10) ** FVal(decimals))
+            result = FVal.from_fixed_point(amount, decimals)
+            assert result == expected
+            assert str(result) == str(expected)
+
+    assert str(FVal.from_fixed_point(1500000, 6)) == '1.5'
+    assert str(FVal.from_fixed_point(10 ** 21, 18)) == '1000'
@@ -2,10 +2,23 @@ from contextlib import ExitStack
 from unittest.mock import MagicMock, patch
 
 import pytest
+from gql import gql
 
-from rotkehlchen.chain.ethereum.graph import Graph, format_query_indentation
+from rotkehlchen.chain.ethereum.graph import (
+    GRAPH_QUERY_BATCH_SIZE,
+    Graph,
+    _parse_query,
+    format_query_indentation,
+)
+from rotkehlchen.chain.ethereum.modules.aave.graph import USER_RESERVES_SELECTION
 from rotkehlchen.constants.timing import QUERY_RETRY_TIMES
 from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.tests.utils.factories import make_ethereum_address
+from rotkehlchen.tests.utils.graph import (
+    AAVE_USER_RESERVES_SCHEMA,
+    LocalSubgraph,
+    make_aave_user_reserves,
+)
 
 TEST_URL_1 = 'https://api.thegraph.com/subgraphs/name/uniswap/uniswap-v2'
 TEST_QUERY_1 = (
@@ -86,3 +99,50 @@ def test_success_result():
 
     assert client.execute.call_count == 1
     assert result == expected_result
+
+
+def test_parsed_queries_are_cached():
+    """Test that the same query text is only parsed once"""
+    _parse_query.cache_clear()
+    graph = Graph(TEST_URL_1)
+    client = MagicMock()
+    client.execute.return_value = {}
+    querystr = format_query_indentation(TEST_QUERY_1.format())
+    with patch('rotkehlchen.chain.ethereum.graph.gql', side_effect=gql) as gql_mock, patch.object(graph, 'client', new=client):  # noqa: E501
+        for limit in (1, 2, 3):
+            graph.query(querystr=querystr, param_types={'$limit': 'Int!'}, param_values={'limit': limit})  # noqa: E501
+
+    assert gql_mock.call_count == 1
+    assert client.execute.call_count == 3
+
+
+def test_query_by_address_batches_requests():
+    """Test that per address queries are batched in aliased requests and that the results
+    are the same as querying each address on its own, using a local aave subgraph"""
+    addresses = [make_ethereum_address() for _ in range(GRAPH_QUERY_BATCH_SIZE * 2 + 5)]
+    users = [x.lower() for x in addresses[:-5]]  # the last addresses have no reserves
+    subgraph = LocalSubgraph(
+        type_defs=AAVE_USER_RESERVES_SCHEMA,
+        entities={'userReserves': make_aave_user_reserves(users=users, reserves_per_user=3)},
+    )
+    graph = Graph(TEST_URL_1)
+    subgraph.patch(graph)
+
+    result = graph.query_by_address(selection=USER_RESERVES_SELECTION, addresses=addresses)
+    assert subgraph.requests == 3
+    assert set(result) == set(addresses)
+    for address in addresses[-5:]:
+        assert result[address] == []
+
+    subgraph.requests = 0
+    for address in addresses:
+        single_result = graph.query(
+            querystr=format_query_indentation(USER_RESERVES_SELECTION.format(address='$address')) + '}',  # noqa: E501
+            param_types={'$address': 'String!'},
+            param_values={'address': address.lower()},
+        )
+        assert single_result['userReserves'] == result[address]
+        if address in addresses[:-5]:
+            assert len(single_result['userReserves']) == 3
+
+    assert subgraph.requests == len(addresses)
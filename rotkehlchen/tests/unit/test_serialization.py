@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from rotkehlchen.accounting.structures.balance import BalanceType
@@ -12,6 +14,8 @@ from rotkehlchen.serialization.deserialize import (
     deserialize_ethereum_transaction,
     deserialize_int_from_hex_or_int,
 )
+from rotkehlchen.serialization.encoder import dumps_json, register_json_encoder
+from rotkehlchen.serialization.serialize import process_result, process_result_list
 from rotkehlchen.types import (
     EthereumTransaction,
     Location,
@@ -40,6 +44,36 @@ def test_rlk_jsondumps():
     )
 
 
+def test_dumps_json():
+    """Test that the single pass serialization gives the same JSON as the two pass one"""
+    data = {
+        'test': TEST_DATA,
+        'list': [TEST_DATA, Location.KRAKEN, TradeType.BUY, None, True, 1.5],
+        'empty': [{}, []],
+        'unicode': 'μ',
+    }
+    assert dumps_json(data) == json.dumps(process_result(data))
+    assert dumps_json({'a': (1, 2)}) == '{"a": [1, 2]}'
+    with pytest.raises(ValueError):
+        process_result({'a': (1, 2)})
+    with pytest.raises(TypeError):
+        dumps_json({'a': object()})
+
+    class BaseStructure:
+        def __init__(self, value):
+            self.value = value
+
+    class Structure(BaseStructure):
+        pass
+
+    # subclasses use the encoder of their closest registered base
+    register_json_encoder((BaseStructure,), lambda x: {'value': x.value})
+    assert dumps_json([Structure(FVal('1.5'))]) == '[{"value": "1.5"}]'
+    register_json_encoder((Structure,), lambda x: x.value)
+    assert dumps_json([Structure(FVal('1.5'))]) == '["1.5"]'
+    assert process_result_list([BaseStructure(1), Structure(2)]) == [{'value': 1}, 2]
+
+
 def test_pretty_json_dumps():
     """Simply test that pretty json dumps also works. That means that sorting
     of all serializable assets is enabled"""
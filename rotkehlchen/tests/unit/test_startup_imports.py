@@ -0,0 +1,62 @@
+import json
+import subprocess
+import sys
+from typing import Any, Dict
+
+from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES, ExchangeManager
+
+# Imports what `python -m rotkehlchen` imports before the server starts listening
+STARTUP_IMPORT_SCRIPT = """
+from gevent import monkey
+monkey.patch_all()
+import json
+import sys
+import time
+start = time.perf_counter()
+import rotkehlchen.server
+from rotkehlchen.chain.ethereum import patch_web3
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))
+"""
+# Generous upper bound for importing the backend in CI. It is here to catch big
+# regressions such as something heavy being imported eagerly again.
+STARTUP_IMPORT_MAX_SECONDS = 15
+
+
+def _import_backend_in_fresh_process(script: str = STARTUP_IMPORT_SCRIPT) -> Dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_exchange_modules_are_not_imported_at_startup():
+    """Exchange modules are imported on demand by the ExchangeManager when set up"""
+    modules = set(_import_backend_in_fresh_process()['modules'])
+    exchange_modules = {
+        f'rotkehlchen.exchanges.{ExchangeManager._get_exchange_module_name(location)}'
+        for location in SUPPORTED_EXCHANGES
+    }
+    assert modules.intersection(exchange_modules) == set()
+
+
+def test_ethereum_module_classes_are_loaded_lazily():
+    script = """
+import json
+import sys
+import rotkehlchen.chain.ethereum.modules as modules
+before = 'rotkehlchen.chain.ethereum.modules.yearn.vaultsv2' in sys.modules
+klass = modules.YearnVaultsV2
+print(json.dumps({'before': before, 'module': klass.__module__}))
+"""
+    result = _import_backend_in_fresh_process(script)
+    assert result['before'] is False
+    assert result['module'] == 'rotkehlchen.chain.ethereum.modules.yearn.vaultsv2'
+
+
+def test_startup_import_time():
+    elapsed = _import_backend_in_fresh_process()['elapsed']
+    assert elapsed < STARTUP_IMPORT_MAX_SECONDS, f'Importing the backend took {elapsed} seconds'
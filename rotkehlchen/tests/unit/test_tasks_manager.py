@@ -290,7 +290,8 @@ def test_update_snapshot_balances(task_manager):
                     requested_save_data=True,
                     save_despite_errors=False,
                     timestamp=None,
-                    ignore_cache=True,
+                    ignore_cache=False,
+                    beaconchain_fetch_eth1=True,
                 )
     except gevent.Timeout as e:
         raise AssertionError(f'Update snapshot balances was not completed within {timeout} seconds') from e  # noqa: E501
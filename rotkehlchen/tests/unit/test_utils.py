@@ -3,12 +3,14 @@ import time
 from json.decoder import JSONDecodeError
 from unittest.mock import patch
 
+import gevent
 import pytest
 from eth_typing import HexAddress, HexStr
 from eth_utils import to_checksum_address
 from hexbytes import HexBytes
 
 from rotkehlchen.chain.ethereum.utils import generate_address_via_create2
+from rotkehlchen.errors.misc import WorkerProcessError
 from rotkehlchen.errors.serialization import ConversionError
 from rotkehlchen.fval import FVal
 from rotkehlchen.serialization.deserialize import deserialize_timestamp_from_date
@@ -21,9 +23,19 @@ from rotkehlchen.utils.misc import (
     iso8601ts_to_timestamp,
     pairwise,
     pairwise_longest,
+    timed_section,
     timestamp_to_date,
 )
-from rotkehlchen.utils.mixins.cacheable import CacheableMixIn, cache_response_timewise
+from rotkehlchen.utils.mixins.cacheable import (
+    CacheableMixIn,
+    cache_response_timewise,
+    pop_served_cache_age,
+    reset_served_cache_age,
+)
+from rotkehlchen.utils.mixins.common import function_sig_key
+from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
+from rotkehlchen.utils.process_pool import WorkerProcessPool, report_progress, run_in_worker
+from rotkehlchen.utils.ratelimit import RequestPriority, TokenBucket
 from rotkehlchen.utils.serialization import jsonloads_dict, jsonloads_list
 from rotkehlchen.utils.version_check import get_current_version
 
@@ -93,6 +105,19 @@ def test_combine_dicts():
     assert result == {'a': 5, 'b': 2, 'c': 5}
 
 
+def test_timed_section():
+    timings = {}
+    with timed_section(timings, 'a'):
+        gevent.sleep(0.05)
+    with pytest.raises(ValueError), timed_section(timings, 'b'):
+        raise ValueError('timing is recorded even on failure')
+    with timed_section(timings, 'a'):
+        gevent.sleep(0.05)
+    assert set(timings) == {'a', 'b'}
+    assert timings['a'] >= 0.1
+    assert timings['b'] < 0.05
+
+
 def test_combine_stat_dicts():
     a = {
         'EUR': {'amount': FVal('50.5'), 'usd_value': FVal('200.1')},
@@ -182,6 +207,7 @@ class Foo(CacheableMixIn):
         self.do_sum_call_count = 0
         self.do_something_call_count = 0
         self.do_something_arguments_dont_matter_count = 0
+        self.do_slow_query_count = 0
 
     @cache_response_timewise()
     def do_sum(self, arg1, arg2, **kwargs):  # pylint: disable=no-self-use, unused-argument
@@ -198,6 +224,36 @@ class Foo(CacheableMixIn):
         self.do_something_arguments_dont_matter_count += 1
         return arg1 + arg2
 
+    @cache_response_timewise(ttl_secs=10)
+    def do_slow_query(self, **kwargs):  # pylint: disable=unused-argument
+        self.do_slow_query_count += 1
+        gevent.sleep(0.1)
+        return self.do_slow_query_count
+
+    @cache_response_timewise(ttl_secs=10, stale_while_revalidate=True)
+    def do_slow_query_stale(self, **kwargs):  # pylint: disable=unused-argument
+        self.do_slow_query_count += 1
+        gevent.sleep(0.1)
+        return self.do_slow_query_count
+
+
+class LockedFoo(CacheableMixIn, LockableQueryMixIn):
+    def __init__(self):
+        super().__init__()
+        self.query_count = 0
+        self.running_queries = 0
+        self.max_running_queries = 0
+
+    @cache_response_timewise(ttl_secs=10, stale_while_revalidate=True)
+    @protect_with_lock()
+    def locked_query(self, **kwargs):  # pylint: disable=unused-argument
+        self.running_queries += 1
+        self.max_running_queries = max(self.max_running_queries, self.running_queries)
+        gevent.sleep(0.1)
+        self.running_queries -= 1
+        self.query_count += 1
+        return self.query_count
+
 
 def test_cache_response_timewise():
     """Test that cached value is called and not the function again"""
@@ -247,6 +303,75 @@ def test_cache_response_timewise_with_arguments_matter_false():
     assert instance.do_something_arguments_dont_matter_count == 2
 
 
+def test_cache_response_timewise_single_flight():
+    """Test that concurrent identical calls that miss the cache only query once"""
+    instance = Foo()
+    greenlets = [gevent.spawn(instance.do_slow_query) for _ in range(5)]
+    gevent.joinall(greenlets, raise_error=True)
+    assert [x.value for x in greenlets] == [1] * 5
+    assert instance.do_slow_query_count == 1
+
+
+def test_cache_response_timewise_ttl_and_stale_while_revalidate():
+    instance = Foo()
+    with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=1000):
+        assert instance.do_slow_query() == 1
+        assert instance.do_slow_query_stale() == 2
+
+    reset_served_cache_age()
+    with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=1009):
+        assert instance.do_slow_query() == 1
+        assert pop_served_cache_age() == 9
+
+    with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=1010):
+        # per function ttl expired. Without stale_while_revalidate the caller waits
+        assert instance.do_slow_query() == 3
+        # with stale_while_revalidate the stale result is returned at once
+        assert instance.do_slow_query_stale() == 2
+        assert instance.do_slow_query_stale() == 2
+        assert pop_served_cache_age() == 10
+        gevent.sleep(0.2)  # let the single background refresh finish
+        assert instance.do_slow_query_stale() == 4
+        assert pop_served_cache_age() == 0
+        assert instance.do_slow_query_count == 4
+
+    with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=1020):
+        # a caller that does not allow stale results waits for the query
+        assert instance.do_slow_query_stale(allow_stale=False) == 5
+        assert pop_served_cache_age() is None
+        assert instance.do_slow_query_stale() == 5
+        gevent.sleep(0.2)
+        assert instance.do_slow_query_count == 5
+
+
+def test_cache_response_timewise_stale_refresh_holds_lock():
+    """Test that the background refresh of a stale result takes the lock of the method
+    and that callers served from the cache don't wait for the lock or the refresh"""
+    instance = LockedFoo()
+    with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=1000):
+        assert instance.locked_query() == 1
+
+    lock = instance.query_locks_map[function_sig_key('locked_query', False, False)]
+    with patch('rotkehlchen.utils.mixins.cacheable.ts_now', return_value=1010):
+        with lock:
+            # the stale result is served at once and a refresh is spawned
+            assert instance.locked_query() == 1
+            gevent.sleep(0.05)
+            assert instance.running_queries == 0, 'the refresh should wait for the lock'
+
+        gevent.sleep(0.01)
+        assert instance.running_queries == 1, 'the refresh should be running'
+        start = time.monotonic()
+        assert instance.locked_query() == 1
+        assert time.monotonic() - start < 0.05, 'plain call should not wait for the refresh'
+        # a call that ignores the cache waits for the running refresh instead of repeating it
+        assert instance.locked_query(ignore_cache=True) == 2
+
+    assert instance.query_count == 2
+    assert instance.max_running_queries == 1
+    assert instance.refreshing_keys == set()
+
+
 def test_convert_to_int():
     assert convert_to_int('5') == 5
     assert convert_to_int('37451082560000003241000000000003221111111111') == 37451082560000003241000000000003221111111111  # noqa: E501
@@ -383,3 +508,88 @@ def test_pairwise():
     a = [1, 2, 3, 4, 5]
     assert [x + y for x, y in pairwise(a)] == [3, 7]
     assert list(pairwise_longest(a)) == [(1, 2), (3, 4), (5, None)]
+
+
+def test_token_bucket_serves_interactive_callers_first():
+    bucket = TokenBucket(max_rate=20, capacity=1)
+    bucket.acquire()  # empty the bucket
+    order = []
+
+    def background_query(name):
+        gevent.getcurrent().task_name = name
+        bucket.acquire()
+        order.append(name)
+
+    def interactive_query(name):
+        bucket.acquire()
+        order.append(name)
+
+    greenlets = [
+        gevent.spawn(background_query, 'background_1'),
+        gevent.spawn(background_query, 'background_2'),
+        gevent.spawn(interactive_query, 'api'),
+    ]
+    gevent.joinall(greenlets, raise_error=True)
+    assert order == ['api', 'background_1', 'background_2']
+    assert bucket.throttled_seconds[RequestPriority.BACKGROUND] > bucket.throttled_seconds[RequestPriority.INTERACTIVE]  # noqa: E501
+    assert set(bucket.throttled_seconds) == {RequestPriority.BACKGROUND, RequestPriority.INTERACTIVE}  # noqa: E501
+    assert bucket.waiters == []
+
+
+def test_token_bucket_adapts_rate():
+    bucket = TokenBucket(max_rate=4, capacity=4, min_rate=1, recover_after=2)
+    bucket.register_rate_limited()
+    assert bucket.rate == 2
+    assert bucket.tokens == 0
+    bucket.register_rate_limited()
+    bucket.register_rate_limited()
+    assert bucket.rate == 1, 'rate should not go below the minimum'
+    bucket.register_success()
+    bucket.register_success()
+    assert bucket.rate == pytest.approx(1.4)
+    bucket.reconfigure(max_rate=8, capacity=8)
+    assert bucket.rate == 8
+
+
+def _sum_with_progress(numbers, fail=False):
+    """Job run in the worker process of test_worker_process_pool"""
+    result = 0
+    for number in numbers:
+        result += number
+        report_progress(result)
+    if fail:
+        raise ConversionError('Job failed')
+    return result
+
+
+def test_worker_process_pool():
+    pool = WorkerProcessPool(size=1)
+    progress = []
+    try:
+        # other greenlets keep running while the worker computes
+        ticker = gevent.spawn(lambda: [gevent.sleep(0.01) for _ in range(3)])
+        result = pool.run(_sum_with_progress, [1, 2, 3], progress_callback=progress.append)
+        assert result == 6
+        assert progress == [1, 3, 6]
+        ticker.join()
+        assert len(pool.idle_workers) == 1
+
+        with pytest.raises(ConversionError, match='Job failed'):
+            pool.run(_sum_with_progress, [1], fail=True)
+        assert len(pool.idle_workers) == 1, 'worker should be reused after a job exception'
+
+        greenlet = gevent.spawn(pool.run, time.sleep, 30)
+        gevent.sleep(0.5)
+        greenlet.kill()
+        assert pool.idle_workers == [], 'busy worker of a killed job should be stopped'
+        assert pool.run(_sum_with_progress, [5]) == 5
+    finally:
+        pool.stop()
+    assert pool.idle_workers == []
+
+
+def test_run_in_worker_falls_back_to_main_process():
+    pool = WorkerProcessPool(size=1)
+    with patch('rotkehlchen.utils.process_pool.get_worker_pool', return_value=pool):
+        with patch.object(pool, '_get_worker', side_effect=WorkerProcessError('no processes')):
+            assert run_in_worker(_sum_with_progress, [1, 2]) == 3
@@ -1,13 +1,17 @@
 import warnings as test_warnings
+from unittest.mock import patch
 
+import gevent
 import pytest
 
+from rotkehlchen.chain.ethereum.defi.chad import DEFI_BALANCES_QUERY_CONCURRENCY, DefiChad
 from rotkehlchen.chain.ethereum.defi.zerionsdk import KNOWN_ZERION_PROTOCOL_NAMES, ZerionSDK
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.ethereum import (
     ETHEREUM_TEST_PARAMETERS,
     wait_until_all_nodes_connected,
 )
+from rotkehlchen.tests.utils.factories import make_ethereum_address
 
 
 @pytest.mark.parametrize(*ETHEREUM_TEST_PARAMETERS)
@@ -78,3 +82,38 @@ def test_protocol_names_are_known(
             test_warnings.warn(
                 UserWarning(f'Unknown protocol "{name}" seen in Zerion protocol names'),
             )
+
+
+def test_defi_balances_queried_concurrently_and_cached(
+        ethereum_manager,
+        function_scope_messages_aggregator,
+        database,
+):
+    """Test that accounts are queried concurrently up to the limit and that only
+    accounts without recent balances are requeried"""
+    chad = DefiChad(ethereum_manager, function_scope_messages_aggregator, database)
+    addresses = [make_ethereum_address() for _ in range(20)]
+    queried = []
+    in_flight, max_in_flight = 0, 0
+
+    def mock_all_balances_for_account(account):
+        nonlocal in_flight, max_in_flight
+        queried.append(account)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        gevent.sleep(0.01)
+        in_flight -= 1
+        return [] if account == addresses[0] else [f'balance_{account}']
+
+    with patch.object(chad.zerion_sdk, 'all_balances_for_account', side_effect=mock_all_balances_for_account):  # noqa: E501
+        result = chad.query_defi_balances(addresses)
+        assert max_in_flight == DEFI_BALANCES_QUERY_CONCURRENCY
+        assert set(queried) == set(addresses)
+        assert list(result) == addresses[1:], 'accounts without balances should be skipped'
+        assert result[addresses[1]] == [f'balance_{addresses[1]}']
+
+        queried = []
+        new_address = make_ethereum_address()
+        result = chad.query_defi_balances(addresses + [new_address])
+        assert queried == [new_address]
+        assert len(result) == len(addresses)
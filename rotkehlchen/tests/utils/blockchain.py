@@ -1,11 +1,15 @@
 import json
-from typing import Any, Dict, List, Optional, Union
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, DefaultDict, Dict, Iterator, List, Optional, Sequence, Union
 from unittest.mock import patch
 
+import gevent
 from web3 import Web3
 from web3._utils.abi import get_abi_input_types, get_abi_output_types
 
 from rotkehlchen.assets.asset import EvmToken
+from rotkehlchen.chain.bitcoin.hedging import PROVIDER_STATS
 from rotkehlchen.chain.ethereum.defi.zerionsdk import ZERION_ADAPTER_ADDRESS
 from rotkehlchen.constants.assets import A_BTC
 from rotkehlchen.constants.ethereum import ETH_MULTICALL, ETH_SCAN, ZERION_ABI
@@ -506,36 +510,93 @@ def mock_etherscan_query(
     return patch.object(etherscan.session, 'get', wraps=mock_requests_get)
 
 
+def _bitcoin_api_provider(url: str) -> Optional[str]:
+    for api_name in ('blockchain.info', 'blockstream.info', 'mempool.space'):
+        if api_name in url:
+            return api_name
+    return None
+
+
+def _bitcoin_api_response(url: str, btc_map: Dict[BTCAddress, str]) -> str:
+    """Returns the response of the bitcoin balance API of the url for the given balances"""
+    if 'blockchain.info' in url:
+        addresses = url.split('multiaddr?active=')[1].split('|')
+        response = '{"addresses":['
+        for idx, address in enumerate(addresses):
+            balance = btc_map.get(address, '0')
+            response += f'{{"address":"{address}", "final_balance":{balance}}}'
+            if idx < len(addresses) - 1:
+                response += ','
+        return response + ']}'
+
+    # blockstream.info and mempool.space
+    split_result = url.rsplit('/', 1)
+    if len(split_result) != 2:
+        raise AssertionError(f'Could not find bitcoin address at url {url}')
+    address = split_result[1]
+    balance = btc_map.get(address, '0')
+    return f"""{{"address":"{address}","chain_stats":{{"funded_txo_count":1,"funded_txo_sum":{balance},"spent_txo_count":0,"spent_txo_sum":0,"tx_count":1}},"mempool_stats":{{"funded_txo_count":0,"funded_txo_sum":0,"spent_txo_count":0,"spent_txo_sum":0,"tx_count":0}}}}"""  # noqa: E501
+
+
 def mock_bitcoin_balances_query(
         btc_map: Dict[BTCAddress, str],
         original_requests_get,
 ):
 
     def mock_requests_get(url, *args, **kwargs):
-        if 'blockchain.info' in url:
-            addresses = url.split('multiaddr?active=')[1].split('|')
-            response = '{"addresses":['
-            for idx, address in enumerate(addresses):
-                balance = btc_map.get(address, '0')
-                response += f'{{"address":"{address}", "final_balance":{balance}}}'
-                if idx < len(addresses) - 1:
-                    response += ','
-            response += ']}'
-        elif 'blockstream.info' in url:
-            split_result = url.rsplit('/', 1)
-            if len(split_result) != 2:
-                raise AssertionError(f'Could not find bitcoin address at url {url}')
-            address = split_result[1]
-            balance = btc_map.get(address, '0')
-            response = f"""{{"address":"{address}","chain_stats":{{"funded_txo_count":1,"funded_txo_sum":{balance},"spent_txo_count":0,"spent_txo_sum":0,"tx_count":1}},"mempool_stats":{{"funded_txo_count":0,"funded_txo_sum":0,"spent_txo_count":0,"spent_txo_sum":0,"tx_count":0}}}}"""  # noqa: E501
-        else:
+        if _bitcoin_api_provider(url) is None:
             return original_requests_get(url, *args, **kwargs)
 
-        return MockResponse(200, response)
+        return MockResponse(200, _bitcoin_api_response(url, btc_map))
 
     return patch('rotkehlchen.utils.network.requests.get', wraps=mock_requests_get)
 
 
+class LocalBitcoinApis():
+    """A stand-in for the blockchain.info, blockstream.info and mempool.space balance APIs
+
+    Serves the given balances in satoshis with a configurable latency per API. APIs in
+    `failing` return an error. Counts the requests and accounts each API served so that
+    the distribution of a query across the APIs can be checked offline.
+    """
+
+    def __init__(
+            self,
+            btc_map: Dict[BTCAddress, str],
+            latencies: Optional[Dict[str, float]] = None,
+            failing: Sequence[str] = (),
+    ) -> None:
+        self.btc_map = btc_map
+        self.latencies = latencies or {}
+        self.failing = failing
+        self.requests: DefaultDict[str, int] = defaultdict(int)
+        self.accounts: DefaultDict[str, int] = defaultdict(int)
+
+    def _requests_get(self, url: str, *args: Any, **kwargs: Any) -> MockResponse:  # pylint: disable=unused-argument  # noqa: E501
+        api_name = _bitcoin_api_provider(url)
+        if api_name is None:
+            raise AssertionError(f'Unexpected url {url} queried from the bitcoin APIs stand-in')
+
+        self.requests[api_name] += 1
+        gevent.sleep(self.latencies.get(api_name, 0))
+        if api_name in self.failing:
+            return MockResponse(500, 'Internal server error')
+
+        self.accounts[api_name] += url.count('|') + 1 if api_name == 'blockchain.info' else 1
+        return MockResponse(200, _bitcoin_api_response(url, self.btc_map))
+
+    @contextmanager
+    def patch(self) -> Iterator['LocalBitcoinApis']:
+        """Makes the bitcoin balance queries hit this stand-in. Also starts from fresh
+        provider stats so that earlier queries don't affect the assignment of chunks"""
+        PROVIDER_STATS.clear()
+        try:
+            with patch('rotkehlchen.utils.network.requests.get', side_effect=self._requests_get):  # noqa: E501
+                yield self
+        finally:
+            PROVIDER_STATS.clear()
+
+
 def compare_account_data(expected: List[Dict], got: List[Dict]) -> None:
     """Compare two lists of account data dictionaries for equality"""
 
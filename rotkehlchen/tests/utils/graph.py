@@ -0,0 +1,98 @@
+from typing import Any, Dict, List
+
+from gql import Client
+from graphql import build_ast_schema, parse
+
+from rotkehlchen.chain.ethereum.graph import Graph
+
+# The parts of the aave subgraphs schema queried for the users' reserves
+AAVE_USER_RESERVES_SCHEMA = """
+type Reserve {
+  id: ID!
+  symbol: String!
+}
+
+type User {
+  id: ID!
+}
+
+type UserReserve {
+  id: ID!
+  reserve: Reserve!
+  user: User!
+}
+
+input UserReserve_filter {
+  user: String
+}
+
+type Query {
+  userReserves(where: UserReserve_filter, first: Int, skip: Int): [UserReserve!]!
+}
+
+schema {
+  query: Query
+}
+"""
+
+
+class LocalSubgraph():
+    """A stand-in for a subgraph that executes queries against fixture entities locally
+
+    Top level fields are resolved to the fixture entities of the same name, filtered by
+    the equality conditions of the `where` argument. Nested entities are given inline in
+    the fixture data. Counts the requests it serves so that batched query paths can be
+    checked and benchmarked offline.
+    """
+
+    def __init__(self, type_defs: str, entities: Dict[str, List[Dict[str, Any]]]) -> None:
+        self.entities = entities
+        self.requests = 0
+        schema = build_ast_schema(parse(type_defs))
+        for name, field in schema.get_query_type().fields.items():
+            field.resolver = self._make_resolver(name)
+        self.client = Client(schema=schema)
+        # count requests at the transport, like the remote subgraph would see them
+        transport_execute = self.client.transport.execute
+
+        def execute(*args: Any, **kwargs: Any) -> Any:
+            self.requests += 1
+            return transport_execute(*args, **kwargs)
+        self.client.transport.execute = execute
+
+    def _make_resolver(self, name: str) -> Any:
+        def resolver(root: Any, info: Any, where: Any = None, first: int = 100, skip: int = 0) -> List[Dict[str, Any]]:  # pylint: disable=unused-argument  # noqa: E501
+            entries = self.entities.get(name, [])
+            if where is not None:
+                entries = [
+                    entry for entry in entries
+                    if all(_entity_value(entry, key) == value for key, value in where.items())
+                ]
+            return entries[skip:skip + first]
+        return resolver
+
+    def patch(self, graph: Graph) -> None:
+        """Makes the given Graph query this stand-in instead of the remote subgraph"""
+        graph.client = self.client
+
+
+def _entity_value(entry: Dict[str, Any], key: str) -> Any:
+    """Filters on entity fields compare with the id of the referenced entity"""
+    value = entry.get(key)
+    if isinstance(value, dict):
+        return value.get('id')
+    return value
+
+
+def make_aave_user_reserves(users: List[str], reserves_per_user: int) -> List[Dict[str, Any]]:
+    """Creates fixture userReserves entities for the given lowercased user addresses"""
+    entries = []
+    for user in users:
+        for idx in range(reserves_per_user):
+            reserve_id = f'0x{idx:040x}0x24a42fd28c976a61df5d00d0599c34c4f90748c8'
+            entries.append({
+                'id': f'{reserve_id}{user}',
+                'reserve': {'id': reserve_id, 'symbol': f'TOKEN{idx}'},
+                'user': {'id': user},
+            })
+    return entries
@@ -1176,6 +1176,8 @@ def maybe_mock_historical_price_queries(
         return price
 
     historian.query_historical_price = mock_historical_price_query
+    # the mocked prices need no prefetching
+    historian.prefetch_historical_prices = lambda needs: None
 
 
 def assert_pnl_debug_import(filepath: Path, database: DBHandler) -> None:
@@ -15,6 +15,9 @@ log = RotkehlchenLogsAdapter(logger)
 INFORMATIONAL_MESSAGE_TYPES = {
     WSMessageType.ETHEREUM_TRANSACTION_STATUS,
     WSMessageType.PREMIUM_STATUS_UPDATE,
+    WSMessageType.CSV_IMPORT_PROGRESS,
+    WSMessageType.NEW_HISTORY_EVENTS,
+    WSMessageType.BALANCE_SOURCE_QUERIED,
 }
 
 
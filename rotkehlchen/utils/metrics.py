@@ -0,0 +1,181 @@
+"""Timers and counters of the hot paths of the backend
+
+Collection is off by default. It is turned on with the --metrics argument or the
+metrics endpoint. While it is off, timing a section only costs a check of the
+enabled flag and entering a shared no-op context manager.
+
+Each metric is kept per label, such as the oracle or the exchange it refers to.
+Timers measure wall clock time, which includes the time other greenlets ran
+while the timed section was waiting.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import nullcontext
+from time import perf_counter
+from types import TracebackType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    DefaultDict,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+# Upper bounds in seconds of the histogram buckets of the timers
+TIMER_BUCKETS = (0.001, 0.005, 0.025, 0.1, 0.5, 2.5, 10.0)
+PROMETHEUS_PREFIX = 'rotki_'
+
+_NO_OP_TIMER: ContextManager[None] = nullcontext()
+
+
+class Timer():
+    """Histogram of the durations of a timed section"""
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # one more bucket for durations above the last bound
+        self.buckets = [0] * (len(TIMER_BUCKETS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(TIMER_BUCKETS, seconds)] += 1
+
+    def cumulative_buckets(self) -> List[Tuple[str, int]]:
+        """Returns the count of durations up to each bucket bound"""
+        result: List[Tuple[str, int]] = []
+        count = 0
+        for bound, bucket_count in zip((*(str(x) for x in TIMER_BUCKETS), '+Inf'), self.buckets):
+            count += bucket_count
+            result.append((bound, count))
+        return result
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_seconds': self.total,
+            'max_seconds': self.max,
+            'buckets': dict(self.cumulative_buckets()),
+        }
+
+
+class _TimedSection():
+    __slots__ = ('timer', 'start')
+
+    def __init__(self, timer: Timer) -> None:
+        self.timer = timer
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(
+            self,
+            exctype: Optional[Type[BaseException]],
+            value: Optional[BaseException],
+            traceback: Optional[TracebackType],
+    ) -> None:
+        self.timer.observe(perf_counter() - self.start)
+
+
+def _prometheus_label(label: str) -> str:
+    escaped = label.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'label="{escaped}"'
+
+
+class MetricsRegistry():
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.timers: Dict[Tuple[str, str], Timer] = {}
+        self.counters: DefaultDict[Tuple[str, str], int] = defaultdict(int)
+
+    def _get_timer(self, metric: str, label: str) -> Timer:
+        timer = self.timers.get((metric, label))
+        if timer is None:
+            timer = self.timers[(metric, label)] = Timer()
+        return timer
+
+    def time(self, metric: str, label: str = '') -> ContextManager[None]:
+        """Context manager that adds the duration of its section to the timer"""
+        if self.enabled is False:
+            return _NO_OP_TIMER
+        return _TimedSection(self._get_timer(metric, label))
+
+    def observe(self, metric: str, seconds: float, label: str = '') -> None:
+        """Adds an already measured duration to the timer"""
+        if self.enabled is True:
+            self._get_timer(metric, label).observe(seconds)
+
+    def increment(self, metric: str, label: str = '', amount: int = 1) -> None:
+        if self.enabled is True:
+            self.counters[(metric, label)] += amount
+
+    def reset(self) -> None:
+        self.timers = {}
+        self.counters = defaultdict(int)
+
+    def serialize(self) -> Dict[str, Any]:
+        timers: DefaultDict[str, Dict[str, Any]] = defaultdict(dict)
+        for (metric, label), timer in self.timers.items():
+            timers[metric][label] = timer.serialize()
+        counters: DefaultDict[str, Dict[str, int]] = defaultdict(dict)
+        for (metric, label), value in self.counters.items():
+            counters[metric][label] = value
+        return {'enabled': self.enabled, 'timers': timers, 'counters': counters}
+
+    def to_prometheus(self) -> str:
+        """Returns the metrics in the Prometheus text exposition format"""
+        lines = []
+        last_metric = None
+        for (metric, label), timer in sorted(self.timers.items()):
+            name = f'{PROMETHEUS_PREFIX}{metric}_seconds'
+            if metric != last_metric:
+                lines.append(f'# TYPE {name} histogram')
+                last_metric = metric
+            label_pair = _prometheus_label(label)
+            for bound, count in timer.cumulative_buckets():
+                lines.append(f'{name}_bucket{{{label_pair},le="{bound}"}} {count}')
+            lines.append(f'{name}_sum{{{label_pair}}} {timer.total}')
+            lines.append(f'{name}_count{{{label_pair}}} {timer.count}')
+
+        last_metric = None
+        for (metric, label), value in sorted(self.counters.items()):
+            name = f'{PROMETHEUS_PREFIX}{metric}_total'
+            if metric != last_metric:
+                lines.append(f'# TYPE {name} counter')
+                last_metric = metric
+            lines.append(f'{name}{{{_prometheus_label(label)}}} {value}')
+
+        return ''.join(f'{line}\n' for line in lines)
+
+
+METRICS = MetricsRegistry()
+
+
+def instrument_session(session: 'requests.Session', metric: str, label: str) -> None:
+    """Times the responses of the session's requests and counts the error responses.
+
+    The time is the one until the response headers are parsed. Requests that get no
+    response, such as those that time out, are not counted.
+    """
+    def response_hook(response: 'requests.Response', *args: Any, **kwargs: Any) -> None:
+        if METRICS.enabled is False:
+            return
+        METRICS.observe(metric, response.elapsed.total_seconds(), label)
+        if response.status_code >= 400:
+            METRICS.increment(f'{metric}_errors', label)
+
+    session.hooks['response'].append(response_hook)
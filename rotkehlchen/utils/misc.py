@@ -7,12 +7,14 @@ import platform
 import re
 import sys
 import time
+from contextlib import contextmanager
 from itertools import zip_longest
 from typing import (
     Any,
     Callable,
     DefaultDict,
     Dict,
+    Generator,
     Iterable,
     Iterator,
     List,
@@ -37,6 +39,16 @@ def ts_now() -> Timestamp:
     return Timestamp(int(time.time()))
 
 
+@contextmanager
+def timed_section(timings: Dict[str, float], name: str) -> Generator[None, None, None]:
+    """Adds the seconds spent inside the context to timings[name]"""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.monotonic() - start
+
+
 def ts_now_in_ms() -> TimestampMS:
     return TimestampMS(int(time.time() * 1000))
 
@@ -1,13 +1,23 @@
+import logging
 from functools import wraps
-from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Set, Tuple
 
+import gevent
+from gevent.event import AsyncResult
+from gevent.local import local
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.utils.misc import ts_now
 
 from .common import function_sig_key
 
 if TYPE_CHECKING:
+    from rotkehlchen.greenlets import GreenletManager
     from rotkehlchen.types import Timestamp
 
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
 
 class ResultCache(NamedTuple):
     """Represents a time-cached result of some API query"""
@@ -15,12 +25,40 @@ class ResultCache(NamedTuple):
     timestamp: 'Timestamp'
 
 
-# Seconds for which cached api queries will be cached
-# By default 10 minutes.
-# TODO: Make configurable!
+# Default seconds for which cached api queries will be cached. By default 10 minutes.
+# Functions can use a different value with the ttl_secs argument of the decorator.
 CACHE_RESPONSE_FOR_SECS = 600
 
 
+class _SingleFlightAborted(Exception):
+    """The greenlet performing a query others were waiting for got killed"""
+
+
+# Greenlet local record of the age of the oldest cached result served to a greenlet
+_served_cache_age = local()
+
+
+def reset_served_cache_age() -> None:
+    _served_cache_age.value = None
+
+
+def pop_served_cache_age() -> Optional[int]:
+    """Returns the age in seconds of the oldest cached result served to the current
+    greenlet since the last reset, or None if only fresh results were served."""
+    value = getattr(_served_cache_age, 'value', None)
+    _served_cache_age.value = None
+    return value
+
+
+def record_served_cache_age(age: int) -> None:
+    """Records that a cached result of the given age in seconds was served to the
+    current greenlet. Greenlets that collect results of other greenlets use it to
+    record the ages that were served to those."""
+    value = getattr(_served_cache_age, 'value', None)
+    if value is None or age > value:
+        _served_cache_age.value = age
+
+
 class CacheableMixIn:
     """Interface for objects that can use timewise caches
 
@@ -33,6 +71,12 @@ class CacheableMixIn:
         self.results_cache: Dict[int, ResultCache] = {}
         # Can also be 0 which means cache is disabled.
         self.cache_ttl_secs = CACHE_RESPONSE_FOR_SECS
+        # Queries currently running, so that identical concurrent calls can wait for them
+        self.inflight_queries: Dict[int, AsyncResult] = {}
+        # Keys of stale results that are being refreshed in the background
+        self.refreshing_keys: Set[int] = set()
+        # Tracks the background refreshes. Set by the owner of the object if it has one
+        self.greenlet_manager: Optional['GreenletManager'] = None
 
     def flush_cache(self, name: str, *args: Any, **kwargs: Any) -> None:
         cache_key = function_sig_key(
@@ -45,9 +89,65 @@ class CacheableMixIn:
         self.results_cache.pop(cache_key, None)
 
 
+def _query_and_cache(
+        wrappingobj: CacheableMixIn,
+        cache_key: int,
+        f: Callable,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+) -> Any:
+    """Calls the function and caches its result. If an identical call is already
+    running then waits for it and returns its result (or raises its exception)."""
+    while (inflight := wrappingobj.inflight_queries.get(cache_key)) is not None:
+        try:
+            return inflight.get()
+        except _SingleFlightAborted:
+            continue  # the querying greenlet was killed. Query ourselves
+
+    inflight = AsyncResult()
+    wrappingobj.inflight_queries[cache_key] = inflight
+    try:
+        now = ts_now()
+        result = f(wrappingobj, *args, **kwargs)
+    except Exception as e:
+        inflight.set_exception(e)
+        raise
+    else:
+        wrappingobj.results_cache[cache_key] = ResultCache(result, now)
+        inflight.set(result)
+        return result
+    finally:
+        wrappingobj.inflight_queries.pop(cache_key, None)
+        if not inflight.ready():
+            inflight.set_exception(_SingleFlightAborted())
+
+
+def _refresh_in_background(
+        wrappingobj: CacheableMixIn,
+        cache_key: int,
+        method_name: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+) -> None:
+    """Refreshes a stale result by calling the method again with ignore_cache.
+
+    The call goes through the bound method and not the undecorated function so that
+    all the decorators of the method, such as protect_with_lock, apply to it as well.
+    """
+    try:
+        getattr(wrappingobj, method_name)(*args, **{**kwargs, 'ignore_cache': True})
+    except Exception as e:  # pylint: disable=broad-except
+        # The stale result stays in the cache and the next caller will try again
+        log.error(f'Failed to refresh the cached result of {method_name} due to {str(e)}')
+    finally:
+        wrappingobj.refreshing_keys.discard(cache_key)
+
+
 def cache_response_timewise(
         arguments_matter: bool = True,
         forward_ignore_cache: bool = False,
+        ttl_secs: Optional[int] = None,
+        stale_while_revalidate: bool = False,
 ) -> Callable:
     """ This is a decorator for caching results of functions of objects.
     The objects must adhere to the CachableOject interface.
@@ -65,6 +165,26 @@ def cache_response_timewise(
 
     if forward_ignore_cache is True then if the ignore_cache argument is given it's
     forward to the decorated function instead of being silently consumed.
+
+    ttl_secs is the number of seconds a result is cached for. If not given the
+    object's cache_ttl_secs is used. If the object's cache_ttl_secs is 0 caching is
+    disabled regardless.
+
+    Concurrent identical calls that miss the cache don't duplicate work. Only the first
+    one calls the function and the rest wait for its result.
+
+    If stale_while_revalidate is True then an expired result is returned immediately
+    and a single background greenlet refreshes it. Only a missing result or
+    ignore_cache=True make the caller wait for the function. The refresh calls the
+    method with ignore_cache=True, so any lock the method is protected with is held.
+    Such a lock should be applied below this decorator, so that callers served from
+    the cache don't wait for the lock while a refresh holds it.
+    If the special keyword argument allow_stale=False is given then an expired result
+    is not returned and the caller waits for the function as if stale_while_revalidate
+    was False.
+
+    The age of the oldest cached result served to a greenlet can be retrieved with
+    pop_served_cache_age().
     """
     def _cache_response_timewise(f: Callable) -> Callable:
         @wraps(f)
@@ -73,6 +193,7 @@ def cache_response_timewise(
                 ignore_cache = kwargs.get('ignore_cache', False)
             else:
                 ignore_cache = kwargs.pop('ignore_cache', False)
+            allow_stale = kwargs.pop('allow_stale', True)
             cache_key = function_sig_key(
                 f.__name__,        # name
                 arguments_matter,  # arguments_matter
@@ -80,26 +201,44 @@ def cache_response_timewise(
                 *args,
                 **kwargs,
             )
-            now = ts_now()
-            if ignore_cache is False:
-                # Check the cache
-                if cache_key in wrappingobj.results_cache:
-                    cache_life_secs = now - wrappingobj.results_cache[cache_key].timestamp
-
-            cache_miss = (
-                ignore_cache is True or
-                cache_key not in wrappingobj.results_cache or
-                cache_life_secs >= wrappingobj.cache_ttl_secs
-            )
-
-            if cache_miss:
-                # Call the function, write the result in cache and return it
-                result = f(wrappingobj, *args, **kwargs)
-                wrappingobj.results_cache[cache_key] = ResultCache(result, now)
-                return result
+            if wrappingobj.cache_ttl_secs == 0 or ttl_secs is None:
+                cache_ttl = wrappingobj.cache_ttl_secs
+            else:
+                cache_ttl = ttl_secs
+            cached = wrappingobj.results_cache.get(cache_key)
+            if ignore_cache is True or cached is None or cache_ttl == 0:
+                return _query_and_cache(wrappingobj, cache_key, f, args, kwargs)
+
+            cache_life_secs = ts_now() - cached.timestamp
+            if cache_life_secs >= cache_ttl:
+                if stale_while_revalidate is False or allow_stale is False:
+                    return _query_and_cache(wrappingobj, cache_key, f, args, kwargs)
+
+                if cache_key not in wrappingobj.refreshing_keys:
+                    wrappingobj.refreshing_keys.add(cache_key)
+                    refresh_kwargs: Dict[str, Any] = {
+                        'wrappingobj': wrappingobj,
+                        'cache_key': cache_key,
+                        'method_name': f.__name__,
+                        'args': args,
+                        'kwargs': kwargs,
+                    }
+                    task_name = f'Refresh cached result of {f.__name__}'
+                    if wrappingobj.greenlet_manager is not None:
+                        wrappingobj.greenlet_manager.spawn_and_track(
+                            after_seconds=None,
+                            task_name=task_name,
+                            exception_is_error=False,
+                            method=_refresh_in_background,
+                            **refresh_kwargs,
+                        )
+                    else:
+                        greenlet = gevent.spawn(_refresh_in_background, **refresh_kwargs)
+                        greenlet.task_name = task_name
 
             # else hit the cache and return it
-            return wrappingobj.results_cache[cache_key].result
+            record_served_cache_age(cache_life_secs)
+            return cached.result
 
         return wrapper
     return _cache_response_timewise
@@ -0,0 +1,208 @@
+"""Runs CPU heavy jobs in worker processes so that they don't block the gevent hub
+
+A job is a module level function and its arguments, all of which have to be
+picklable. Jobs should only work on their arguments, like writing given data to
+files. They have no access to the user DB or any other state of the main process.
+
+The greenlet that runs a job waits for messages from the worker cooperatively,
+so the rest of the backend, such as the API, keeps running while the worker is
+busy. A job can call report_progress to send progress data back to the main
+process while it runs.
+"""
+import logging
+import multiprocessing
+import os
+import sys
+import traceback
+from multiprocessing.connection import Connection
+from typing import Any, Callable, List, Optional, Tuple
+
+import gevent
+from gevent.lock import BoundedSemaphore
+from gevent.socket import wait_read
+
+from rotkehlchen.errors.misc import WorkerProcessError
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+DEFAULT_WORKER_PROCESSES = 2
+
+# Connection to the main process. Only set inside a worker process
+_worker_connection: Optional[Connection] = None
+
+
+def report_progress(data: Any) -> None:
+    """Sends progress data of the running job to the main process. Does nothing
+    if not called from a job running in a worker process."""
+    if _worker_connection is not None:
+        _worker_connection.send(('progress', data))
+
+
+def _worker_main(connection: Connection) -> None:
+    """Main loop of a worker process. Runs jobs until the connection is closed"""
+    global _worker_connection  # pylint: disable=global-statement
+    _worker_connection = connection
+    while True:
+        try:
+            function, args, kwargs = connection.recv()
+        except (EOFError, OSError):
+            return
+
+        try:
+            result = function(*args, **kwargs)
+        except Exception as e:  # pylint: disable=broad-except
+            try:  # send the exception itself so that the caller can handle it as usual
+                connection.send(('exception', e))
+            except Exception:  # pylint: disable=broad-except  # can't be pickled
+                connection.send(('error', traceback.format_exc()))
+        else:
+            connection.send(('result', result))
+
+
+class _Worker():
+
+    def __init__(self, context: multiprocessing.context.SpawnContext) -> None:
+        self.connection, child_connection = context.Pipe(duplex=True)
+        if sys.platform != 'win32':
+            # the socket pair of the monkey patched socket module is non blocking but
+            # the connections expect blocking reads. Waiting is done with wait_read.
+            os.set_blocking(self.connection.fileno(), True)
+            os.set_blocking(child_connection.fileno(), True)
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection,),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+
+    def receive(self) -> Tuple[str, Any]:
+        """Waits for the next message from the worker without blocking other greenlets
+
+        May raise:
+        - EOFError or OSError if the worker process has died
+        """
+        if sys.platform == 'win32':  # can't wait on pipe handles in the hub
+            gevent.get_hub().threadpool.apply(self.connection.poll, (None,))
+        else:
+            wait_read(self.connection.fileno())
+        return self.connection.recv()
+
+    def stop(self) -> None:
+        self.connection.close()
+        self.process.terminate()
+        self.process.join(timeout=1)
+
+
+class WorkerProcessPool():
+    """Pool of worker processes that are started when first needed. Each worker
+    runs one job at a time. Jobs wait in order for a free worker."""
+
+    def __init__(self, size: int = DEFAULT_WORKER_PROCESSES) -> None:
+        self.context = multiprocessing.get_context('spawn')
+        self.slots = BoundedSemaphore(size)
+        self.idle_workers: List[_Worker] = []
+
+    def _get_worker(self) -> _Worker:
+        """Needs to be called while holding a slot
+
+        May raise:
+        - WorkerProcessError if a new worker process can't be started
+        """
+        while len(self.idle_workers) != 0:
+            worker = self.idle_workers.pop()
+            if worker.process.is_alive():
+                return worker
+            worker.stop()
+
+        log.debug('Starting a worker process')
+        try:
+            return _Worker(self.context)
+        except OSError as e:
+            raise WorkerProcessError(f'Could not start a worker process due to {str(e)}') from e  # noqa: E501
+
+    def run(
+            self,
+            function: Callable[..., Any],
+            *args: Any,
+            progress_callback: Optional[Callable[[Any], None]] = None,
+            **kwargs: Any,
+    ) -> Any:
+        """Runs function(*args, **kwargs) in a worker process and returns its result.
+        Progress sent by the job with report_progress is given to progress_callback.
+
+        If the calling greenlet is killed while the job runs, the worker is stopped.
+
+        May raise:
+        - WorkerProcessError if the job can't be run or the worker dies while running it
+        - Any exception the job raises, if it can be pickled
+        """
+        with self.slots:
+            worker = self._get_worker()
+            finished = False
+            try:
+                try:
+                    worker.connection.send((function, args, kwargs))
+                    while True:
+                        message_type, data = worker.receive()
+                        if message_type != 'progress':
+                            break
+                        if progress_callback is not None:
+                            progress_callback(data)
+                except (EOFError, OSError) as e:
+                    raise WorkerProcessError(
+                        f'Worker process failed while running {function.__name__}',
+                    ) from e
+
+                finished = True
+            finally:
+                if finished:
+                    self.idle_workers.append(worker)
+                else:  # the worker may still be running the job
+                    worker.stop()
+
+        if message_type == 'result':
+            return data
+        if message_type == 'exception':
+            raise data
+        raise WorkerProcessError(f'{function.__name__} failed in a worker process with:\n{data}')  # noqa: E501
+
+    def stop(self) -> None:
+        """Stops the idle worker processes. New ones are started if more jobs are run"""
+        workers, self.idle_workers = self.idle_workers, []
+        for worker in workers:
+            worker.stop()
+
+
+_pool: Optional[WorkerProcessPool] = None
+
+
+def get_worker_pool() -> WorkerProcessPool:
+    """Returns the worker process pool of the backend"""
+    global _pool  # pylint: disable=global-statement
+    if _pool is None:
+        _pool = WorkerProcessPool()
+    return _pool
+
+
+def run_in_worker(function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Runs the job in a worker process of the backend pool and returns its result.
+    If no worker process can run it, as when processes can't be started, the job is
+    run in this process.
+
+    May raise:
+    - Any exception the job raises
+    """
+    try:
+        return get_worker_pool().run(function, *args, **kwargs)
+    except WorkerProcessError as e:
+        log.warning(f'Running {function.__name__} in the main process due to: {str(e)}')
+        return function(*args, **kwargs)
+
+
+def stop_worker_pool() -> None:
+    """Stops the worker processes of the backend pool, if any were started"""
+    if _pool is not None:
+        _pool.stop()
@@ -0,0 +1,130 @@
+import heapq
+import itertools
+import logging
+import time
+from collections import defaultdict
+from enum import IntEnum
+from typing import DefaultDict, List, Tuple
+
+import gevent
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+class RequestPriority(IntEnum):
+    """Lower values are served first"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+def current_priority() -> RequestPriority:
+    """Returns the priority of the caller of the current greenlet
+
+    Greenlets spawned by the GreenletManager are background tasks and carry a task_name.
+    Everything else runs as part of serving an API request.
+    """
+    if getattr(gevent.getcurrent(), 'task_name', None) is not None:
+        return RequestPriority.BACKGROUND
+    return RequestPriority.INTERACTIVE
+
+
+class TokenBucket():
+    """A gevent aware token bucket shared by all greenlets that query the same service
+
+    Tokens are refilled at `rate` per second up to `capacity`. Callers that find the
+    bucket empty are queued and served in order of priority and then arrival, so that
+    interactive requests go before background tasks.
+
+    The rate adapts to what the remote actually allows. Each time the remote says we are
+    rate limited the rate is halved (down to `min_rate`) and after `recover_after`
+    consecutive successful requests it is increased again by a fraction of `max_rate`.
+    """
+
+    def __init__(
+            self,
+            max_rate: float,
+            capacity: float,
+            min_rate: float = 0.1,
+            recover_after: int = 20,
+    ) -> None:
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.capacity = capacity
+        self.recover_after = recover_after
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.consecutive_successes = 0
+        self.waiters: List[Tuple[int, int]] = []
+        self.counter = itertools.count()
+        # per priority and not per caller so that it doesn't grow with each task
+        self.throttled_seconds: DefaultDict[RequestPriority, float] = defaultdict(float)
+        self.rate_limited_responses = 0
+
+    def reconfigure(self, max_rate: float, capacity: float) -> None:
+        """Changes the limits of the bucket. For example when the api key changes"""
+        if max_rate == self.max_rate and capacity == self.capacity:
+            return
+
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.min_rate = min(self.min_rate, max_rate)
+        self.capacity = capacity
+        self.tokens = min(self.tokens, capacity)
+        self.consecutive_successes = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self) -> float:
+        """Blocks the current greenlet until a token is available and takes it
+
+        Returns the number of seconds the caller had to wait.
+        """
+        priority = current_priority()
+        entry = (priority, next(self.counter))
+        heapq.heappush(self.waiters, entry)
+        start = time.monotonic()
+        try:
+            while True:
+                self._refill()
+                if self.waiters[0] == entry:
+                    if self.tokens >= 1:
+                        heapq.heappop(self.waiters)
+                        self.tokens -= 1
+                        break
+
+                    wait = (1 - self.tokens) / self.rate
+                else:  # someone is ahead of us. Check again after the next token is due
+                    wait = 1 / self.rate
+
+                gevent.sleep(wait)
+        except BaseException:  # also greenlet kills. Don't leave a stale entry in the queue
+            self.waiters.remove(entry)
+            heapq.heapify(self.waiters)
+            raise
+
+        waited = time.monotonic() - start
+        if waited > 0:
+            self.throttled_seconds[priority] += waited
+        return waited
+
+    def register_success(self) -> None:
+        self.consecutive_successes += 1
+        if self.rate < self.max_rate and self.consecutive_successes >= self.recover_after:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+            self.consecutive_successes = 0
+
+    def register_rate_limited(self) -> None:
+        """The remote said we were rate limited despite the bucket. Slow down"""
+        self.rate_limited_responses += 1
+        self.consecutive_successes = 0
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+        self.last_refill = time.monotonic()
+        log.debug(f'Got rate limited. Reducing request rate to {self.rate} per second')
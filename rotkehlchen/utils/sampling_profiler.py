@@ -0,0 +1,185 @@
+"""Sampling profiler of the running backend
+
+All greenlets run in the thread of the gevent hub, so whatever runs there blocks
+everything else. The profiler samples the stack of that thread from a native thread
+at a fixed interval. Each sample is prefixed with the name of the greenlet that was
+running, so that the stacks of the background tasks can be told apart.
+
+It also traces the greenlet switches to account the time each greenlet held the hub.
+Greenlets spawned by the GreenletManager are named by their task name.
+
+The stacks are returned in the collapsed format of flamegraph.pl and speedscope:
+one line per distinct stack with its frames separated by semicolons and followed
+by the microseconds attributed to it. Each sample is weighted by the time since
+the previous one. The sampler has to wait for the GIL, so samples are further apart
+while Python code runs and weighting them keeps the proportions right.
+"""
+import sys
+from collections import defaultdict
+from time import perf_counter
+from types import FrameType
+from typing import Any, DefaultDict, Dict, List, NamedTuple, Optional
+
+import gevent
+import greenlet
+from gevent.hub import Hub
+from gevent.monkey import get_original
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+HUB_TASK_NAME = 'gevent hub (idle or waiting for I/O)'
+
+# The originals since the sampler runs in a native thread and not in a greenlet
+_get_native_ident = get_original('_thread', 'get_ident')
+_start_native_thread = get_original('_thread', 'start_new_thread')
+_allocate_native_lock = get_original('_thread', 'allocate_lock')
+_native_sleep = get_original('time', 'sleep')
+
+
+def greenlet_task_name(glet: greenlet.greenlet) -> str:
+    """Name of the greenlet in the profile. Needs to be called while the greenlet is
+    alive since gevent forgets the function a greenlet runs once it finishes."""
+    task_name = getattr(glet, 'task_name', None)
+    if task_name is not None:
+        return task_name
+    if isinstance(glet, Hub):
+        return HUB_TASK_NAME
+    args = getattr(glet, 'args', ())
+    if getattr(glet, 'task_id', None) is not None and len(args) != 0:
+        # async API query. The first argument is the command
+        return f'API task {getattr(args[0], "__qualname__", args[0])}'
+
+    run = getattr(glet, '_run', None)
+    if run is not None:
+        return getattr(run, '__qualname__', str(run))
+    return 'main' if glet.parent is None else str(glet)
+
+
+def _format_stack(frame: Optional[FrameType]) -> List[str]:
+    """Returns the frames of the stack from the outermost to the innermost"""
+    stack = []
+    while frame is not None:
+        stack.append(f'{frame.f_code.co_name}({frame.f_globals.get("__name__")})')
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class GreenletTime(NamedTuple):
+    task_name: str
+    seconds: float
+    switches: int
+
+    def serialize(self, duration: float) -> Dict[str, Any]:
+        return {
+            'task_name': self.task_name,
+            'seconds': round(self.seconds, 6),
+            'percentage': round(self.seconds * 100 / duration, 2) if duration else 0,
+            'switches': self.switches,
+        }
+
+
+class ProfileResult(NamedTuple):
+    duration: float
+    samples: int
+    stack_counts: Dict[str, int]
+    greenlet_times: List[GreenletTime]
+
+    def collapsed_stacks(self) -> str:
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(self.stack_counts.items()))  # noqa: E501
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            'duration': round(self.duration, 6),
+            'samples': self.samples,
+            'collapsed_stacks': self.collapsed_stacks(),
+            'greenlets': [x.serialize(self.duration) for x in self.greenlet_times],
+        }
+
+
+class SamplingProfiler():
+    """Profiles the hub thread between start and stop. Only one can run at a time
+    since the greenlet trace function is global."""
+
+    def __init__(self, sample_interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        self.sample_interval = sample_interval
+        self.running = False
+        self.task_names: Dict[greenlet.greenlet, str] = {}
+        self.current_task_name = 'main'
+        self.last_switch_time = 0.0
+        self.task_seconds: DefaultDict[str, float] = defaultdict(float)
+        self.task_switches: DefaultDict[str, int] = defaultdict(int)
+        self.stack_counts: DefaultDict[str, int] = defaultdict(int)
+        self.samples = 0
+        self.start_time = 0.0
+        self.previous_trace: Optional[Any] = None
+        self.hub_thread_ident = 0
+        self.sampler_done = _allocate_native_lock()
+
+    def _task_name(self, glet: greenlet.greenlet) -> str:
+        task_name = self.task_names.get(glet)
+        if task_name is None:
+            task_name = self.task_names[glet] = greenlet_task_name(glet)
+        return task_name
+
+    def _trace(self, event: str, args: Any) -> None:
+        if event in ('switch', 'throw'):
+            origin, target = args
+            now = perf_counter()
+            self.task_seconds[self._task_name(origin)] += now - self.last_switch_time
+            self.last_switch_time = now
+            self.current_task_name = self._task_name(target)
+            self.task_switches[self.current_task_name] += 1
+
+        if self.previous_trace is not None:
+            self.previous_trace(event, args)
+
+    def _sample(self) -> None:
+        """Runs in the native sampler thread until the profiler stops"""
+        last_sample_time = perf_counter()
+        try:
+            while self.running:
+                _native_sleep(self.sample_interval)
+                frame = sys._current_frames().get(self.hub_thread_ident)  # pylint: disable=protected-access  # noqa: E501
+                now = perf_counter()
+                elapsed, last_sample_time = now - last_sample_time, now
+                if frame is None:
+                    continue
+                stack = ';'.join([self.current_task_name, *_format_stack(frame)])
+                self.stack_counts[stack] += int(elapsed * 1000000)
+                self.samples += 1
+        finally:
+            self.sampler_done.release()
+
+    def start(self) -> None:
+        assert self.running is False, 'profiler already started'
+        current = gevent.getcurrent()
+        self.current_task_name = self._task_name(current)
+        self.hub_thread_ident = _get_native_ident()
+        self.start_time = self.last_switch_time = perf_counter()
+        self.running = True
+        self.previous_trace = greenlet.settrace(self._trace)
+        self.sampler_done.acquire()
+        _start_native_thread(self._sample, ())
+
+    def stop(self) -> ProfileResult:
+        assert self.running is True, 'profiler not started'
+        self.running = False
+        greenlet.settrace(self.previous_trace)
+        now = perf_counter()
+        self.task_seconds[self.current_task_name] += now - self.last_switch_time
+        # wait for the sampler to finish its last sample. Takes at most an interval
+        self.sampler_done.acquire()
+        self.sampler_done.release()
+
+        greenlet_times = [
+            GreenletTime(task_name=name, seconds=seconds, switches=self.task_switches[name])
+            for name, seconds in self.task_seconds.items()
+        ]
+        greenlet_times.sort(key=lambda x: x.seconds, reverse=True)
+        self.task_names = {}  # don't keep the greenlets alive
+        return ProfileResult(
+            duration=now - self.start_time,
+            samples=self.samples,
+            stack_counts=dict(self.stack_counts),
+            greenlet_times=greenlet_times,
+        )
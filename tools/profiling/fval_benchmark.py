@@ -0,0 +1,95 @@
+"""Micro-benchmark of the FVal operations that dominate accounting and balances
+
+The operations are the ones of the cost basis calculation in
+rotkehlchen/accounting/cost_basis/base.py and of the balances aggregation in
+rotkehlchen/chain/manager.py. Each is also timed on plain Decimals to show the
+overhead of FVal. Run from the repository root:
+
+    python -m tools.profiling.fval_benchmark
+"""
+import argparse
+import timeit
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Tuple
+
+from rotkehlchen.fval import FVal
+
+ZERO = FVal(0)
+AMOUNT = '1.2345678901234'
+RATE = '1834.12'
+
+
+def _operations(zero: Any, amount: Any, rate: Any) -> List[Tuple[str, Callable[[], Any]]]:
+    """The operations to time, for the given values of the number type"""
+    return [
+        ('add', lambda: amount + rate),
+        ('sub', lambda: amount - rate),
+        ('mul', lambda: amount * rate),
+        ('truediv', lambda: amount / rate),
+        ('add int', lambda: amount + 1),
+        ('lt', lambda: amount < rate),
+        ('le', lambda: zero <= amount),
+        ('eq zero', lambda: amount == zero),
+        ('ne zero', lambda: amount != zero),
+        ('abs', lambda: abs(amount)),
+    ]
+
+
+def _consume_acquisitions(zero: Any, acquisitions: List[Tuple[Any, Any]], sold: Any) -> Any:
+    """Same arithmetic as consuming acquisitions for a spend in the cost basis"""
+    taxable_amount = taxable_bought_cost = zero
+    remaining_sold_amount = sold
+    for remaining_amount, rate in acquisitions:
+        if remaining_sold_amount < remaining_amount:
+            taxable_amount += remaining_sold_amount
+            taxable_bought_cost += rate * remaining_sold_amount
+            break
+        remaining_sold_amount -= remaining_amount
+        taxable_amount += remaining_amount
+        taxable_bought_cost += rate * remaining_amount
+    return taxable_bought_cost
+
+
+def _aggregate_balances(zero: Any, balances: List[Tuple[str, Any, Any]]) -> Dict[str, Any]:
+    """Same arithmetic as aggregating per account balances to totals in the chain manager"""
+    totals: Dict[str, Any] = {}
+    for asset, amount, price in balances:
+        usd_value = amount * price
+        totals[asset] = totals.get(asset, zero) + usd_value
+    return totals
+
+
+def _time(method: Callable[[], Any], runs: int) -> float:
+    """Returns the best nanoseconds per run out of 3 repeats"""
+    return min(timeit.repeat(method, number=runs, repeat=3)) * 1e9 / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the FVal operations')
+    parser.add_argument('--runs', type=int, default=100000, help='Runs per repeat')
+    args = parser.parse_args()
+
+    fval_operations = _operations(ZERO, FVal(AMOUNT), FVal(RATE))
+    decimal_operations = _operations(Decimal(0), Decimal(AMOUNT), Decimal(RATE))
+    for (name, fval_method), (_, decimal_method) in zip(fval_operations, decimal_operations):
+        fval_ns = _time(fval_method, args.runs)
+        decimal_ns = _time(decimal_method, args.runs)
+        print(f'{name}: FVal {fval_ns:.0f}ns, Decimal {decimal_ns:.0f}ns, overhead {fval_ns / decimal_ns:.2f}x')  # noqa: E501
+
+    token_amount = 1234567890123456789012
+    fixed_point_ns = _time(lambda: FVal.from_fixed_point(token_amount, 18), args.runs)
+    division_ns = _time(lambda: token_amount / (FVal(10) ** FVal(18)), args.runs)
+    print(f'fixed point 18 decimals: from_fixed_point {fixed_point_ns:.0f}ns, division {division_ns:.0f}ns')  # noqa: E501
+
+    loop_runs = max(1, args.runs // 1000)
+    for label, number_type, zero in (('FVal', FVal, ZERO), ('Decimal', Decimal, Decimal(0))):
+        acquisitions = [(number_type(f'0.{idx + 1}'), number_type(f'{1000 + idx}.5')) for idx in range(1000)]  # noqa: E501
+        sold = number_type('30')
+        balances = [(f'TOKEN{idx % 50}', number_type(f'{idx}.123'), number_type('1.5')) for idx in range(1000)]  # noqa: E501
+        cost_basis_us = _time(lambda: _consume_acquisitions(zero, acquisitions, sold), loop_runs) / 1000  # noqa: E501
+        aggregation_us = _time(lambda: _aggregate_balances(zero, balances), loop_runs) / 1000  # noqa: E501
+        print(f'{label}: cost basis spend over 1000 acquisitions {cost_basis_us:.0f}us, aggregation of 1000 balances {aggregation_us:.0f}us')  # noqa: E501
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark of the serialization of representative API responses
+
+Compares the two pass serialization, process_result followed by json.dumps, with
+the single pass dumps_json that api_response uses. Run from the repository root:
+
+    python -m tools.profiling.json_benchmark
+"""
+import argparse
+import json
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.accounting.pnl import PNL
+from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.accounting.structures.base import HistoryBaseEntry
+from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.assets.types import AssetType
+from rotkehlchen.fval import FVal
+from rotkehlchen.serialization.encoder import dumps_json
+from rotkehlchen.serialization.serialize import process_result
+from rotkehlchen.types import Location, Price, Timestamp, TimestampMS
+
+
+def _make_assets(number: int) -> List[Asset]:
+    return [
+        Asset.initialize(identifier=f'TOKEN{idx}', asset_type=AssetType.EVM_TOKEN, symbol=f'T{idx}')  # noqa: E501
+        for idx in range(number)
+    ]
+
+
+def history_events_page(entries: int) -> Dict[str, Any]:
+    asset = _make_assets(1)[0]
+    events = [HistoryBaseEntry(
+        event_identifier=idx.to_bytes(32, byteorder='big'),
+        sequence_index=1,
+        timestamp=TimestampMS(1600000000000 + idx),
+        location=Location.BLOCKCHAIN,
+        event_type=HistoryEventType.SPEND,
+        event_subtype=HistoryEventSubType.FEE,
+        asset=asset,
+        balance=Balance(amount=FVal('0.0123'), usd_value=FVal('30.12')),
+        location_label='0x9531C059098e3d194fF87FebB587aB07B30B1306',
+        notes='Burned 0.0123 ETH for gas',
+        counterparty='gas',
+        identifier=idx,
+    ) for idx in range(entries)]
+    return {'result': {
+        'entries': [{'entry': x.serialize(), 'customized': False} for x in events],
+        'entries_found': entries,
+        'entries_limit': -1,
+    }, 'message': ''}
+
+
+def blockchain_balances(accounts: int, assets_per_account: int) -> Dict[str, Any]:
+    assets = _make_assets(assets_per_account)
+    per_account = {
+        f'0x{idx:040x}': {
+            'assets': {
+                asset: Balance(amount=FVal('1.2345'), usd_value=FVal('1001.5'))
+                for asset in assets
+            },
+            'liabilities': {},
+        } for idx in range(accounts)
+    }
+    totals = {
+        asset: Balance(amount=FVal('1.2345') * accounts, usd_value=FVal('1001.5') * accounts)
+        for asset in assets
+    }
+    return {'result': {
+        'per_account': {'ETH': per_account},
+        'totals': {'assets': totals, 'liabilities': {}},
+    }, 'message': ''}
+
+
+def pnl_report_data(entries: int) -> Dict[str, Any]:
+    asset = _make_assets(1)[0]
+    events = [ProcessedAccountingEvent(
+        type=AccountingEventType.TRADE,
+        notes=f'Sold {idx} TOKEN0',
+        location=Location.KRAKEN,
+        timestamp=Timestamp(1600000000 + idx),
+        asset=asset,
+        free_amount=FVal('0.5'),
+        taxable_amount=FVal('1.5'),
+        price=Price(FVal('1245.23')),
+        pnl=PNL(taxable=FVal('12.3'), free=FVal('1.1')),
+        cost_basis=None,
+        index=idx,
+    ) for idx in range(entries)]
+    return {'result': {
+        'entries': [x.to_exported_dict(ts_converter=str, eth_explorer=None, for_api=True) for x in events],  # noqa: E501
+        'entries_found': entries,
+        'entries_limit': -1,
+    }, 'message': ''}
+
+
+def _two_pass(response: Dict[str, Any]) -> str:
+    return json.dumps(process_result(response))
+
+
+def _time(method: Callable[[Dict[str, Any]], str], response: Dict[str, Any], runs: int) -> float:
+    """Returns the best milliseconds per run out of 3 repeats"""
+    return min(timeit.repeat(lambda: method(response), number=runs, repeat=3)) * 1000 / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the API response serialization')
+    parser.add_argument('--runs', type=int, default=10, help='Runs per repeat')
+    args = parser.parse_args()
+
+    responses: List[Tuple[str, Dict[str, Any]]] = [
+        ('history events page of 1000', history_events_page(1000)),
+        ('balances of 300 accounts', blockchain_balances(accounts=300, assets_per_account=10)),
+        ('pnl report data of 1000', pnl_report_data(1000)),
+    ]
+    for name, response in responses:
+        assert _two_pass(response) == dumps_json(response)
+        two_pass = _time(_two_pass, response, args.runs)
+        single_pass = _time(dumps_json, response, args.runs)
+        print(
+            f'{name}: two pass {two_pass:.2f}ms, single pass {single_pass:.2f}ms, '
+            f'speedup {two_pass / single_pass:.2f}x',
+        )
+
+
+if __name__ == '__main__':
+    main()